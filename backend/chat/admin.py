@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ChatRoom, Message, MessageRead
+from .models import ChatRoom, Message, MessageRead, ChatReadState
 
 
 @admin.register(ChatRoom)
@@ -28,3 +28,10 @@ class MessageReadAdmin(admin.ModelAdmin):
     list_display = ['id', 'message', 'user', 'read_at']
     list_filter = ['read_at']
     readonly_fields = ['read_at']
+
+
+@admin.register(ChatReadState)
+class ChatReadStateAdmin(admin.ModelAdmin):
+    list_display = ['id', 'chat_room', 'user', 'last_read_message_id', 'updated_at']
+    list_filter = ['updated_at']
+    readonly_fields = ['updated_at']
@@ -2,19 +2,25 @@ import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
-from .models import ChatRoom, Message, MessageRead
+from django.db import transaction
+from .models import ChatRoom, Message, ChatReadState
+from . import fanout
+from .history import record_message
+from .heartbeat import HeartbeatMixin
+from projects import stats
+from projects.permissions import MembershipResolver
+from tasks import reminders
 
 
 User = get_user_model()
 
 
-class ChatConsumer(AsyncWebsocketConsumer):
+class ChatConsumer(HeartbeatMixin, AsyncWebsocketConsumer):
     """Consumer para WebSocket de chat."""
     
     async def connect(self):
         """Manejar conexión WebSocket."""
         self.room_id = self.scope['url_route']['kwargs']['room_id']
-        self.room_group_name = f'chat_{self.room_id}'
         self.user = self.scope['user']
         
         # Verificar autenticación
@@ -28,17 +34,25 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
-        # Unirse al grupo de la sala
+        # Respetar el límite de conexiones por usuario
+        if not await self.register_connection():
+            return
+        
+        # Unirse al grupo (o subgrupo, en salas grandes) de la sala
+        self.room_shards = await self.get_room_shards()
+        self.room_group_name = fanout.room_group_name(
+            self.room_id, self.room_shards, self.channel_name
+        )
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
         )
         
         await self.accept()
+        self.start_heartbeat()
         
         # Notificar que el usuario se conectó
-        await self.channel_layer.group_send(
-            self.room_group_name,
+        await self.room_group_send(
             {
                 'type': 'user_join',
                 'user_id': self.user.id,
@@ -48,27 +62,38 @@ class ChatConsumer(AsyncWebsocketConsumer):
     
     async def disconnect(self, close_code):
         """Manejar desconexión WebSocket."""
-        if hasattr(self, 'room_group_name'):
-            # Notificar que el usuario se desconectó
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'user_leave',
-                    'user_id': self.user.id,
-                    'user_name': self.user.get_full_name(),
-                }
-            )
-            
-            # Salir del grupo
-            await self.channel_layer.group_discard(
-                self.room_group_name,
-                self.channel_name
-            )
+        await self.stop_heartbeat()
+        await self.leave_groups()
+    
+    async def leave_groups(self):
+        """Notificar la salida y abandonar el grupo de la sala (una sola vez)."""
+        if not hasattr(self, 'room_group_name'):
+            return
+        room_group_name = self.room_group_name
+        del self.room_group_name
+        
+        # Notificar que el usuario se desconectó
+        await self.room_group_send(
+            {
+                'type': 'user_leave',
+                'user_id': self.user.id,
+                'user_name': self.user.get_full_name(),
+            }
+        )
+        
+        # Salir del grupo
+        await self.channel_layer.group_discard(
+            room_group_name,
+            self.channel_name
+        )
     
     async def receive(self, text_data):
         """Recibir mensaje del WebSocket."""
         try:
             data = json.loads(text_data)
+            if await self.handle_heartbeat(data):
+                return
+            
             message_type = data.get('type', 'chat_message')
             
             if message_type == 'chat_message':
@@ -83,38 +108,56 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 'message': 'Formato de mensaje inválido'
             }))
     
+    async def room_group_send(self, event):
+        """Enviar un evento a todas las conexiones de la sala."""
+        await fanout.room_group_send(
+            self.channel_layer, self.room_id, self.room_shards, event
+        )
+    
     async def handle_chat_message(self, data):
         """Manejar mensaje de chat."""
         content = data.get('content', '').strip()
         msg_type = data.get('message_type', 'text')
+        client_key = data.get('client_key') or None
         
         if not content:
             return
         
-        # Guardar mensaje en base de datos
-        message = await self.save_message(content, msg_type)
+        if client_key is not None and (not isinstance(client_key, str) or len(client_key) > 64):
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': 'Clave de mensaje inválida'
+            }))
+            return
+        
+        # Guardar mensaje en base de datos (o recuperar el original si es un reintento)
+        message, created = await self.save_message(content, msg_type, client_key)
+        
+        event = {
+            'type': 'chat_message',
+            'message_id': message.id,
+            'content': message.content,
+            'message_type': message.message_type,
+            'sender_id': self.user.id,
+            'sender_name': self.user.get_full_name(),
+            'sender_email': self.user.email,
+            'created_at': message.created_at.isoformat(),
+            'client_key': message.client_key,
+        }
+        
+        if not created:
+            # Reintento: confirmar solo a este socket, sin volver a distribuir
+            await self.chat_message(event)
+            return
         
         # Enviar mensaje a todos en la sala
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'chat_message',
-                'message_id': message.id,
-                'content': message.content,
-                'message_type': message.message_type,
-                'sender_id': self.user.id,
-                'sender_name': self.user.get_full_name(),
-                'sender_email': self.user.email,
-                'created_at': message.created_at.isoformat(),
-            }
-        )
+        await self.room_group_send(event)
     
     async def handle_typing(self, data):
         """Manejar indicador de escritura."""
         is_typing = data.get('is_typing', False)
         
-        await self.channel_layer.group_send(
-            self.room_group_name,
+        await self.room_group_send(
             {
                 'type': 'typing_indicator',
                 'user_id': self.user.id,
@@ -124,16 +167,30 @@ class ChatConsumer(AsyncWebsocketConsumer):
         )
     
     async def handle_mark_read(self, data):
-        """Marcar mensajes como leídos."""
-        message_ids = data.get('message_ids', [])
-        await self.mark_messages_read(message_ids)
+        """Marcar mensajes como leídos hasta una marca de agua."""
+        up_to_id = data.get('up_to_id')
         
-        await self.channel_layer.group_send(
-            self.room_group_name,
+        try:
+            if up_to_id is None:
+                # Compatibilidad: clientes que aún envían la lista de ids
+                up_to_id = max(map(int, data.get('message_ids') or []), default=None)
+            else:
+                up_to_id = int(up_to_id)
+        except (TypeError, ValueError):
+            return
+        
+        if up_to_id is None:
+            return
+        
+        last_read_id = await self.mark_messages_read(up_to_id)
+        if last_read_id is None:
+            return
+        
+        await self.room_group_send(
             {
                 'type': 'messages_read',
                 'user_id': self.user.id,
-                'message_ids': message_ids,
+                'last_read_id': last_read_id,
             }
         )
     
@@ -151,6 +208,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 'email': event['sender_email'],
             },
             'created_at': event['created_at'],
+            'client_key': event.get('client_key'),
             'is_own_message': event['sender_id'] == self.user.id,
         }))
     
@@ -170,7 +228,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         await self.send(text_data=json.dumps({
             'type': 'messages_read',
             'user_id': event['user_id'],
-            'message_ids': event['message_ids'],
+            'last_read_id': event['last_read_id'],
         }))
     
     async def user_join(self, event):
@@ -200,7 +258,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             
             if room.room_type == 'group':
                 # Para chat grupal, verificar membresía en el proyecto
-                return room.project.memberships.filter(user=self.user).exists()
+                return MembershipResolver(self.user).is_member(room.project_id)
             else:
                 # Para chat privado, verificar si es participante
                 return room.participants.filter(id=self.user.id).exists()
@@ -208,35 +266,58 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return False
     
     @database_sync_to_async
-    def save_message(self, content, message_type):
-        """Guardar mensaje en la base de datos."""
-        room = ChatRoom.objects.get(id=self.room_id)
-        message = Message.objects.create(
-            chat_room=room,
-            sender=self.user,
-            content=content,
-            message_type=message_type
-        )
-        # Actualizar timestamp de la sala
-        room.save()
-        return message
+    def get_room_shards(self):
+        """Calcular los subgrupos de la sala, ampliándolos si creció."""
+        room = ChatRoom.objects.select_related('project').get(id=self.room_id)
+        if room.room_type == 'group' and room.project:
+            member_count = room.project.memberships.count()
+        else:
+            member_count = room.participants.count()
+        
+        shards = fanout.shard_count_for(member_count)
+        if shards > room.fanout_shards:
+            ChatRoom.objects.filter(
+                id=room.id,
+                fanout_shards__lt=shards
+            ).update(fanout_shards=shards)
+            return shards
+        return room.fanout_shards
     
     @database_sync_to_async
-    def mark_messages_read(self, message_ids):
-        """Marcar mensajes como leídos."""
-        messages = Message.objects.filter(
-            id__in=message_ids,
-            chat_room_id=self.room_id
-        ).exclude(sender=self.user)
+    def save_message(self, content, message_type, client_key=None):
+        """Guardar mensaje en la base de datos.
         
-        for message in messages:
-            MessageRead.objects.get_or_create(
-                message=message,
-                user=self.user
+        Retorna ``(message, created)``; ``created`` es falso si ``client_key``
+        ya se había usado y se retorna el mensaje original.
+        """
+        room = ChatRoom.objects.get(id=self.room_id)
+        with transaction.atomic():
+            message, created = Message.create_idempotent(
+                room,
+                self.user,
+                client_key,
+                content=content,
+                message_type=message_type
             )
+            if not created:
+                return message, False
+            
+            # Actualizar timestamp de la sala
+            room.save(update_fields=['updated_at'])
+            stats.message_created(room.project_id)
+        
+        record_message(message)
+        # Usar el número de subgrupos más reciente para la distribución
+        self.room_shards = room.fanout_shards
+        return message, True
+    
+    @database_sync_to_async
+    def mark_messages_read(self, up_to_id):
+        """Avanzar la marca de agua de lectura del usuario en la sala."""
+        return ChatReadState.advance(self.room_id, self.user, up_to_id)
 
 
-class NotificationConsumer(AsyncWebsocketConsumer):
+class NotificationConsumer(HeartbeatMixin, AsyncWebsocketConsumer):
     """Consumer para notificaciones en tiempo real."""
     
     async def connect(self):
@@ -247,22 +328,48 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
+        if not await self.register_connection():
+            return
+        
         self.notification_group_name = f'notifications_{self.user.id}'
         
         await self.channel_layer.group_add(
             self.notification_group_name,
             self.channel_name
         )
+        reminders.listeners.acquire(self.user.id)
         
         await self.accept()
+        self.start_heartbeat()
+        
+        # Recordatorios pendientes desde la última conexión; luego el ciclo
+        # periódico avisa mientras la conexión siga abierta
+        reminders.ensure_scheduler()
+        await reminders.send_due_reminders(self.channel_layer, [self.user.id])
     
     async def disconnect(self, close_code):
         """Manejar desconexión."""
-        if hasattr(self, 'notification_group_name'):
-            await self.channel_layer.group_discard(
-                self.notification_group_name,
-                self.channel_name
-            )
+        await self.stop_heartbeat()
+        await self.leave_groups()
+    
+    async def leave_groups(self):
+        """Abandonar el grupo de notificaciones (una sola vez)."""
+        if not hasattr(self, 'notification_group_name'):
+            return
+        notification_group_name = self.notification_group_name
+        del self.notification_group_name
+        reminders.listeners.release(self.user.id)
+        await self.channel_layer.group_discard(
+            notification_group_name,
+            self.channel_name
+        )
+    
+    async def receive(self, text_data):
+        """Solo se esperan mensajes de latido del cliente."""
+        try:
+            await self.handle_heartbeat(json.loads(text_data))
+        except (json.JSONDecodeError, AttributeError):
+            pass
     
     async def new_message_notification(self, event):
         """Enviar notificación de nuevo mensaje."""
@@ -273,3 +380,10 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             'sender_name': event['sender_name'],
             'content_preview': event['content_preview'],
         }))
+    
+    async def task_reminder_notification(self, event):
+        """Enviar recordatorios de fechas límite (ver ``tasks.reminders``)."""
+        await self.send(text_data=json.dumps({
+            'type': 'task_reminder',
+            'reminders': event['reminders'],
+        }))
@@ -0,0 +1,69 @@
+"""Ventana en memoria de claves de idempotencia de mensajes recientes.
+
+Evita consultar la base de datos cuando un cliente reenvía un mensaje poco
+después de enviarlo (por ejemplo, al reconectarse). La garantía definitiva
+la da el índice único ``(chat_room, sender, client_key)`` de ``Message``.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+def window_seconds():
+    return getattr(settings, 'CHAT_DEDUP_WINDOW_SECONDS', 120)
+
+
+def max_keys():
+    return getattr(settings, 'CHAT_DEDUP_MAX_KEYS', 10000)
+
+
+class RecentKeys:
+    """Mapa con expiración de ``(sala, remitente, clave)`` a id de mensaje."""
+
+    def __init__(self, ttl=None, max_keys=None):
+        # Sin valores explícitos se leen de la configuración en cada uso
+        self._ttl = ttl
+        self._max_keys = max_keys
+        self._keys = OrderedDict()  # clave -> (message_id, expira)
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return window_seconds() if self._ttl is None else self._ttl
+
+    @property
+    def max_keys(self):
+        return max_keys() if self._max_keys is None else self._max_keys
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            item = self._keys.get(key)
+            return item[0] if item else None
+
+    def add(self, key, message_id):
+        now = time.monotonic()
+        with self._lock:
+            self._keys.pop(key, None)
+            self._keys[key] = (message_id, now + self.ttl)
+            self._expire(now)
+            while len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+    def _expire(self, now):
+        # Las claves se insertan en orden de expiración
+        while self._keys:
+            _, (_, expires) = next(iter(self._keys.items()))
+            if expires > now:
+                break
+            self._keys.popitem(last=False)
+
+
+recent_keys = RecentKeys()
@@ -0,0 +1,122 @@
+"""Distribución (fan-out) de eventos a las salas de chat.
+
+Las salas pequeñas usan un único grupo ``chat_<id>``. Cuando una sala supera
+``CHAT_FANOUT_SHARD_SIZE`` integrantes, sus conexiones se reparten en
+subgrupos ``chat_<id>_s<k>`` y cada evento se envía a los subgrupos con
+paralelismo acotado (``CHAT_FANOUT_CONCURRENCY``).
+
+En salas particionadas quien envía no espera a la distribución: el evento
+entra en la cola de la sala y una sola tarea por sala la atiende en orden,
+así dos mensajes seguidos nunca llegan invertidos. Los errores de envío se
+registran en el log; un subgrupo que falla no impide entregar a los demás.
+
+El número de subgrupos de una sala (``ChatRoom.fanout_shards``) solo crece:
+una conexión unida al grupo base o al subgrupo ``hash % n`` sigue recibiendo
+los eventos cuando la sala pasa a ``m > n`` subgrupos, porque el envío cubre
+el grupo base y ``0..m-1``.
+
+Los valores de configuración se leen en cada llamada.
+"""
+import asyncio
+import logging
+import math
+import zlib
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Cola de distribución por sala: room_id -> (event loop, cola, tarea)
+_room_workers = {}
+
+
+def shard_size():
+    return getattr(settings, 'CHAT_FANOUT_SHARD_SIZE', 100)
+
+
+def max_shards():
+    return getattr(settings, 'CHAT_FANOUT_MAX_SHARDS', 16)
+
+
+def concurrency():
+    return getattr(settings, 'CHAT_FANOUT_CONCURRENCY', 4)
+
+
+def shard_count_for(member_count):
+    """Número de subgrupos recomendado para una sala con ``member_count`` integrantes."""
+    size = shard_size()
+    if member_count <= size:
+        return 1
+    return min(max_shards(), math.ceil(member_count / size))
+
+
+def room_group_name(room_id, shards, channel_name):
+    """Grupo al que debe unirse un canal dentro de una sala."""
+    if shards <= 1:
+        return f'chat_{room_id}'
+    shard = zlib.crc32(channel_name.encode()) % shards
+    return f'chat_{room_id}_s{shard}'
+
+
+def room_group_names(room_id, shards):
+    """Todos los grupos que cubren una sala con ``shards`` subgrupos."""
+    if shards <= 1:
+        return [f'chat_{room_id}']
+    # Incluye el grupo base por las conexiones anteriores al particionado
+    return [f'chat_{room_id}'] + [f'chat_{room_id}_s{k}' for k in range(shards)]
+
+
+async def _send_to_groups(channel_layer, room_id, groups, event):
+    semaphore = asyncio.Semaphore(concurrency())
+
+    async def send(group):
+        async with semaphore:
+            await channel_layer.group_send(group, event)
+
+    results = await asyncio.gather(*(send(group) for group in groups), return_exceptions=True)
+    for group, result in zip(groups, results):
+        if isinstance(result, Exception):
+            logger.error(
+                'Error al enviar el evento %s al grupo %s de la sala %s',
+                event.get('type'), group, room_id, exc_info=result
+            )
+
+
+async def _drain(channel_layer, room_id, queue):
+    """Atiende la cola de una sala en orden y termina cuando queda vacía."""
+    while not queue.empty():
+        groups, event = queue.get_nowait()
+        try:
+            await _send_to_groups(channel_layer, room_id, groups, event)
+        except Exception:
+            logger.exception('Error al distribuir el evento %s en la sala %s', event.get('type'), room_id)
+    worker = _room_workers.get(room_id)
+    if worker is not None and worker[2] is asyncio.current_task():
+        del _room_workers[room_id]
+
+
+async def room_group_send(channel_layer, room_id, shards, event):
+    """Enviar un evento a todas las conexiones de una sala.
+
+    Con un único grupo el envío es directo; con varios subgrupos el evento
+    se encola y la función retorna de inmediato.
+    """
+    groups = room_group_names(room_id, shards)
+    if len(groups) == 1:
+        await channel_layer.group_send(groups[0], event)
+        return
+
+    loop = asyncio.get_running_loop()
+    worker = _room_workers.get(room_id)
+    if worker is None or worker[0] is not loop or worker[2].done():
+        queue = asyncio.Queue()
+        task = loop.create_task(_drain(channel_layer, room_id, queue))
+        worker = _room_workers[room_id] = (loop, queue, task)
+    worker[1].put_nowait((groups, event))
+
+
+async def wait_pending():
+    """Espera a que se distribuyan los eventos encolados en este event loop."""
+    loop = asyncio.get_running_loop()
+    tasks = [task for worker_loop, _, task in list(_room_workers.values()) if worker_loop is loop]
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,154 @@
+"""Latido (ping/pong) y cierre de conexiones WebSocket inactivas.
+
+El servidor envía ``{"type": "ping"}`` cada ``CHAT_HEARTBEAT_INTERVAL``
+segundos y el cliente responde ``{"type": "pong"}`` (cualquier mensaje
+recibido cuenta como señal de vida). Si pasan ``CHAT_HEARTBEAT_MAX_MISSED``
+intervalos sin noticias del cliente, la conexión se cierra y sale de sus
+grupos sin esperar al timeout de TCP.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+
+def heartbeat_interval():
+    return getattr(settings, 'CHAT_HEARTBEAT_INTERVAL', 30)
+
+
+def heartbeat_max_missed():
+    return getattr(settings, 'CHAT_HEARTBEAT_MAX_MISSED', 2)
+
+
+def max_connections_per_user():
+    return getattr(settings, 'CHAT_MAX_CONNECTIONS_PER_USER', None)
+
+# Código de cierre para conexiones sin latido y para exceso de conexiones
+CLOSE_CODE_IDLE = 4408
+CLOSE_CODE_TOO_MANY = 4429
+
+
+class ConnectionRegistry:
+    """Contadores de conexiones vivas en este proceso."""
+
+    def __init__(self):
+        self._by_user = Counter()
+        self._lock = threading.Lock()
+
+    def acquire(self, user_id, limit=None):
+        """Registra una conexión; retorna ``False`` si supera ``limit``."""
+        with self._lock:
+            if limit is not None and self._by_user[user_id] >= limit:
+                return False
+            self._by_user[user_id] += 1
+            return True
+
+    def release(self, user_id):
+        with self._lock:
+            self._by_user[user_id] -= 1
+            if self._by_user[user_id] <= 0:
+                del self._by_user[user_id]
+
+    def count(self, user_id=None):
+        with self._lock:
+            if user_id is not None:
+                return self._by_user[user_id]
+            return sum(self._by_user.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'connections': sum(self._by_user.values()),
+                'users': len(self._by_user),
+                'by_user': dict(self._by_user),
+            }
+
+
+connections = ConnectionRegistry()
+
+
+class HeartbeatMixin:
+    """Mixin para ``AsyncWebsocketConsumer`` con latido y límite de conexiones.
+
+    Las subclases llaman a ``start_heartbeat()`` tras aceptar la conexión y
+    a ``stop_heartbeat()`` al desconectarse. Si se unen a grupos del channel
+    layer, sobrescriben ``leave_groups()`` para salir de ellos al cerrar una
+    conexión inactiva.
+    """
+
+    _heartbeat_task = None
+    _registered = False
+
+    # Se leen de la configuración en cada uso; una subclase puede fijarlos
+    @property
+    def heartbeat_interval(self):
+        return heartbeat_interval()
+
+    @property
+    def heartbeat_max_missed(self):
+        return heartbeat_max_missed()
+
+    @property
+    def max_connections_per_user(self):
+        return max_connections_per_user()
+
+    async def register_connection(self):
+        """Registrar la conexión; cierra y retorna ``False`` si excede el límite."""
+        if not connections.acquire(self.user.id, self.max_connections_per_user):
+            await self.close(code=CLOSE_CODE_TOO_MANY)
+            return False
+        self._registered = True
+        return True
+
+    def start_heartbeat(self):
+        self.last_seen = time.monotonic()
+        if self.heartbeat_interval:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop_heartbeat(self):
+        task, self._heartbeat_task = self._heartbeat_task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        if self._registered:
+            self._registered = False
+            connections.release(self.user.id)
+
+    def touch(self):
+        """Marcar actividad del cliente."""
+        self.last_seen = time.monotonic()
+
+    async def handle_heartbeat(self, data):
+        """Procesa ``ping``/``pong`` del cliente. Retorna ``True`` si lo era."""
+        self.touch()
+        message_type = data.get('type')
+        if message_type == 'ping':
+            await self.send_json_heartbeat('pong')
+            return True
+        return message_type == 'pong'
+
+    async def send_json_heartbeat(self, message_type):
+        await self.send(text_data=json.dumps({'type': message_type}))
+
+    async def leave_groups(self):
+        """Salir de los grupos del channel layer; por omisión no hay ninguno."""
+
+    async def _heartbeat(self):
+        timeout = self.heartbeat_interval * self.heartbeat_max_missed
+        try:
+            while True:
+                await asyncio.sleep(self.heartbeat_interval)
+                if time.monotonic() - self.last_seen > timeout:
+                    await self.reap()
+                    return
+                await self.send_json_heartbeat('ping')
+        except asyncio.CancelledError:
+            pass
+
+    async def reap(self):
+        """Cerrar una conexión abandonada y liberar sus grupos."""
+        await self.leave_groups()
+        await self.stop_heartbeat()
+        await self.close(code=CLOSE_CODE_IDLE)
@@ -0,0 +1,243 @@
+"""Historial reciente de mensajes en memoria por sala.
+
+Cada sala activa mantiene un buffer circular con sus últimos mensajes ya
+serializados. Se llena al leer el historial de la sala y se actualiza con
+cada mensaje guardado en este proceso, de modo que abrir una sala no vuelve
+a consultar los mensajes ni sus remitentes. Las salas se expulsan en orden
+LRU cuando el tamaño estimado supera el presupuesto de memoria.
+
+Mientras una petición lee el historial de la base de datos, los mensajes
+guardados en este proceso se anotan aparte y se agregan al llenar el
+buffer, así no se pierde un mensaje escrito entre la consulta y ``fill``.
+
+El buffer es local al proceso y no se entera de lo que cambia fuera de
+``record_message``: los mensajes de otros procesos y las ediciones o
+borrados hechos directamente en la base de datos (p. ej. desde el admin)
+se ven cuando la sala expira tras ``CHAT_HISTORY_TTL`` segundos o cuando se
+llama a ``invalidate_room``. Con varios procesos conviene un TTL corto.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+
+from projects.downloads import download_url
+
+
+def buffer_size():
+    return getattr(settings, 'CHAT_HISTORY_BUFFER_SIZE', 50)
+
+
+def memory_budget():
+    return getattr(settings, 'CHAT_HISTORY_MEMORY_BUDGET', 8 * 1024 * 1024)
+
+
+def history_ttl():
+    return getattr(settings, 'CHAT_HISTORY_TTL', 60)
+
+
+def _entry_size(entry):
+    """Tamaño aproximado en bytes de un mensaje serializado."""
+    return len(json.dumps(entry, default=str))
+
+
+class RoomHistoryBuffer:
+    """Buffers circulares de mensajes por sala con expulsión LRU.
+
+    Los límites que no se pasan al constructor se leen de la configuración
+    en cada uso.
+    """
+
+    def __init__(self, size=None, memory_budget=None, ttl=None):
+        self._size = size
+        self._memory_budget = memory_budget
+        self._ttl = ttl
+        # room_id -> [deque de (entrada, bytes), bytes, momento del llenado]
+        self._rooms = OrderedDict()
+        # room_id -> [lecturas en curso, mensajes agregados durante ellas]
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self):
+        return buffer_size() if self._size is None else self._size
+
+    @property
+    def memory_budget(self):
+        return memory_budget() if self._memory_budget is None else self._memory_budget
+
+    @property
+    def ttl(self):
+        return history_ttl() if self._ttl is None else self._ttl
+
+    def get(self, room_id, limit):
+        """Últimos ``limit`` mensajes (más recientes primero) o ``None``."""
+        with self._lock:
+            room = self._rooms.get(room_id)
+            if room is not None and self.ttl and time.monotonic() - room[2] > self.ttl:
+                self._discard(room_id)
+                room = None
+            if room is None or limit > self.size:
+                self.misses += 1
+                return None
+            self._rooms.move_to_end(room_id)
+            self.hits += 1
+            entries = list(room[0])
+        return [entry for entry, _ in reversed(entries[-limit:])] if limit else []
+
+    def begin_load(self, room_id):
+        """Anuncia que se leerá el historial de la sala de la base de datos.
+
+        Desde aquí hasta ``end_load`` los mensajes agregados con ``append``
+        se guardan para incorporarlos en ``fill``.
+        """
+        with self._lock:
+            self._loading.setdefault(room_id, [0, []])[0] += 1
+
+    def end_load(self, room_id):
+        with self._lock:
+            loading = self._loading.get(room_id)
+            if loading is None:
+                return
+            loading[0] -= 1
+            if loading[0] <= 0:
+                del self._loading[room_id]
+
+    def fill(self, room_id, entries):
+        """Inicializa el buffer de una sala con sus mensajes en orden cronológico.
+
+        Incorpora los mensajes agregados desde ``begin_load`` que la lectura
+        no alcanzó a ver. Retorna las entradas resultantes, en orden.
+        """
+        with self._lock:
+            loading = self._loading.get(room_id)
+            if loading and loading[1]:
+                seen = {entry.get('id') for entry in entries}
+                late = [entry for entry in loading[1] if entry.get('id') not in seen]
+                entries = sorted(entries + late, key=lambda entry: entry.get('id') or 0)
+            self._discard(room_id)
+            room = [deque(maxlen=self.size), 0, time.monotonic()]
+            self._rooms[room_id] = room
+            for entry in entries[-self.size:]:
+                self._push(room, entry)
+            self._evict()
+        return entries
+
+    def append(self, room_id, entry):
+        """Agrega un mensaje nuevo si la sala está en memoria o cargándose."""
+        with self._lock:
+            loading = self._loading.get(room_id)
+            if loading is not None:
+                loading[1] = (loading[1] + [entry])[-self.size:]
+            room = self._rooms.get(room_id)
+            if room is None:
+                return
+            self._push(room, entry)
+            self._rooms.move_to_end(room_id)
+            self._evict()
+
+    def discard(self, room_id):
+        with self._lock:
+            self._discard(room_id)
+
+    def clear(self):
+        with self._lock:
+            self._rooms.clear()
+            self._loading.clear()
+            self.bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'rooms': len(self._rooms),
+                'messages': sum(len(room[0]) for room in self._rooms.values()),
+                'bytes': self.bytes,
+                'memory_budget': self.memory_budget,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+    def _push(self, room, entry):
+        entries = room[0]
+        if len(entries) == entries.maxlen:
+            _, size = entries[0]
+            room[1] -= size
+            self.bytes -= size
+        size = _entry_size(entry)
+        entries.append((entry, size))
+        room[1] += size
+        self.bytes += size
+
+    def _discard(self, room_id):
+        room = self._rooms.pop(room_id, None)
+        if room is not None:
+            self.bytes -= room[1]
+
+    def _evict(self):
+        # Nunca expulsar la sala recién usada
+        while self.bytes > self.memory_budget and len(self._rooms) > 1:
+            _, room = self._rooms.popitem(last=False)
+            self.bytes -= room[1]
+
+
+room_history = RoomHistoryBuffer()
+
+
+def serialize_message(message):
+    """Serializa un mensaje de forma independiente de la petición."""
+    from .serializers import MessageSerializer
+
+    data = json.loads(json.dumps(MessageSerializer(message).data, default=str))
+    data.pop('is_own_message', None)
+    return data
+
+
+def personalize(entries, request):
+    """Adapta mensajes en memoria al usuario y host de la petición."""
+    user_id = request.user.id if request and request.user else None
+    results = []
+    for entry in entries:
+        data = dict(entry)
+        sender = data.get('sender')
+        data['is_own_message'] = bool(sender) and sender['id'] == user_id
+        if data.get('file') and request:
+            # La firma de descarga es por usuario
+            data['file'] = download_url(request, data['file'])
+        results.append(data)
+    return results
+
+
+def recent_messages(chat_room, limit, request):
+    """Últimos ``limit`` mensajes serializados de una sala, más recientes primero."""
+    entries = room_history.get(chat_room.id, limit)
+    if entries is None:
+        room_history.begin_load(chat_room.id)
+        try:
+            messages = chat_room.messages.select_related('sender').order_by('-created_at')
+            window = list(messages[:max(limit, room_history.size)])
+            entries_chrono = [serialize_message(message) for message in reversed(window)]
+            if limit <= room_history.size:
+                entries_chrono = room_history.fill(chat_room.id, entries_chrono)
+        finally:
+            room_history.end_load(chat_room.id)
+        entries = list(reversed(entries_chrono))[:limit]
+    return personalize(entries, request)
+
+
+def record_message(message):
+    """Registra un mensaje recién guardado en el buffer de su sala."""
+    room_history.append(message.chat_room_id, serialize_message(message))
+
+
+def invalidate_room(*room_ids):
+    """Descarta el historial en memoria de las salas (tras editar o borrar mensajes)."""
+    for room_id in room_ids:
+        room_history.discard(room_id)
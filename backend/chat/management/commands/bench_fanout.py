@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+from channels.layers import InMemoryChannelLayer
+from django.core.management.base import BaseCommand
+
+from chat import fanout
+
+
+class Command(BaseCommand):
+    """Mide la latencia de envío y de entrega del fan-out de salas de chat."""
+
+    help = 'Benchmark del fan-out de salas de chat con y sin subgrupos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--members', type=int, nargs='+', default=[10, 100, 1000],
+            help='Tamaños de sala a medir'
+        )
+        parser.add_argument(
+            '--rounds', type=int, default=20,
+            help='Mensajes enviados por tamaño de sala'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"integrantes":>11} {"modo":>10} {"subgrupos":>9} '
+            f'{"envío (ms)":>11} {"entrega (ms)":>13}'
+        )
+        for members in options['members']:
+            for mode, shards in (
+                ('único', 1),
+                ('particion', fanout.shard_count_for(members)),
+            ):
+                ack, delivery = asyncio.run(
+                    self.measure(members, shards, options['rounds'])
+                )
+                self.stdout.write(
+                    f'{members:>11} {mode:>10} {shards:>9} '
+                    f'{ack * 1000:>11.3f} {delivery * 1000:>13.3f}'
+                )
+
+    async def measure(self, members, shards, rounds):
+        """Retorna la latencia media de envío y de entrega completa."""
+        layer = InMemoryChannelLayer(capacity=rounds + 10)
+        channels = []
+        for _ in range(members):
+            channel = await layer.new_channel()
+            await layer.group_add(
+                fanout.room_group_name(1, shards, channel), channel
+            )
+            channels.append(channel)
+
+        event = {
+            'type': 'chat_message',
+            'content': 'x' * 500,
+            'sender_id': 1,
+            'sender_name': 'Benchmark',
+        }
+        ack_total = delivery_total = 0.0
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await fanout.room_group_send(layer, 1, shards, event)
+            ack_total += time.perf_counter() - start
+
+            await asyncio.gather(*(layer.receive(channel) for channel in channels))
+            delivery_total += time.perf_counter() - start
+
+        return ack_total / rounds, delivery_total / rounds
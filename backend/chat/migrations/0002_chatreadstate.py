@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_read_states(apps, schema_editor):
+    """Inicializa las marcas de agua a partir de las lecturas existentes."""
+    MessageRead = apps.get_model('chat', 'MessageRead')
+    ChatReadState = apps.get_model('chat', 'ChatReadState')
+    
+    rows = MessageRead.objects.values(
+        'message__chat_room_id', 'user_id'
+    ).annotate(last_id=models.Max('message_id'))
+    
+    ChatReadState.objects.bulk_create([
+        ChatReadState(
+            chat_room_id=row['message__chat_room_id'],
+            user_id=row['user_id'],
+            last_read_message_id=row['last_id'],
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatReadState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_message_id', models.BigIntegerField(default=0, verbose_name='último mensaje leído')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='fecha de actualización')),
+                ('chat_room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_states', to='chat.chatroom', verbose_name='sala de chat')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_read_states', to=settings.AUTH_USER_MODEL, verbose_name='usuario')),
+            ],
+            options={
+                'verbose_name': 'estado de lectura',
+                'verbose_name_plural': 'estados de lectura',
+                'unique_together': {('chat_room', 'user')},
+            },
+        ),
+        migrations.RunPython(backfill_read_states, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_chatreadstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroom',
+            name='fanout_shards',
+            field=models.PositiveSmallIntegerField(default=1, verbose_name='subgrupos de distribución'),
+        ),
+    ]
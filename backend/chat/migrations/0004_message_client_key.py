@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_chatroom_fanout_shards'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='client_key',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='clave del cliente'),
+        ),
+        migrations.AddConstraint(
+            model_name='message',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_key__isnull', False)), fields=('chat_room', 'sender', 'client_key'), name='unique_message_client_key'),
+        ),
+    ]
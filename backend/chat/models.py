@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.conf import settings
+from django.utils import timezone
 
 
 class ChatRoom(models.Model):
@@ -32,6 +33,8 @@ class ChatRoom(models.Model):
         verbose_name='participantes',
         blank=True
     )
+    # Número de subgrupos del channel layer (ver chat.fanout); solo crece
+    fanout_shards = models.PositiveSmallIntegerField('subgrupos de distribución', default=1)
     created_at = models.DateTimeField('fecha de creación', auto_now_add=True)
     updated_at = models.DateTimeField('fecha de actualización', auto_now=True)
     
@@ -39,6 +42,13 @@ class ChatRoom(models.Model):
         verbose_name = 'sala de chat'
         verbose_name_plural = 'salas de chat'
         ordering = ['-updated_at']
+        indexes = [
+            # Salas de un proyecto por tipo, de la más reciente a la más antigua
+            models.Index(
+                fields=['project', 'room_type', '-updated_at'],
+                name='chatroom_project_type_idx',
+            ),
+        ]
     
     def __str__(self):
         if self.room_type == 'group' and self.project:
@@ -121,16 +131,72 @@ class Message(models.Model):
         blank=True
     )
     is_read = models.BooleanField('leído', default=False)
+    # Clave de idempotencia opcional generada por el cliente
+    client_key = models.CharField(
+        'clave del cliente',
+        max_length=64,
+        null=True,
+        blank=True
+    )
     created_at = models.DateTimeField('fecha de envío', auto_now_add=True)
     
     class Meta:
         verbose_name = 'mensaje'
         verbose_name_plural = 'mensajes'
         ordering = ['created_at']
+        indexes = [
+            # Mensajes de una sala en orden cronológico
+            models.Index(fields=['chat_room', 'created_at'], name='message_room_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['chat_room', 'sender', 'client_key'],
+                condition=models.Q(client_key__isnull=False),
+                name='unique_message_client_key',
+            ),
+        ]
     
     def __str__(self):
         sender_name = self.sender.get_full_name() if self.sender else 'Sistema'
         return f'{sender_name}: {self.content[:50]}...'
+    
+    @classmethod
+    def create_idempotent(cls, chat_room, sender, client_key=None, **fields):
+        """Crea un mensaje o retorna el original si la clave ya se usó.
+        
+        Retorna ``(message, created)``. Sin ``client_key`` siempre crea.
+        """
+        from .dedup import recent_keys
+        
+        if not client_key:
+            return cls.objects.create(chat_room=chat_room, sender=sender, **fields), True
+        
+        window_key = (chat_room.id, sender.id, client_key)
+        message_id = recent_keys.get(window_key)
+        if message_id is not None:
+            message = cls.objects.filter(id=message_id).select_related('sender').first()
+            if message is not None:
+                return message, False
+        
+        try:
+            with transaction.atomic():
+                message = cls.objects.create(
+                    chat_room=chat_room,
+                    sender=sender,
+                    client_key=client_key,
+                    **fields
+                )
+        except IntegrityError:
+            message = cls.objects.select_related('sender').get(
+                chat_room=chat_room,
+                sender=sender,
+                client_key=client_key
+            )
+            recent_keys.add(window_key, message.id)
+            return message, False
+        
+        recent_keys.add(window_key, message.id)
+        return message, True
 
 
 class MessageRead(models.Model):
@@ -157,3 +223,63 @@ class MessageRead(models.Model):
     
     def __str__(self):
         return f'{self.user.email} leyó mensaje {self.message.id}'
+
+
+class ChatReadState(models.Model):
+    """Marca de agua de lectura por usuario y sala.
+    
+    Todos los mensajes de la sala con id menor o igual a
+    ``last_read_message_id`` se consideran leídos por el usuario.
+    """
+    
+    chat_room = models.ForeignKey(
+        ChatRoom,
+        on_delete=models.CASCADE,
+        related_name='read_states',
+        verbose_name='sala de chat'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='chat_read_states',
+        verbose_name='usuario'
+    )
+    last_read_message_id = models.BigIntegerField('último mensaje leído', default=0)
+    updated_at = models.DateTimeField('fecha de actualización', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'estado de lectura'
+        verbose_name_plural = 'estados de lectura'
+        unique_together = ['chat_room', 'user']
+    
+    def __str__(self):
+        return f'{self.user.email} leyó hasta {self.last_read_message_id} en sala {self.chat_room_id}'
+    
+    @classmethod
+    def advance(cls, chat_room_id, user, up_to_id=None):
+        """Avanza la marca de agua del usuario hasta ``up_to_id``.
+        
+        Si no se indica ``up_to_id`` se usa el último mensaje de la sala.
+        Retorna la nueva marca de agua o ``None`` si no avanzó.
+        """
+        messages = Message.objects.filter(chat_room_id=chat_room_id)
+        if up_to_id is not None:
+            messages = messages.filter(id__lte=up_to_id)
+        last_id = messages.aggregate(last_id=models.Max('id'))['last_id']
+        if not last_id:
+            return None
+        
+        state, created = cls.objects.get_or_create(
+            chat_room_id=chat_room_id,
+            user=user,
+            defaults={'last_read_message_id': last_id}
+        )
+        if created:
+            return last_id
+        
+        # Actualización condicional: la marca de agua nunca retrocede
+        updated = cls.objects.filter(
+            pk=state.pk,
+            last_read_message_id__lt=last_id
+        ).update(last_read_message_id=last_id, updated_at=timezone.now())
+        return last_id if updated else None
@@ -1,5 +1,8 @@
+from django.urls import reverse
 from rest_framework import serializers
-from .models import ChatRoom, Message, MessageRead
+
+from projects.downloads import download_url
+from .models import ChatRoom, Message, ChatReadState
 from users.serializers import UserSerializer
 
 
@@ -9,20 +12,29 @@ class MessageSerializer(serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
     sender_id = serializers.IntegerField(write_only=True, required=False)
     is_own_message = serializers.SerializerMethodField()
+    file = serializers.SerializerMethodField()
     
     class Meta:
         model = Message
         fields = [
             'id', 'chat_room', 'sender', 'sender_id', 'content',
-            'message_type', 'file', 'is_read', 'created_at', 'is_own_message'
+            'message_type', 'file', 'is_read', 'client_key', 'created_at',
+            'is_own_message'
         ]
-        read_only_fields = ['id', 'created_at', 'sender']
+        read_only_fields = ['id', 'created_at', 'sender', 'client_key']
     
     def get_is_own_message(self, obj):
         request = self.context.get('request')
         if request and request.user:
             return obj.sender_id == request.user.id
         return False
+    
+    def get_file(self, obj):
+        """URL de descarga firmada; sin petición, solo la ruta del endpoint."""
+        if not obj.file:
+            return None
+        path = reverse('chatroom-message-file', kwargs={'pk': obj.chat_room_id, 'message_id': obj.pk})
+        return download_url(self.context.get('request'), path)
 
 
 class ChatRoomSerializer(serializers.ModelSerializer):
@@ -58,8 +70,12 @@ class ChatRoomSerializer(serializers.ModelSerializer):
     def get_unread_count(self, obj):
         request = self.context.get('request')
         if request and request.user:
-            return obj.messages.exclude(
-                read_by__user=request.user
+            last_read_id = ChatReadState.objects.filter(
+                chat_room=obj,
+                user=request.user
+            ).values_list('last_read_message_id', flat=True).first() or 0
+            return obj.messages.filter(
+                id__gt=last_read_id
             ).exclude(sender=request.user).count()
         return 0
 
@@ -73,12 +89,8 @@ class ChatRoomDetailSerializer(ChatRoomSerializer):
         fields = ChatRoomSerializer.Meta.fields + ['messages']
     
     def get_messages(self, obj):
-        messages = obj.messages.all().order_by('-created_at')[:50]
-        return MessageSerializer(
-            messages,
-            many=True,
-            context=self.context
-        ).data
+        from .history import recent_messages
+        return recent_messages(obj, 50, self.context.get('request'))
 
 
 class CreatePrivateChatSerializer(serializers.Serializer):
@@ -110,3 +122,4 @@ class SendMessageSerializer(serializers.Serializer):
         default='text'
     )
     file = serializers.FileField(required=False)
+    client_key = serializers.CharField(max_length=64, required=False)
@@ -1,3 +1,643 @@
-from django.test import TestCase
+import asyncio
+import json
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from dashboard.views import unread_summary
+from projects.models import Project, Membership
+from . import fanout, history
+from .consumers import ChatConsumer
+from .dedup import recent_keys
+from .heartbeat import CLOSE_CODE_IDLE, CLOSE_CODE_TOO_MANY, ConnectionRegistry, connections
+from .history import RoomHistoryBuffer, record_message, recent_messages, room_history
+from .models import ChatRoom, ChatReadState, Message
+from .routing import websocket_urlpatterns
+
+User = get_user_model()
+
+
+class ChatFixture:
+    """Proyecto con dos miembros y su sala grupal."""
+
+    def setUp(self):
+        self.member = User.objects.create_user('miembro@example.com', None)
+        self.other = User.objects.create_user('otro@example.com', None)
+        self.project = Project.objects.create(
+            title='Proyecto', description='-', general_objectives='-',
+            specific_objectives='-', start_date=date(2025, 1, 1),
+            end_date=date(2030, 1, 1), created_by=self.member
+        )
+        for user in (self.member, self.other):
+            Membership.objects.create(user=user, project=self.project, role='member')
+        self.room, _ = ChatRoom.get_or_create_group_chat(self.project)
+        # Los ids se reutilizan entre pruebas; el historial no debe arrastrarse
+        room_history.clear()
+
+    def send(self, sender, count=1):
+        return [
+            Message.objects.create(chat_room=self.room, sender=sender, content=f'Hola {i}')
+            for i in range(count)
+        ]
+
+    async def connect(self, user, room=None):
+        communicator = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns), f'/ws/chat/{(room or self.room).pk}/'
+        )
+        communicator.scope['user'] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def drain(self, communicator, message_type=None):
+        """Mensajes recibidos hasta que el socket queda en silencio."""
+        received = []
+        while not await communicator.receive_nothing(0.2):
+            data = json.loads(await communicator.receive_from())
+            if message_type is None or data['type'] == message_type:
+                received.append(data)
+        return received
+
+
+class ReadStateTest(ChatFixture, TestCase):
+    """Marca de agua de lectura por usuario y sala."""
+
+    def state(self, user):
+        return ChatReadState.objects.filter(chat_room=self.room, user=user).values_list(
+            'last_read_message_id', flat=True
+        ).first()
+
+    def test_advance_only_moves_forward(self):
+        first, second, third = self.send(self.other, 3)
+
+        self.assertEqual(ChatReadState.advance(self.room.id, self.member, second.id), second.id)
+        self.assertIsNone(ChatReadState.advance(self.room.id, self.member, first.id))
+        self.assertIsNone(ChatReadState.advance(self.room.id, self.member, second.id))
+        self.assertEqual(self.state(self.member), second.id)
+
+        # Sin límite avanza hasta el último mensaje de la sala
+        self.assertEqual(ChatReadState.advance(self.room.id, self.member), third.id)
+        self.assertEqual(self.state(self.member), third.id)
+
+        # Un id mayor que el último se acota al último mensaje existente
+        self.assertIsNone(ChatReadState.advance(self.room.id, self.member, third.id + 100))
+
+    def test_advance_in_empty_room(self):
+        self.assertIsNone(ChatReadState.advance(self.room.id, self.member))
+        self.assertIsNone(self.state(self.member))
+
+    def test_unread_counts_from_watermark(self):
+        received = self.send(self.other, 4)
+        self.send(self.member, 2)
+        ChatReadState.advance(self.room.id, self.member, received[1].id)
+
+        # Los mensajes propios nunca cuentan como no leídos
+        summary = unread_summary(self.member, [self.project.id])
+        self.assertEqual(summary, {'total': 2, 'by_room': {self.room.id: 2}})
+        self.assertEqual(unread_summary(self.other, [self.project.id])['total'], 2)
+
+        client = APIClient()
+        client.force_authenticate(self.member)
+        response = client.get('/api/chat/rooms/')
+        self.assertEqual(response.data['results'][0]['unread_count'], 2)
+
+        client.post(f'/api/chat/rooms/{self.room.pk}/mark_read/')
+        self.assertEqual(unread_summary(self.member, [self.project.id])['total'], 0)
+
+
+class MarkReadConsumerTest(ChatFixture, TransactionTestCase):
+    """``mark_read`` por WebSocket, con marca de agua o con la lista anterior.
+
+    ``database_sync_to_async`` cierra la conexión al terminar, por eso la
+    prueba no corre dentro de la transacción de ``TestCase``.
+    """
+
+    def mark_read(self, payload):
+        async def run():
+            reader = await self.connect(self.member)
+            watcher = await self.connect(self.other)
+            await reader.send_json_to({'type': 'mark_read', **payload})
+            events = await self.drain(watcher, 'messages_read')
+            # El socket sigue abierto aunque el mensaje no sea válido
+            await self.drain(reader)
+            await reader.send_json_to({'type': 'ping'})
+            self.assertEqual(await reader.receive_json_from(), {'type': 'pong'})
+            await reader.disconnect()
+            await watcher.disconnect()
+            self.assertLessEqual(len(events), 1)
+            return events[0] if events else None
+
+        return async_to_sync(run)()
+
+    def state(self):
+        return ChatReadState.objects.filter(chat_room=self.room, user=self.member).values_list(
+            'last_read_message_id', flat=True
+        ).first()
+
+    def test_up_to_id_broadcasts_watermark(self):
+        messages = self.send(self.other, 3)
+        event = self.mark_read({'up_to_id': messages[1].id})
+        self.assertEqual(event['last_read_id'], messages[1].id)
+        self.assertEqual(event['user_id'], self.member.id)
+        self.assertEqual(self.state(), messages[1].id)
+
+        # Retroceder no cambia nada ni se anuncia
+        self.assertIsNone(self.mark_read({'up_to_id': messages[0].id}))
+        self.assertEqual(self.state(), messages[1].id)
+
+    def test_legacy_message_ids_reduce_to_max(self):
+        messages = self.send(self.other, 4)
+        event = self.mark_read({'message_ids': [messages[2].id, messages[0].id, str(messages[1].id)]})
+        self.assertEqual(event['last_read_id'], messages[2].id)
+        self.assertEqual(self.state(), messages[2].id)
+
+    def test_legacy_malformed_message_ids_are_ignored(self):
+        messages = self.send(self.other, 2)
+        for payload in ({'message_ids': [messages[1].id, 'abc']},
+                        {'message_ids': [None]},
+                        {'message_ids': 'abc'},
+                        {'up_to_id': 'abc'},
+                        {'message_ids': []}):
+            with self.subTest(payload=payload):
+                self.assertIsNone(self.mark_read(payload))
+        self.assertIsNone(self.state())
+
+
+class IdempotentMessageTest(ChatFixture, TestCase):
+    """``Message.create_idempotent`` y el envío REST con ``client_key``."""
+
+    def setUp(self):
+        super().setUp()
+        recent_keys.clear()
+
+    def create(self, sender, client_key, content='Hola'):
+        return Message.create_idempotent(self.room, sender, client_key, content=content)
+
+    def test_without_key_always_creates(self):
+        self.assertTrue(self.create(self.member, None)[1])
+        self.assertTrue(self.create(self.member, None)[1])
+        self.assertEqual(Message.objects.count(), 2)
+
+    def test_repeated_key_returns_original(self):
+        message, created = self.create(self.member, 'clave-1')
+        self.assertTrue(created)
+        again, created = self.create(self.member, 'clave-1', content='Otro')
+        self.assertFalse(created)
+        self.assertEqual(again.id, message.id)
+        self.assertEqual(again.content, 'Hola')
+        self.assertEqual(Message.objects.count(), 1)
+
+    def test_unique_index_catches_keys_outside_window(self):
+        message, _ = self.create(self.member, 'clave-1')
+        # Otro proceso, o la ventana ya expiró
+        recent_keys.clear()
+        again, created = self.create(self.member, 'clave-1')
+        self.assertFalse(created)
+        self.assertEqual(again.id, message.id)
+        self.assertEqual(Message.objects.count(), 1)
+
+    def test_key_is_scoped_to_sender(self):
+        self.create(self.member, 'clave-1')
+        self.assertTrue(self.create(self.other, 'clave-1')[1])
+        self.assertEqual(Message.objects.count(), 2)
+
+    def test_rest_resend_returns_original(self):
+        client = APIClient()
+        client.force_authenticate(self.member)
+        url = f'/api/chat/rooms/{self.room.pk}/send_message/'
+        first = client.post(url, {'content': 'Hola', 'client_key': 'clave-1'})
+        self.assertEqual(first.status_code, 201)
+        second = client.post(url, {'content': 'Hola', 'client_key': 'clave-1'})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.assertEqual(second.data['client_key'], 'clave-1')
+        self.assertEqual(Message.objects.count(), 1)
+
+
+class ClientKeyConsumerTest(ChatFixture, TransactionTestCase):
+    """Reenvío de un ``chat_message`` por WebSocket con la misma clave."""
+
+    def setUp(self):
+        super().setUp()
+        recent_keys.clear()
+
+    def test_resend_creates_one_message_and_acks_sender(self):
+        async def run():
+            sender = await self.connect(self.member)
+            watcher = await self.connect(self.other)
+            await self.drain(sender)
+            payload = {'type': 'chat_message', 'content': 'Hola', 'client_key': 'clave-1'}
+            await sender.send_json_to(payload)
+            # Reconexión: el cliente reenvía el mensaje pendiente
+            await sender.send_json_to(payload)
+            sent = await self.drain(sender, 'chat_message')
+            seen = await self.drain(watcher, 'chat_message')
+            await sender.disconnect()
+            await watcher.disconnect()
+            return sent, seen
+
+        sent, seen = async_to_sync(run)()
+        message = Message.objects.get()
+        self.assertEqual(message.client_key, 'clave-1')
+        # Una distribución a la sala y una confirmación solo para quien envía
+        self.assertEqual(len(seen), 1)
+        self.assertEqual(len(sent), 2)
+        for event in sent + seen:
+            self.assertEqual(event['message_id'], message.id)
+            self.assertEqual(event['client_key'], 'clave-1')
+        self.assertTrue(all(event['is_own_message'] for event in sent))
+        self.assertFalse(seen[0]['is_own_message'])
+
+    def test_invalid_key_is_rejected(self):
+        async def run():
+            sender = await self.connect(self.member)
+            await sender.send_json_to({'type': 'chat_message', 'content': 'Hola', 'client_key': 'x' * 65})
+            events = await self.drain(sender, 'error')
+            await sender.disconnect()
+            return events
+
+        self.assertEqual(len(async_to_sync(run)()), 1)
+        self.assertFalse(Message.objects.exists())
+
+
+class ConnectionRegistryTest(TestCase):
+
+    def test_limit_and_release(self):
+        registry = ConnectionRegistry()
+        self.assertTrue(registry.acquire(1, limit=2))
+        self.assertTrue(registry.acquire(1, limit=2))
+        self.assertFalse(registry.acquire(1, limit=2))
+        self.assertTrue(registry.acquire(2))
+        self.assertEqual(registry.stats(), {'connections': 3, 'users': 2, 'by_user': {1: 2, 2: 1}})
+        registry.release(1)
+        registry.release(2)
+        self.assertEqual(registry.count(1), 1)
+        self.assertEqual(registry.stats(), {'connections': 1, 'users': 1, 'by_user': {1: 1}})
+
+
+class HeartbeatConsumerTest(ChatFixture, TransactionTestCase):
+    """Latido, cierre de conexiones inactivas y límite por usuario."""
+
+    async def wait_close(self, communicator, answer_pings=False, timeout=2):
+        """Código de cierre recibido, o ``None`` si la conexión sigue abierta."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        pings = 0
+        while loop.time() < deadline:
+            if await communicator.receive_nothing(0.05):
+                continue
+            output = await communicator.receive_output()
+            if output['type'] == 'websocket.close':
+                return output.get('code'), pings
+            if json.loads(output['text'])['type'] == 'ping':
+                pings += 1
+                if answer_pings:
+                    await communicator.send_json_to({'type': 'pong'})
+        return None, pings
+
+    def test_idle_connection_is_reaped(self):
+        async def run():
+            communicator = await self.connect(self.member)
+            self.assertEqual(connections.count(self.member.id), 1)
+            code, pings = await self.wait_close(communicator)
+            count = connections.count(self.member.id)
+            await communicator.disconnect()
+            return code, pings, count
+
+        with override_settings(CHAT_HEARTBEAT_INTERVAL=0.1, CHAT_HEARTBEAT_MAX_MISSED=2):
+            code, pings, count = async_to_sync(run)()
+        self.assertEqual(code, CLOSE_CODE_IDLE)
+        self.assertGreaterEqual(pings, 1)
+        self.assertEqual(count, 0)
+
+    def test_pong_keeps_connection_open(self):
+        async def run():
+            communicator = await self.connect(self.member)
+            code, pings = await self.wait_close(communicator, answer_pings=True, timeout=0.8)
+            await communicator.disconnect()
+            return code, pings
+
+        with override_settings(CHAT_HEARTBEAT_INTERVAL=0.1, CHAT_HEARTBEAT_MAX_MISSED=2):
+            code, pings = async_to_sync(run)()
+        self.assertIsNone(code)
+        self.assertGreaterEqual(pings, 3)
+        self.assertEqual(connections.count(self.member.id), 0)
+
+    def test_connections_per_user_are_capped(self):
+        async def run():
+            first = await self.connect(self.member)
+            second = WebsocketCommunicator(
+                URLRouter(websocket_urlpatterns), f'/ws/chat/{self.room.pk}/'
+            )
+            second.scope['user'] = self.member
+            result = await second.connect()
+            # Otro usuario no se ve afectado
+            other = await self.connect(self.other)
+            count = connections.count(self.member.id)
+            await first.disconnect()
+            await other.disconnect()
+            return result, count
+
+        with override_settings(CHAT_MAX_CONNECTIONS_PER_USER=1):
+            (connected, code), count = async_to_sync(run)()
+        self.assertFalse(connected)
+        self.assertEqual(code, CLOSE_CODE_TOO_MANY)
+        self.assertEqual(count, 1)
+        self.assertEqual(connections.count(self.member.id), 0)
+
+    def test_disconnect_releases_and_stats_report_gauges(self):
+        client = APIClient()
+        client.force_authenticate(self.member)
+        url = '/api/chat/rooms/connection_stats/'
+        self.assertEqual(client.get(url).status_code, 403)
+        self.member.is_staff = True
+        self.member.save(update_fields=['is_staff'])
+
+        async def run():
+            sockets = [await self.connect(self.member), await self.connect(self.member),
+                       await self.connect(self.other)]
+            stats = connections.stats()
+            for communicator in sockets:
+                await communicator.disconnect()
+            return stats
+
+        before = connections.count()
+        stats = async_to_sync(run)()
+        self.assertEqual(stats['connections'], before + 3)
+        self.assertEqual(stats['by_user'][self.member.id], 2)
+        self.assertEqual(stats['by_user'][self.other.id], 1)
+        self.assertEqual(connections.count(), before)
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(self.member.id, response.data['by_user'])
+
+
+class RoomHistoryTest(ChatFixture, TestCase):
+    """Historial en memoria de la primera página de mensajes."""
+
+    def entry(self, message_id):
+        return {'id': message_id, 'content': f'm{message_id}'}
+
+    def test_append_ignored_for_room_not_buffered(self):
+        buffer = RoomHistoryBuffer(size=5)
+        buffer.append(1, self.entry(1))
+        self.assertIsNone(buffer.get(1, 5))
+
+    def test_append_during_load_is_merged_into_fill(self):
+        buffer = RoomHistoryBuffer(size=5)
+        buffer.begin_load(1)
+        buffer.append(1, self.entry(3))
+        # La lectura vio hasta el 2; el 3 llegó después de la consulta
+        entries = buffer.fill(1, [self.entry(1), self.entry(2)])
+        buffer.end_load(1)
+        self.assertEqual([entry['id'] for entry in entries], [1, 2, 3])
+        self.assertEqual([entry['id'] for entry in buffer.get(1, 5)], [3, 2, 1])
+
+    def test_merge_skips_messages_the_query_already_saw(self):
+        buffer = RoomHistoryBuffer(size=5)
+        buffer.begin_load(1)
+        buffer.append(1, self.entry(2))
+        buffer.fill(1, [self.entry(1), self.entry(2)])
+        buffer.end_load(1)
+        self.assertEqual([entry['id'] for entry in buffer.get(1, 5)], [2, 1])
+
+    def test_appends_after_load_are_not_kept(self):
+        buffer = RoomHistoryBuffer(size=5)
+        buffer.begin_load(1)
+        buffer.end_load(1)
+        buffer.append(1, self.entry(3))
+        buffer.fill(1, [self.entry(1)])
+        self.assertEqual([entry['id'] for entry in buffer.get(1, 5)], [1])
+
+    def test_room_expires_after_ttl(self):
+        buffer = RoomHistoryBuffer(size=5, ttl=60)
+        with mock.patch('chat.history.time.monotonic', return_value=1000):
+            buffer.fill(1, [self.entry(1)])
+        with mock.patch('chat.history.time.monotonic', return_value=1059):
+            self.assertIsNotNone(buffer.get(1, 5))
+        with mock.patch('chat.history.time.monotonic', return_value=1061):
+            self.assertIsNone(buffer.get(1, 5))
+        self.assertEqual(buffer.stats()['rooms'], 0)
+
+    def test_message_saved_between_query_and_fill_reaches_page(self):
+        first, second = self.send(self.member, 2)
+        serialize = history.serialize_message
+        late = []
+
+        def serialize_and_write(message):
+            if not late:
+                # Otro mensaje se guarda cuando la consulta ya terminó
+                late.append(Message.objects.create(
+                    chat_room=self.room, sender=self.other, content='Tarde'
+                ))
+                record_message(late[0])
+            return serialize(message)
+
+        with mock.patch('chat.history.serialize_message', side_effect=serialize_and_write):
+            entries = recent_messages(self.room, 10, None)
+        self.assertEqual([entry['id'] for entry in entries], [late[0].id, second.id, first.id])
+        # La siguiente lectura sale del buffer e incluye el mensaje tardío
+        self.assertEqual(
+            [entry['id'] for entry in room_history.get(self.room.id, 10)],
+            [late[0].id, second.id, first.id]
+        )
+
+    def test_recorded_message_served_from_buffer(self):
+        self.send(self.member, 2)
+        recent_messages(self.room, 10, None)
+        message = Message.objects.create(chat_room=self.room, sender=self.other, content='Nuevo')
+        record_message(message)
+        self.assertEqual(room_history.get(self.room.id, 10)[0]['id'], message.id)
+
+    @override_settings(CHAT_HISTORY_BUFFER_SIZE=2, CHAT_DEDUP_MAX_KEYS=1)
+    def test_limits_follow_settings(self):
+        buffer = RoomHistoryBuffer()
+        buffer.fill(1, [self.entry(1), self.entry(2), self.entry(3)])
+        self.assertEqual([entry['id'] for entry in buffer.get(1, 2)], [3, 2])
+        self.assertIsNone(buffer.get(1, 3))
+        self.assertEqual(recent_keys.max_keys, 1)
+
+    def test_invalidate_room(self):
+        self.send(self.member, 1)
+        recent_messages(self.room, 10, None)
+        history.invalidate_room(self.room.id)
+        self.assertIsNone(room_history.get(self.room.id, 10))
+
+
+class FailingChannelLayer(InMemoryChannelLayer):
+    """Channel layer en memoria que falla al enviar a ``broken_group``."""
+
+    broken_group = None
+
+    async def group_send(self, group, message):
+        if group == self.broken_group:
+            raise RuntimeError('grupo caído')
+        await super().group_send(group, message)
+
+
+class FanoutTest(TestCase):
+    """Reparto de conexiones en subgrupos y entrega ordenada a todos."""
+
+    @override_settings(CHAT_FANOUT_SHARD_SIZE=10, CHAT_FANOUT_MAX_SHARDS=4)
+    def test_shard_count_reads_current_settings(self):
+        self.assertEqual(
+            [fanout.shard_count_for(n) for n in (0, 10, 11, 20, 21, 35, 1000)],
+            [1, 1, 2, 2, 3, 4, 4]
+        )
+
+    def test_shard_assignment_is_stable_and_spread(self):
+        self.assertEqual(fanout.room_group_name(7, 1, 'canal'), 'chat_7')
+        names = [f'specific.inmemory!{i}' for i in range(400)]
+        groups = [fanout.room_group_name(7, 4, name) for name in names]
+        self.assertEqual(groups, [fanout.room_group_name(7, 4, name) for name in names])
+        self.assertEqual(set(groups), {f'chat_7_s{k}' for k in range(4)})
+        # Ningún subgrupo se queda con la mayoría de las conexiones
+        self.assertLess(max(groups.count(group) for group in set(groups)), 150)
+
+        # Todo subgrupo de una partición anterior sigue cubierto al crecer
+        covered = set(fanout.room_group_names(7, 8))
+        for name in names:
+            for shards in (1, 2, 4, 8):
+                self.assertIn(fanout.room_group_name(7, shards, name), covered)
+
+    def deliver(self, layer, shards, events):
+        async def run():
+            channels = []
+            # Conexiones unidas con distintas particiones de la sala
+            for joined_with in (1, 2, shards, shards, shards, shards):
+                channel = await layer.new_channel()
+                await layer.group_add(fanout.room_group_name(1, joined_with, channel), channel)
+                channels.append(channel)
+            for event in events:
+                await fanout.room_group_send(layer, 1, shards, event)
+            await fanout.wait_pending()
+            received = []
+            for channel in channels:
+                messages = []
+                while True:
+                    try:
+                        messages.append(await asyncio.wait_for(layer.receive(channel), 0.05))
+                    except asyncio.TimeoutError:
+                        break
+                received.append([message['n'] for message in messages])
+            return received
+
+        return async_to_sync(run)()
+
+    def test_events_reach_every_shard_in_order(self):
+        events = [{'type': 'chat_message', 'n': n} for n in range(5)]
+        received = self.deliver(InMemoryChannelLayer(), 4, events)
+        self.assertEqual(received, [[0, 1, 2, 3, 4]] * 6)
+
+    def test_failed_shard_is_logged_and_others_receive(self):
+        layer = FailingChannelLayer()
+        layer.broken_group = 'chat_1_s3'
+        with self.assertLogs('chat.fanout', 'ERROR') as logs:
+            received = self.deliver(layer, 4, [{'type': 'chat_message', 'n': 0}])
+        self.assertIn('chat_1_s3', logs.output[0])
+        self.assertEqual(received[:2], [[0], [0]])
+
+
+class RoomShardsTest(ChatFixture, TransactionTestCase):
+    """Crecimiento de ``fanout_shards`` y entrega en salas particionadas."""
+
+    def room_shards(self):
+        consumer = ChatConsumer()
+        consumer.room_id = self.room.id
+        return async_to_sync(consumer.get_room_shards)()
+
+    def test_shards_grow_with_members_and_never_shrink(self):
+        self.assertEqual(self.room_shards(), 1)
+        with override_settings(CHAT_FANOUT_SHARD_SIZE=1):
+            self.assertEqual(self.room_shards(), 2)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.fanout_shards, 2)
+        self.assertEqual(self.room_shards(), 2)
+
+    @override_settings(CHAT_FANOUT_SHARD_SIZE=1)
+    def test_messages_arrive_in_order_across_shards(self):
+        async def run():
+            sender = await self.connect(self.member)
+            listener = await self.connect(self.other)
+            for i in range(5):
+                await sender.send_json_to({'type': 'chat_message', 'content': f'Mensaje {i}'})
+            received = await self.drain(listener, 'chat_message')
+            await sender.disconnect()
+            await listener.disconnect()
+            return [message['content'] for message in received]
+
+        self.assertEqual(async_to_sync(run)(), [f'Mensaje {i}' for i in range(5)])
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.fanout_shards, 2)
+
+
+class MessageFileDownloadTest(TestCase):
+    """Adjuntos del chat servidos solo a quienes tienen acceso a la sala."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.member = User.objects.create_user('miembro@example.com', None)
+        self.other = User.objects.create_user('otro@example.com', None)
+        self.outsider = User.objects.create_user('externo@example.com', None)
+        project = Project.objects.create(
+            title='Proyecto', description='-', general_objectives='-',
+            specific_objectives='-', start_date=date(2025, 1, 1),
+            end_date=date(2030, 1, 1), created_by=self.member
+        )
+        for user in (self.member, self.other):
+            Membership.objects.create(user=user, project=project, role='member')
+        self.room, _ = ChatRoom.get_or_create_group_chat(project)
+        self.private, _ = ChatRoom.get_or_create_private_chat(self.member, self.other, project)
+
+        self.message = Message(chat_room=self.private, sender=self.member, message_type='file')
+        self.message.file.save('video.mp4', ContentFile(b'0123456789'))
+        self.url = f'/api/chat/rooms/{self.private.pk}/messages/{self.message.pk}/file/'
+        self.client = APIClient()
+
+    def test_participant_downloads_range(self):
+        self.client.force_authenticate(self.other)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_serialized_file_is_signed_per_user(self):
+        self.client.force_authenticate(self.other)
+        response = self.client.get(f'/api/chat/rooms/{self.private.pk}/messages/')
+        url = response.data['results'][0]['file']
+        self.assertTrue(url.startswith(f'http://testserver{self.url}?token='))
+        # La primera página sale del historial en memoria: la firma se genera por petición
+        self.client.force_authenticate(self.member)
+        own = self.client.get(f'/api/chat/rooms/{self.private.pk}/messages/').data['results'][0]['file']
+        self.assertNotEqual(url.split('token=')[1], own.split('token=')[1])
+
+        response = APIClient().get(url, HTTP_RANGE='bytes=0-1')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'01')
+
+    def test_other_rooms_and_outsiders_are_rejected(self):
+        self.client.force_authenticate(self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        # El mensaje debe pertenecer a la sala de la URL
+        self.client.force_authenticate(self.member)
+        url = f'/api/chat/rooms/{self.room.pk}/messages/{self.message.pk}/file/'
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -1,17 +1,26 @@
+import os
+
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Q
 
-from .models import ChatRoom, Message, MessageRead
+from .models import ChatRoom, Message, ChatReadState
+from .history import recent_messages, record_message, room_history
+from .heartbeat import connections
 from .serializers import (
     ChatRoomSerializer, ChatRoomDetailSerializer,
     MessageSerializer, CreatePrivateChatSerializer,
     SendMessageSerializer
 )
-from projects.models import Project, Membership
+from projects.models import Project
+from projects import activity, stats
+from projects.downloads import DownloadTokenAuthentication, serve_file
+from projects.permissions import get_membership_resolver
 
 
 User = get_user_model()
@@ -27,14 +36,20 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         """Obtener salas de chat del usuario."""
         user = self.request.user
         
-        # Obtener proyectos donde el usuario es miembro
-        user_projects = Project.objects.filter(memberships__user=user)
+        # Proyectos donde el usuario es miembro
+        user_projects = get_membership_resolver(self.request).project_ids()
+        
+        # Salas privadas donde es participante (subconsulta en lugar de JOIN,
+        # así cada rama del OR usa su índice y no hace falta DISTINCT)
+        private_rooms = ChatRoom.participants.through.objects.filter(
+            user=user
+        ).values('chatroom_id')
         
         # Salas grupales de sus proyectos + salas privadas donde es participante
         return ChatRoom.objects.filter(
-            Q(room_type='group', project__in=user_projects) |
-            Q(room_type='private', participants=user)
-        ).distinct().order_by('-updated_at')
+            Q(room_type='group', project_id__in=user_projects) |
+            Q(room_type='private', id__in=private_rooms)
+        ).order_by('-updated_at')
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -53,14 +68,16 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         
         # Verificar membresía
         project = get_object_or_404(Project, id=project_id)
-        if not project.memberships.filter(user=request.user).exists():
+        if not get_membership_resolver(request).is_member(project.id):
             return Response(
                 {'error': 'No tienes acceso a este proyecto'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
         # Obtener o crear chat grupal
-        group_chat, _ = ChatRoom.get_or_create_group_chat(project)
+        group_chat, created = ChatRoom.get_or_create_group_chat(project)
+        if created:
+            activity.chat_room_created(group_chat, request.user)
         
         # Obtener chats privados del usuario en este proyecto
         private_chats = ChatRoom.objects.filter(
@@ -95,7 +112,7 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         project = get_object_or_404(Project, id=project_id)
         
         # Verificar que ambos usuarios sean miembros del proyecto
-        if not project.memberships.filter(user=request.user).exists():
+        if not get_membership_resolver(request).is_member(project.id):
             return Response(
                 {'error': 'No eres miembro de este proyecto'},
                 status=status.HTTP_403_FORBIDDEN
@@ -111,6 +128,8 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         chat_room, created = ChatRoom.get_or_create_private_chat(
             request.user, other_user, project
         )
+        if created:
+            activity.chat_room_created(chat_room, request.user)
         
         response_serializer = ChatRoomDetailSerializer(
             chat_room, context={'request': request}
@@ -128,7 +147,7 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         
         # Verificar acceso
         if chat_room.room_type == 'group':
-            if not chat_room.project.memberships.filter(user=request.user).exists():
+            if not get_membership_resolver(request).is_member(chat_room.project_id):
                 return Response(
                     {'error': 'No tienes acceso a esta sala'},
                     status=status.HTTP_403_FORBIDDEN
@@ -145,16 +164,22 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         page_size = int(request.query_params.get('page_size', 50))
         offset = (page - 1) * page_size
         
-        messages = chat_room.messages.all().order_by('-created_at')[offset:offset + page_size]
-        serializer = MessageSerializer(
-            messages, many=True, context={'request': request}
-        )
+        if page == 1:
+            # La primera página se sirve desde el historial en memoria
+            results = recent_messages(chat_room, page_size, request)
+        else:
+            messages = chat_room.messages.select_related('sender').order_by(
+                '-created_at'
+            )[offset:offset + page_size]
+            results = MessageSerializer(
+                messages, many=True, context={'request': request}
+            ).data
         
         return Response({
             'count': chat_room.messages.count(),
             'page': page,
             'page_size': page_size,
-            'results': serializer.data
+            'results': results
         })
     
     @action(detail=True, methods=['post'])
@@ -164,7 +189,7 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         
         # Verificar acceso
         if chat_room.room_type == 'group':
-            if not chat_room.project.memberships.filter(user=request.user).exists():
+            if not get_membership_resolver(request).is_member(chat_room.project_id):
                 return Response(
                     {'error': 'No tienes acceso a esta sala'},
                     status=status.HTTP_403_FORBIDDEN
@@ -179,41 +204,74 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         serializer = SendMessageSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        message = Message.objects.create(
-            chat_room=chat_room,
-            sender=request.user,
-            content=serializer.validated_data['content'],
-            message_type=serializer.validated_data.get('message_type', 'text'),
-            file=serializer.validated_data.get('file')
-        )
+        with transaction.atomic():
+            message, created = Message.create_idempotent(
+                chat_room,
+                request.user,
+                serializer.validated_data.get('client_key'),
+                content=serializer.validated_data['content'],
+                message_type=serializer.validated_data.get('message_type', 'text'),
+                file=serializer.validated_data.get('file')
+            )
+            
+            if created:
+                # Actualizar timestamp de la sala
+                chat_room.save(update_fields=['updated_at'])
+                stats.message_created(chat_room.project_id)
         
-        # Actualizar timestamp de la sala
-        chat_room.save()
+        if created:
+            record_message(message)
         
         response_serializer = MessageSerializer(
             message, context={'request': request}
         )
         
-        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+        return Response(
+            response_serializer.data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+    
+    @action(
+        detail=True, methods=['get'], url_path=r'messages/(?P<message_id>\d+)/file',
+        authentication_classes=[JWTAuthentication, DownloadTokenAuthentication]
+    )
+    def message_file(self, request, pk=None, message_id=None):
+        """Descargar el archivo adjunto de un mensaje.
+        
+        ``get_object`` solo encuentra salas accesibles para el usuario, así
+        que la membresía se verifica en esa misma consulta.
+        """
+        chat_room = self.get_object()
+        message = get_object_or_404(chat_room.messages.exclude(file=''), id=message_id)
+        return serve_file(request, message.file, os.path.basename(message.file.name))
+    
+    @action(detail=False, methods=['get'])
+    def history_stats(self, request):
+        """Estadísticas del historial en memoria (solo staff)."""
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'No tienes permiso para ver estas estadísticas'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(room_history.stats())
+    
+    @action(detail=False, methods=['get'])
+    def connection_stats(self, request):
+        """Conexiones WebSocket vivas en este proceso (solo staff)."""
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'No tienes permiso para ver estas estadísticas'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(connections.stats())
     
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
         """Marcar todos los mensajes de la sala como leídos."""
         chat_room = self.get_object()
         
-        # Obtener mensajes no leídos que no son del usuario actual
-        unread_messages = chat_room.messages.exclude(
-            sender=request.user
-        ).exclude(
-            read_by__user=request.user
-        )
-        
-        # Crear registros de lectura
-        for message in unread_messages:
-            MessageRead.objects.get_or_create(
-                message=message,
-                user=request.user
-            )
+        # Avanzar la marca de agua hasta el último mensaje de la sala
+        ChatReadState.advance(chat_room.id, request.user)
         
         return Response({'status': 'Mensajes marcados como leídos'})
 
@@ -235,7 +293,7 @@ class ProjectMembersForChatViewSet(viewsets.ViewSet):
         project = get_object_or_404(Project, id=project_id)
         
         # Verificar membresía
-        if not project.memberships.filter(user=request.user).exists():
+        if not get_membership_resolver(request).is_member(project.id):
             return Response(
                 {'error': 'No tienes acceso a este proyecto'},
                 status=status.HTTP_403_FORBIDDEN
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -52,6 +53,7 @@ INSTALLED_APPS = [
     'projects',
     'tasks',
     'chat',
+    'dashboard',
 ]
 
 MIDDLEWARE = [
@@ -95,9 +97,70 @@ CHANNEL_LAYERS = {
     }
 }
 
+# Distribución de eventos en salas grandes (ver chat/fanout.py)
+CHAT_FANOUT_SHARD_SIZE = 100  # integrantes por subgrupo
+CHAT_FANOUT_MAX_SHARDS = 16
+CHAT_FANOUT_CONCURRENCY = 4  # subgrupos enviados en paralelo
+
+# Latido de WebSockets y límite de conexiones (ver chat/heartbeat.py)
+CHAT_HEARTBEAT_INTERVAL = 30  # segundos entre pings
+CHAT_HEARTBEAT_MAX_MISSED = 2  # intervalos sin respuesta antes de cerrar
+CHAT_MAX_CONNECTIONS_PER_USER = None  # sin límite
+
+# Historial reciente de mensajes en memoria (ver chat/history.py)
+CHAT_HISTORY_BUFFER_SIZE = 50  # mensajes por sala
+CHAT_HISTORY_MEMORY_BUDGET = 8 * 1024 * 1024  # bytes por proceso
+CHAT_HISTORY_TTL = 60  # segundos antes de volver a leer una sala; 0 sin expiración
+
+# Caché entre peticiones de los roles por proyecto (ver projects/permissions.py).
+# 0 la desactiva; con varios procesos requiere un backend de caché compartido.
+MEMBERSHIP_CACHE_TIMEOUT = 0  # segundos
+
+# Exportación de proyectos a PDF (ver projects/export.py)
+PROJECT_EXPORT_WORKERS = 2  # hilos de generación por proceso
+PROJECT_EXPORT_CACHE_TIMEOUT = 24 * 60 * 60  # segundos
+
+# Purga de proyectos eliminados (ver projects/purge.py)
+PROJECT_PURGE_CHUNK_SIZE = 500  # filas por transacción
+PROJECT_PURGE_PAUSE = 0.05  # segundos entre lotes para dejar escribir a otros
+
+# Búsqueda de proyectos (ver projects/search.py)
+PROJECT_SEARCH_BACKEND = 'projects.search.SQLiteFTSBackend'
+PROJECT_SEARCH_LIMIT = 200  # resultados como máximo por búsqueda
+
+# Registro de actividad (ver projects/activity.py y compact_project_activity)
+ACTIVITY_SYNC_LIMIT = 200  # entradas por respuesta con ?since=
+ACTIVITY_RETENTION_DAYS = 180  # las entradas más antiguas se eliminan
+ACTIVITY_COMPACT_AFTER_DAYS = 30  # ediciones de tareas más antiguas se fusionan
+
+# Resumen del dashboard (ver dashboard/cache.py)
+DASHBOARD_CACHE_TIMEOUT = 300  # segundos; 0 desactiva la caché
+DASHBOARD_UPCOMING_DAYS = 30  # días hacia adelante de fechas límite próximas
+DASHBOARD_UPCOMING_LIMIT = 50  # máximo de tareas próximas
+
+# Altas y bajas masivas de miembros (ver projects/bulk.py)
+BULK_MEMBERS_MAX_ROWS = 500  # filas por operación
+
+# Cambios masivos de tareas (ver tasks/bulk.py)
+BULK_TASKS_MAX_ITEMS = 500  # elementos por operación, sumando las tres listas
+
+# Listas de tareas con cursor (ver tasks/listing.py)
+TASK_LIST_MAX_PAGE_SIZE = 100  # máximo de ?page_size=
+
+# Recordatorios de fechas límite (ver tasks/reminders.py)
+TASK_REMINDER_INTERVAL = 300  # segundos entre revisiones; 0 desactiva el ciclo
+TASK_REMINDER_DUE_SOON_DAYS = 3  # avisar desde estos días antes del vencimiento
+TASK_REMINDER_OVERDUE_DAYS = 7  # tareas vencidas hace más días ya no se avisan
+
+# Subidas de documentos por partes (ver tasks/uploads.py)
+TASK_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # bytes máximos por parte
+TASK_UPLOAD_MAX_SIZE = 1024 * 1024 * 1024  # tamaño máximo del documento
+TASK_UPLOAD_EXPIRY = 24 * 60 * 60  # segundos sin actividad antes de descartar la subida
+
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = True  # Solo para desarrollo
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'upload-offset', 'upload-checksum')  # subidas por partes
 
 
 # Database
@@ -107,6 +170,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Base de pruebas en archivo: SQLite en memoria compartida no espera
+        # los bloqueos y las pruebas con hilos concurrentes fallarían
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -156,6 +224,28 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    # Documentos de tareas deduplicados por contenido (ver tasks/storage.py)
+    'task_documents': {
+        'BACKEND': 'tasks.storage.ContentAddressedStorage',
+    },
+}
+
+
+# Descargas de archivos (ver projects/downloads.py): 'django' envía el
+# archivo con FileResponse (sendfile si el servidor WSGI lo permite);
+# 'x-accel-redirect' (nginx) o 'x-sendfile' (Apache) delegan el envío al
+# servidor web, que debe exponer MEDIA_ROOT como ubicación interna.
+DOWNLOAD_SERVE_MODE = 'django'
+DOWNLOAD_ACCEL_PREFIX = '/protected-media/'
+# Vigencia en segundos de los enlaces de descarga firmados
+DOWNLOAD_TOKEN_MAX_AGE = 15 * 60
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
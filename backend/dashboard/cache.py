@@ -0,0 +1,47 @@
+"""Caché por usuario del resumen del dashboard.
+
+Se guarda la parte que solo cambia con proyectos, membresías y tareas
+(proyectos con conteos y tareas del usuario). Los mensajes no leídos
+cambian con cada mensaje y se calculan siempre. La clave incluye la fecha
+para que las fechas límite próximas no arrastren el día anterior.
+
+Las señales de ``dashboard.signals`` invalidan a todos los miembros del
+proyecto afectado; con varios procesos debe usarse un backend de caché
+compartido.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from projects.models import Membership
+
+
+CACHE_TIMEOUT = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+
+
+def cache_key(user_id):
+    return f'dashboard:{user_id}:{timezone.localdate().isoformat()}'
+
+
+def get_summary(user_id):
+    if not CACHE_TIMEOUT:
+        return None
+    return cache.get(cache_key(user_id))
+
+
+def set_summary(user_id, summary):
+    if CACHE_TIMEOUT:
+        cache.set(cache_key(user_id), summary, CACHE_TIMEOUT)
+
+
+def invalidate_users(*user_ids):
+    if CACHE_TIMEOUT and user_ids:
+        cache.delete_many([cache_key(user_id) for user_id in user_ids])
+
+
+def invalidate_project(project_id):
+    """Invalida el resumen de todos los miembros del proyecto."""
+    if CACHE_TIMEOUT:
+        invalidate_users(*Membership.objects.filter(
+            project_id=project_id
+        ).values_list('user_id', flat=True))
@@ -0,0 +1,13 @@
+from rest_framework import serializers
+
+from projects.serializers import ProjectListSerializer
+
+
+class DashboardProjectSerializer(ProjectListSerializer):
+    """Proyecto del dashboard: el listado más sus conteos de tareas."""
+    
+    tasks_count = serializers.IntegerField(read_only=True)
+    completed_tasks_count = serializers.IntegerField(read_only=True)
+    
+    class Meta(ProjectListSerializer.Meta):
+        fields = ProjectListSerializer.Meta.fields + ['tasks_count', 'completed_tasks_count']
@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from projects.models import Project
+from projects.signals import memberships_changed
+from tasks.models import Task
+from tasks.signals import tasks_changed
+from .cache import invalidate_project, invalidate_users
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_project(instance.project_id))
+
+
+@receiver(tasks_changed)
+def tasks_changed_handler(sender, project_id, **kwargs):
+    invalidate_project(project_id)
+
+
+@receiver(memberships_changed)
+def memberships_changed_handler(sender, project_id, user_ids, **kwargs):
+    # Los usuarios se invalidan aparte: si dejaron el proyecto ya no figuran entre sus miembros
+    invalidate_users(*user_ids)
+    invalidate_project(project_id)
+
+
+@receiver(post_save, sender=Project)
+def project_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_project(instance.pk))
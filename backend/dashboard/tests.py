@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from chat.models import ChatRoom, ChatReadState, Message
+from projects.models import Project, Membership
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class DashboardTest(TestCase):
+    """El resumen del dashboard usa un número fijo de consultas."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            'lider@example.com', 'clave-segura-123',
+            first_name='Ana', last_name='Torres'
+        )
+        self.other = User.objects.create_user(
+            'miembro@example.com', 'clave-segura-123',
+            first_name='Luis', last_name='Rojas'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_project(self, tasks=3, messages=2):
+        project = Project.objects.create(
+            title='Proyecto', description='-', general_objectives='-',
+            specific_objectives='-', start_date=date(2025, 1, 1),
+            end_date=date(2030, 1, 1), created_by=self.user
+        )
+        Membership.objects.create(user=self.user, project=project, role='leader')
+        Membership.objects.create(user=self.other, project=project)
+        today = timezone.localdate()
+        for i in range(tasks):
+            Task.objects.create(
+                project=project, name=f'Tarea {i}', description='-',
+                deadline=today + timedelta(days=i), created_by=self.user,
+                assigned_to=self.user, status='completed' if i == 0 else 'pending'
+            )
+        room = ChatRoom.objects.create(project=project, room_type='group')
+        for i in range(messages):
+            Message.objects.create(chat_room=room, sender=self.other, content=f'Hola {i}')
+        return project, room
+
+    def get_dashboard(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data
+
+    def test_query_count_does_not_grow(self):
+        self.add_project()
+        baseline, _ = self.get_dashboard()
+        cache.clear()
+
+        for _ in range(4):
+            self.add_project()
+        queries, data = self.get_dashboard()
+
+        self.assertEqual(queries, baseline)
+        self.assertEqual(len(data['projects']), 5)
+        self.assertEqual(data['projects'][0]['tasks_count'], 3)
+        self.assertEqual(data['projects'][0]['completed_tasks_count'], 1)
+        self.assertEqual(data['tasks']['by_status']['pending'], 10)
+        self.assertEqual(data['tasks']['by_status']['completed'], 5)
+        self.assertEqual(len(data['tasks']['upcoming']), 10)
+        self.assertEqual(data['unread']['total'], 10)
+
+    def test_cached_until_tasks_change(self):
+        project, room = self.add_project()
+        uncached, _ = self.get_dashboard()
+        cached, _ = self.get_dashboard()
+        self.assertLess(cached, uncached)
+
+        # Marcar como leído no toca la caché: los no leídos se calculan siempre
+        ChatReadState.advance(room.id, self.user)
+        _, data = self.get_dashboard()
+        self.assertEqual(data['unread']['total'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(
+                project=project, name='Nueva', description='-',
+                deadline=timezone.localdate(), created_by=self.other,
+                assigned_to=self.user
+            )
+        _, data = self.get_dashboard()
+        self.assertEqual(data['tasks']['by_status']['pending'], 3)
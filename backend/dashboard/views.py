@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from chat.models import ChatRoom, ChatReadState, Message
+from projects.permissions import get_membership_resolver
+from projects.views import project_list_queryset
+from tasks.models import Task
+from . import cache
+from .serializers import DashboardProjectSerializer
+
+
+# Días hacia adelante que cubren las fechas límite próximas
+UPCOMING_DAYS = getattr(settings, 'DASHBOARD_UPCOMING_DAYS', 30)
+UPCOMING_LIMIT = getattr(settings, 'DASHBOARD_UPCOMING_LIMIT', 50)
+
+
+def _task_count(**filters):
+    """Subconsulta con el número de tareas del proyecto externo."""
+    return Subquery(
+        Task.objects.filter(project=OuterRef('pk'), **filters).values(
+            'project'
+        ).annotate(n=Count('id')).values('n')
+    )
+
+
+def project_summary(request):
+    """Proyectos del usuario con miembros, rol y conteos de tareas (una consulta)."""
+    projects = project_list_queryset(request).annotate(
+        tasks_count=Coalesce('stats__tasks_total', _task_count(), 0),
+        completed_tasks_count=Coalesce(
+            'stats__tasks_status_completed', _task_count(status='completed'), 0
+        ),
+    )
+    return DashboardProjectSerializer(projects, many=True, context={'request': request}).data
+
+
+def task_summary(user):
+    """Tareas asignadas al usuario agrupadas por estado y las próximas a vencer.
+
+    ``upcoming`` incluye las tareas abiertas vencidas y las que vencen en los
+    próximos ``UPCOMING_DAYS`` días, ordenadas por fecha límite.
+    """
+    by_status = {value: 0 for value, _ in Task.STATUS_CHOICES}
+    # Las tareas de proyectos eliminados siguen ahí hasta que termina la purga
+    tasks = Task.objects.filter(assigned_to=user, project__deleted_at__isnull=True)
+    rows = tasks.values('status').annotate(n=Count('id'))
+    for row in rows.order_by():
+        by_status[row['status']] = row['n']
+
+    today = timezone.localdate()
+    upcoming = tasks.filter(
+        deadline__lte=today + timedelta(days=UPCOMING_DAYS)
+    ).exclude(status='completed').order_by('deadline', 'id').values(
+        'id', 'name', 'deadline', 'priority', 'status', 'project', 'project__title'
+    )[:UPCOMING_LIMIT]
+
+    return {
+        'total': sum(by_status.values()),
+        'by_status': by_status,
+        'upcoming': [
+            {
+                'id': task['id'],
+                'name': task['name'],
+                'deadline': task['deadline'],
+                'priority': task['priority'],
+                'status': task['status'],
+                'project': task['project'],
+                'project_title': task['project__title'],
+                'days_remaining': (task['deadline'] - today).days,
+            }
+            for task in upcoming
+        ],
+    }
+
+
+def unread_summary(user, project_ids):
+    """Mensajes no leídos por sala del usuario, en una sola consulta."""
+    private_rooms = ChatRoom.participants.through.objects.filter(
+        user=user
+    ).values('chatroom_id')
+    rooms = ChatRoom.objects.filter(
+        Q(room_type='group', project_id__in=project_ids) |
+        Q(room_type='private', id__in=private_rooms)
+    ).values('id')
+    last_read = ChatReadState.objects.filter(
+        chat_room=OuterRef('chat_room'),
+        user=user
+    ).values('last_read_message_id')[:1]
+
+    rows = Message.objects.filter(chat_room__in=rooms).exclude(sender=user).filter(
+        id__gt=Coalesce(Subquery(last_read), 0)
+    ).values('chat_room').annotate(n=Count('id'))
+    by_room = {row['chat_room']: row['n'] for row in rows.order_by()}
+    return {'total': sum(by_room.values()), 'by_room': by_room}
+
+
+class DashboardView(APIView):
+    """Resumen inicial del dashboard en una sola petición.
+
+    Proyectos con conteos, tareas del usuario por estado con las próximas
+    a vencer y mensajes no leídos. Los proyectos y tareas se guardan en la
+    caché por usuario (ver ``dashboard.cache``).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        summary = cache.get_summary(user.id)
+        if summary is None:
+            summary = {
+                'projects': project_summary(request),
+                'tasks': task_summary(user),
+            }
+            cache.set_summary(user.id, summary)
+
+        return Response({
+            **summary,
+            'unread': unread_summary(user, get_membership_resolver(request).project_ids()),
+        })
@@ -0,0 +1,81 @@
+"""Registro de actividad de los proyectos.
+
+Las funciones se llaman desde las vistas después de escribir el cambio y
+dentro de la misma transacción, igual que ``projects.stats``. Cada una
+agrega una sola fila a ``Activity`` con un ``payload`` compacto: IDs y el
+nombre visible del objeto, para que el cliente pueda mostrar la entrada
+aunque el objeto ya no exista.
+"""
+from .models import Activity
+
+
+def record(project_id, verb, actor=None, **payload):
+    """Agrega una entrada al registro del proyecto."""
+    return Activity.objects.create(
+        project_id=project_id,
+        verb=verb,
+        actor=actor,
+        payload=payload
+    )
+
+
+def record_many(project_id, actor, events):
+    """Agrega varias entradas con un solo INSERT.
+
+    ``events`` son pares ``(verbo, payload)``; para operaciones masivas.
+    """
+    Activity.objects.bulk_create([
+        Activity(project_id=project_id, verb=verb, actor=actor, payload=payload)
+        for verb, payload in events
+    ])
+
+
+def task_created(task, actor):
+    record(task.project_id, Activity.TASK_CREATED, actor, task=task.id, name=task.name)
+
+
+def task_updated(task, actor, fields):
+    """Registra los campos de la tarea que cambiaron (si cambió alguno)."""
+    if fields:
+        record(task.project_id, Activity.TASK_UPDATED, actor,
+               task=task.id, name=task.name, fields=sorted(fields))
+
+
+def task_status_changed(task, actor, old_status):
+    if task.status != old_status:
+        record(task.project_id, Activity.TASK_STATUS_CHANGED, actor,
+               task=task.id, name=task.name, old=old_status, new=task.status)
+
+
+def task_deleted(task, actor):
+    record(task.project_id, Activity.TASK_DELETED, actor, task=task.id, name=task.name)
+
+
+def members_added(project_id, actor, user_ids):
+    if user_ids:
+        record(project_id, Activity.MEMBERS_ADDED, actor, users=sorted(user_ids))
+
+
+def members_removed(project_id, actor, user_ids):
+    if user_ids:
+        record(project_id, Activity.MEMBERS_REMOVED, actor, users=sorted(user_ids))
+
+
+def leader_changed(project_id, actor, new_leader_id):
+    record(project_id, Activity.LEADER_CHANGED, actor, old=actor.id, new=new_leader_id)
+
+
+def document_uploaded(document, task, actor):
+    record(task.project_id, Activity.DOCUMENT_UPLOADED, actor,
+           task=task.id, document=document.id, name=document.name)
+
+
+def document_deleted(document, task, actor):
+    record(task.project_id, Activity.DOCUMENT_DELETED, actor,
+           task=task.id, document=document.id, name=document.name)
+
+
+def chat_room_created(chat_room, actor):
+    if chat_room.project_id:
+        record(chat_room.project_id, Activity.CHAT_ROOM_CREATED, actor,
+               room=chat_room.id, type=chat_room.room_type)
@@ -1,5 +1,11 @@
 from django.contrib import admin
-from .models import Project, Membership
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from tasks.models import Task
+from .models import Project, Membership, ProjectStats, ProjectDeletion, Activity
+from .search import get_backend as get_search_backend
 
 
 class MembershipInline(admin.TabularInline):
@@ -13,18 +19,28 @@ class MembershipInline(admin.TabularInline):
 class ProjectAdmin(admin.ModelAdmin):
     """Admin para proyectos."""
     
-    list_display = ('title', 'code', 'priority', 'start_date', 'end_date', 'created_by', 'created_at')
-    list_filter = ('priority', 'start_date', 'end_date', 'created_at')
+    list_display = ('title', 'code', 'priority', 'start_date', 'end_date', 'created_by', 'created_at', 'deleted_at')
+    list_filter = ('priority', 'start_date', 'end_date', 'created_at', 'deleted_at')
     search_fields = ('title', 'description', 'code', 'created_by__email')
     ordering = ('-created_at',)
-    readonly_fields = ('code', 'created_at', 'updated_at')
+    readonly_fields = ('code', 'created_at', 'updated_at', 'deleted_at')
     inlines = [MembershipInline]
     
+    def get_search_results(self, request, queryset, search_term):
+        # El texto se busca en el índice; el código y el correo, exactos
+        term = search_term.strip()
+        if not term:
+            return super().get_search_results(request, queryset, search_term)
+        ids = get_search_backend().search(term, limit=1000)
+        return queryset.filter(
+            Q(id__in=ids) | Q(code=term.upper()) | Q(created_by__email=term)
+        ), False
+    
     fieldsets = (
         ('Información básica', {'fields': ('title', 'description', 'code')}),
         ('Objetivos', {'fields': ('general_objectives', 'specific_objectives')}),
         ('Fechas y prioridad', {'fields': ('start_date', 'end_date', 'priority')}),
-        ('Metadata', {'fields': ('created_by', 'created_at', 'updated_at')}),
+        ('Metadata', {'fields': ('created_by', 'created_at', 'updated_at', 'deleted_at')}),
     )
 
 
@@ -36,3 +52,55 @@ class MembershipAdmin(admin.ModelAdmin):
     list_filter = ('role', 'joined_at')
     search_fields = ('user__email', 'project__title')
     ordering = ('-joined_at',)
+    
+    def delete_queryset(self, request, queryset):
+        # El borrado por queryset no pasa por Membership.delete
+        changed = {}
+        for project_id, user_id in queryset.values_list('project_id', 'user_id'):
+            changed.setdefault(project_id, []).append(user_id)
+        super().delete_queryset(request, queryset)
+        for project_id, user_ids in changed.items():
+            Membership.notify_changed(project_id, user_ids)
+
+
+@admin.register(ProjectStats)
+class ProjectStatsAdmin(admin.ModelAdmin):
+    """Admin para estadísticas de proyectos (solo lectura)."""
+    
+    list_display = ('project', 'members_count', 'tasks_total', 'tasks_status_completed', 'tasks_overdue', 'messages_count', 'updated_at')
+    search_fields = ('project__title',)
+    readonly_fields = [field.name for field in ProjectStats._meta.fields]
+    
+    def get_queryset(self, request):
+        # Las vencidas se cuentan al leer (ver projects.stats.overdue_counts)
+        overdue = Task.objects.filter(
+            project=OuterRef('project'), deadline__lt=timezone.localdate()
+        ).exclude(status='completed').values('project').annotate(n=Count('id')).values('n')
+        return super().get_queryset(request).annotate(
+            tasks_overdue=Coalesce(Subquery(overdue), 0)
+        )
+    
+    @admin.display(description='tareas vencidas', ordering='tasks_overdue')
+    def tasks_overdue(self, obj):
+        return obj.tasks_overdue
+
+
+@admin.register(ProjectDeletion)
+class ProjectDeletionAdmin(admin.ModelAdmin):
+    """Admin para eliminaciones de proyectos (solo lectura)."""
+    
+    list_display = ('title', 'project_id', 'status', 'deleted_rows', 'total_rows', 'deleted_files', 'requested_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('title', 'requested_by__email')
+    readonly_fields = [field.name for field in ProjectDeletion._meta.fields]
+
+
+@admin.register(Activity)
+class ActivityAdmin(admin.ModelAdmin):
+    """Admin para el registro de actividad (solo lectura)."""
+    
+    list_display = ('project', 'verb', 'actor', 'created_at')
+    list_filter = ('verb', 'created_at')
+    search_fields = ('project__title', 'actor__email')
+    list_select_related = ('project', 'actor')
+    readonly_fields = [field.name for field in Activity._meta.fields]
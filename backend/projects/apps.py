@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects'
+    
+    def ready(self):
+        # Registra el receptor de ``memberships_changed`` y los del índice de búsqueda
+        from . import permissions, search  # noqa: F401
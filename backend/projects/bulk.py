@@ -0,0 +1,178 @@
+"""Altas y bajas masivas de miembros.
+
+Cada operación usa un número fijo de consultas sin importar cuántas filas
+reciba, se aplica en una transacción y emite un único
+``memberships_changed`` con todos los usuarios afectados. El resultado
+incluye el estado de cada fila.
+"""
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from . import activity, stats
+from .models import Membership
+
+User = get_user_model()
+
+# Intentos de inserción antes de desistir por uniones concurrentes
+ADD_MAX_ATTEMPTS = 3
+
+
+ADD_MESSAGES = {
+    'added': 'Agregado al proyecto.',
+    'already_member': 'Ya es miembro del proyecto.',
+    'not_found': 'No existe un usuario con este correo.',
+    'invalid': 'Correo electrónico inválido.',
+    'duplicate': 'Correo repetido en la lista.',
+}
+
+REMOVE_MESSAGES = {
+    'removed': 'Removido del proyecto.',
+    'not_member': 'El usuario no es miembro del proyecto.',
+    'leader': 'No se puede remover al líder.',
+    'self': 'No puedes removerte a ti mismo.',
+    'invalid': 'ID de usuario inválido.',
+    'duplicate': 'Usuario repetido en la lista.',
+}
+
+
+def _result(messages, row, status, **fields):
+    return {'row': row, **fields, 'status': status, 'message': messages[status]}
+
+
+def _summary(results):
+    summary = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    return summary
+
+
+def _current_members(project, user_ids):
+    return set(Membership.objects.filter(
+        project=project,
+        user_id__in=user_ids
+    ).values_list('user_id', flat=True))
+
+
+def add_members(project, emails, acting_user=None):
+    """Agrega como integrantes a los usuarios de ``emails``.
+
+    Retorna ``(results, summary)``: un resultado por fila, en el orden
+    recibido, y el conteo por estado.
+    """
+    results = {}
+    candidates = []
+    seen = set()
+    for row, raw in enumerate(emails, start=1):
+        email = User.objects.normalize_email(str(raw).strip())
+        try:
+            validate_email(email)
+        except ValidationError:
+            results[row] = _result(ADD_MESSAGES, row, 'invalid', email=raw)
+            continue
+        key = email.lower()
+        if key in seen:
+            results[row] = _result(ADD_MESSAGES, row, 'duplicate', email=email)
+            continue
+        seen.add(key)
+        candidates.append((row, email))
+
+    # El dominio se guarda en minúsculas; se busca también la variante en minúsculas
+    lookup = {email for _, email in candidates} | seen
+    users = {
+        user.email.lower(): user
+        for user in User.objects.filter(email__in=lookup).only('id', 'email')
+    }
+
+    with transaction.atomic():
+        # Una unión concurrente puede insertar la misma membresía entre la
+        # lectura y el INSERT: el índice único la detecta dentro de un
+        # savepoint y se recalcula la diferencia
+        for attempt in range(ADD_MAX_ATTEMPTS):
+            members = _current_members(project, [user.id for user in users.values()])
+
+            new = []
+            for row, email in candidates:
+                user = users.get(email.lower())
+                if user is None:
+                    results[row] = _result(ADD_MESSAGES, row, 'not_found', email=email)
+                elif user.id in members:
+                    results[row] = _result(ADD_MESSAGES, row, 'already_member', email=email, user=user.id)
+                else:
+                    members.add(user.id)
+                    new.append(Membership(user=user, project=project, role='member'))
+                    results[row] = _result(ADD_MESSAGES, row, 'added', email=email, user=user.id)
+
+            if not new:
+                break
+            try:
+                with transaction.atomic():
+                    Membership.objects.bulk_create(new)
+                break
+            except IntegrityError:
+                if attempt == ADD_MAX_ATTEMPTS - 1:
+                    raise
+
+        if new:
+            user_ids = [membership.user_id for membership in new]
+            stats.membership_added(project.id, count=len(new))
+            stats.recount_member_load(project.id, user_ids)
+            activity.members_added(project.id, acting_user, user_ids)
+            Membership.notify_changed(project.id, user_ids)
+
+    results = [results[row] for row in sorted(results)]
+    return results, _summary(results)
+
+
+def remove_members(project, user_ids, acting_user):
+    """Remueve a los usuarios de ``user_ids`` con un solo DELETE.
+
+    El líder y quien realiza la operación no se pueden remover. Retorna
+    ``(results, summary)`` igual que ``add_members``.
+    """
+    results = {}
+    candidates = []
+    seen = set()
+    for row, raw in enumerate(user_ids, start=1):
+        try:
+            user_id = int(raw)
+        except (TypeError, ValueError):
+            results[row] = _result(REMOVE_MESSAGES, row, 'invalid', user=raw)
+            continue
+        if user_id in seen:
+            results[row] = _result(REMOVE_MESSAGES, row, 'duplicate', user=user_id)
+            continue
+        seen.add(user_id)
+        candidates.append((row, user_id))
+
+    with transaction.atomic():
+        roles = dict(Membership.objects.filter(
+            project=project,
+            user_id__in=seen
+        ).values_list('user_id', 'role'))
+
+        removable = []
+        for row, user_id in candidates:
+            if user_id == acting_user.id:
+                status = 'self'
+            elif user_id not in roles:
+                status = 'not_member'
+            elif roles[user_id] == 'leader':
+                status = 'leader'
+            else:
+                status = 'removed'
+                removable.append(user_id)
+            results[row] = _result(REMOVE_MESSAGES, row, status, user=user_id)
+
+        if removable:
+            deleted, _ = Membership.objects.filter(
+                project=project,
+                user_id__in=removable
+            ).delete()
+            stats.membership_removed(project.id, count=deleted)
+            activity.members_removed(project.id, acting_user, removable)
+            Membership.notify_changed(project.id, removable)
+
+    results = [results[row] for row in sorted(results)]
+    return results, _summary(results)
@@ -0,0 +1,85 @@
+"""Clonación de proyectos y plantillas.
+
+``clone_project`` copia los datos del proyecto, sus tareas (con las fechas
+límite desplazadas según la nueva fecha de inicio) y opcionalmente sus
+miembros. Todo se inserta con ``bulk_create`` en una transacción: las
+tareas se leen en una consulta y se escriben en lotes, y las estadísticas
+del proyecto nuevo se calculan en memoria.
+"""
+from django.db import transaction
+
+from tasks.models import Task
+from . import stats
+from .models import Project, Membership, ProjectStats
+
+
+# Campos del proyecto que se copian tal cual
+PROJECT_FIELDS = ['description', 'general_objectives', 'specific_objectives', 'priority']
+
+
+def clone_project(source, user, start_date, title=None, end_date=None,
+                  include_members=False, is_template=False):
+    """Crea una copia de ``source`` con ``user`` como líder.
+
+    Las tareas se copian como pendientes. Si ``include_members`` es
+    verdadero, los demás miembros se copian como integrantes y las tareas
+    conservan su asignación; si no, quedan sin asignar.
+    """
+    offset = start_date - source.start_date
+    if end_date is None:
+        end_date = source.end_date + offset
+
+    with transaction.atomic():
+        project = Project.objects.create(
+            title=title or f'Copia de {source.title}',
+            start_date=start_date,
+            end_date=end_date,
+            is_template=is_template,
+            created_by=user,
+            **{field: getattr(source, field) for field in PROJECT_FIELDS}
+        )
+
+        member_ids = {user.id}
+        if include_members:
+            member_ids.update(source.memberships.values_list('user_id', flat=True))
+        # Sin miembros copiados no se conserva ninguna asignación
+        assignable = member_ids if include_members else set()
+
+        tasks = [
+            Task(
+                project=project,
+                name=task['name'],
+                description=task['description'],
+                deadline=task['deadline'] + offset,
+                priority=task['priority'],
+                assigned_to_id=task['assigned_to_id'] if task['assigned_to_id'] in assignable else None,
+                created_by=user
+            )
+            for task in source.tasks.order_by('id').values(
+                'name', 'description', 'deadline', 'priority', 'assigned_to_id'
+            )
+        ]
+
+        # Carga de tareas abiertas por miembro (todas las copias quedan pendientes)
+        load = {}
+        for task in tasks:
+            if task.assigned_to_id:
+                load[task.assigned_to_id] = load.get(task.assigned_to_id, 0) + 1
+
+        Membership.objects.bulk_create([
+            Membership(
+                user_id=user_id,
+                project=project,
+                role='leader' if user_id == user.id else 'member',
+                open_tasks_count=load.get(user_id, 0)
+            )
+            for user_id in sorted(member_ids)
+        ])
+        Task.objects.bulk_create(tasks)
+        ProjectStats.objects.create(
+            project=project,
+            **stats.initial(tasks, members_count=len(member_ids))
+        )
+        Membership.notify_changed(project.id, member_ids)
+
+    return project
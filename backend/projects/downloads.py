@@ -0,0 +1,250 @@
+"""Descarga autenticada de archivos subidos (documentos y adjuntos del chat).
+
+Las vistas verifican la membresía una vez y llaman a ``serve_file``, que:
+
+* responde ``304`` si ``If-None-Match`` coincide con la ETag (el hash del
+  blob para documentos, o tamaño y fecha de modificación para el resto);
+* atiende un rango ``Range: bytes=inicio-fin`` con ``206`` (o ``416`` si
+  queda fuera del archivo), respetando ``If-Range``, para reanudar
+  descargas y saltar dentro de PDF y videos;
+* entrega el archivo abierto a ``FileResponse``: con un servidor WSGI que
+  ofrece ``wsgi.file_wrapper`` (gunicorn, uWSGI) se envía con ``sendfile``
+  sin pasar por Python, también para rangos.
+
+Con ``DOWNLOAD_SERVE_MODE = 'x-accel-redirect'`` (nginx) o ``'x-sendfile'``
+(Apache, lighttpd) la vista solo autoriza y el servidor web envía el archivo.
+
+Los enlaces de ``<a>`` y ``<video>`` no pueden enviar el encabezado
+``Authorization``. Los serializers entregan la URL con ``download_url``,
+que agrega en ``?token=`` una firma de corta duración
+(``DOWNLOAD_TOKEN_MAX_AGE``) válida solo para ese usuario y esa ruta;
+``DownloadTokenAuthentication`` la verifica. El token de acceso nunca va en
+la URL, donde quedaría en historiales y registros del servidor.
+"""
+import io
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.http import content_disposition_header, parse_etags, quote_etag
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+
+TOKEN_SALT = 'projects.downloads'
+BLOCK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def serve_mode():
+    return getattr(settings, 'DOWNLOAD_SERVE_MODE', 'django')
+
+
+def accel_prefix():
+    return getattr(settings, 'DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+
+
+def token_max_age():
+    return getattr(settings, 'DOWNLOAD_TOKEN_MAX_AGE', 15 * 60)
+
+
+def download_token(user, path):
+    """Firma que autoriza a ``user`` a descargar ``path`` durante ``DOWNLOAD_TOKEN_MAX_AGE``."""
+    return signing.dumps({'user': user.pk, 'path': path}, salt=TOKEN_SALT)
+
+
+def download_url(request, path):
+    """URL absoluta de ``path`` firmada para el usuario de ``request``."""
+    if request is None or not request.user.is_authenticated:
+        return path
+    return f'{request.build_absolute_uri(path)}?token={download_token(request.user, path)}'
+
+
+class DownloadTokenAuthentication(BaseAuthentication):
+    """Autentica con la firma de ``download_token`` en ``?token=``.
+
+    La firma solo vale para la ruta con la que se generó, así que no sirve
+    para llamar a otros endpoints de la API.
+    """
+
+    def authenticate(self, request):
+        token = request.query_params.get('token')
+        if not token:
+            return None
+        try:
+            payload = signing.loads(token, salt=TOKEN_SALT, max_age=token_max_age())
+        except signing.SignatureExpired:
+            raise AuthenticationFailed('El enlace de descarga expiró.')
+        except signing.BadSignature:
+            raise AuthenticationFailed('El enlace de descarga no es válido.')
+        if payload.get('path') != request.path:
+            raise AuthenticationFailed('El enlace de descarga no es válido.')
+        user = get_user_model().objects.filter(pk=payload.get('user'), is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed('El enlace de descarga no es válido.')
+        return user, None
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header, size):
+    """``(inicio, fin)`` inclusivos del encabezado ``Range``.
+
+    Solo se atiende un rango de bytes: si no hay encabezado, pide varios
+    rangos o no se entiende, retorna ``None`` y se envía el archivo completo.
+    Lanza ``RangeNotSatisfiable`` si el rango empieza fuera del archivo.
+    """
+    match = RANGE_RE.match((header or '').replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+class FileRange:
+    """Vista de solo lectura de ``length`` bytes de un archivo abierto.
+
+    ``FileResponse`` calcula ``Content-Length`` con ``seek``/``tell``
+    relativos al rango; el archivo real queda posicionado en el inicio, así
+    ``wsgi.file_wrapper`` puede enviar el rango con ``sendfile``.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.start = start
+        self.length = length
+        self.file.seek(start)
+
+    def read(self, size=-1):
+        remaining = self.length - self.tell()
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        return self.file.read(size) if size > 0 else b''
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.tell()
+        elif whence == io.SEEK_END:
+            offset += self.length
+        offset = min(max(offset, 0), self.length)
+        self.file.seek(self.start + offset)
+        return offset
+
+    def tell(self):
+        return self.file.tell() - self.start
+
+    def seekable(self):
+        return True
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def etag_matches(header, etag):
+    """Comparación débil de ``If-None-Match`` contra la ETag entre comillas."""
+    if header.strip() == '*':
+        return True
+    return any(candidate.removeprefix('W/') == etag for candidate in parse_etags(header))
+
+
+def guess_content_type(filename):
+    content_type, encoding = mimetypes.guess_type(filename)
+    if encoding:
+        # Igual que FileResponse: el navegador no debe descomprimirlo
+        return 'application/octet-stream'
+    return content_type or 'application/octet-stream'
+
+
+def serve_file(request, field_file, filename, etag=None):
+    """Respuesta con el contenido de ``field_file`` para ``request``.
+
+    ``filename`` es el nombre que verá el usuario (los blobs no tienen
+    extensión, así que también define el ``Content-Type``). ``etag`` puede
+    darse si el nombre ya identifica el contenido; si no, se deriva del
+    tamaño y la fecha de modificación. Con ``?download=1`` se pide guardar
+    el archivo en vez de abrirlo en el navegador.
+    """
+    if not field_file:
+        raise Http404('El archivo no existe.')
+    storage, name = field_file.storage, field_file.name
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        path = None
+
+    try:
+        if path is not None:
+            stat = os.stat(path)
+            size, modified = stat.st_size, stat.st_mtime_ns
+        else:
+            size, modified = storage.size(name), storage.get_modified_time(name).timestamp()
+    except (FileNotFoundError, NotImplementedError):
+        raise Http404('El archivo no existe.')
+
+    etag = quote_etag(etag or f'{int(modified):x}-{size:x}')
+    headers = {
+        'ETag': etag,
+        'Accept-Ranges': 'bytes',
+        # El navegador puede guardarlo pero revalida con la ETag
+        'Cache-Control': 'private, no-cache',
+    }
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and etag_matches(if_none_match, etag):
+        return HttpResponse(status=304, headers=headers)
+
+    as_attachment = request.query_params.get('download') in ('1', 'true')
+    headers['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+
+    mode = serve_mode()
+    if mode in ('x-accel-redirect', 'x-sendfile'):
+        response = HttpResponse(content_type=guess_content_type(filename), headers=headers)
+        if mode == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = accel_prefix().rstrip('/') + '/' + quote(name)
+        else:
+            response['X-Sendfile'] = path or name
+        return response
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if not if_range or if_range.strip() == etag:
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except RangeNotSatisfiable:
+            headers['Content-Range'] = f'bytes */{size}'
+            return HttpResponse(status=416, headers=headers)
+
+    file = open(path, 'rb') if path is not None else storage.open(name, 'rb')
+    if byte_range:
+        start, end = byte_range
+        file = FileRange(file, start, end - start + 1)
+        headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response = FileResponse(
+        file, status=206 if byte_range else 200,
+        as_attachment=as_attachment, filename=filename, headers=headers
+    )
+    response.block_size = BLOCK_SIZE
+    return response
@@ -0,0 +1,395 @@
+"""Exportación del proyecto a PDF en el servidor.
+
+El documento se escribe por páginas con ``PDFDocument`` (sin dependencias
+externas: fuentes estándar Helvetica y flujos comprimidos con zlib) y se
+entrega por partes mientras se genera. La generación corre en un hilo de
+``_executor``; la vista solo lee los fragmentos de una cola.
+
+El PDF completo queda en la caché de Django bajo una clave que incluye la
+última modificación del proyecto (ver ``export_stamp``), así que cualquier
+cambio en el proyecto, sus tareas o sus miembros genera una clave nueva.
+"""
+import queue
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.utils import timezone
+
+from tasks.models import Task
+from . import stats
+from .models import Project, Membership
+from .serializers import get_project_stats
+
+
+CACHE_TIMEOUT = getattr(settings, 'PROJECT_EXPORT_CACHE_TIMEOUT', 24 * 60 * 60)
+WORKERS = getattr(settings, 'PROJECT_EXPORT_WORKERS', 2)
+
+# Fragmentos pendientes por exportación antes de frenar al generador
+QUEUE_SIZE = 16
+
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='project-export')
+_DONE = object()
+
+
+# Página A4 en puntos
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 50
+
+STATUS_LABELS = dict(Task.STATUS_CHOICES)
+PRIORITY_LABELS = dict(Task.PRIORITY_CHOICES)
+
+# (encabezado, ancho en puntos) de la tabla de tareas
+TASK_COLUMNS = [
+    ('Tarea', 190),
+    ('Estado', 75),
+    ('Prioridad', 60),
+    ('Fecha límite', 65),
+    ('Asignado a', 105),
+]
+
+
+def _encode(text):
+    """Texto como cadena literal de PDF en WinAnsiEncoding."""
+    data = str(text).encode('cp1252', 'replace')
+    data = data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+    return b'(' + data + b')'
+
+
+def _text_width(text, size):
+    # Ancho medio aproximado de Helvetica
+    return len(text) * size * 0.5
+
+
+def _fit(text, width, size):
+    """Recorta ``text`` para que quepa en ``width`` puntos."""
+    text = ' '.join(str(text).split())
+    max_chars = int(width / (size * 0.5))
+    if len(text) <= max_chars:
+        return text
+    return text[:max(max_chars - 3, 0)] + '...'
+
+
+def _wrap(text, width, size):
+    """Divide ``text`` en líneas que quepan en ``width`` puntos."""
+    max_chars = max(int(width / (size * 0.5)), 1)
+    lines = []
+    for paragraph in str(text).splitlines() or ['']:
+        line = ''
+        for word in paragraph.split():
+            candidate = f'{line} {word}' if line else word
+            if len(candidate) <= max_chars:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            while len(word) > max_chars:
+                lines.append(word[:max_chars])
+                word = word[max_chars:]
+            line = word
+        lines.append(line)
+    return lines
+
+
+class PDFDocument:
+    """Escritor de PDF que entrega el archivo por fragmentos.
+
+    ``write_*`` acumulan operaciones en la página actual; cada página
+    terminada se devuelve como bytes desde ``pages()``/``close()``. Los
+    objetos 1 (catálogo) y 2 (árbol de páginas) se escriben al final,
+    cuando ya se conocen todas las páginas.
+    """
+
+    FONTS = {'F1': 'Helvetica', 'F2': 'Helvetica-Bold'}
+
+    def __init__(self):
+        self.offset = 0
+        self.offsets = {}
+        self.next_id = 3
+        self.page_ids = []
+        self.font_ids = {}
+        self.ready = []
+        self.ops = None
+        self.y = 0
+
+    def _object(self, obj_id, body):
+        self.offsets[obj_id] = self.offset
+        data = b'%d 0 obj\n' % obj_id + body + b'\nendobj\n'
+        self.offset += len(data)
+        return data
+
+    def _allocate(self):
+        obj_id = self.next_id
+        self.next_id += 1
+        return obj_id
+
+    def _emit(self, data):
+        self.ready.append(data)
+
+    def begin(self):
+        header = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+        self.offset += len(header)
+        self._emit(header)
+        for name, base_font in self.FONTS.items():
+            font_id = self._allocate()
+            self.font_ids[name] = font_id
+            self._emit(self._object(font_id, (
+                b'<< /Type /Font /Subtype /Type1 /BaseFont /%s '
+                b'/Encoding /WinAnsiEncoding >>' % base_font.encode()
+            )))
+        self.new_page()
+
+    def new_page(self):
+        self.end_page()
+        self.ops = []
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def end_page(self):
+        if self.ops is None:
+            return
+        content = zlib.compress(b'\n'.join(self.ops))
+        content_id = self._allocate()
+        page_id = self._allocate()
+        self._emit(self._object(content_id, (
+            b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(content)
+            + content + b'\nendstream'
+        )))
+        fonts = b' '.join(
+            b'/%s %d 0 R' % (name.encode(), font_id)
+            for name, font_id in self.font_ids.items()
+        )
+        self._emit(self._object(page_id, (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << %s >> >> /Contents %d 0 R >>'
+            % (PAGE_WIDTH, PAGE_HEIGHT, fonts, content_id)
+        )))
+        self.page_ids.append(page_id)
+        self.ops = None
+
+    def pages(self):
+        """Fragmentos listos para enviar desde la última llamada."""
+        ready, self.ready = self.ready, []
+        return ready
+
+    def ensure_space(self, height):
+        if self.y - height < MARGIN:
+            self.new_page()
+
+    def text(self, x, text, size=10, bold=False, color=(0.29, 0.22, 0.16)):
+        font = b'F2' if bold else b'F1'
+        self.ops.append(
+            b'BT %.3f %.3f %.3f rg /%s %d Tf 1 0 0 1 %.2f %.2f Tm %s Tj ET'
+            % (*color, font, size, x, self.y, _encode(text))
+        )
+
+    def rule(self, color=(0.91, 0.87, 0.84)):
+        self.ops.append(
+            b'%.3f %.3f %.3f RG 0.8 w %d %.2f m %d %.2f l S'
+            % (*color, MARGIN, self.y, PAGE_WIDTH - MARGIN, self.y)
+        )
+
+    def advance(self, height):
+        self.y -= height
+
+    def write_line(self, text, size=10, bold=False, gap=4, color=(0.29, 0.22, 0.16)):
+        self.ensure_space(size + gap)
+        self.advance(size)
+        self.text(MARGIN, text, size=size, bold=bold, color=color)
+        self.advance(gap)
+
+    def write_paragraph(self, text, size=10, gap=4):
+        for line in _wrap(text, PAGE_WIDTH - 2 * MARGIN, size):
+            self.write_line(line, size=size, gap=gap)
+
+    def write_heading(self, text):
+        self.ensure_space(40)
+        self.advance(14)
+        self.write_line(text, size=14, bold=True, color=(0.55, 0.45, 0.33))
+        self.rule()
+        self.advance(8)
+
+    def write_row(self, cells, columns, size=9, bold=False):
+        self.ensure_space(size + 8)
+        self.advance(size)
+        x = MARGIN
+        for cell, (_, width) in zip(cells, columns):
+            self.text(x, _fit(cell, width - 6, size), size=size, bold=bold)
+            x += width
+        self.advance(4)
+        self.rule()
+        self.advance(4)
+
+    def close(self):
+        """Cierra la última página y escribe el árbol de páginas y el xref."""
+        self.end_page()
+        kids = b' '.join(b'%d 0 R' % page_id for page_id in self.page_ids)
+        self._emit(self._object(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            kids, len(self.page_ids)
+        )))
+        self._emit(self._object(1, b'<< /Type /Catalog /Pages 2 0 R >>'))
+        size = self.next_id
+        xref = [b'xref\n0 %d\n' % size, b'0000000000 65535 f \n']
+        for obj_id in range(1, size):
+            xref.append(b'%010d 00000 n \n' % self.offsets[obj_id])
+        xref.append(
+            b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+            % (size, self.offset)
+        )
+        self._emit(b''.join(xref))
+        return self.pages()
+
+
+def export_stamp(project_id):
+    """Última modificación del proyecto para la caché de exportación.
+
+    Es la mayor fecha entre el proyecto, sus estadísticas (cambian con las
+    tareas y membresías) y la tarea editada más recientemente. Retorna
+    ``None`` si el proyecto no existe.
+    """
+    last_task = Task.objects.filter(project=OuterRef('pk')).order_by('-updated_at')
+    row = Project.objects.filter(pk=project_id).annotate(
+        last_task_update=Subquery(last_task.values('updated_at')[:1])
+    ).values('updated_at', 'stats__updated_at', 'last_task_update').first()
+    if row is None:
+        return None
+    return max(value for value in row.values() if value is not None)
+
+
+def _cache_key(project_id, stamp):
+    return f'project_pdf:{project_id}:{stamp.timestamp()}'
+
+
+def render_project_pdf(project_id):
+    """Genera el PDF del proyecto y lo entrega por páginas.
+
+    Usa tres consultas: el proyecto con su creador y estadísticas, sus
+    miembros con los usuarios y las tareas, leídas con un cursor.
+    """
+    project = Project.objects.select_related('created_by', 'stats').prefetch_related(
+        Prefetch(
+            'memberships',
+            queryset=Membership.objects.select_related('user').order_by('role', 'joined_at')
+        )
+    ).get(pk=project_id)
+    members = list(project.memberships.all())
+    counts = get_project_stats(project)
+    if counts is None:
+        counts = stats.compute([project.id])[project.id]
+    else:
+        counts = {field: getattr(counts, field) for field in stats.stat_fields()}
+    total = counts['tasks_total']
+    completed = counts['tasks_status_completed']
+    progress = round(completed / total * 100) if total else 0
+
+    pdf = PDFDocument()
+    pdf.begin()
+    pdf.write_line(project.title, size=20, bold=True, gap=10)
+    pdf.write_line(
+        f'Código: {project.code} | Prioridad: {project.get_priority_display()}',
+        color=(0.49, 0.42, 0.36)
+    )
+    pdf.write_line(
+        f'Fechas: {project.start_date:%d/%m/%Y} - {project.end_date:%d/%m/%Y}',
+        color=(0.49, 0.42, 0.36)
+    )
+    pdf.write_line(f'Creado por: {project.created_by.get_full_name()}', color=(0.49, 0.42, 0.36), gap=10)
+    pdf.write_paragraph(project.description or 'Sin descripción')
+    pdf.write_line(
+        f'Miembros: {len(members)}   Tareas totales: {total}   '
+        f'Completadas: {completed}   Progreso: {progress}%',
+        bold=True, gap=6
+    )
+
+    pdf.write_heading('Objetivos generales')
+    pdf.write_paragraph(project.general_objectives)
+    pdf.write_heading('Objetivos específicos')
+    pdf.write_paragraph(project.specific_objectives)
+    yield from pdf.pages()
+
+    pdf.write_heading(f'Tareas ({total})')
+    pdf.write_row([title for title, _ in TASK_COLUMNS], TASK_COLUMNS, bold=True)
+    tasks = Task.objects.filter(project=project).select_related('assigned_to').only(
+        'name', 'status', 'priority', 'deadline',
+        'assigned_to__first_name', 'assigned_to__last_name'
+    ).order_by('deadline', 'id')
+    written = 0
+    for task in tasks.iterator(chunk_size=500):
+        pdf.write_row([
+            task.name,
+            STATUS_LABELS.get(task.status, task.status),
+            PRIORITY_LABELS.get(task.priority, task.priority),
+            f'{task.deadline:%d/%m/%Y}',
+            task.assigned_to.get_full_name() if task.assigned_to else 'Sin asignar',
+        ], TASK_COLUMNS)
+        written += 1
+        yield from pdf.pages()
+    if not written:
+        pdf.write_line('No hay tareas en este proyecto.')
+
+    pdf.write_heading(f'Equipo ({len(members)})')
+    for membership in members:
+        role = ' (Líder)' if membership.role == 'leader' else ''
+        pdf.write_line(f'{membership.user.get_full_name()}{role}', bold=True, gap=2)
+        pdf.write_line(membership.user.email, size=9, color=(0.49, 0.42, 0.36), gap=6)
+
+    pdf.advance(20)
+    pdf.write_line(
+        f'Generado el {timezone.localtime():%d/%m/%Y %H:%M} - Academic Project Manager',
+        size=8, color=(0.72, 0.66, 0.60)
+    )
+    yield from pdf.close()
+
+
+def _generate(project_id, key, chunks, cancelled):
+    """Tarea del hilo de exportación: genera, encola y guarda en caché."""
+
+    def put(item):
+        while not cancelled.is_set():
+            try:
+                chunks.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        parts = []
+        for chunk in render_project_pdf(project_id):
+            parts.append(chunk)
+            if not put(chunk):
+                return
+        cache.set(key, b''.join(parts), CACHE_TIMEOUT)
+        put(_DONE)
+    except Exception as exc:
+        put(exc)
+    finally:
+        connection.close()
+
+
+def stream_project_pdf(project_id, stamp):
+    """Fragmentos del PDF: desde la caché o generados en un hilo de exportación."""
+    key = _cache_key(project_id, stamp)
+    cached = cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = queue.Queue(maxsize=QUEUE_SIZE)
+    cancelled = threading.Event()
+    _executor.submit(_generate, project_id, key, chunks, cancelled)
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is _DONE:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        # Si el cliente se desconecta, el hilo deja de generar
+        cancelled.set()
@@ -0,0 +1,96 @@
+import random
+import string
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projects.models import Project, generate_project_code
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """Mide la asignación de códigos de proyecto con muchos proyectos existentes.
+
+    Todos los datos se crean dentro de una transacción que se revierte al final.
+    """
+
+    help = 'Benchmark de la asignación de códigos de proyecto'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--existing', type=int, default=1_000_000,
+            help='Proyectos existentes antes de medir'
+        )
+        parser.add_argument(
+            '--creates', type=int, default=1000,
+            help='Proyectos creados durante la medición'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['existing'], options['creates'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, existing, creates):
+        user = User.objects.create_user(
+            f'bench-{random.random()}@example.com', None,
+            first_name='Bench', last_name='Codes'
+        )
+        fields = dict(
+            title='Benchmark', description='-', general_objectives='-',
+            specific_objectives='-', start_date=date(2025, 1, 1),
+            end_date=date(2025, 12, 31), created_by=user,
+        )
+
+        start = time.perf_counter()
+        codes = set(Project.objects.values_list('code', flat=True))
+        alphabet = string.ascii_uppercase + string.digits
+        while len(codes) < existing:
+            codes.add(''.join(random.choices(alphabet, k=6)))
+        new_codes = codes.difference(Project.objects.values_list('code', flat=True))
+        batch = []
+        for code in new_codes:
+            batch.append(Project(code=code, **fields))
+            if len(batch) == 5000:
+                Project.objects.bulk_create(batch)
+                batch = []
+        Project.objects.bulk_create(batch)
+        self.stdout.write(
+            f'Proyectos existentes: {Project.objects.count()} '
+            f'(preparados en {time.perf_counter() - start:.1f} s)'
+        )
+
+        # Asignación anterior: consulta de existencia antes de insertar
+        start = time.perf_counter()
+        for _ in range(creates):
+            project = Project(**fields)
+            while Project.objects.filter(code=project.code).exists():
+                project.code = generate_project_code()
+            Project.objects.bulk_create([project])
+        legacy = time.perf_counter() - start
+
+        # Asignación actual: inserción con reintento ante IntegrityError
+        start = time.perf_counter()
+        for _ in range(creates):
+            Project.objects.create(**fields)
+        current = time.perf_counter() - start
+
+        self.stdout.write(f'{"asignación":>28} {"total (s)":>10} {"por proyecto (ms)":>18}')
+        for name, elapsed in (
+            ('consulta + inserción', legacy),
+            ('inserción con reintento', current),
+        ):
+            self.stdout.write(
+                f'{name:>28} {elapsed:>10.3f} {elapsed / creates * 1000:>18.3f}'
+            )
@@ -0,0 +1,126 @@
+import random
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projects.models import Project, Membership, generate_project_code
+from projects.search import LikeSearchBackend, SQLiteFTSBackend
+
+User = get_user_model()
+
+SYLLABLES = 'ra me to lin gar so pe du cri ban vel mo ti que zar na'.split()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """Mide la búsqueda de proyectos con FTS5 frente a ``LIKE``.
+
+    Todos los datos se crean dentro de una transacción que se revierte al final.
+    """
+
+    help = 'Benchmark de la búsqueda de texto completo de proyectos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--projects', type=int, default=100_000,
+            help='Proyectos existentes antes de medir'
+        )
+        parser.add_argument(
+            '--memberships', type=int, default=200,
+            help='Proyectos a los que pertenece el usuario de la búsqueda'
+        )
+        parser.add_argument(
+            '--queries', type=int, default=50,
+            help='Búsquedas por escenario'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['projects'], options['memberships'], options['queries'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def text(self, words):
+        return ' '.join(random.choices(self.vocabulary, k=words))
+
+    def run(self, count, memberships, queries):
+        # Vocabulario sintético de unas 13 000 palabras
+        self.vocabulary = sorted({
+            ''.join(random.choices(SYLLABLES, k=random.randint(2, 4)))
+            for _ in range(30_000)
+        })
+        user = User.objects.create_user(
+            f'bench-{random.random()}@example.com', None,
+            first_name='Bench', last_name='Search'
+        )
+
+        start = time.perf_counter()
+        # bulk_create no reintenta colisiones de código: se generan únicos de antemano
+        codes = set(Project.objects.values_list('code', flat=True))
+        existing = len(codes)
+        while len(codes) < existing + count:
+            codes.add(generate_project_code())
+        codes = codes.difference(Project.objects.values_list('code', flat=True))
+        batch = []
+        for code in codes:
+            batch.append(Project(
+                code=code, title=self.text(4), description=self.text(40),
+                general_objectives=self.text(20), specific_objectives=self.text(20),
+                start_date=date(2025, 1, 1), end_date=date(2025, 12, 31), created_by=user
+            ))
+            if len(batch) == 5000:
+                Project.objects.bulk_create(batch)
+                batch = []
+        Project.objects.bulk_create(batch)
+
+        fts = SQLiteFTSBackend()
+        fts.rebuild()
+        project_ids = random.sample(list(Project.objects.values_list('id', flat=True)), memberships)
+        Membership.objects.bulk_create([
+            Membership(user=user, project_id=project_id) for project_id in project_ids
+        ])
+        self.stdout.write(
+            f'Proyectos indexados: {Project.objects.count()} '
+            f'(preparados en {time.perf_counter() - start:.1f} s)'
+        )
+
+        # Prefijos de 3 a 7 letras, como al escribir en el buscador
+        terms = [
+            random.choice(self.vocabulary)[:random.randint(3, 7)]
+            for _ in range(queries)
+        ]
+        scenarios = (
+            ('FTS5, todos', fts, None),
+            ('FTS5, del usuario', fts, project_ids),
+            ('LIKE, todos', LikeSearchBackend(), None),
+            ('LIKE, del usuario', LikeSearchBackend(), project_ids),
+        )
+
+        self.stdout.write(f'{"escenario":>20} {"total (s)":>10} {"por búsqueda (ms)":>18}')
+        for name, backend, ids in scenarios:
+            start = time.perf_counter()
+            for term in terms:
+                backend.search(term, project_ids=ids, limit=200)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{name:>20} {elapsed:>10.3f} {elapsed / queries * 1000:>18.3f}'
+            )
+
+        # Mantenimiento incremental: guardar un proyecto reindexa su fila
+        project = Project.objects.get(pk=project_ids[0])
+        start = time.perf_counter()
+        for _ in range(queries):
+            project.description = self.text(40)
+            project.save()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{"guardar y reindexar":>20} {elapsed:>10.3f} {elapsed / queries * 1000:>18.3f}'
+        )
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from projects.models import Activity
+
+
+class Command(BaseCommand):
+    """Compacta y recorta el registro de actividad de los proyectos.
+
+    Las ediciones de una misma tarea más antiguas que ``--compact-after``
+    días se fusionan en la más reciente (con la unión de los campos
+    cambiados) y las entradas más antiguas que ``--retention`` días se
+    eliminan. Ambos pasos borran por lotes de IDs.
+    """
+
+    help = 'Compacta las ediciones antiguas de tareas y elimina la actividad vencida'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention', type=int,
+            default=getattr(settings, 'ACTIVITY_RETENTION_DAYS', 180),
+            help='Días que se conserva la actividad'
+        )
+        parser.add_argument(
+            '--compact-after', type=int,
+            default=getattr(settings, 'ACTIVITY_COMPACT_AFTER_DAYS', 30),
+            help='Días tras los cuales se fusionan las ediciones de una tarea'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Filas por lote al borrar'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Solo reportar, sin modificar el registro'
+        )
+
+    def boundary(self, days):
+        """Primer ID con fecha dentro de los últimos ``days`` días.
+
+        Los IDs crecen con ``created_at``, así que la búsqueda recorre la
+        clave primaria solo hasta la primera entrada reciente.
+        """
+        cutoff = timezone.now() - timedelta(days=days)
+        first_recent = Activity.objects.filter(created_at__gte=cutoff).order_by('id').values_list(
+            'id', flat=True
+        ).first()
+        if first_recent is not None:
+            return first_recent
+        last = Activity.objects.order_by('-id').values_list('id', flat=True).first()
+        return (last or 0) + 1
+
+    def delete_ids(self, ids, batch_size):
+        for start in range(0, len(ids), batch_size):
+            with transaction.atomic():
+                Activity.objects.filter(id__in=ids[start:start + batch_size]).delete()
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        # Fusionar ediciones antiguas de la misma tarea en la más reciente
+        boundary = self.boundary(options['compact_after'])
+        updates = Activity.objects.filter(
+            verb=Activity.TASK_UPDATED, id__lt=boundary
+        ).order_by('id').values('id', 'project_id', 'payload')
+        latest = {}
+        merged = []
+        for entry in updates.iterator(chunk_size=batch_size):
+            key = (entry['project_id'], entry['payload'].get('task'))
+            fields = set(entry['payload'].get('fields', []))
+            previous = latest.get(key)
+            if previous is not None:
+                merged.append(previous['id'])
+                fields |= previous['fields']
+            latest[key] = {'id': entry['id'], 'payload': entry['payload'], 'fields': fields}
+
+        self.stdout.write(f'Ediciones de tareas fusionadas: {len(merged)}')
+
+        retention = self.boundary(options['retention'])
+        expired = Activity.objects.filter(id__lt=retention).count()
+        self.stdout.write(f'Entradas vencidas: {expired}')
+
+        if dry_run:
+            return
+
+        if merged:
+            kept = []
+            for entry in latest.values():
+                if sorted(entry['fields']) != entry['payload'].get('fields'):
+                    kept.append(Activity(
+                        id=entry['id'],
+                        payload={**entry['payload'], 'fields': sorted(entry['fields'])}
+                    ))
+            with transaction.atomic():
+                Activity.objects.bulk_update(kept, ['payload'], batch_size=batch_size)
+            self.delete_ids(merged, batch_size)
+
+        while True:
+            ids = list(Activity.objects.filter(id__lt=retention).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            self.delete_ids(ids, batch_size)
+
+        self.stdout.write(self.style.SUCCESS('Registro de actividad compactado.'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from projects.models import ProjectDeletion
+from projects.purge import purge_project
+
+
+class Command(BaseCommand):
+    """Retoma las purgas de proyectos que no terminaron."""
+
+    help = 'Purga los proyectos eliminados cuya purga quedó pendiente o falló'
+
+    def handle(self, *args, **options):
+        deletions = ProjectDeletion.objects.exclude(status='completed').order_by('created_at')
+        for deletion in deletions:
+            self.stdout.write(f'Purgando "{deletion.title}" (proyecto {deletion.project_id})...')
+            try:
+                deletion = purge_project(deletion.pk)
+            except Exception as exc:
+                self.stderr.write(self.style.ERROR(f'  Falló: {exc}'))
+                continue
+            self.stdout.write(
+                f'  Filas borradas: {deletion.deleted_rows}, archivos: {deletion.deleted_files}'
+            )
+        self.stdout.write(self.style.SUCCESS('Purga terminada.'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projects.search import get_backend
+
+
+class Command(BaseCommand):
+    """Reconstruye el índice de búsqueda de proyectos desde cero.
+
+    Necesario tras cargas con ``bulk_create`` o al cambiar de motor.
+    """
+
+    help = 'Reconstruye el índice de búsqueda de proyectos'
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        with transaction.atomic():
+            backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Índice reconstruido con {type(backend).__name__}.'
+        ))
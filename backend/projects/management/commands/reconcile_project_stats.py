@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from projects import stats
+from projects.models import Membership, ProjectStats
+
+
+class Command(BaseCommand):
+    """Recalcula ``ProjectStats`` en bloque e informa las diferencias."""
+
+    help = 'Recalcula las estadísticas de proyectos y reporta la deriva'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Solo reportar diferencias, sin guardar cambios'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Filas por lote al guardar'
+        )
+
+    def handle(self, *args, **options):
+        fields = stats.stat_fields()
+        expected = stats.compute()
+        current = {row.pk: row for row in ProjectStats.objects.all()}
+
+        missing = []
+        drifted = []
+        drift_by_field = {field: 0 for field in fields}
+        for project_id, values in expected.items():
+            row = current.get(project_id)
+            if row is None:
+                missing.append(ProjectStats(project_id=project_id, **values))
+                continue
+            changed = False
+            for field in fields:
+                if getattr(row, field) != values[field]:
+                    drift_by_field[field] += 1
+                    setattr(row, field, values[field])
+                    changed = True
+            if changed:
+                row.updated_at = timezone.now()
+                drifted.append(row)
+
+        load = stats.compute_member_load()
+        drifted_memberships = []
+        for membership in Membership.objects.only('id', 'project_id', 'user_id', 'open_tasks_count'):
+            count = load.get((membership.project_id, membership.user_id), 0)
+            if membership.open_tasks_count != count:
+                membership.open_tasks_count = count
+                drifted_memberships.append(membership)
+
+        self.stdout.write(f'Proyectos revisados: {len(expected)}')
+        self.stdout.write(f'Sin estadísticas: {len(missing)}')
+        self.stdout.write(f'Con deriva: {len(drifted)}')
+        for field, count in drift_by_field.items():
+            if count:
+                self.stdout.write(f'  {field}: {count}')
+        self.stdout.write(f'Membresías con carga incorrecta: {len(drifted_memberships)}')
+
+        if options['dry_run']:
+            return
+
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            ProjectStats.objects.bulk_create(missing, batch_size=batch_size)
+            ProjectStats.objects.bulk_update(
+                drifted, fields + ['updated_at'], batch_size=batch_size
+            )
+            Membership.objects.bulk_update(
+                drifted_memberships, ['open_tasks_count'], batch_size=batch_size
+            )
+        self.stdout.write(self.style.SUCCESS('Estadísticas reconciliadas.'))
@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def backfill_stats(apps, schema_editor):
+    """Calcula las estadísticas iniciales de los proyectos existentes."""
+    Project = apps.get_model('projects', 'Project')
+    Membership = apps.get_model('projects', 'Membership')
+    ProjectStats = apps.get_model('projects', 'ProjectStats')
+    Task = apps.get_model('tasks', 'Task')
+    Message = apps.get_model('chat', 'Message')
+    
+    stats = {pk: ProjectStats(project_id=pk) for pk in Project.objects.values_list('pk', flat=True)}
+    today = timezone.localdate()
+    
+    aggregates = {
+        'tasks_total': Count('id'),
+        'tasks_overdue': Count('id', filter=Q(deadline__lt=today) & ~Q(status='completed')),
+    }
+    for value in ('pending', 'in_progress', 'completed'):
+        aggregates[f'tasks_status_{value}'] = Count('id', filter=Q(status=value))
+    for value in ('low', 'medium', 'high', 'critical'):
+        aggregates[f'tasks_priority_{value}'] = Count('id', filter=Q(priority=value))
+    for row in Task.objects.values('project_id').annotate(**aggregates).order_by():
+        for field in aggregates:
+            setattr(stats[row['project_id']], field, row[field])
+    
+    for row in Membership.objects.values('project_id').annotate(n=Count('id')).order_by():
+        stats[row['project_id']].members_count = row['n']
+    
+    rows = Message.objects.filter(chat_room__project__isnull=False).values(
+        'chat_room__project_id'
+    ).annotate(n=Count('id')).order_by()
+    for row in rows:
+        stats[row['chat_room__project_id']].messages_count = row['n']
+    
+    ProjectStats.objects.bulk_create(stats.values(), batch_size=500)
+    
+    rows = Task.objects.exclude(status='completed').filter(
+        assigned_to__isnull=False
+    ).values('project_id', 'assigned_to_id').annotate(n=Count('id')).order_by()
+    for row in rows:
+        Membership.objects.filter(
+            project_id=row['project_id'],
+            user_id=row['assigned_to_id']
+        ).update(open_tasks_count=row['n'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_initial'),
+        ('tasks', '0002_initial'),
+        ('chat', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectStats',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='projects.project', verbose_name='proyecto')),
+                ('members_count', models.PositiveIntegerField(default=0, verbose_name='miembros')),
+                ('tasks_total', models.PositiveIntegerField(default=0, verbose_name='tareas')),
+                ('tasks_status_pending', models.PositiveIntegerField(default=0, verbose_name='tareas pendientes')),
+                ('tasks_status_in_progress', models.PositiveIntegerField(default=0, verbose_name='tareas en progreso')),
+                ('tasks_status_completed', models.PositiveIntegerField(default=0, verbose_name='tareas completadas')),
+                ('tasks_priority_low', models.PositiveIntegerField(default=0, verbose_name='tareas de prioridad baja')),
+                ('tasks_priority_medium', models.PositiveIntegerField(default=0, verbose_name='tareas de prioridad media')),
+                ('tasks_priority_high', models.PositiveIntegerField(default=0, verbose_name='tareas de prioridad alta')),
+                ('tasks_priority_critical', models.PositiveIntegerField(default=0, verbose_name='tareas de prioridad crítica')),
+                ('tasks_overdue', models.PositiveIntegerField(default=0, verbose_name='tareas vencidas')),
+                ('messages_count', models.PositiveIntegerField(default=0, verbose_name='mensajes')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='fecha de actualización')),
+            ],
+            options={
+                'verbose_name': 'estadísticas de proyecto',
+                'verbose_name_plural': 'estadísticas de proyectos',
+            },
+        ),
+        migrations.AddField(
+            model_name='membership',
+            name='open_tasks_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='tareas abiertas'),
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
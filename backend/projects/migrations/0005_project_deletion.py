@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_membership_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='fecha de eliminación'),
+        ),
+        migrations.CreateModel(
+            name='ProjectDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project_id', models.PositiveBigIntegerField(db_index=True, verbose_name='proyecto')),
+                ('title', models.CharField(max_length=255, verbose_name='título')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En curso'), ('completed', 'Completado'), ('failed', 'Fallido')], default='pending', max_length=10, verbose_name='estado')),
+                ('total_rows', models.PositiveIntegerField(default=0, verbose_name='filas a borrar')),
+                ('deleted_rows', models.PositiveIntegerField(default=0, verbose_name='filas borradas')),
+                ('deleted_files', models.PositiveIntegerField(default=0, verbose_name='archivos borrados')),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='fecha de actualización')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='fecha de término')),
+                ('requested_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='project_deletions', to=settings.AUTH_USER_MODEL, verbose_name='solicitado por')),
+            ],
+            options={
+                'verbose_name': 'eliminación de proyecto',
+                'verbose_name_plural': 'eliminaciones de proyectos',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
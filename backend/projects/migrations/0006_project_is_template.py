@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_project_deletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='is_template',
+            field=models.BooleanField(default=False, verbose_name='es plantilla'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_project_is_template'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Activity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('verb', models.PositiveSmallIntegerField(choices=[(1, 'Tarea creada'), (2, 'Tarea actualizada'), (3, 'Estado de tarea cambiado'), (4, 'Tarea eliminada'), (10, 'Miembros agregados'), (11, 'Miembros removidos'), (12, 'Liderazgo transferido'), (20, 'Documento subido'), (21, 'Documento eliminado'), (30, 'Sala de chat creada')], verbose_name='verbo')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='datos')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='fecha')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='autor')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activities', to='projects.project', verbose_name='proyecto')),
+            ],
+            options={
+                'verbose_name': 'actividad',
+                'verbose_name_plural': 'actividades',
+                'indexes': [models.Index(fields=['project', 'id'], name='activity_project_id_idx')],
+            },
+        ),
+    ]
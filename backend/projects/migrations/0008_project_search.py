@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+# Tabla FTS5 de projects.search.SQLiteFTSBackend; en otras bases de datos
+# no se crea y se usa LikeSearchBackend
+FIELDS = 'title, description, general_objectives, specific_objectives'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS projects_project_fts USING fts5('
+        f'{FIELDS}, '
+        "tokenize = 'unicode61 remove_diacritics 2', "
+        "prefix = '2 3')"
+    )
+    schema_editor.execute(
+        f'INSERT INTO projects_project_fts (rowid, {FIELDS}) '
+        f'SELECT id, {FIELDS} FROM projects_project'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS projects_project_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_activity'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
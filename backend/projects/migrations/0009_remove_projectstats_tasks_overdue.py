@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:39
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_project_search'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='projectstats',
+            name='tasks_overdue',
+        ),
+    ]
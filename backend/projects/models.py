@@ -1,8 +1,13 @@
 import random
 import string
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.conf import settings
 
+from .signals import memberships_changed
+
+# Intentos de inserción antes de desistir por colisiones del código
+CODE_MAX_ATTEMPTS = 10
+
 
 def generate_project_code():
     """Genera un código único de 6 caracteres para el proyecto."""
@@ -43,8 +48,12 @@ class Project(models.Model):
         related_name='created_projects',
         verbose_name='creado por'
     )
+    # Las plantillas se reutilizan cada período con la acción de clonar (ver projects.cloning)
+    is_template = models.BooleanField('es plantilla', default=False)
     created_at = models.DateTimeField('fecha de creación', auto_now_add=True)
     updated_at = models.DateTimeField('fecha de actualización', auto_now=True)
+    # Marca de borrado: el proyecto se purga después en segundo plano (ver projects.purge)
+    deleted_at = models.DateTimeField('fecha de eliminación', null=True, blank=True)
     
     class Meta:
         verbose_name = 'proyecto'
@@ -55,10 +64,24 @@ class Project(models.Model):
         return self.title
     
     def save(self, *args, **kwargs):
-        # Asegurar código único
-        while not self.code or Project.objects.filter(code=self.code).exclude(pk=self.pk).exists():
-            self.code = generate_project_code()
-        super().save(*args, **kwargs)
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        
+        # Asegurar código único: el índice único detecta la colisión y se
+        # reintenta con otro código dentro de un savepoint
+        for attempt in range(CODE_MAX_ATTEMPTS):
+            if not self.code:
+                self.code = generate_project_code()
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if not Project.objects.filter(code=self.code).exists():
+                    raise
+                self.code = generate_project_code()
+        raise IntegrityError(
+            f'No se pudo asignar un código único tras {CODE_MAX_ATTEMPTS} intentos.'
+        )
 
 
 class Membership(models.Model):
@@ -87,12 +110,196 @@ class Membership(models.Model):
         choices=ROLE_CHOICES,
         default='member'
     )
+    # Tareas abiertas asignadas al usuario en el proyecto (ver projects.stats)
+    open_tasks_count = models.PositiveIntegerField('tareas abiertas', default=0)
     joined_at = models.DateTimeField('fecha de unión', auto_now_add=True)
     
     class Meta:
         verbose_name = 'membresía'
         verbose_name_plural = 'membresías'
         unique_together = ['user', 'project']
+        indexes = [
+            # Miembros de un proyecto por rol (p. ej. buscar al líder)
+            models.Index(fields=['project', 'role'], name='membership_project_role_idx'),
+        ]
     
     def __str__(self):
         return f'{self.user.email} - {self.project.title} ({self.get_role_display()})'
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'user', 'project', 'role'} & set(update_fields):
+            Membership.notify_changed(self.project_id, [self.user_id])
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        Membership.notify_changed(self.project_id, [self.user_id])
+        return result
+    
+    @classmethod
+    def notify_changed(cls, project_id, user_ids):
+        """Envía ``memberships_changed`` al confirmar la transacción.
+        
+        Las operaciones masivas (``bulk_create``, borrados por queryset) no
+        pasan por ``save``/``delete`` y lo llaman una sola vez con todos los
+        usuarios afectados.
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        transaction.on_commit(lambda: memberships_changed.send(
+            sender=cls, project_id=project_id, user_ids=user_ids
+        ))
+
+
+class ProjectStats(models.Model):
+    """Estadísticas de un proyecto mantenidas de forma incremental.
+    
+    Se actualizan desde ``projects.stats`` en la misma transacción que los
+    cambios de tareas, membresías y mensajes. Las tareas vencidas dependen
+    de la fecha actual y se cuentan al leer (``stats.overdue_counts``).
+    """
+    
+    project = models.OneToOneField(
+        Project,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='proyecto'
+    )
+    members_count = models.PositiveIntegerField('miembros', default=0)
+    tasks_total = models.PositiveIntegerField('tareas', default=0)
+    tasks_status_pending = models.PositiveIntegerField('tareas pendientes', default=0)
+    tasks_status_in_progress = models.PositiveIntegerField('tareas en progreso', default=0)
+    tasks_status_completed = models.PositiveIntegerField('tareas completadas', default=0)
+    tasks_priority_low = models.PositiveIntegerField('tareas de prioridad baja', default=0)
+    tasks_priority_medium = models.PositiveIntegerField('tareas de prioridad media', default=0)
+    tasks_priority_high = models.PositiveIntegerField('tareas de prioridad alta', default=0)
+    tasks_priority_critical = models.PositiveIntegerField('tareas de prioridad crítica', default=0)
+    messages_count = models.PositiveIntegerField('mensajes', default=0)
+    updated_at = models.DateTimeField('fecha de actualización', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'estadísticas de proyecto'
+        verbose_name_plural = 'estadísticas de proyectos'
+    
+    def __str__(self):
+        return f'Estadísticas de {self.project_id}'
+
+
+class ProjectDeletion(models.Model):
+    """Avance del borrado en segundo plano de un proyecto.
+    
+    Guarda el ID del proyecto como entero y no como llave foránea porque
+    el registro sobrevive al proyecto purgado (ver ``projects.purge``).
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('running', 'En curso'),
+        ('completed', 'Completado'),
+        ('failed', 'Fallido'),
+    ]
+    
+    project_id = models.PositiveBigIntegerField('proyecto', db_index=True)
+    title = models.CharField('título', max_length=255)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='project_deletions',
+        verbose_name='solicitado por'
+    )
+    status = models.CharField(
+        'estado',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+    total_rows = models.PositiveIntegerField('filas a borrar', default=0)
+    deleted_rows = models.PositiveIntegerField('filas borradas', default=0)
+    deleted_files = models.PositiveIntegerField('archivos borrados', default=0)
+    error = models.TextField('error', blank=True)
+    created_at = models.DateTimeField('fecha de creación', auto_now_add=True)
+    updated_at = models.DateTimeField('fecha de actualización', auto_now=True)
+    finished_at = models.DateTimeField('fecha de término', null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'eliminación de proyecto'
+        verbose_name_plural = 'eliminaciones de proyectos'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f'Eliminación de {self.title} ({self.get_status_display()})'
+    
+    @property
+    def progress(self):
+        """Porcentaje de filas borradas."""
+        if self.status == 'completed':
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(99, self.deleted_rows * 100 // self.total_rows)
+
+
+class Activity(models.Model):
+    """Registro de solo anexado con lo que cambió en un proyecto.
+    
+    Cada entrada guarda un código de verbo entero y un ``payload`` JSON con
+    los datos mínimos del evento (ver ``projects.activity``). Los IDs son
+    crecientes, así que sirven de cursor para sincronizar.
+    """
+    
+    TASK_CREATED = 1
+    TASK_UPDATED = 2
+    TASK_STATUS_CHANGED = 3
+    TASK_DELETED = 4
+    MEMBERS_ADDED = 10
+    MEMBERS_REMOVED = 11
+    LEADER_CHANGED = 12
+    DOCUMENT_UPLOADED = 20
+    DOCUMENT_DELETED = 21
+    CHAT_ROOM_CREATED = 30
+    
+    VERB_CHOICES = [
+        (TASK_CREATED, 'Tarea creada'),
+        (TASK_UPDATED, 'Tarea actualizada'),
+        (TASK_STATUS_CHANGED, 'Estado de tarea cambiado'),
+        (TASK_DELETED, 'Tarea eliminada'),
+        (MEMBERS_ADDED, 'Miembros agregados'),
+        (MEMBERS_REMOVED, 'Miembros removidos'),
+        (LEADER_CHANGED, 'Liderazgo transferido'),
+        (DOCUMENT_UPLOADED, 'Documento subido'),
+        (DOCUMENT_DELETED, 'Documento eliminado'),
+        (CHAT_ROOM_CREATED, 'Sala de chat creada'),
+    ]
+    
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='activities',
+        verbose_name='proyecto'
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='autor'
+    )
+    verb = models.PositiveSmallIntegerField('verbo', choices=VERB_CHOICES)
+    payload = models.JSONField('datos', default=dict, blank=True)
+    created_at = models.DateTimeField('fecha', auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'actividad'
+        verbose_name_plural = 'actividades'
+        indexes = [
+            # Lectura por cursor: entradas de un proyecto en orden de ID
+            models.Index(fields=['project', 'id'], name='activity_project_id_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.get_verb_display()} ({self.project_id})'
@@ -0,0 +1,136 @@
+"""Resolución de membresías y permisos por proyecto.
+
+``MembershipResolver`` carga una sola vez los roles del usuario en todos sus
+proyectos; las vistas lo obtienen con ``get_membership_resolver(request)``
+(uno por petición) y los consumers de WebSocket lo crean para su usuario.
+
+Opcionalmente los roles se guardan en la caché de Django durante
+``MEMBERSHIP_CACHE_TIMEOUT`` segundos. La caché se invalida con la señal
+``memberships_changed`` (ver ``projects.signals``); con varios procesos
+debe usarse un backend de caché compartido.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import receiver
+from rest_framework.permissions import BasePermission
+
+from .models import Project, Membership
+from .signals import memberships_changed
+
+
+CACHE_TIMEOUT = getattr(settings, 'MEMBERSHIP_CACHE_TIMEOUT', 0)
+
+
+def _cache_key(user_id):
+    return f'project_memberships:{user_id}'
+
+
+def invalidate_memberships(*user_ids):
+    """Descarta los roles en caché de los usuarios indicados."""
+    if CACHE_TIMEOUT:
+        cache.delete_many([_cache_key(user_id) for user_id in user_ids])
+
+
+@receiver(memberships_changed)
+def memberships_changed_handler(sender, project_id, user_ids, **kwargs):
+    invalidate_memberships(*user_ids)
+
+
+class MembershipResolver:
+    """Roles del usuario por proyecto, cargados en una sola consulta."""
+
+    def __init__(self, user):
+        self.user = user
+        self._roles = None
+
+    @property
+    def roles(self):
+        """Diccionario ``{project_id: role}``."""
+        if self._roles is None:
+            self._roles = self._load()
+        return self._roles
+
+    def _load(self):
+        if not self.user or not self.user.is_authenticated:
+            return {}
+        if CACHE_TIMEOUT:
+            roles = cache.get(_cache_key(self.user.id))
+            if roles is not None:
+                return roles
+        roles = dict(
+            Membership.objects.filter(user=self.user).values_list('project_id', 'role')
+        )
+        if CACHE_TIMEOUT:
+            cache.set(_cache_key(self.user.id), roles, CACHE_TIMEOUT)
+        return roles
+
+    def reset(self):
+        """Olvida los roles cargados (tras cambiar membresías en la petición)."""
+        self._roles = None
+
+    def role(self, project_id):
+        try:
+            return self.roles.get(int(project_id))
+        except (TypeError, ValueError):
+            return None
+
+    def is_member(self, project_id):
+        return self.role(project_id) is not None
+
+    def is_leader(self, project_id):
+        return self.role(project_id) == 'leader'
+
+    def project_ids(self):
+        return list(self.roles)
+
+
+def get_membership_resolver(request):
+    """Resolver compartido por toda la petición."""
+    resolver = getattr(request, '_membership_resolver', None)
+    if resolver is None or resolver.user != request.user:
+        resolver = MembershipResolver(request.user)
+        request._membership_resolver = resolver
+    return resolver
+
+
+def project_id_of(obj):
+    """Id del proyecto de un objeto (proyecto, tarea, documento, sala...)."""
+    if isinstance(obj, Project):
+        return obj.pk
+    if hasattr(obj, 'project_id'):
+        return obj.project_id
+    if hasattr(obj, 'task'):
+        return obj.task.project_id
+    return None
+
+
+class IsProjectMember(BasePermission):
+    """El usuario es miembro del proyecto de la URL o del objeto.
+
+    La vista puede indicar el argumento de la URL con ``project_url_kwarg``.
+    """
+
+    message = 'No tienes acceso a este proyecto.'
+    project_url_kwarg = 'project_id'
+
+    def check_role(self, role):
+        return role is not None
+
+    def has_permission(self, request, view):
+        kwarg = getattr(view, 'project_url_kwarg', self.project_url_kwarg)
+        project_id = view.kwargs.get(kwarg)
+        if project_id is None:
+            return True
+        return self.check_role(get_membership_resolver(request).role(project_id))
+
+    def has_object_permission(self, request, view, obj):
+        return self.check_role(get_membership_resolver(request).role(project_id_of(obj)))
+
+
+class IsProjectLeader(IsProjectMember):
+    """El usuario es líder del proyecto de la URL o del objeto."""
+
+    message = 'Solo el líder puede realizar esta acción.'
+
+    def check_role(self, role):
+        return role == 'leader'
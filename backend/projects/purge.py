@@ -0,0 +1,192 @@
+"""Eliminación de proyectos en segundo plano.
+
+``soft_delete`` solo marca el proyecto con ``deleted_at``, quita las
+membresías (el proyecto deja de ser visible de inmediato) y registra un
+``ProjectDeletion``. Después ``purge_project`` borra las filas dependientes
+en lotes de ``CHUNK_SIZE`` desde el hilo de ``_executor``: cada lote va en
+su propia transacción, así el bloqueo de escritura de SQLite se libera
+entre lotes, y los archivos de mensajes y documentos se eliminan del
+almacenamiento una vez confirmado el lote.
+
+Si el proceso se detiene a mitad de un borrado, ``purge_deleted_projects``
+retoma los registros que no terminaron.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from chat.history import invalidate_room
+from chat.models import ChatRoom, ChatReadState, Message, MessageRead
+from tasks.models import DocumentUpload, Task, TaskDocument, TaskReminder
+from tasks.uploads import document_storage
+from .models import Project, Membership, ProjectStats, ProjectDeletion, Activity
+
+logger = logging.getLogger(__name__)
+
+
+CHUNK_SIZE = getattr(settings, 'PROJECT_PURGE_CHUNK_SIZE', 500)
+PAUSE = getattr(settings, 'PROJECT_PURGE_PAUSE', 0.05)
+
+# Un solo hilo: las purgas compiten por el mismo bloqueo de escritura
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='project-purge')
+
+
+def purge_steps(project_id):
+    """Consultas a borrar en orden, de las hojas hacia el proyecto.
+
+    Cada paso es ``(queryset, campo de archivo o None)``; el campo también
+    puede ser una propiedad del modelo con el nombre del archivo, como
+    ``DocumentUpload.partial_name``. Al borrar primero las filas
+    dependientes, el colector de Django no encuentra nada en cascada y cada
+    lote es un DELETE acotado.
+    """
+    rooms = ChatRoom.objects.filter(project_id=project_id).values('id')
+    return [
+        (MessageRead.objects.filter(message__chat_room__in=rooms), None),
+        (ChatReadState.objects.filter(chat_room__in=rooms), None),
+        (Message.objects.filter(chat_room__in=rooms), 'file'),
+        (ChatRoom.participants.through.objects.filter(chatroom__in=rooms), None),
+        (ChatRoom.objects.filter(project_id=project_id), None),
+        (TaskReminder.objects.filter(task__project_id=project_id), None),
+        (DocumentUpload.objects.filter(task__project_id=project_id), 'partial_name'),
+        (TaskDocument.objects.filter(task__project_id=project_id), 'file'),
+        (Task.objects.filter(project_id=project_id), None),
+        (Membership.objects.filter(project_id=project_id), None),
+        (ProjectStats.objects.filter(project_id=project_id), None),
+        (Activity.objects.filter(project_id=project_id), None),
+        (Project.objects.filter(pk=project_id), None),
+    ]
+
+
+def soft_delete(project, user):
+    """Oculta el proyecto y programa su purga al confirmar la transacción."""
+    with transaction.atomic():
+        user_ids = list(project.memberships.values_list('user_id', flat=True))
+        project.deleted_at = timezone.now()
+        project.save(update_fields=['deleted_at'])
+        project.memberships.all().delete()
+        Membership.notify_changed(project.id, user_ids)
+
+        deletion = ProjectDeletion.objects.create(
+            project_id=project.id,
+            title=project.title,
+            requested_by=user
+        )
+        transaction.on_commit(lambda: schedule_purge(deletion.id))
+    return deletion
+
+
+def schedule_purge(deletion_id):
+    """Envía la purga al hilo de fondo."""
+    return _executor.submit(_run, deletion_id)
+
+
+def _run(deletion_id):
+    try:
+        purge_project(deletion_id)
+    except Exception:
+        logger.exception('Falló la purga del proyecto (eliminación %s)', deletion_id)
+    finally:
+        close_old_connections()
+
+
+def _delete_chunk(queryset, file_field):
+    """Borra hasta ``CHUNK_SIZE`` filas; retorna ``(filas, archivos)``."""
+    model = queryset.model
+    if file_field in _field_names(model):
+        rows = list(queryset.values_list('pk', file_field)[:CHUNK_SIZE])
+    elif file_field:
+        rows = [(obj.pk, getattr(obj, file_field)) for obj in queryset.only('pk')[:CHUNK_SIZE]]
+    else:
+        rows = [(pk, None) for pk in queryset.values_list('pk', flat=True)[:CHUNK_SIZE]]
+    if not rows:
+        return 0, []
+
+    with transaction.atomic():
+        model.objects.filter(pk__in=[pk for pk, _ in rows]).delete()
+    return len(rows), [name for _, name in rows if name]
+
+
+def _field_names(model):
+    return {field.name for field in model._meta.concrete_fields}
+
+
+def _file_storage(model, file_field):
+    if not file_field:
+        return None
+    if file_field not in _field_names(model):
+        # Archivos parciales de subidas: viven junto a los documentos
+        return document_storage()
+    return model._meta.get_field(file_field).storage
+
+
+def _delete_files(storage, names):
+    deleted = 0
+    for name in names:
+        try:
+            storage.delete(name)
+            deleted += 1
+        except OSError:
+            logger.warning('No se pudo borrar el archivo %s', name)
+    return deleted
+
+
+def purge_project(deletion_id):
+    """Borra por lotes todo lo que pertenece al proyecto del registro.
+
+    Es idempotente: al reanudar un borrado interrumpido solo quedan las
+    filas que faltaban. El avance se guarda en el ``ProjectDeletion``
+    después de cada lote.
+    """
+    deletion = ProjectDeletion.objects.get(pk=deletion_id)
+    if deletion.status == 'completed':
+        return deletion
+
+    # El historial en memoria de estas salas ya no debe servirse
+    invalidate_room(*ChatRoom.objects.filter(project_id=deletion.project_id).values_list('id', flat=True))
+
+    steps = purge_steps(deletion.project_id)
+    remaining = sum(queryset.count() for queryset, _ in steps)
+    ProjectDeletion.objects.filter(pk=deletion.pk).update(
+        status='running',
+        total_rows=F('deleted_rows') + remaining,
+        error='',
+        updated_at=timezone.now()
+    )
+
+    try:
+        for queryset, file_field in steps:
+            storage = _file_storage(queryset.model, file_field)
+            while True:
+                rows, names = _delete_chunk(queryset, file_field)
+                if not rows:
+                    break
+                files = _delete_files(storage, names) if names else 0
+                ProjectDeletion.objects.filter(pk=deletion.pk).update(
+                    deleted_rows=F('deleted_rows') + rows,
+                    deleted_files=F('deleted_files') + files,
+                    updated_at=timezone.now()
+                )
+                if PAUSE:
+                    time.sleep(PAUSE)
+    except Exception as exc:
+        ProjectDeletion.objects.filter(pk=deletion.pk).update(
+            status='failed',
+            error=str(exc),
+            updated_at=timezone.now()
+        )
+        raise
+
+    now = timezone.now()
+    ProjectDeletion.objects.filter(pk=deletion.pk).update(
+        status='completed',
+        finished_at=now,
+        updated_at=now
+    )
+    deletion.refresh_from_db()
+    return deletion
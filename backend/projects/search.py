@@ -0,0 +1,174 @@
+"""Búsqueda de texto completo sobre proyectos.
+
+El motor se elige con ``PROJECT_SEARCH_BACKEND``. ``SQLiteFTSBackend``
+mantiene la tabla virtual FTS5 ``projects_project_fts`` (creada por la
+migración ``0008_project_search``) con título, descripción y objetivos;
+ordena por ``bm25`` dando más peso al título y admite prefijos para la
+búsqueda mientras se escribe. ``LikeSearchBackend`` sirve para bases de
+datos sin FTS5.
+
+El índice se actualiza en la misma transacción que cada ``Project.save``
+o ``delete`` (ver ``project_saved`` y ``project_deleted``); las cargas con
+``bulk_create`` deben reconstruirlo con ``rebuild_project_search``.
+"""
+import json
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Project
+
+
+# Campos indexados, en el orden de las columnas de la tabla FTS
+SEARCH_FIELDS = ['title', 'description', 'general_objectives', 'specific_objectives']
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(query):
+    """Palabras de la consulta, sin la sintaxis de FTS5."""
+    return TOKEN_RE.findall(query.lower())
+
+
+class SearchBackend:
+    """Interfaz de los motores de búsqueda de proyectos."""
+
+    def index(self, project):
+        raise NotImplementedError
+
+    def remove(self, project_id):
+        raise NotImplementedError
+
+    def rebuild(self):
+        raise NotImplementedError
+
+    def search(self, query, project_ids=None, limit=None):
+        """IDs de los proyectos que coinciden, del más al menos relevante.
+
+        Con ``project_ids`` se restringe a esos proyectos. Cada palabra de
+        la consulta se toma como prefijo.
+        """
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """Búsqueda con la tabla FTS5 ``projects_project_fts``."""
+
+    table = 'projects_project_fts'
+    # Pesos de bm25 por columna, en el orden de SEARCH_FIELDS
+    weights = (10.0, 2.0, 1.0, 1.0)
+
+    def index(self, project):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [project.pk])
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, {", ".join(SEARCH_FIELDS)}) '
+                f'VALUES (%s, {", ".join(["%s"] * len(SEARCH_FIELDS))})',
+                [project.pk] + [getattr(project, field) for field in SEARCH_FIELDS]
+            )
+
+    def remove(self, project_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [project_id])
+
+    def rebuild(self):
+        columns = ', '.join(SEARCH_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, {columns}) '
+                f'SELECT id, {columns} FROM {Project._meta.db_table}'
+            )
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+
+    def match_expression(self, query):
+        # Cada palabra entre comillas y con * para buscarla como prefijo
+        return ' '.join(f'"{token}"*' for token in tokenize(query))
+
+    def search(self, query, project_ids=None, limit=None):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+
+        sql = f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s'
+        params = [expression]
+        if project_ids is not None:
+            # json_each evita el límite de parámetros con muchos proyectos. El
+            # ``+`` impide que FTS5 use el rowid como índice: evaluaría la
+            # consulta completa una vez por cada proyecto de la lista
+            sql += ' AND +rowid IN (SELECT value FROM json_each(%s))'
+            params.append(json.dumps(list(project_ids)))
+        sql += f' ORDER BY bm25({self.table}, {", ".join(map(str, self.weights))})'
+        if limit is not None:
+            sql += ' LIMIT %s'
+            params.append(limit)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+class LikeSearchBackend(SearchBackend):
+    """Búsqueda con ``icontains`` para bases de datos sin FTS5.
+
+    No mantiene índice propio; primero aparecen las coincidencias en el título.
+    """
+
+    def index(self, project):
+        pass
+
+    def remove(self, project_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, query, project_ids=None, limit=None):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        projects = Project.objects.all()
+        if project_ids is not None:
+            projects = projects.filter(id__in=project_ids)
+        title_hits = Q()
+        for token in tokens:
+            any_field = Q()
+            for field in SEARCH_FIELDS:
+                any_field |= Q(**{f'{field}__icontains': token})
+            projects = projects.filter(any_field)
+            title_hits &= Q(title__icontains=token)
+
+        ids = list(projects.order_by('-created_at').values_list('id', flat=True))
+        in_title = set(projects.filter(title_hits).values_list('id', flat=True))
+        ids.sort(key=lambda project_id: project_id not in in_title)
+        return ids[:limit] if limit is not None else ids
+
+
+_backend = None
+
+
+def get_backend():
+    """Instancia del motor configurado en ``PROJECT_SEARCH_BACKEND``."""
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'PROJECT_SEARCH_BACKEND', 'projects.search.SQLiteFTSBackend')
+        _backend = import_string(path)()
+    return _backend
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, update_fields=None, **kwargs):
+    # Guardados que no tocan campos indexados (p. ej. ``deleted_at``) no reindexan
+    if update_fields is None or set(SEARCH_FIELDS) & set(update_fields):
+        get_backend().index(instance)
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    get_backend().remove(instance.pk)
@@ -1,9 +1,27 @@
+import csv
+import io
+import re
+
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from .models import Project, Membership
+from django.db.models import Count, Q
+from .models import Project, Membership, ProjectStats, ProjectDeletion, Activity
+from tasks.models import Task
 
 User = get_user_model()
 
+# Filas por operación masiva de miembros
+BULK_MEMBERS_MAX_ROWS = getattr(settings, 'BULK_MEMBERS_MAX_ROWS', 500)
+
+
+def get_project_stats(project):
+    """Estadísticas materializadas del proyecto o ``None`` si aún no existen."""
+    try:
+        return project.stats
+    except ProjectStats.DoesNotExist:
+        return None
+
 
 class MembershipSerializer(serializers.ModelSerializer):
     """Serializer para membresías."""
@@ -14,8 +32,11 @@ class MembershipSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Membership
-        fields = ['id', 'user', 'user_email', 'user_name', 'role', 'role_display', 'joined_at']
-        read_only_fields = ['id', 'joined_at']
+        fields = [
+            'id', 'user', 'user_email', 'user_name', 'role', 'role_display',
+            'open_tasks_count', 'joined_at'
+        ]
+        read_only_fields = ['id', 'open_tasks_count', 'joined_at']
 
 
 class ProjectListSerializer(serializers.ModelSerializer):
@@ -30,15 +51,23 @@ class ProjectListSerializer(serializers.ModelSerializer):
         model = Project
         fields = [
             'id', 'title', 'description', 'priority', 'priority_display',
-            'start_date', 'end_date', 'code', 'created_by', 'created_by_name',
+            'start_date', 'end_date', 'code', 'is_template', 'created_by', 'created_by_name',
             'members_count', 'user_role', 'created_at'
         ]
         read_only_fields = ['id', 'code', 'created_by', 'created_at']
     
     def get_members_count(self, obj):
+        # Valor anotado por ProjectListCreateView.get_queryset
+        if hasattr(obj, 'members_count'):
+            return obj.members_count
+        project_stats = get_project_stats(obj)
+        if project_stats is not None:
+            return project_stats.members_count
         return obj.memberships.count()
     
     def get_user_role(self, obj):
+        if hasattr(obj, 'user_role'):
+            return dict(Membership.ROLE_CHOICES).get(obj.user_role)
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             membership = obj.memberships.filter(user=request.user).first()
@@ -55,22 +84,52 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
     members = MembershipSerializer(source='memberships', many=True, read_only=True)
     tasks_count = serializers.SerializerMethodField()
     completed_tasks_count = serializers.SerializerMethodField()
+    tasks_by_status = serializers.SerializerMethodField()
+    tasks_by_priority = serializers.SerializerMethodField()
     
     class Meta:
         model = Project
         fields = [
             'id', 'title', 'description', 'general_objectives', 'specific_objectives',
-            'priority', 'priority_display', 'start_date', 'end_date', 'code',
+            'priority', 'priority_display', 'start_date', 'end_date', 'code', 'is_template',
             'created_by', 'created_by_name', 'members', 'tasks_count',
-            'completed_tasks_count', 'created_at', 'updated_at'
+            'completed_tasks_count', 'tasks_by_status', 'tasks_by_priority',
+            'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'code', 'created_by', 'created_at', 'updated_at']
     
+    def get_task_counts(self, obj):
+        """Conteos de tareas desde ``ProjectStats``.
+        
+        Si el proyecto aún no tiene estadísticas se calculan con una sola
+        agregación condicional.
+        """
+        project_stats = get_project_stats(obj)
+        if project_stats is not None:
+            return project_stats
+        if not hasattr(obj, 'tasks_total'):
+            aggregates = {'tasks_total': Count('id')}
+            for value, _ in Task.STATUS_CHOICES:
+                aggregates[f'tasks_status_{value}'] = Count('id', filter=Q(status=value))
+            for value, _ in Task.PRIORITY_CHOICES:
+                aggregates[f'tasks_priority_{value}'] = Count('id', filter=Q(priority=value))
+            for name, value in obj.tasks.aggregate(**aggregates).items():
+                setattr(obj, name, value)
+        return obj
+    
     def get_tasks_count(self, obj):
-        return obj.tasks.count()
+        return self.get_task_counts(obj).tasks_total
     
     def get_completed_tasks_count(self, obj):
-        return obj.tasks.filter(status='completed').count()
+        return self.get_task_counts(obj).tasks_status_completed
+    
+    def get_tasks_by_status(self, obj):
+        counts = self.get_task_counts(obj)
+        return {value: getattr(counts, f'tasks_status_{value}') for value, _ in Task.STATUS_CHOICES}
+    
+    def get_tasks_by_priority(self, obj):
+        counts = self.get_task_counts(obj)
+        return {value: getattr(counts, f'tasks_priority_{value}') for value, _ in Task.PRIORITY_CHOICES}
 
 
 class ProjectCreateUpdateSerializer(serializers.ModelSerializer):
@@ -80,7 +139,7 @@ class ProjectCreateUpdateSerializer(serializers.ModelSerializer):
         model = Project
         fields = [
             'title', 'description', 'general_objectives', 'specific_objectives',
-            'priority', 'start_date', 'end_date'
+            'priority', 'start_date', 'end_date', 'is_template'
         ]
     
     def validate(self, attrs):
@@ -94,6 +153,24 @@ class ProjectCreateUpdateSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class CloneProjectSerializer(serializers.Serializer):
+    """Serializer para clonar un proyecto o plantilla."""
+    
+    title = serializers.CharField(max_length=255, required=False)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField(required=False)
+    include_members = serializers.BooleanField(default=False)
+    is_template = serializers.BooleanField(default=False)
+    
+    def validate(self, attrs):
+        end_date = attrs.get('end_date')
+        if end_date and attrs['start_date'] > end_date:
+            raise serializers.ValidationError({
+                'end_date': 'La fecha de fin debe ser posterior a la fecha de inicio.'
+            })
+        return attrs
+
+
 class JoinProjectSerializer(serializers.Serializer):
     """Serializer para unirse a un proyecto mediante código."""
     
@@ -101,6 +178,90 @@ class JoinProjectSerializer(serializers.Serializer):
     
     def validate_code(self, value):
         value = value.upper()
-        if not Project.objects.filter(code=value).exists():
+        if not Project.objects.filter(code=value, deleted_at__isnull=True).exists():
             raise serializers.ValidationError('No existe un proyecto con este código.')
         return value
+
+
+class BulkAddMembersSerializer(serializers.Serializer):
+    """Serializer para agregar miembros en bloque.
+    
+    Acepta ``emails`` (lista o texto separado por comas, punto y coma o
+    saltos de línea) o un archivo CSV en ``file`` con una columna ``email``
+    (o los correos en la primera columna si no hay encabezado).
+    """
+    
+    emails = serializers.JSONField(required=False)
+    file = serializers.FileField(required=False)
+    
+    def validate_emails(self, value):
+        if isinstance(value, str):
+            value = re.split(r'[,;\s]+', value)
+        if not isinstance(value, list):
+            raise serializers.ValidationError('Debe ser una lista de correos.')
+        return [str(email).strip() for email in value if str(email).strip()]
+    
+    def validate_file(self, value):
+        try:
+            text = value.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise serializers.ValidationError('El archivo debe estar en UTF-8.')
+        rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+        column = 0
+        if rows:
+            header = [cell.strip().lower() for cell in rows[0]]
+            for name in ('email', 'correo', 'correo electrónico'):
+                if name in header:
+                    column = header.index(name)
+                    rows = rows[1:]
+                    break
+        return [row[column].strip() for row in rows if len(row) > column and row[column].strip()]
+    
+    def validate(self, attrs):
+        emails = attrs.get('emails', []) + attrs.get('file', [])
+        if not emails:
+            raise serializers.ValidationError('Debes enviar una lista de correos o un archivo CSV.')
+        if len(emails) > BULK_MEMBERS_MAX_ROWS:
+            raise serializers.ValidationError(
+                f'Máximo {BULK_MEMBERS_MAX_ROWS} correos por operación.'
+            )
+        return {'emails': emails}
+
+
+class BulkRemoveMembersSerializer(serializers.Serializer):
+    """Serializer para remover miembros en bloque."""
+    
+    user_ids = serializers.ListField(child=serializers.JSONField(), allow_empty=False)
+    
+    def validate_user_ids(self, value):
+        if len(value) > BULK_MEMBERS_MAX_ROWS:
+            raise serializers.ValidationError(
+                f'Máximo {BULK_MEMBERS_MAX_ROWS} usuarios por operación.'
+            )
+        return value
+
+
+class ProjectDeletionSerializer(serializers.ModelSerializer):
+    """Serializer para el avance de la eliminación de un proyecto."""
+    
+    progress = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = ProjectDeletion
+        fields = [
+            'id', 'project_id', 'title', 'status', 'progress',
+            'total_rows', 'deleted_rows', 'deleted_files', 'error',
+            'created_at', 'updated_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
+class ActivitySerializer(serializers.ModelSerializer):
+    """Serializer para entradas del registro de actividad."""
+    
+    actor_name = serializers.CharField(source='actor.get_full_name', read_only=True, allow_null=True)
+    
+    class Meta:
+        model = Activity
+        fields = ['id', 'verb', 'actor', 'actor_name', 'payload', 'created_at']
+        read_only_fields = fields
@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+
+# Cambiaron las membresías de un proyecto (altas, bajas o cambios de rol).
+# Argumentos: ``project_id`` y ``user_ids``. Se envía una vez por operación,
+# también en las masivas, al confirmar la transacción (ver
+# ``Membership.notify_changed``).
+memberships_changed = Signal()
@@ -0,0 +1,265 @@
+"""Mantenimiento incremental de ``ProjectStats``.
+
+Las funciones ``task_*``, ``membership_*`` y ``message_created`` se llaman
+después de escribir el cambio correspondiente y dentro de la misma
+transacción; aplican incrementos con ``F()`` sin leer la fila. Si el proyecto
+aún no tiene estadísticas, se calculan completas con ``refresh``.
+
+Las tareas vencidas no se guardan: dependen de la fecha actual y un
+contador incremental se desajusta cuando una tarea vence sin cambiar.
+``overdue_counts`` las cuenta al leer, con los índices de fecha límite
+de ``Task``.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from chat.models import Message
+from tasks.models import Task
+from .models import Project, Membership, ProjectStats
+
+
+def _task_deltas(status, priority, sign):
+    return {
+        'tasks_total': sign,
+        f'tasks_status_{status}': sign,
+        f'tasks_priority_{priority}': sign,
+    }
+
+
+def _merge(*deltas):
+    merged = {}
+    for delta in deltas:
+        for field, value in delta.items():
+            merged[field] = merged.get(field, 0) + value
+    return {field: value for field, value in merged.items() if value}
+
+
+def adjust(project_id, **deltas):
+    """Aplica incrementos a las estadísticas de un proyecto.
+    
+    Retorna ``False`` si el proyecto no tenía estadísticas y se recalcularon
+    completas (incluida la carga por miembro).
+    """
+    if not deltas:
+        return True
+    updated = ProjectStats.objects.filter(project_id=project_id).update(
+        **{field: F(field) + value for field, value in deltas.items()},
+        updated_at=timezone.now()
+    )
+    if not updated:
+        refresh([project_id])
+        return False
+    return True
+
+
+def _adjust_load(project_id, user_id, value):
+    if user_id and value:
+        Membership.objects.filter(project_id=project_id, user_id=user_id).update(
+            open_tasks_count=F('open_tasks_count') + value
+        )
+
+
+def task_created(task):
+    if not adjust(task.project_id, **_task_deltas(task.status, task.priority, 1)):
+        return
+    if task.status != 'completed':
+        _adjust_load(task.project_id, task.assigned_to_id, 1)
+
+
+def task_deleted(task):
+    if not adjust(task.project_id, **_task_deltas(task.status, task.priority, -1)):
+        return
+    if task.status != 'completed':
+        _adjust_load(task.project_id, task.assigned_to_id, -1)
+
+
+def task_changed(task, old_status, old_priority, old_deadline, old_assigned_to_id):
+    """Registra un cambio de estado, prioridad, fecha límite o asignación."""
+    if not adjust(task.project_id, **_merge(
+        _task_deltas(old_status, old_priority, -1),
+        _task_deltas(task.status, task.priority, 1),
+    )):
+        return
+    if old_status != 'completed':
+        _adjust_load(task.project_id, old_assigned_to_id, -1)
+    if task.status != 'completed':
+        _adjust_load(task.project_id, task.assigned_to_id, 1)
+
+
+def tasks_applied(project_id, created=(), changed=()):
+    """Registra en bloque tareas creadas y cambiadas de un proyecto.
+    
+    ``changed`` son pares ``(task, snapshot)`` con el ``task_snapshot``
+    previo al cambio. Aplica un solo incremento a ``ProjectStats`` y uno por
+    miembro cuya carga cambió.
+    """
+    deltas = []
+    load = {}
+    
+    def add_load(user_id, status, value):
+        if user_id and status != 'completed':
+            load[user_id] = load.get(user_id, 0) + value
+    
+    for task in created:
+        deltas.append(_task_deltas(task.status, task.priority, 1))
+        add_load(task.assigned_to_id, task.status, 1)
+    for task, (old_status, old_priority, old_deadline, old_assigned_to_id) in changed:
+        deltas.append(_task_deltas(old_status, old_priority, -1))
+        deltas.append(_task_deltas(task.status, task.priority, 1))
+        add_load(old_assigned_to_id, old_status, -1)
+        add_load(task.assigned_to_id, task.status, 1)
+    
+    if not adjust(project_id, **_merge(*deltas)):
+        return
+    for user_id, value in load.items():
+        _adjust_load(project_id, user_id, value)
+
+
+def task_snapshot(task):
+    """Valores de ``task`` necesarios para ``task_changed``."""
+    return task.status, task.priority, task.deadline, task.assigned_to_id
+
+
+def membership_added(project_id, count=1):
+    adjust(project_id, members_count=count)
+
+
+def recount_member_load(project_id, user_ids):
+    """Fija la carga de membresías recién creadas con sus tareas abiertas.
+
+    Quien sale de un proyecto conserva sus tareas asignadas; al volver, la
+    nueva membresía debe contarlas para que completarlas o borrarlas no deje
+    el contador bajo cero.
+    """
+    load = Task.objects.exclude(status='completed').filter(
+        project_id=project_id, assigned_to_id__in=user_ids
+    ).values('assigned_to_id').annotate(n=Count('id')).order_by()
+    for row in load:
+        Membership.objects.filter(project_id=project_id, user_id=row['assigned_to_id']).update(
+            open_tasks_count=row['n']
+        )
+
+
+def membership_removed(project_id, count=1):
+    adjust(project_id, members_count=-count)
+
+
+def touch(project_id):
+    """Marca las estadísticas como modificadas sin cambiar conteos.
+    
+    Para cambios que no alteran conteos pero sí el contenido del proyecto
+    (p. ej. un cambio de rol), de modo que ``updated_at`` siga reflejando la
+    última modificación.
+    """
+    ProjectStats.objects.filter(project_id=project_id).update(updated_at=timezone.now())
+
+
+def message_created(project_id):
+    if project_id:
+        adjust(project_id, messages_count=1)
+
+
+def initial(tasks, members_count=0):
+    """Estadísticas de un proyecto nuevo a partir de sus tareas en memoria.
+    
+    Para proyectos creados en bloque (p. ej. al clonar), sin volver a leer
+    las tareas recién insertadas.
+    """
+    values = {field: 0 for field in stat_fields()}
+    values['members_count'] = members_count
+    for task in tasks:
+        for field, value in _task_deltas(task.status, task.priority, 1).items():
+            values[field] += value
+    return values
+
+
+def compute(project_ids=None):
+    """Calcula las estadísticas desde cero con una agregación por tabla.
+
+    Retorna ``{project_id: {campo: valor}}`` para los proyectos indicados
+    (o todos si ``project_ids`` es ``None``).
+    """
+    projects = Project.objects.all()
+    if project_ids is not None:
+        projects = projects.filter(id__in=project_ids)
+    stats = {
+        project_id: {field: 0 for field in stat_fields()}
+        for project_id in projects.values_list('id', flat=True)
+    }
+
+    def scoped(queryset, project_field):
+        if project_ids is None:
+            return queryset
+        return queryset.filter(**{f'{project_field}__in': list(stats)})
+
+    task_aggregates = {'tasks_total': Count('id')}
+    for value, _ in Task.STATUS_CHOICES:
+        task_aggregates[f'tasks_status_{value}'] = Count('id', filter=Q(status=value))
+    for value, _ in Task.PRIORITY_CHOICES:
+        task_aggregates[f'tasks_priority_{value}'] = Count('id', filter=Q(priority=value))
+    rows = scoped(Task.objects, 'project_id').values('project_id').annotate(**task_aggregates)
+    for row in rows.order_by():
+        if row['project_id'] in stats:
+            stats[row['project_id']].update({field: row[field] for field in task_aggregates})
+
+    rows = scoped(Membership.objects, 'project_id').values('project_id').annotate(n=Count('id'))
+    for row in rows.order_by():
+        if row['project_id'] in stats:
+            stats[row['project_id']]['members_count'] = row['n']
+
+    rows = scoped(Message.objects, 'chat_room__project_id').values(
+        'chat_room__project_id'
+    ).annotate(n=Count('id'))
+    for row in rows.order_by():
+        if row['chat_room__project_id'] in stats:
+            stats[row['chat_room__project_id']]['messages_count'] = row['n']
+
+    return stats
+
+
+def overdue_counts(project_ids, today=None):
+    """Tareas abiertas con fecha límite vencida por proyecto.
+
+    La consulta recorre ``task_project_deadline_idx`` solo hasta ``today``.
+    """
+    today = today or timezone.localdate()
+    counts = dict.fromkeys(project_ids, 0)
+    rows = Task.objects.exclude(status='completed').filter(
+        deadline__lt=today, project_id__in=list(counts)
+    ).values('project_id').annotate(n=Count('id')).order_by()
+    for row in rows:
+        counts[row['project_id']] = row['n']
+    return counts
+
+
+def compute_member_load(project_ids=None):
+    """Tareas abiertas por ``(project_id, user_id)``."""
+    tasks = Task.objects.exclude(status='completed').filter(assigned_to__isnull=False)
+    if project_ids is not None:
+        tasks = tasks.filter(project_id__in=project_ids)
+    return {
+        (row['project_id'], row['assigned_to_id']): row['n']
+        for row in tasks.values('project_id', 'assigned_to_id').annotate(n=Count('id')).order_by()
+    }
+
+
+def stat_fields():
+    return [
+        field.name for field in ProjectStats._meta.concrete_fields
+        if field.name not in ('project', 'updated_at')
+    ]
+
+
+def refresh(project_ids):
+    """Recalcula y guarda las estadísticas de los proyectos indicados."""
+    stats = compute(project_ids)
+    with transaction.atomic():
+        for project_id, values in stats.items():
+            ProjectStats.objects.update_or_create(project_id=project_id, defaults=values)
+        load = compute_member_load(project_ids)
+        for membership in Membership.objects.filter(project_id__in=stats.keys()):
+            count = load.get((membership.project_id, membership.user_id), 0)
+            if membership.open_tasks_count != count:
+                membership.open_tasks_count = count
+                membership.save(update_fields=['open_tasks_count'])
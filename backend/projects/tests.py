@@ -1,3 +1,1096 @@
-from django.test import TestCase
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Project, Membership, ProjectStats, ProjectDeletion, Activity
+from .permissions import MembershipResolver
+from .purge import purge_project
+from . import bulk, stats as project_stats
+from .signals import memberships_changed
+from tasks import reminders, uploads
+from tasks.models import DocumentUpload, Task, TaskDocument
+from chat.models import ChatRoom, ChatReadState, Message, MessageRead
+
+User = get_user_model()
+
+
+def create_project(user, role='leader', **extra):
+    """Crea un proyecto con el usuario como miembro."""
+    project = Project.objects.create(
+        title=extra.pop('title', 'Proyecto'),
+        description='Descripción',
+        general_objectives='Objetivos generales',
+        specific_objectives='Objetivos específicos',
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 6, 30),
+        created_by=extra.pop('created_by', user),
+        **extra
+    )
+    Membership.objects.create(user=user, project=project, role=role)
+    return project
+
+
+class ProjectListQueriesTest(TestCase):
+    """El listado de proyectos no debe hacer consultas por proyecto."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'lider@example.com', 'clave-segura-123',
+            first_name='Ana', last_name='Torres'
+        )
+        self.other = User.objects.create_user(
+            'miembro@example.com', 'clave-segura-123',
+            first_name='Luis', last_name='Rojas'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data
+
+    def test_query_count_does_not_grow_with_projects(self):
+        create_project(self.user)
+        baseline, _ = self.count_list_queries()
+
+        for i in range(9):
+            project = create_project(self.user, role='member', created_by=self.other)
+            Membership.objects.create(user=self.other, project=project, role='leader')
+        queries, data = self.count_list_queries()
+
+        self.assertEqual(queries, baseline)
+        self.assertEqual(data['count'], 10)
+
+    def test_annotated_fields(self):
+        project = create_project(self.user)
+        Membership.objects.create(user=self.other, project=project)
+        create_project(self.other)
+
+        _, data = self.count_list_queries()
+
+        self.assertEqual(data['count'], 1)
+        result = data['results'][0]
+        self.assertEqual(result['members_count'], 2)
+        self.assertEqual(result['user_role'], 'Líder')
+        self.assertEqual(result['created_by_name'], 'Ana Torres')
+
+
+class ProjectDetailQueriesTest(TestCase):
+    """El detalle de proyecto agrega las tareas en una sola consulta."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'lider@example.com', 'clave-segura-123',
+            first_name='Ana', last_name='Torres'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(self.user)
+
+    def add_members(self, count):
+        for i in range(count):
+            member = User.objects.create_user(
+                f'miembro{i}@example.com', 'clave-segura-123',
+                first_name='Miembro', last_name=str(i)
+            )
+            Membership.objects.create(user=member, project=self.project)
+
+    def add_tasks(self, statuses):
+        for i, status in enumerate(statuses):
+            Task.objects.create(
+                project=self.project, name=f'Tarea {i}', description='-',
+                deadline=date(2025, 3, 1), status=status,
+                priority='high' if i % 2 else 'low', created_by=self.user
+            )
+
+    def get_detail(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/projects/{self.project.pk}/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data
+
+    def test_query_count_does_not_grow_with_members_or_tasks(self):
+        baseline, _ = self.get_detail()
+
+        self.add_members(5)
+        self.add_tasks(['pending', 'in_progress', 'completed', 'completed'])
+        queries, data = self.get_detail()
+
+        self.assertEqual(queries, baseline)
+        self.assertEqual(len(data['members']), 6)
+        self.assertEqual(data['tasks_count'], 4)
+        self.assertEqual(data['completed_tasks_count'], 2)
+        self.assertEqual(
+            data['tasks_by_status'],
+            {'pending': 1, 'in_progress': 1, 'completed': 2}
+        )
+        self.assertEqual(
+            data['tasks_by_priority'],
+            {'low': 2, 'medium': 0, 'high': 2, 'critical': 0}
+        )
+
+
+class ProjectStatsTest(TestCase):
+    """ProjectStats se mantiene al crear, cambiar y eliminar tareas y membresías."""
+
+    def setUp(self):
+        self.leader = User.objects.create_user(
+            'lider@example.com', 'clave-segura-123',
+            first_name='Ana', last_name='Torres'
+        )
+        self.member = User.objects.create_user(
+            'miembro@example.com', 'clave-segura-123',
+            first_name='Luis', last_name='Rojas'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.leader)
+        response = self.client.post('/api/projects/', {
+            'title': 'Proyecto', 'description': 'Descripción',
+            'general_objectives': 'Generales', 'specific_objectives': 'Específicos',
+            'start_date': '2025-01-01', 'end_date': '2030-12-31',
+        }, format='json')
+        self.project = Project.objects.get(pk=response.data['id'])
+
+    def stats(self):
+        return ProjectStats.objects.get(project=self.project)
+
+    def test_membership_and_task_lifecycle(self):
+        member_client = APIClient()
+        member_client.force_authenticate(self.member)
+        member_client.post('/api/projects/join/', {'code': self.project.code}, format='json')
+        self.assertEqual(self.stats().members_count, 2)
+
+        response = self.client.post(f'/api/tasks/project/{self.project.pk}/', {
+            'name': 'Tarea', 'description': '-', 'deadline': '2030-01-01',
+            'priority': 'high', 'assigned_to': self.member.pk,
+        }, format='json')
+        task_id = response.data['id']
+        stats = self.stats()
+        self.assertEqual(stats.tasks_total, 1)
+        self.assertEqual(stats.tasks_status_pending, 1)
+        self.assertEqual(stats.tasks_priority_high, 1)
+        self.assertEqual(
+            Membership.objects.get(project=self.project, user=self.member).open_tasks_count, 1
+        )
+
+        self.client.patch(f'/api/tasks/{task_id}/status/', {'status': 'completed'}, format='json')
+        stats = self.stats()
+        self.assertEqual(stats.tasks_status_pending, 0)
+        self.assertEqual(stats.tasks_status_completed, 1)
+        self.assertEqual(
+            Membership.objects.get(project=self.project, user=self.member).open_tasks_count, 0
+        )
+
+        detail = self.client.get(f'/api/projects/{self.project.pk}/').data
+        self.assertEqual(detail['tasks_count'], 1)
+        self.assertEqual(detail['completed_tasks_count'], 1)
+
+        self.client.delete(f'/api/tasks/{task_id}/')
+        self.assertEqual(self.stats().tasks_total, 0)
+
+        member_client.post(f'/api/projects/{self.project.pk}/leave/')
+        self.assertEqual(self.stats().members_count, 1)
+
+    def test_member_who_rejoins_keeps_task_load(self):
+        member_client = APIClient()
+        member_client.force_authenticate(self.member)
+        member_client.post('/api/projects/join/', {'code': self.project.code}, format='json')
+        task_ids = [
+            self.client.post(f'/api/tasks/project/{self.project.pk}/', {
+                'name': f'Tarea {i}', 'description': '-', 'deadline': '2030-01-01',
+                'assigned_to': self.member.pk,
+            }, format='json').data['id']
+            for i in range(2)
+        ]
+
+        def load():
+            return Membership.objects.get(project=self.project, user=self.member).open_tasks_count
+
+        # Sale y vuelve a entrar por código: las tareas siguen asignadas
+        member_client.post(f'/api/projects/{self.project.pk}/leave/')
+        member_client.post('/api/projects/join/', {'code': self.project.code}, format='json')
+        self.assertEqual(load(), 2)
+        response = self.client.patch(
+            f'/api/tasks/{task_ids[0]}/status/', {'status': 'completed'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(load(), 1)
+
+        # Sale y el líder lo vuelve a agregar en bloque
+        member_client.post(f'/api/projects/{self.project.pk}/leave/')
+        response = self.client.post(
+            f'/api/projects/{self.project.pk}/members/bulk-add/',
+            {'emails': [self.member.email]}, format='json'
+        )
+        self.assertEqual(response.data['summary'], {'added': 1})
+        self.assertEqual(load(), 1)
+        self.assertEqual(self.client.delete(f'/api/tasks/{task_ids[1]}/').status_code, 204)
+        self.assertEqual(load(), 0)
+
+    def test_task_that_became_overdue_can_be_completed(self):
+        response = self.client.post(f'/api/tasks/project/{self.project.pk}/', {
+            'name': 'Tarea', 'description': '-', 'deadline': '2030-01-01',
+        }, format='json')
+        task_id = response.data['id']
+        self.assertEqual(project_stats.overdue_counts([self.project.id]), {self.project.id: 0})
+
+        # La fecha límite pasa sin que la tarea cambie
+        yesterday = timezone.localdate() - timedelta(days=1)
+        Task.objects.filter(pk=task_id).update(deadline=yesterday)
+        self.assertEqual(project_stats.overdue_counts([self.project.id]), {self.project.id: 1})
+
+        response = self.client.patch(
+            f'/api/tasks/{task_id}/status/', {'status': 'completed'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stats().tasks_status_completed, 1)
+        self.assertEqual(project_stats.overdue_counts([self.project.id]), {self.project.id: 0})
+
+        self.assertEqual(self.client.delete(f'/api/tasks/{task_id}/').status_code, 204)
+        self.assertEqual(self.stats().tasks_total, 0)
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        ProjectStats.objects.filter(project=self.project).update(members_count=7)
+        out = StringIO()
+        call_command('reconcile_project_stats', stdout=out)
+        self.assertIn('Con deriva: 1', out.getvalue())
+        self.assertEqual(self.stats().members_count, 1)
+
+
+class ProjectCodeAllocationTest(TestCase):
+    """El código se asigna reintentando ante colisiones del índice único."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'lider@example.com', 'clave-segura-123',
+            first_name='Ana', last_name='Torres'
+        )
+
+    def test_retries_on_collision(self):
+        create_project(self.user, code='AAAAAA')
+        with mock.patch('projects.models.generate_project_code', side_effect=['BBBBBB']):
+            project = create_project(self.user, code='AAAAAA')
+        self.assertEqual(project.code, 'BBBBBB')
+
+    def test_gives_up_after_bounded_attempts(self):
+        create_project(self.user, code='AAAAAA')
+        with mock.patch('projects.models.generate_project_code', return_value='AAAAAA'):
+            with self.assertRaises(IntegrityError):
+                create_project(self.user, code='AAAAAA')
+        self.assertEqual(Project.objects.count(), 1)
+
+    def test_update_keeps_code(self):
+        project = create_project(self.user)
+        code = project.code
+        project.title = 'Nuevo título'
+        project.save()
+        project.refresh_from_db()
+        self.assertEqual(project.code, code)
+
+
+class ConcurrentProjectCodeTest(TransactionTestCase):
+    """Creadores en paralelo que sortean el mismo código obtienen códigos distintos."""
+
+    def test_parallel_creators(self):
+        user = User.objects.create_user(
+            'lider@example.com', 'clave-segura-123',
+            first_name='Ana', last_name='Torres'
+        )
+        creators = 8
+        counter = itertools.count()
+        lock = threading.Lock()
+
+        def next_code():
+            with lock:
+                return f'Z{next(counter):05d}'
+
+        barrier = threading.Barrier(creators)
+        errors = []
+
+        def create():
+            try:
+                barrier.wait()
+                # Todos parten del mismo código para forzar la colisión
+                Project.objects.create(
+                    title='Proyecto', description='-', general_objectives='-',
+                    specific_objectives='-', start_date=date(2025, 1, 1),
+                    end_date=date(2025, 6, 30), created_by=user, code='AAAAAA'
+                )
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        with mock.patch('projects.models.generate_project_code', side_effect=next_code):
+            threads = [threading.Thread(target=create) for _ in range(creators)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+        codes = list(Project.objects.values_list('code', flat=True))
+        self.assertEqual(len(codes), creators)
+        self.assertEqual(len(set(codes)), creators)
+        self.assertIn('AAAAAA', codes)
+
+
+class MembershipResolverTest(TestCase):
+    """Las membresías del usuario se consultan una sola vez por petición."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'lider@example.com', 'clave-segura-123',
+            first_name='Ana', last_name='Torres'
+        )
+        self.other = User.objects.create_user(
+            'miembro@example.com', 'clave-segura-123',
+            first_name='Luis', last_name='Rojas'
+        )
+        self.project = create_project(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def membership_queries(self, queries):
+        return [
+            query for query in queries.captured_queries
+            if 'FROM "projects_membership"' in query['sql']
+            and '"projects_membership"."user_id" = ' in query['sql']
+        ]
+
+    def test_task_create_checks_membership_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/api/tasks/project/{self.project.pk}/', {
+                'name': 'Tarea', 'description': '-', 'deadline': '2030-01-01',
+                'priority': 'high',
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.membership_queries(queries)), 1)
+
+    def test_roles(self):
+        other_project = create_project(self.other)
+        Membership.objects.create(user=self.user, project=other_project)
+        resolver = MembershipResolver(self.user)
+        self.assertTrue(resolver.is_leader(self.project.pk))
+        self.assertTrue(resolver.is_member(str(other_project.pk)))
+        self.assertFalse(resolver.is_leader(other_project.pk))
+        self.assertIsNone(resolver.role('abc'))
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    })
+    def test_cache_is_invalidated_on_membership_change(self):
+        with mock.patch('projects.permissions.CACHE_TIMEOUT', 60):
+            self.assertFalse(MembershipResolver(self.other).is_member(self.project.pk))
+            with self.captureOnCommitCallbacks(execute=True):
+                Membership.objects.create(user=self.other, project=self.project)
+            with self.assertNumQueries(1):
+                self.assertTrue(MembershipResolver(self.other).is_member(self.project.pk))
+            with self.assertNumQueries(0):
+                self.assertTrue(MembershipResolver(self.other).is_member(self.project.pk))
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    })
+    def test_leaving_revokes_cached_access(self):
+        cache.clear()
+        Membership.objects.create(user=self.other, project=self.project)
+        client = APIClient()
+        client.force_authenticate(self.other)
+        with mock.patch('projects.permissions.CACHE_TIMEOUT', 60):
+            self.assertEqual(client.get(f'/api/projects/{self.project.pk}/').status_code, 200)
+            dashboard = client.get('/api/dashboard/').data
+            self.assertEqual(len(dashboard['projects']), 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                response = client.post(f'/api/projects/{self.project.pk}/leave/')
+            self.assertEqual(response.status_code, 200)
+
+            response = client.get(f'/api/projects/{self.project.pk}/')
+            self.assertIn(response.status_code, (403, 404))
+            self.assertEqual(client.get('/api/dashboard/').data['projects'], [])
+
+
+class HotPathIndexTest(TestCase):
+    """Las consultas de los endpoints frecuentes usan índices, sin recorridos completos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.leader = User.objects.create_user(
+            'lider@example.com', 'clave-segura-123',
+            first_name='Ana', last_name='Torres'
+        )
+        cls.member = User.objects.create_user(
+            'miembro@example.com', 'clave-segura-123',
+            first_name='Luis', last_name='Rojas'
+        )
+        statuses = [value for value, _ in Task.STATUS_CHOICES]
+        for i in range(20):
+            project = create_project(cls.leader, title=f'Proyecto {i}')
+            Membership.objects.create(user=cls.member, project=project)
+            Task.objects.bulk_create([
+                Task(
+                    project=project, name=f'Tarea {j}', description='-',
+                    deadline=date(2025, 1 + j % 12, 1), status=statuses[j % 3],
+                    assigned_to=cls.member if j % 2 else None, created_by=cls.leader
+                )
+                for j in range(30)
+            ])
+            room = ChatRoom.objects.create(project=project, room_type='group')
+            Message.objects.bulk_create([
+                Message(chat_room=room, sender=cls.leader, content=f'Mensaje {j}')
+                for j in range(30)
+            ])
+            private = ChatRoom.objects.create(project=project, room_type='private')
+            private.participants.add(cls.leader, cls.member)
+        cls.project = project
+        cls.room = room
+
+    def plans(self, run):
+        """Ejecuta ``run`` y retorna ``[(sql, plan)]`` de cada SELECT."""
+        statements = []
+
+        def capture(execute, sql, params, many, context):
+            statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(capture):
+            run()
+
+        plans = []
+        with connection.cursor() as cursor:
+            for sql, params in statements:
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+        return plans
+
+    def assert_no_full_scans(self, plans):
+        for sql, plan in plans:
+            scans = [
+                step for step in plan
+                if step.startswith('SCAN ') and step != 'SCAN CONSTANT ROW'
+            ]
+            self.assertEqual(scans, [], f'Recorrido completo en: {sql}')
+
+    def assert_uses_index(self, plans, index_name):
+        self.assertTrue(
+            any(index_name in step for _, plan in plans for step in plan),
+            f'Ninguna consulta usa {index_name}'
+        )
+
+    def test_endpoints(self):
+        client = APIClient()
+        client.force_authenticate(self.member)
+        urls = [
+            '/api/projects/',
+            f'/api/projects/{self.project.pk}/',
+            f'/api/projects/{self.project.pk}/members/',
+            f'/api/tasks/project/{self.project.pk}/',
+            f'/api/tasks/project/{self.project.pk}/?sort=deadline&status=pending,in_progress',
+            '/api/tasks/my-tasks/',
+            '/api/tasks/my-tasks/?sort=deadline&deadline_after=2025-01-01&facets=true',
+            '/api/chat/rooms/',
+            f'/api/chat/rooms/{self.room.pk}/',
+            f'/api/chat/rooms/by_project/?project_id={self.project.pk}',
+            f'/api/chat/rooms/{self.room.pk}/messages/',
+        ]
+        used = []
+        for url in urls:
+            with self.subTest(url=url):
+                plans = self.plans(lambda: self.assertEqual(client.get(url).status_code, 200))
+                self.assert_no_full_scans(plans)
+                used.extend(plans)
+
+        self.assert_uses_index(used, 'task_assignee_created_idx')
+        self.assert_uses_index(used, 'chatroom_project_type_idx')
+        self.assert_uses_index(used, 'message_room_created_idx')
+
+    def test_filters(self):
+        queries = [
+            ('task_project_status_idx', lambda: list(
+                Task.objects.filter(project=self.project, status='pending')
+            )),
+            ('task_open_deadline_idx', lambda: list(
+                Task.objects.filter(deadline__lt=date(2025, 6, 1)).exclude(status='completed')
+            )),
+            ('task_open_deadline_idx', lambda: reminders.pending_reminders(date(2025, 6, 1))),
+            ('membership_project_role_idx', lambda: list(
+                Membership.objects.filter(project=self.project, role='leader')
+            )),
+        ]
+        for index_name, run in queries:
+            with self.subTest(index=index_name):
+                plans = self.plans(run)
+                self.assert_no_full_scans(plans)
+                self.assert_uses_index(plans, index_name)
+
+
+class ProjectExportPDFTest(TransactionTestCase):
+    """El PDF se genera en un hilo de exportación y se reutiliza desde la caché."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            'lider@example.com', 'clave-segura-123',
+            first_name='Ana', last_name='Núñez'
+        )
+        self.project = create_project(self.user, title='Proyecto (exportación)')
+        Task.objects.bulk_create([
+            Task(
+                project=self.project, name=f'Tarea {i}', description='-',
+                deadline=date(2025, 3, 1), created_by=self.user
+            )
+            for i in range(200)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/projects/{self.project.pk}/export/pdf/'
+
+    def export(self, **headers):
+        response = self.client.get(self.url, **headers)
+        if response.status_code != 200:
+            return response, None
+        return response, b''.join(response.streaming_content)
+
+    def test_streams_valid_pdf(self):
+        response, data = self.export()
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(data.startswith(b'%PDF-1.4'))
+        self.assertTrue(data.endswith(b'%%EOF\n'))
+        # Cada entrada del xref apunta a su objeto
+        startxref = int(data.rsplit(b'startxref\n', 1)[1].split()[0])
+        lines = data[startxref:].split(b'\n')
+        size = int(lines[1].split()[1])
+        for obj_id in range(1, size):
+            offset = int(lines[2 + obj_id][:10])
+            self.assertTrue(data[offset:].startswith(b'%d 0 obj' % obj_id))
+
+    def test_cached_until_project_changes(self):
+        _, first = self.export()
+        with mock.patch('projects.export.render_project_pdf') as render:
+            response, second = self.export()
+            self.assertEqual(second, first)
+            render.assert_not_called()
+
+            not_modified, _ = self.export(HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(not_modified.status_code, 304)
+
+        Task.objects.filter(project=self.project).first().save()
+        with mock.patch('projects.export.render_project_pdf', return_value=[b'%PDF']) as render:
+            _, third = self.export()
+            render.assert_called_once()
+        self.assertEqual(third, b'%PDF')
+
+    def test_requires_membership(self):
+        other = User.objects.create_user(
+            'otro@example.com', 'clave-segura-123',
+            first_name='Luis', last_name='Rojas'
+        )
+        self.client.force_authenticate(other)
+        response, _ = self.export()
+        self.assertEqual(response.status_code, 404)
+
+
+class BulkMembershipTest(TestCase):
+    """Altas y bajas masivas con resultados por fila y un solo evento."""
+
+    def setUp(self):
+        self.leader = User.objects.create_user(
+            'lider@example.com', 'clave-segura-123',
+            first_name='Ana', last_name='Torres'
+        )
+        self.students = [
+            User.objects.create_user(
+                f'alumno{i}@example.com', None,
+                first_name='Alumno', last_name=str(i)
+            )
+            for i in range(30)
+        ]
+        self.project = create_project(self.leader)
+        ProjectStats.objects.create(project=self.project, members_count=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.leader)
+        self.events = []
+        memberships_changed.connect(self.record_event)
+        self.addCleanup(memberships_changed.disconnect, self.record_event)
+
+    def record_event(self, sender, project_id, user_ids, **kwargs):
+        self.events.append((project_id, sorted(user_ids)))
+
+    def bulk_add(self, data, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    f'/api/projects/{self.project.pk}/members/bulk-add/', data, **kwargs
+                )
+        return response, len(queries)
+
+    def test_add_by_email_list(self):
+        Membership.objects.create(user=self.students[0], project=self.project)
+        emails = [student.email for student in self.students] + [
+            'ALUMNO1@EXAMPLE.COM', 'nadie@example.com', 'no-es-correo'
+        ]
+        response, _ = self.bulk_add({'emails': emails}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary'], {
+            'already_member': 1, 'added': 29, 'duplicate': 1, 'not_found': 1, 'invalid': 1,
+        })
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses[:2], ['already_member', 'added'])
+        self.assertEqual(statuses[-3:], ['duplicate', 'not_found', 'invalid'])
+        self.assertEqual(self.project.memberships.count(), 31)
+        self.assertEqual(ProjectStats.objects.get(project=self.project).members_count, 30)
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(len(self.events[0][1]), 29)
+
+    def test_add_retries_after_concurrent_join(self):
+        # La unión concurrente ocurre después de leer las membresías actuales
+        Membership.objects.create(user=self.students[0], project=self.project)
+        current_members = bulk._current_members
+        with mock.patch(
+            'projects.bulk._current_members',
+            side_effect=[set(), current_members(self.project, [self.students[0].id])]
+        ):
+            response, _ = self.bulk_add(
+                {'emails': [s.email for s in self.students[:2]]}, format='json'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary'], {'already_member': 1, 'added': 1})
+        self.assertEqual(self.project.memberships.count(), 3)
+        self.assertEqual(ProjectStats.objects.get(project=self.project).members_count, 2)
+        self.assertEqual(self.events[-1], (self.project.id, [self.students[1].id]))
+
+    def test_add_query_count_does_not_grow(self):
+        _, few = self.bulk_add({'emails': [s.email for s in self.students[:2]]}, format='json')
+        _, many = self.bulk_add({'emails': [s.email for s in self.students[2:]]}, format='json')
+        self.assertEqual(few, many)
+
+    def test_add_from_csv(self):
+        content = 'nombre,email\nAlumno 0,alumno0@example.com\nAlumno 1,alumno1@example.com\n'
+        upload = SimpleUploadedFile('alumnos.csv', content.encode(), content_type='text/csv')
+        response, _ = self.bulk_add({'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary'], {'added': 2})
+
+    def test_remove(self):
+        for student in self.students[:5]:
+            Membership.objects.create(user=student, project=self.project)
+        ProjectStats.objects.filter(project=self.project).update(members_count=6)
+        self.events.clear()
+        user_ids = [student.id for student in self.students[:6]] + [self.leader.id, 'x']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/projects/{self.project.pk}/members/bulk-remove/',
+                {'user_ids': user_ids}, format='json'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary'], {
+            'removed': 5, 'not_member': 1, 'self': 1, 'invalid': 1,
+        })
+        self.assertEqual(list(self.project.memberships.values_list('user_id', flat=True)), [self.leader.id])
+        self.assertEqual(ProjectStats.objects.get(project=self.project).members_count, 1)
+        self.assertEqual(self.events, [(self.project.id, sorted(s.id for s in self.students[:5]))])
+
+    def test_only_leader(self):
+        Membership.objects.create(user=self.students[0], project=self.project)
+        self.client.force_authenticate(self.students[0])
+        response, _ = self.bulk_add({'emails': ['alumno1@example.com']}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class ProjectDeletionTest(TestCase):
+    """Eliminación inmediata del proyecto y purga posterior por lotes."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.leader = User.objects.create_user(
+            'lider@example.com', None, first_name='Ana', last_name='Torres'
+        )
+        self.member = User.objects.create_user(
+            'miembro@example.com', None, first_name='Luis', last_name='Rojas'
+        )
+        self.project = create_project(self.leader)
+        Membership.objects.create(user=self.member, project=self.project)
+        ProjectStats.objects.create(project=self.project, members_count=2)
+
+        room = ChatRoom.objects.create(project=self.project, room_type='group')
+        for i in range(5):
+            message = Message.objects.create(chat_room=room, sender=self.member, content=f'Hola {i}')
+            MessageRead.objects.create(message=message, user=self.leader)
+        ChatReadState.advance(room.id, self.leader)
+        for i in range(3):
+            task = Task.objects.create(
+                project=self.project, name=f'Tarea {i}', description='-',
+                deadline=date(2025, 3, 1), created_by=self.leader, assigned_to=self.member
+            )
+            document = TaskDocument(task=task, uploaded_by=self.leader)
+            document.file.save(f'doc{i}.txt', ContentFile(b'contenido'), save=True)
+        self.files = list(TaskDocument.objects.values_list('file', flat=True))
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.leader)
+
+    def delete_project(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.delete(f'/api/projects/{self.project.pk}/')
+        return response, callbacks
+
+    def test_soft_delete_hides_project(self):
+        response, _ = self.delete_project()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertFalse(Membership.objects.filter(project=self.project).exists())
+        self.assertIsNotNone(Project.objects.get(pk=self.project.pk).deleted_at)
+        self.assertEqual(self.client.get(f'/api/projects/{self.project.pk}/').status_code, 404)
+        self.assertEqual(self.client.get('/api/projects/').data['count'], 0)
+
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.client.get('/api/tasks/my-tasks/').data['results'], [])
+        response = self.client.post('/api/projects/join/', {'code': self.project.code})
+        self.assertEqual(response.status_code, 400)
+
+    @mock.patch('projects.purge.PAUSE', 0)
+    @mock.patch('projects.purge.CHUNK_SIZE', 2)
+    def test_purge_in_chunks(self):
+        response, _ = self.delete_project()
+        deletion_id = response.data['id']
+
+        # Los archivos sin referencias se borran al confirmar cada lote
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                deletion = purge_project(deletion_id)
+
+        self.assertEqual(deletion.status, 'completed')
+        # 5 lecturas, 1 estado, 5 mensajes, 1 sala, 3 documentos, 3 tareas, stats y proyecto
+        self.assertEqual(deletion.total_rows, 20)
+        self.assertEqual(deletion.deleted_rows, 20)
+        self.assertEqual(deletion.deleted_files, 3)
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+        self.assertFalse(Message.objects.exists())
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(ProjectStats.objects.exists())
+        for name in self.files:
+            self.assertFalse(TaskDocument.file.field.storage.exists(name))
+        # Los 5 mensajes se borran en 3 lotes de a lo más 2
+        deletes = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('DELETE FROM "chat_message"')
+        ]
+        self.assertEqual(len(deletes), 3)
+
+        response = self.client.get(f'/api/projects/deletions/{deletion_id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['progress'], 100)
+
+    @mock.patch('projects.purge.PAUSE', 0)
+    def test_purge_removes_partial_uploads(self):
+        task = Task.objects.filter(project=self.project).first()
+        upload = uploads.start(task, self.leader, '', 'grande.bin', 1024)
+        partial = uploads.document_storage().path(upload.partial_name)
+        self.assertTrue(os.path.exists(partial))
+        response, _ = self.delete_project()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deletion = purge_project(response.data['id'])
+
+        self.assertEqual(deletion.total_rows, 21)
+        self.assertEqual(deletion.deleted_files, 4)
+        self.assertFalse(DocumentUpload.objects.exists())
+        self.assertFalse(os.path.exists(partial))
+
+    def test_progress_only_for_requester(self):
+        response, _ = self.delete_project()
+        self.client.force_authenticate(self.member)
+        response = self.client.get(f'/api/projects/deletions/{response.data["id"]}/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_command_resumes_pending(self):
+        response, _ = self.delete_project()
+        ProjectDeletion.objects.filter(pk=response.data['id']).update(status='failed')
+
+        call_command('purge_deleted_projects', stdout=StringIO())
+
+        deletion = ProjectDeletion.objects.get(pk=response.data['id'])
+        self.assertEqual(deletion.status, 'completed')
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+
+
+class CloneProjectTest(TestCase):
+    """Clonación con tareas desplazadas e inserciones en bloque."""
+
+    def setUp(self):
+        self.leader = User.objects.create_user(
+            'lider@example.com', None, first_name='Ana', last_name='Torres'
+        )
+        self.member = User.objects.create_user(
+            'miembro@example.com', None, first_name='Luis', last_name='Rojas'
+        )
+        self.source = create_project(self.leader, title='Taller 2025-1', is_template=True)
+        Membership.objects.create(user=self.member, project=self.source)
+        self.client = APIClient()
+        self.client.force_authenticate(self.leader)
+
+    def add_tasks(self, count):
+        Task.objects.bulk_create([
+            Task(
+                project=self.source, name=f'Entrega {i}', description='-',
+                deadline=date(2025, 1, 10 + i % 15), priority='high' if i % 2 else 'low',
+                status='completed', created_by=self.leader, assigned_to=self.member
+            )
+            for i in range(count)
+        ])
+
+    def clone(self, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    f'/api/projects/{self.source.pk}/clone/', data, format='json'
+                )
+        return response, len(queries)
+
+    def test_clone_shifts_deadlines(self):
+        self.add_tasks(3)
+        response, _ = self.clone({'start_date': '2025-08-01', 'title': 'Taller 2025-2'})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['title'], 'Taller 2025-2')
+        self.assertEqual(response.data['end_date'], '2026-01-28')
+        self.assertFalse(response.data['is_template'])
+        self.assertEqual(response.data['tasks_count'], 3)
+        self.assertEqual(response.data['tasks_by_status']['pending'], 3)
+        self.assertEqual([m['user'] for m in response.data['members']], [self.leader.id])
+
+        tasks = Task.objects.filter(project_id=response.data['id']).order_by('id')
+        self.assertEqual(
+            [task.deadline for task in tasks],
+            [date(2025, 8, 10), date(2025, 8, 11), date(2025, 8, 12)]
+        )
+        self.assertTrue(all(task.assigned_to_id is None for task in tasks))
+
+    def test_clone_with_members(self):
+        self.add_tasks(4)
+        response, _ = self.clone({'start_date': '2025-08-01', 'include_members': True})
+
+        self.assertEqual(response.status_code, 201)
+        memberships = Membership.objects.filter(project_id=response.data['id'])
+        self.assertEqual(
+            dict(memberships.values_list('user_id', 'role')),
+            {self.leader.id: 'leader', self.member.id: 'member'}
+        )
+        self.assertEqual(memberships.get(user=self.member).open_tasks_count, 4)
+        self.assertEqual(MembershipResolver(self.member).role(response.data['id']), 'member')
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        self.add_tasks(5)
+        response, baseline = self.clone({'start_date': '2025-08-01'})
+        self.assertEqual(response.status_code, 201)
+
+        self.add_tasks(495)
+        started = time.monotonic()
+        response, queries = self.clone({'start_date': '2025-08-01'})
+        elapsed = time.monotonic() - started
+        self.assertEqual(response.data['tasks_count'], 500)
+        # Solo crecen los lotes de INSERT que arma bulk_create según el límite de parámetros
+        self.assertLess(queries, baseline + 10)
+        self.assertLess(elapsed, 1)
+
+    def test_members_only_by_leader(self):
+        self.client.force_authenticate(self.member)
+        response, _ = self.clone({'start_date': '2025-08-01'})
+        self.assertEqual(response.status_code, 201)
+
+        response, _ = self.clone({'start_date': '2025-08-01', 'include_members': True})
+        self.assertEqual(response.status_code, 403)
+
+        outsider = User.objects.create_user('otro@example.com', None)
+        self.client.force_authenticate(outsider)
+        response, _ = self.clone({'start_date': '2025-08-01'})
+        self.assertEqual(response.status_code, 403)
+
+
+class ActivityFeedTest(TestCase):
+    """Registro de actividad escrito desde las vistas y leído por cursor."""
+
+    def setUp(self):
+        self.leader = User.objects.create_user(
+            'lider@example.com', None, first_name='Ana', last_name='Torres'
+        )
+        self.member = User.objects.create_user(
+            'miembro@example.com', None, first_name='Luis', last_name='Rojas'
+        )
+        self.project = create_project(self.leader)
+        self.client = APIClient()
+        self.client.force_authenticate(self.leader)
+
+    def activity_url(self, **params):
+        query = '&'.join(f'{key}={value}' for key, value in params.items())
+        return f'/api/projects/{self.project.pk}/activity/?{query}'
+
+    def test_events_are_recorded(self):
+        self.client.force_authenticate(self.member)
+        self.client.post('/api/projects/join/', {'code': self.project.code})
+        self.client.force_authenticate(self.leader)
+
+        response = self.client.post(f'/api/tasks/project/{self.project.pk}/', {
+            'name': 'Informe', 'description': '-', 'deadline': '2029-01-01',
+            'assigned_to': self.member.id
+        })
+        task_id = response.data['id']
+        self.client.patch(f'/api/tasks/{task_id}/', {'priority': 'high', 'name': 'Informe'})
+        self.client.patch(f'/api/tasks/{task_id}/status/', {'status': 'in_progress'})
+        self.client.delete(f'/api/tasks/{task_id}/')
+
+        entries = list(Activity.objects.filter(project=self.project).order_by('id'))
+        self.assertEqual([entry.verb for entry in entries], [
+            Activity.MEMBERS_ADDED, Activity.TASK_CREATED, Activity.TASK_UPDATED,
+            Activity.TASK_STATUS_CHANGED, Activity.TASK_DELETED,
+        ])
+        self.assertEqual(entries[0].payload, {'users': [self.member.id]})
+        self.assertEqual(entries[2].payload['fields'], ['priority'])
+        self.assertEqual(entries[3].payload['new'], 'in_progress')
+        self.assertEqual(entries[4].actor, self.leader)
+
+    def test_cursor_and_since(self):
+        for i in range(7):
+            Activity.objects.create(
+                project=self.project, verb=Activity.TASK_CREATED, payload={'task': i}
+            )
+        ids = list(Activity.objects.order_by('id').values_list('id', flat=True))
+
+        with mock.patch('projects.views.ActivityCursorPagination.page_size', 5):
+            response = self.client.get(self.activity_url())
+        self.assertEqual([entry['id'] for entry in response.data['results']], ids[:1:-1])
+        self.assertIsNotNone(response.data['next'])
+
+        with mock.patch('projects.views.ACTIVITY_SYNC_LIMIT', 4):
+            response = self.client.get(self.activity_url(since=ids[1]))
+            self.assertEqual([entry['id'] for entry in response.data['results']], ids[2:6])
+            self.assertTrue(response.data['has_more'])
+
+            response = self.client.get(self.activity_url(since=response.data['cursor']))
+            self.assertEqual([entry['id'] for entry in response.data['results']], ids[6:])
+            self.assertFalse(response.data['has_more'])
+
+            response = self.client.get(self.activity_url(since=response.data['cursor']))
+            self.assertEqual(response.data, {'results': [], 'cursor': ids[-1], 'has_more': False})
+
+    def test_requires_membership(self):
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.client.get(self.activity_url()).status_code, 403)
+
+    def test_compaction_and_retention(self):
+        now = timezone.now()
+
+        def add(verb, days_ago, **payload):
+            entry = Activity.objects.create(project=self.project, verb=verb, payload=payload)
+            Activity.objects.filter(pk=entry.pk).update(created_at=now - timedelta(days=days_ago))
+            return entry.pk
+
+        add(Activity.TASK_CREATED, 400, task=1)
+        add(Activity.TASK_UPDATED, 60, task=1, fields=['name'])
+        add(Activity.TASK_UPDATED, 50, task=2, fields=['deadline'])
+        kept = add(Activity.TASK_UPDATED, 40, task=1, fields=['priority'])
+        recent = add(Activity.TASK_UPDATED, 1, task=1, fields=['description'])
+
+        call_command('compact_project_activity', stdout=StringIO())
+
+        entries = {entry.pk: entry for entry in Activity.objects.all()}
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries[kept].payload['fields'], ['name', 'priority'])
+        self.assertEqual(entries[recent].payload['fields'], ['description'])
+
+
+class ProjectSearchTest(TestCase):
+    """Búsqueda FTS5 restringida a los proyectos del usuario."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'lider@example.com', None, first_name='Ana', last_name='Torres'
+        )
+        self.other = User.objects.create_user('otro@example.com', None)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, query):
+        response = self.client.get('/api/projects/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [project['title'] for project in response.data['results']]
+
+    def add_project(self, user, title, description):
+        project = create_project(user, title=title)
+        project.description = description
+        project.save()
+
+    def test_ranking_prefix_and_membership(self):
+        self.add_project(self.user, 'Riego automatizado', 'Sensores de humedad')
+        self.add_project(self.user, 'Gestión de inventario', 'Control de riego en bodegas')
+        self.add_project(self.other, 'Riego por goteo', '-')
+
+        self.assertEqual(self.search('riego'), ['Riego automatizado', 'Gestión de inventario'])
+        self.assertEqual(self.search('rie'), ['Riego automatizado', 'Gestión de inventario'])
+        self.assertEqual(self.search('gestion inv'), ['Gestión de inventario'])
+        # La sintaxis de FTS5 se ignora
+        self.assertEqual(self.search('riego* "('), ['Riego automatizado', 'Gestión de inventario'])
+        self.assertEqual(self.search('drones'), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        project = create_project(self.user, title='Huerto escolar')
+        project.title = 'Compostaje escolar'
+        project.save()
+        self.assertEqual(self.search('huerto'), [])
+        self.assertEqual(self.search('compost'), ['Compostaje escolar'])
+
+        project_id = project.pk
+        project.delete()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM projects_project_fts WHERE rowid = %s', [project_id])
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_rebuild_command(self):
+        Project.objects.bulk_create([
+            Project(
+                title=f'Laboratorio {i}', description='-', general_objectives='-',
+                specific_objectives='-', start_date=date(2025, 1, 1),
+                end_date=date(2025, 6, 30), created_by=self.user, code=f'LAB00{i}'
+            )
+            for i in range(3)
+        ])
+        Membership.objects.bulk_create([
+            Membership(user=self.user, project=project, role='leader')
+            for project in Project.objects.all()
+        ])
+        self.assertEqual(self.search('laboratorio'), [])
+
+        call_command('rebuild_project_search', stdout=StringIO())
+        self.assertEqual(len(self.search('laboratorio')), 3)
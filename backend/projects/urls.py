@@ -3,11 +3,17 @@ from django.urls import path
 from .views import (
     ProjectListCreateView,
     ProjectDetailView,
+    ProjectExportPDFView,
+    ProjectDeletionView,
+    CloneProjectView,
+    ProjectActivityView,
     JoinProjectView,
     LeaveProjectView,
     ProjectMembersView,
     TransferLeadershipView,
-    RemoveMemberView
+    RemoveMemberView,
+    BulkAddMembersView,
+    BulkRemoveMembersView
 )
 
 app_name = 'projects'
@@ -16,6 +22,10 @@ urlpatterns = [
     # Proyectos CRUD
     path('', ProjectListCreateView.as_view(), name='list_create'),
     path('<int:pk>/', ProjectDetailView.as_view(), name='detail'),
+    path('<int:pk>/export/pdf/', ProjectExportPDFView.as_view(), name='export_pdf'),
+    path('<int:pk>/clone/', CloneProjectView.as_view(), name='clone'),
+    path('<int:pk>/activity/', ProjectActivityView.as_view(), name='activity'),
+    path('deletions/<int:pk>/', ProjectDeletionView.as_view(), name='deletion'),
     
     # Membresía
     path('join/', JoinProjectView.as_view(), name='join'),
@@ -23,4 +33,6 @@ urlpatterns = [
     path('<int:pk>/members/', ProjectMembersView.as_view(), name='members'),
     path('<int:pk>/transfer-leadership/', TransferLeadershipView.as_view(), name='transfer_leadership'),
     path('<int:pk>/remove-member/', RemoveMemberView.as_view(), name='remove_member'),
+    path('<int:pk>/members/bulk-add/', BulkAddMembersView.as_view(), name='bulk_add_members'),
+    path('<int:pk>/members/bulk-remove/', BulkRemoveMembersView.as_view(), name='bulk_remove_members'),
 ]
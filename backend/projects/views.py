@@ -1,19 +1,84 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.http import http_date, quote_etag
 from rest_framework import generics, status
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.db.models import Q, Count, OuterRef, Subquery, Prefetch, Case, When
+from django.db.models.functions import Coalesce
 
-from .models import Project, Membership
+from .models import Project, Membership, ProjectDeletion, Activity
+from . import activity, stats
+from .bulk import add_members, remove_members
+from .cloning import clone_project
+from .export import export_stamp, stream_project_pdf
+from .permissions import get_membership_resolver, IsProjectMember, IsProjectLeader
+from .purge import soft_delete
+from .search import get_backend as get_search_backend
 from .serializers import (
     ProjectListSerializer,
     ProjectDetailSerializer,
     ProjectCreateUpdateSerializer,
+    CloneProjectSerializer,
     JoinProjectSerializer,
-    MembershipSerializer
+    MembershipSerializer,
+    BulkAddMembersSerializer,
+    BulkRemoveMembersSerializer,
+    ProjectDeletionSerializer,
+    ActivitySerializer
 )
 
 
+# Resultados como máximo de ``?search=``
+SEARCH_LIMIT = getattr(settings, 'PROJECT_SEARCH_LIMIT', 200)
+
+# Entradas por respuesta al sincronizar con ``?since=``
+ACTIVITY_SYNC_LIMIT = getattr(settings, 'ACTIVITY_SYNC_LIMIT', 200)
+
+
+def project_detail_queryset():
+    """Proyectos preparados para ``ProjectDetailSerializer``.
+    
+    Los conteos de tareas se leen de ``ProjectStats`` y los miembros se
+    precargan junto a sus usuarios.
+    """
+    return Project.objects.select_related('created_by', 'stats').prefetch_related(
+        Prefetch('memberships', queryset=Membership.objects.select_related('user'))
+    )
+
+
+def project_list_queryset(request):
+    """Proyectos del usuario preparados para ``ProjectListSerializer``.
+    
+    El número de miembros (de ``ProjectStats``, o contado si el proyecto
+    aún no tiene estadísticas) y el rol del usuario se obtienen en la
+    misma consulta para evitar consultas por proyecto.
+    """
+    user_membership = Membership.objects.filter(
+        project=OuterRef('pk'),
+        user=request.user
+    )
+    return Project.objects.filter(
+        id__in=get_membership_resolver(request).project_ids()
+    ).select_related('created_by').annotate(
+        members_count=Coalesce(
+            'stats__members_count',
+            Subquery(
+                Membership.objects.filter(project=OuterRef('pk')).values(
+                    'project'
+                ).annotate(n=Count('id')).values('n')
+            ),
+            0
+        ),
+        user_role=Subquery(user_membership.values('role')[:1])
+    ).order_by('-created_at')
+
+
 class ProjectListCreateView(generics.ListCreateAPIView):
     """Vista para listar y crear proyectos."""
     
@@ -25,20 +90,41 @@ class ProjectListCreateView(generics.ListCreateAPIView):
         return ProjectListSerializer
     
     def get_queryset(self):
-        """Retorna proyectos donde el usuario es miembro."""
-        user = self.request.user
-        return Project.objects.filter(
-            memberships__user=user
-        ).distinct().order_by('-created_at')
+        """Retorna proyectos donde el usuario es miembro.
+        
+        ``?is_template=true`` o ``false`` filtra plantillas y ``?search=``
+        busca en el texto del proyecto (ver ``projects.search``), ordenando
+        por relevancia.
+        """
+        queryset = project_list_queryset(self.request)
+        is_template = self.request.query_params.get('is_template')
+        if is_template in ('true', 'false'):
+            queryset = queryset.filter(is_template=is_template == 'true')
+        
+        query = self.request.query_params.get('search', '').strip()
+        if query:
+            ids = get_search_backend().search(
+                query,
+                project_ids=get_membership_resolver(self.request).project_ids(),
+                limit=SEARCH_LIMIT
+            )
+            if not ids:
+                return queryset.none()
+            queryset = queryset.filter(id__in=ids).order_by(
+                Case(*[When(id=project_id, then=rank) for rank, project_id in enumerate(ids)])
+            )
+        return queryset
     
     def perform_create(self, serializer):
         """Crea el proyecto y asigna al creador como líder."""
-        project = serializer.save(created_by=self.request.user)
-        Membership.objects.create(
-            user=self.request.user,
-            project=project,
-            role='leader'
-        )
+        with transaction.atomic():
+            project = serializer.save(created_by=self.request.user)
+            Membership.objects.create(
+                user=self.request.user,
+                project=project,
+                role='leader'
+            )
+            stats.membership_added(project.id)
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -46,7 +132,7 @@ class ProjectListCreateView(generics.ListCreateAPIView):
         self.perform_create(serializer)
         
         # Retornar el proyecto con el serializer de detalle
-        project = Project.objects.get(pk=serializer.instance.pk)
+        project = project_detail_queryset().get(pk=serializer.instance.pk)
         return Response(
             ProjectDetailSerializer(project, context={'request': request}).data,
             status=status.HTTP_201_CREATED
@@ -65,18 +151,18 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def get_queryset(self):
         """Retorna proyectos donde el usuario es miembro."""
-        user = self.request.user
-        return Project.objects.filter(memberships__user=user).distinct()
+        queryset = Project.objects.all()
+        if self.request.method == 'GET':
+            queryset = project_detail_queryset()
+        return queryset.filter(
+            id__in=get_membership_resolver(self.request).project_ids()
+        )
     
     def update(self, request, *args, **kwargs):
         """Solo el líder puede actualizar el proyecto."""
         project = self.get_object()
-        membership = Membership.objects.filter(
-            user=request.user,
-            project=project
-        ).first()
         
-        if not membership or membership.role != 'leader':
+        if not get_membership_resolver(request).is_leader(project.id):
             return Response(
                 {'error': 'Solo el líder puede editar el proyecto.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -85,20 +171,101 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
         return super().update(request, *args, **kwargs)
     
     def destroy(self, request, *args, **kwargs):
-        """Solo el líder puede eliminar el proyecto."""
+        """Solo el líder puede eliminar el proyecto.
+        
+        El proyecto se oculta de inmediato y se purga en segundo plano; la
+        respuesta trae el registro con el que se consulta el avance.
+        """
         project = self.get_object()
-        membership = Membership.objects.filter(
-            user=request.user,
-            project=project
-        ).first()
         
-        if not membership or membership.role != 'leader':
+        if not get_membership_resolver(request).is_leader(project.id):
             return Response(
                 {'error': 'Solo el líder puede eliminar el proyecto.'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        return super().destroy(request, *args, **kwargs)
+        deletion = soft_delete(project, request.user)
+        return Response(
+            ProjectDeletionSerializer(deletion).data,
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class ProjectDeletionView(generics.RetrieveAPIView):
+    """Vista para consultar el avance de la eliminación de un proyecto."""
+    
+    permission_classes = [IsAuthenticated]
+    serializer_class = ProjectDeletionSerializer
+    
+    def get_queryset(self):
+        return ProjectDeletion.objects.filter(requested_by=self.request.user)
+
+
+class ProjectExportPDFView(APIView):
+    """Vista para exportar el proyecto a PDF.
+    
+    El PDF se genera en un hilo de exportación y se envía por partes; si el
+    proyecto no cambió desde la última exportación se sirve desde la caché.
+    """
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        if not get_membership_resolver(request).is_member(pk):
+            return Response(
+                {'error': 'Proyecto no encontrado.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        stamp = export_stamp(pk)
+        if stamp is None:
+            return Response(
+                {'error': 'Proyecto no encontrado.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        etag = quote_etag(f'{pk}-{stamp.timestamp()}')
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        response = StreamingHttpResponse(
+            stream_project_pdf(pk, stamp),
+            content_type='application/pdf'
+        )
+        response['Content-Disposition'] = f'attachment; filename="proyecto-{pk}.pdf"'
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stamp.timestamp())
+        return response
+
+
+class CloneProjectView(APIView):
+    """Vista para crear un proyecto nuevo a partir de otro o de una plantilla.
+    
+    Cualquier miembro puede clonar y queda como líder de la copia; copiar
+    también a los miembros requiere ser líder del original.
+    """
+    
+    permission_classes = [IsAuthenticated, IsProjectMember]
+    project_url_kwarg = 'pk'
+    
+    def post(self, request, pk):
+        source = get_object_or_404(Project, pk=pk)
+        serializer = CloneProjectSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        data = serializer.validated_data
+        if data['include_members'] and not get_membership_resolver(request).is_leader(pk):
+            return Response(
+                {'error': 'Solo el líder puede copiar a los miembros del proyecto.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        project = clone_project(source, request.user, **data)
+        project = project_detail_queryset().get(pk=project.pk)
+        return Response(
+            ProjectDetailSerializer(project, context={'request': request}).data,
+            status=status.HTTP_201_CREATED
+        )
 
 
 class JoinProjectView(APIView):
@@ -111,22 +278,27 @@ class JoinProjectView(APIView):
         serializer.is_valid(raise_exception=True)
         
         code = serializer.validated_data['code']
-        project = Project.objects.get(code=code)
+        project = Project.objects.get(code=code, deleted_at__isnull=True)
         
         # Verificar si ya es miembro
-        if Membership.objects.filter(user=request.user, project=project).exists():
+        if get_membership_resolver(request).is_member(project.id):
             return Response(
                 {'error': 'Ya eres miembro de este proyecto.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         # Crear membresía
-        Membership.objects.create(
-            user=request.user,
-            project=project,
-            role='member'
-        )
+        with transaction.atomic():
+            Membership.objects.create(
+                user=request.user,
+                project=project,
+                role='member'
+            )
+            stats.membership_added(project.id)
+            stats.recount_member_load(project.id, [request.user.id])
+            activity.members_added(project.id, request.user, [request.user.id])
         
+        project = project_detail_queryset().get(pk=project.pk)
         return Response({
             'message': 'Te has unido al proyecto exitosamente.',
             'project': ProjectDetailSerializer(project, context={'request': request}).data
@@ -147,25 +319,26 @@ class LeaveProjectView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        membership = Membership.objects.filter(
-            user=request.user,
-            project=project
-        ).first()
+        role = get_membership_resolver(request).role(project.id)
         
-        if not membership:
+        if not role:
             return Response(
                 {'error': 'No eres miembro de este proyecto.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         # El líder no puede abandonar, debe transferir liderazgo o eliminar
-        if membership.role == 'leader':
+        if role == 'leader':
             return Response(
                 {'error': 'El líder no puede abandonar el proyecto. Transfiere el liderazgo o elimina el proyecto.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        membership.delete()
+        with transaction.atomic():
+            Membership.objects.filter(user=request.user, project=project).delete()
+            stats.membership_removed(project.id)
+            activity.members_removed(project.id, request.user, [request.user.id])
+            Membership.notify_changed(project.id, [request.user.id])
         
         return Response({
             'message': 'Has abandonado el proyecto exitosamente.'
@@ -180,13 +353,12 @@ class ProjectMembersView(generics.ListAPIView):
     
     def get_queryset(self):
         project_id = self.kwargs.get('pk')
-        user = self.request.user
         
         # Verificar que el usuario sea miembro
-        if not Membership.objects.filter(user=user, project_id=project_id).exists():
+        if not get_membership_resolver(self.request).is_member(project_id):
             return Membership.objects.none()
         
-        return Membership.objects.filter(project_id=project_id)
+        return Membership.objects.filter(project_id=project_id).select_related('user')
 
 
 class TransferLeadershipView(APIView):
@@ -204,13 +376,7 @@ class TransferLeadershipView(APIView):
             )
         
         # Verificar que sea el líder actual
-        current_membership = Membership.objects.filter(
-            user=request.user,
-            project=project,
-            role='leader'
-        ).first()
-        
-        if not current_membership:
+        if not get_membership_resolver(request).is_leader(project.id):
             return Response(
                 {'error': 'Solo el líder puede transferir el liderazgo.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -236,11 +402,18 @@ class TransferLeadershipView(APIView):
             )
         
         # Transferir liderazgo
-        current_membership.role = 'member'
-        current_membership.save()
-        
-        new_leader_membership.role = 'leader'
-        new_leader_membership.save()
+        with transaction.atomic():
+            Membership.objects.filter(
+                user=request.user,
+                project=project
+            ).update(role='member')
+            # ``update`` no pasa por ``save``: avisar del cambio del líder saliente
+            Membership.notify_changed(project.id, [request.user.id])
+            
+            new_leader_membership.role = 'leader'
+            new_leader_membership.save()
+            stats.touch(project.id)
+            activity.leader_changed(project.id, request.user, new_leader_membership.user_id)
         
         return Response({
             'message': 'Liderazgo transferido exitosamente.'
@@ -262,13 +435,7 @@ class RemoveMemberView(APIView):
             )
         
         # Verificar que sea el líder
-        leader_membership = Membership.objects.filter(
-            user=request.user,
-            project=project,
-            role='leader'
-        ).first()
-        
-        if not leader_membership:
+        if not get_membership_resolver(request).is_leader(project.id):
             return Response(
                 {'error': 'Solo el líder puede remover miembros.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -300,8 +467,102 @@ class RemoveMemberView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        membership_to_remove.delete()
+        with transaction.atomic():
+            membership_to_remove.delete()
+            stats.membership_removed(project.id)
+            activity.members_removed(project.id, request.user, [membership_to_remove.user_id])
         
         return Response({
             'message': 'Miembro removido exitosamente.'
         }, status=status.HTTP_200_OK)
+
+
+class BulkAddMembersView(APIView):
+    """Vista para que el líder agregue varios miembros por correo o CSV."""
+    
+    permission_classes = [IsAuthenticated, IsProjectLeader]
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    project_url_kwarg = 'pk'
+    
+    def post(self, request, pk):
+        project = get_object_or_404(Project, pk=pk)
+        serializer = BulkAddMembersSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        results, summary = add_members(
+            project, serializer.validated_data['emails'], request.user
+        )
+        return Response({
+            'message': f'Se agregaron {summary.get("added", 0)} miembros.',
+            'summary': summary,
+            'results': results
+        }, status=status.HTTP_200_OK)
+
+
+class BulkRemoveMembersView(APIView):
+    """Vista para que el líder remueva varios miembros a la vez."""
+    
+    permission_classes = [IsAuthenticated, IsProjectLeader]
+    project_url_kwarg = 'pk'
+    
+    def post(self, request, pk):
+        project = get_object_or_404(Project, pk=pk)
+        serializer = BulkRemoveMembersSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        results, summary = remove_members(
+            project, serializer.validated_data['user_ids'], request.user
+        )
+        return Response({
+            'message': f'Se removieron {summary.get("removed", 0)} miembros.',
+            'summary': summary,
+            'results': results
+        }, status=status.HTTP_200_OK)
+
+
+class ActivityCursorPagination(CursorPagination):
+    """Páginas del registro de actividad, de la entrada más nueva a la más antigua."""
+    
+    ordering = '-id'
+    page_size = 50
+
+
+class ProjectActivityView(generics.ListAPIView):
+    """Vista del registro de actividad de un proyecto.
+    
+    Sin parámetros pagina hacia atrás con cursor. Con ``?since=<id>``
+    retorna en orden ascendente las entradas posteriores a ``id`` (hasta
+    ``ACTIVITY_SYNC_LIMIT``) y el ``cursor`` para la siguiente sincronización.
+    """
+    
+    permission_classes = [IsAuthenticated, IsProjectMember]
+    serializer_class = ActivitySerializer
+    pagination_class = ActivityCursorPagination
+    project_url_kwarg = 'pk'
+    
+    def get_queryset(self):
+        return Activity.objects.filter(project_id=self.kwargs['pk']).select_related('actor')
+    
+    def list(self, request, *args, **kwargs):
+        since = request.query_params.get('since')
+        if since is None:
+            return super().list(request, *args, **kwargs)
+        
+        try:
+            since = int(since)
+        except ValueError:
+            return Response(
+                {'error': 'El parámetro since debe ser un ID de actividad.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        entries = list(
+            self.get_queryset().filter(id__gt=since).order_by('id')[:ACTIVITY_SYNC_LIMIT + 1]
+        )
+        has_more = len(entries) > ACTIVITY_SYNC_LIMIT
+        entries = entries[:ACTIVITY_SYNC_LIMIT]
+        return Response({
+            'results': self.get_serializer(entries, many=True).data,
+            'cursor': entries[-1].id if entries else since,
+            'has_more': has_more
+        })
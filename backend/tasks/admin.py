@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Task, TaskDocument
+from .models import Task, TaskDocument, TaskReminder, DocumentBlob, DocumentUpload
 
 
 class TaskDocumentInline(admin.TabularInline):
@@ -37,3 +37,35 @@ class TaskDocumentAdmin(admin.ModelAdmin):
     search_fields = ('name', 'task__name', 'uploaded_by__email')
     ordering = ('-uploaded_at',)
     readonly_fields = ('uploaded_at',)
+
+
+@admin.register(TaskReminder)
+class TaskReminderAdmin(admin.ModelAdmin):
+    """Admin para recordatorios enviados."""
+    
+    list_display = ('task', 'user', 'kind', 'deadline', 'sent_at')
+    list_filter = ('kind', 'sent_at')
+    search_fields = ('task__name', 'user__email')
+    ordering = ('-sent_at',)
+    raw_id_fields = ('task', 'user')
+
+
+@admin.register(DocumentBlob)
+class DocumentBlobAdmin(admin.ModelAdmin):
+    """Admin para contenidos deduplicados de documentos."""
+    
+    list_display = ('sha256', 'size', 'ref_count', 'created_at')
+    search_fields = ('sha256',)
+    ordering = ('-created_at',)
+    readonly_fields = ('sha256', 'size', 'ref_count', 'created_at')
+
+
+@admin.register(DocumentUpload)
+class DocumentUploadAdmin(admin.ModelAdmin):
+    """Admin para subidas de documentos por partes."""
+    
+    list_display = ('filename', 'task', 'uploaded_by', 'received', 'size', 'document', 'updated_at')
+    search_fields = ('filename', 'task__name', 'uploaded_by__email')
+    ordering = ('-updated_at',)
+    raw_id_fields = ('task', 'uploaded_by', 'document')
+    readonly_fields = ('received', 'created_at', 'updated_at')
@@ -0,0 +1,184 @@
+"""Creación, edición y cambio de estado de tareas en bloque.
+
+``apply_changes`` valida cada elemento por separado, comprueba los
+asignados contra las membresías del proyecto cargadas una sola vez y
+escribe todo con ``bulk_create``/``bulk_update`` en una transacción. Las
+estadísticas y el registro de actividad se actualizan una vez por
+operación y ``tasks_changed`` avisa al confirmar. El resultado incluye el
+estado de cada elemento, igual que ``projects.bulk``.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from projects import activity, stats
+from projects.models import Activity, Membership
+from .models import Task
+from .serializers import (
+    BulkTaskCreateItemSerializer,
+    BulkTaskUpdateItemSerializer,
+    BulkTaskStatusItemSerializer
+)
+from .signals import tasks_changed
+
+
+MESSAGES = {
+    'created': 'Tarea creada.',
+    'updated': 'Tarea actualizada.',
+    'unchanged': 'Sin cambios.',
+    'invalid': 'Datos inválidos.',
+    'not_found': 'La tarea no existe en este proyecto.',
+    'not_member': 'El usuario asignado debe ser miembro del proyecto.',
+    'forbidden': 'No tienes permiso para esta operación.',
+    'duplicate': 'Tarea repetida en la lista.',
+}
+
+def _result(op, row, status, **fields):
+    return {'op': op, 'row': row, **fields, 'status': status, 'message': MESSAGES[status]}
+
+
+def _summary(results):
+    summary = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    return summary
+
+
+def _validate(serializer_class, items, op, results):
+    """Elementos válidos como ``(row, datos)``; los inválidos van a ``results``."""
+    valid = []
+    for row, item in enumerate(items, start=1):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            valid.append((row, serializer.validated_data))
+        else:
+            results.append(_result(op, row, 'invalid', id=item.get('id'), errors=serializer.errors))
+    return valid
+
+
+def _set_status(task, status):
+    """Cambia el estado con la misma lógica de ``TaskStatusSerializer``."""
+    if status == 'completed' and task.status != 'completed':
+        task.completed_at = timezone.now()
+    elif status != 'completed':
+        task.completed_at = None
+    task.status = status
+
+
+def apply_changes(project, user, creates=(), updates=(), statuses=()):
+    """Aplica las listas de cambios sobre tareas de ``project``.
+
+    Crear y editar requiere ser líder; el estado lo puede cambiar el líder
+    o la persona asignada. Retorna ``(results, summary)``.
+    """
+    results = []
+    creates = _validate(BulkTaskCreateItemSerializer, creates, 'create', results)
+    updates = _validate(BulkTaskUpdateItemSerializer, updates, 'update', results)
+    statuses = _validate(BulkTaskStatusItemSerializer, statuses, 'status', results)
+
+    with transaction.atomic():
+        members = dict(Membership.objects.filter(project=project).values_list('user_id', 'role'))
+        is_leader = members.get(user.id) == 'leader'
+
+        ids = {data['id'] for _, data in updates} | {data['id'] for _, data in statuses}
+        tasks = Task.objects.filter(project=project, id__in=ids).in_bulk() if ids else {}
+        snapshots = {task_id: stats.task_snapshot(task) for task_id, task in tasks.items()}
+        # Asignación antes de aplicar las ediciones de esta misma operación
+        assignees = {task_id: task.assigned_to_id for task_id, task in tasks.items()}
+
+        new = []
+        events = []
+        for row, data in creates:
+            assignee = data.get('assigned_to')
+            if not is_leader:
+                results.append(_result('create', row, 'forbidden'))
+            elif assignee is not None and assignee not in members:
+                results.append(_result('create', row, 'not_member'))
+            else:
+                values = {field: value for field, value in data.items() if field != 'assigned_to'}
+                new.append((row, Task(
+                    project=project, created_by=user, assigned_to_id=assignee, **values
+                )))
+
+        changed = {}
+        fields = set()
+        seen = set()
+        for row, data in updates:
+            task = tasks.get(data['id'])
+            assignee = data.get('assigned_to', None)
+            if not is_leader:
+                results.append(_result('update', row, 'forbidden', id=data['id']))
+            elif task is None:
+                results.append(_result('update', row, 'not_found', id=data['id']))
+            elif data['id'] in seen:
+                results.append(_result('update', row, 'duplicate', id=data['id']))
+            elif assignee is not None and assignee not in members:
+                results.append(_result('update', row, 'not_member', id=task.id))
+            else:
+                seen.add(task.id)
+                values = {
+                    ('assigned_to_id' if field == 'assigned_to' else field): value
+                    for field, value in data.items() if field != 'id'
+                }
+                diff = sorted(
+                    field.removesuffix('_id') for field, value in values.items()
+                    if getattr(task, field) != value
+                )
+                for field, value in values.items():
+                    setattr(task, field, value)
+                if diff:
+                    changed[task.id] = task
+                    fields.update(diff)
+                    events.append((Activity.TASK_UPDATED, {
+                        'task': task.id, 'name': task.name, 'fields': diff
+                    }))
+                results.append(_result('update', row, 'updated' if diff else 'unchanged', id=task.id))
+
+        seen = set()
+        for row, data in statuses:
+            task = tasks.get(data['id'])
+            if task is None:
+                results.append(_result('status', row, 'not_found', id=data['id']))
+            elif data['id'] in seen:
+                results.append(_result('status', row, 'duplicate', id=data['id']))
+            elif not is_leader and assignees[task.id] != user.id:
+                results.append(_result('status', row, 'forbidden', id=task.id))
+            elif task.status == data['status']:
+                seen.add(task.id)
+                results.append(_result('status', row, 'unchanged', id=task.id))
+            else:
+                seen.add(task.id)
+                old_status = task.status
+                _set_status(task, data['status'])
+                changed[task.id] = task
+                fields.update(['status', 'completed_at'])
+                events.append((Activity.TASK_STATUS_CHANGED, {
+                    'task': task.id, 'name': task.name, 'old': old_status, 'new': task.status
+                }))
+                results.append(_result('status', row, 'updated', id=task.id))
+
+        if new:
+            Task.objects.bulk_create([task for _, task in new])
+            for row, task in new:
+                events.append((Activity.TASK_CREATED, {'task': task.id, 'name': task.name}))
+                results.append(_result('create', row, 'created', id=task.id))
+        if changed:
+            now = timezone.now()
+            for task in changed.values():
+                task.updated_at = now
+            Task.objects.bulk_update(list(changed.values()), sorted(fields) + ['updated_at'])
+
+        if new or changed:
+            stats.tasks_applied(
+                project.id,
+                created=[task for _, task in new],
+                changed=[(task, snapshots[task.id]) for task in changed.values()]
+            )
+            activity.record_many(project.id, user, events)
+            task_ids = [task.id for _, task in new] + list(changed)
+            transaction.on_commit(lambda: tasks_changed.send(
+                sender=Task, project_id=project.id, task_ids=task_ids
+            ))
+
+    order = {'create': 0, 'update': 1, 'status': 2}
+    results.sort(key=lambda result: (order[result['op']], result['row']))
+    return results, _summary(results)
@@ -0,0 +1,186 @@
+"""Filtros, orden, paginación por clave y facetas de las listas de tareas.
+
+``TaskListCreateView`` y ``MyTasksView`` validan los parámetros con
+``TaskListQuerySerializer`` y usan estas funciones. La paginación es por
+clave (*keyset*): el cursor guarda el valor de la columna de orden y el ID
+de la última tarea de la página, y la siguiente página se pide con
+``WHERE (clave, id) > (valor, último_id)``. Así cada página cuesta lo mismo
+sin importar cuántas haya antes, a diferencia de ``OFFSET``.
+
+Las facetas cuentan tareas por estado y por prioridad en una sola consulta.
+Cada faceta ignora su propio filtro, de modo que con ``status=pending`` los
+conteos por estado siguen mostrando cuántas hay en las otras columnas.
+"""
+import base64
+import binascii
+import json
+from datetime import date
+
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.utils.dateparse import parse_datetime
+
+from .models import Task
+
+
+# Rango de prioridad para ordenar de la más a la menos urgente
+PRIORITY_RANK = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+# Clave de orden -> expresión anotada como ``sort_value`` (o campo del modelo)
+SORTS = {
+    'created_at': F('created_at'),
+    'deadline': F('deadline'),
+    'name': F('name'),
+    'priority': Case(
+        *[When(priority=priority, then=Value(rank)) for priority, rank in PRIORITY_RANK.items()],
+        output_field=IntegerField()
+    ),
+    'project': F('project__title'),
+}
+
+DEFAULT_SORT = '-created_at'
+
+
+def _parse_datetime(value):
+    parsed = parse_datetime(value)
+    if parsed is None or parsed.tzinfo is None:
+        raise ValueError(value)
+    return parsed
+
+
+def _parse_int(value):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError(value)
+    return value
+
+
+def _parse_str(value):
+    if not isinstance(value, str):
+        raise TypeError(value)
+    return value
+
+
+# Clave de orden -> conversión del valor guardado en el cursor
+CURSOR_VALUES = {
+    'created_at': lambda value: _parse_datetime(_parse_str(value)),
+    'deadline': lambda value: date.fromisoformat(_parse_str(value)),
+    'name': _parse_str,
+    'priority': _parse_int,
+    'project': _parse_str,
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def sort_choices():
+    """Valores aceptados en ``?sort=``: cada clave, ascendente o descendente."""
+    return sorted(SORTS) + sorted(f'-{key}' for key in SORTS)
+
+
+def filter_tasks(queryset, params, user, facets=()):
+    """Aplica los filtros de ``params`` salvo los indicados en ``facets``.
+
+    ``params`` son los datos validados de ``TaskListQuerySerializer``.
+    """
+    if params.get('status') and 'status' not in facets:
+        queryset = queryset.filter(status__in=params['status'])
+    if params.get('priority') and 'priority' not in facets:
+        queryset = queryset.filter(priority__in=params['priority'])
+    if params.get('deadline_after'):
+        queryset = queryset.filter(deadline__gte=params['deadline_after'])
+    if params.get('deadline_before'):
+        queryset = queryset.filter(deadline__lte=params['deadline_before'])
+    if params.get('project'):
+        queryset = queryset.filter(project_id=params['project'])
+    if params.get('search'):
+        queryset = queryset.filter(
+            Q(name__icontains=params['search']) | Q(project__title__icontains=params['search'])
+        )
+
+    assigned_to = params.get('assigned_to')
+    if assigned_to == 'none':
+        queryset = queryset.filter(assigned_to__isnull=True)
+    elif assigned_to == 'me':
+        queryset = queryset.filter(assigned_to=user)
+    elif assigned_to:
+        queryset = queryset.filter(assigned_to_id=int(assigned_to))
+    return queryset
+
+
+def facet_counts(queryset, params, user):
+    """Totales por estado y por prioridad y el total filtrado.
+
+    Una sola agregación: la base lleva todos los filtros salvo estado y
+    prioridad, y cada conteo aplica el filtro de la otra faceta.
+    """
+    base = filter_tasks(queryset, params, user, facets=('status', 'priority'))
+    status_q = Q(status__in=params['status']) if params.get('status') else Q()
+    priority_q = Q(priority__in=params['priority']) if params.get('priority') else Q()
+
+    aggregates = {'total': Count('id', filter=status_q & priority_q)}
+    for value, _ in Task.STATUS_CHOICES:
+        aggregates[f'status_{value}'] = Count('id', filter=Q(status=value) & priority_q)
+    for value, _ in Task.PRIORITY_CHOICES:
+        aggregates[f'priority_{value}'] = Count('id', filter=Q(priority=value) & status_q)
+    counts = base.order_by().aggregate(**aggregates)
+
+    return {
+        'total': counts['total'],
+        'status': {value: counts[f'status_{value}'] for value, _ in Task.STATUS_CHOICES},
+        'priority': {value: counts[f'priority_{value}'] for value, _ in Task.PRIORITY_CHOICES},
+    }
+
+
+def encode_cursor(sort, task):
+    value = task.sort_value
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    data = json.dumps([sort, value, task.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(sort, cursor):
+    """``(valor, id)`` del cursor; falla si no corresponde a ``sort``."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, task_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursor('Cursor inválido.')
+    if cursor_sort != sort or isinstance(task_id, bool) or not isinstance(task_id, int):
+        raise InvalidCursor('El cursor no corresponde al orden solicitado.')
+    # El cursor llega del cliente: un valor alterado no debe llegar al ORM
+    try:
+        value = CURSOR_VALUES[sort.lstrip('-')](value)
+    except (TypeError, ValueError):
+        raise InvalidCursor('Cursor inválido.')
+    return value, task_id
+
+
+def keyset_page(queryset, sort, cursor=None, page_size=10):
+    """Una página de ``queryset`` ordenada por ``sort`` y el cursor siguiente.
+
+    El ID desempata valores repetidos, por lo que el orden es total y
+    ninguna tarea se repite ni se salta entre páginas.
+    """
+    descending = sort.startswith('-')
+    key = sort.lstrip('-')
+    queryset = queryset.annotate(sort_value=SORTS[key])
+    if descending:
+        queryset = queryset.order_by('-sort_value', '-id')
+    else:
+        queryset = queryset.order_by('sort_value', 'id')
+
+    if cursor:
+        value, last_id = decode_cursor(sort, cursor)
+        if descending:
+            after = Q(sort_value__lt=value) | Q(sort_value=value, id__lt=last_id)
+        else:
+            after = Q(sort_value__gt=value) | Q(sort_value=value, id__gt=last_id)
+        queryset = queryset.filter(after)
+
+    tasks = list(queryset[:page_size + 1])
+    has_more = len(tasks) > page_size
+    tasks = tasks[:page_size]
+    next_cursor = encode_cursor(sort, tasks[-1]) if has_more else None
+    return tasks, next_cursor
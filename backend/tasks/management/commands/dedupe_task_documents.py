@@ -0,0 +1,115 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import DocumentBlob, DocumentUpload, TaskDocument
+from tasks.storage import BLOB_PREFIX, ContentAddressedStorage, blob_digest
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GB'
+
+
+class Command(BaseCommand):
+    """Convierte los documentos con nombre anterior al almacenamiento por contenido.
+
+    Cada archivo se lee una vez para calcular su hash: si el contenido es
+    nuevo se mueve a ``tasks/blobs/``; si ya estaba guardado se borra. Al
+    final se eliminan los blobs sin referencias (p. ej. de subidas cuya
+    transacción se revirtió) y los archivos parciales de subidas por partes
+    que ya no existen. Informa los bytes liberados.
+    """
+
+    help = 'Deduplica los archivos de documentos de tareas por su contenido'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Solo calcular los bytes que se liberarían'
+        )
+        parser.add_argument(
+            '--orphan-age', type=int, default=3600,
+            help='Segundos mínimos de antigüedad para borrar un blob sin referencias'
+        )
+
+    def handle(self, *args, **options):
+        storage = TaskDocument._meta.get_field('file').storage
+        if not isinstance(storage, ContentAddressedStorage):
+            raise CommandError(
+                "STORAGES['task_documents'] debe usar tasks.storage.ContentAddressedStorage."
+            )
+        self.storage = storage
+        self.dry_run = options['dry_run']
+
+        documents = {}
+        legacy = TaskDocument.objects.exclude(file__startswith=f'{BLOB_PREFIX}/').exclude(file='')
+        for document_id, name in legacy.values_list('id', 'file').order_by('id').iterator():
+            documents.setdefault(name, []).append(document_id)
+
+        converted = duplicates = missing = reclaimed = 0
+        seen = set(DocumentBlob.objects.values_list('sha256', flat=True))
+        for name, ids in documents.items():
+            if not storage.exists(name):
+                missing += 1
+                self.stderr.write(f'Archivo no encontrado: {name}')
+                continue
+
+            if self.dry_run:
+                digest, size = storage.file_digest(name)
+                freed = size if digest in seen else 0
+                seen.add(digest)
+            else:
+                _, freed = storage.adopt(
+                    name, lambda new_name: self.point_to(ids, name, new_name), len(ids)
+                )
+            converted += len(ids)
+            duplicates += bool(freed)
+            reclaimed += freed
+
+        orphans, orphan_bytes = self.remove_orphans(options['orphan_age'])
+        reclaimed += orphan_bytes
+
+        prefix = '[simulación] ' if self.dry_run else ''
+        self.stdout.write(f'{prefix}Documentos convertidos: {converted}')
+        self.stdout.write(f'{prefix}Archivos duplicados eliminados: {duplicates}')
+        self.stdout.write(f'{prefix}Archivos sin referencias eliminados: {orphans}')
+        if missing:
+            self.stdout.write(f'{prefix}Archivos faltantes: {missing}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Bytes liberados: {reclaimed} ({format_bytes(reclaimed)})'
+        ))
+
+    def point_to(self, ids, old_name, new_name):
+        TaskDocument.objects.filter(id__in=ids, original_filename='').update(
+            original_filename=os.path.basename(old_name)
+        )
+        TaskDocument.objects.filter(id__in=ids).update(file=new_name)
+
+    def remove_orphans(self, min_age):
+        """Blobs, temporales y parciales sin fila; retorna ``(archivos, bytes)``."""
+        blobs = set(DocumentBlob.objects.values_list('sha256', flat=True))
+        partials = {
+            upload.partial_name
+            for upload in DocumentUpload.objects.filter(document__isnull=True).only('id')
+        }
+        cutoff = time.time() - min_age
+        count = size = 0
+        for prefix, referenced in ((BLOB_PREFIX, lambda name: blob_digest(name) in blobs),
+                                   ('tasks/uploads', lambda name: name in partials)):
+            root = self.storage.path(prefix)
+            for directory, _, filenames in os.walk(root):
+                for filename in filenames:
+                    path = os.path.join(directory, filename)
+                    name = os.path.relpath(path, self.storage.location).replace(os.sep, '/')
+                    if referenced(name) or os.path.getmtime(path) > cutoff:
+                        continue
+                    count += 1
+                    size += os.path.getsize(path)
+                    if not self.dry_run:
+                        os.remove(path)
+        return count, size
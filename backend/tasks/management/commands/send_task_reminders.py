@@ -0,0 +1,37 @@
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand
+
+from tasks.reminders import INTERVAL, send_due_reminders
+
+
+class Command(BaseCommand):
+    """Envía los recordatorios de fechas límite pendientes.
+
+    Pensado para un channel layer compartido entre procesos (p. ej. Redis):
+    con ``InMemoryChannelLayer`` los eventos no llegan al servidor ASGI y el
+    ciclo de ``tasks.reminders`` ya corre dentro de él.
+    """
+
+    help = 'Envía por WebSocket los recordatorios de tareas por vencer y vencidas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Repetir indefinidamente cada --interval segundos'
+        )
+        parser.add_argument(
+            '--interval', type=int, default=INTERVAL or 300,
+            help='Segundos entre revisiones con --loop'
+        )
+
+    def handle(self, *args, **options):
+        channel_layer = get_channel_layer()
+        while True:
+            sent = async_to_sync(send_due_reminders)(channel_layer)
+            self.stdout.write(f'Recordatorios enviados: {sent}')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('due_soon', 'Vence pronto'), ('overdue', 'Vencida')], max_length=10, verbose_name='tipo')),
+                ('deadline', models.DateField(verbose_name='fecha límite avisada')),
+                ('sent_at', models.DateTimeField(verbose_name='fecha de envío')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='tasks.task', verbose_name='tarea')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_reminders', to=settings.AUTH_USER_MODEL, verbose_name='usuario')),
+            ],
+            options={
+                'verbose_name': 'recordatorio',
+                'verbose_name_plural': 'recordatorios',
+                'constraints': [models.UniqueConstraint(fields=('task', 'user', 'kind', 'deadline'), name='task_reminder_unique')],
+            },
+        ),
+    ]
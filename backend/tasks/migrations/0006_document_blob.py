@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:12
+
+import tasks.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_reminder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('size', models.BigIntegerField(verbose_name='tamaño')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='referencias')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='fecha de creación')),
+            ],
+            options={
+                'verbose_name': 'contenido de documento',
+                'verbose_name_plural': 'contenidos de documentos',
+            },
+        ),
+        migrations.AddField(
+            model_name='taskdocument',
+            name='original_filename',
+            field=models.CharField(blank=True, max_length=255, verbose_name='nombre de archivo original'),
+        ),
+        migrations.AlterField(
+            model_name='taskdocument',
+            name='file',
+            field=models.FileField(storage=tasks.models.task_document_storage, upload_to=tasks.models.task_document_path, verbose_name='archivo'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:22
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_document_blob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, verbose_name='nombre')),
+                ('filename', models.CharField(max_length=255, verbose_name='nombre de archivo')),
+                ('size', models.PositiveBigIntegerField(verbose_name='tamaño')),
+                ('sha256', models.CharField(blank=True, max_length=64, verbose_name='SHA-256 esperado')),
+                ('received', models.PositiveBigIntegerField(default=0, verbose_name='bytes recibidos')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='última actividad')),
+                ('document', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tasks.taskdocument', verbose_name='documento')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='tasks.task', verbose_name='tarea')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_uploads', to=settings.AUTH_USER_MODEL, verbose_name='subido por')),
+            ],
+            options={
+                'verbose_name': 'subida de documento',
+                'verbose_name_plural': 'subidas de documentos',
+                'indexes': [models.Index(fields=['updated_at'], name='task_upload_updated_idx')],
+            },
+        ),
+    ]
@@ -1,14 +1,29 @@
 import os
+import uuid
 from django.db import models
+from django.db.models import F
 from django.conf import settings
+from django.core.files.storage import storages
 from projects.models import Project
 
 
 def task_document_path(instance, filename):
-    """Genera la ruta para guardar documentos de tarea."""
+    """Genera la ruta para guardar documentos de tarea.
+    
+    Con ``ContentAddressedStorage`` es solo el nombre propuesto: el archivo
+    se guarda según el hash de su contenido, por eso aquí se conserva el
+    nombre original.
+    """
+    if not instance.original_filename:
+        instance.original_filename = os.path.basename(filename)
     return f'tasks/{instance.task.project.id}/{instance.task.id}/{filename}'
 
 
+def task_document_storage():
+    """Almacenamiento de documentos configurado en ``STORAGES['task_documents']``."""
+    return storages['task_documents']
+
+
 class Task(models.Model):
     """Modelo para tareas dentro de un proyecto."""
     
@@ -68,6 +83,22 @@ class Task(models.Model):
         verbose_name = 'tarea'
         verbose_name_plural = 'tareas'
         ordering = ['-created_at']
+        indexes = [
+            # Tareas de un proyecto por estado
+            models.Index(fields=['project', 'status'], name='task_project_status_idx'),
+            # "Mis tareas": asignadas al usuario, de la más reciente a la más antigua
+            models.Index(fields=['assigned_to', '-created_at'], name='task_assignee_created_idx'),
+            # Listas paginadas por cursor ordenadas por fecha límite (SQLite
+            # agrega el rowid al final del índice y así desempata por ID)
+            models.Index(fields=['project', 'deadline'], name='task_project_deadline_idx'),
+            models.Index(fields=['assigned_to', 'deadline'], name='task_assignee_deadline_idx'),
+            # Vencimientos: solo interesan las tareas abiertas
+            models.Index(
+                fields=['deadline'],
+                condition=~models.Q(status='completed'),
+                name='task_open_deadline_idx',
+            ),
+        ]
     
     def __str__(self):
         return f'{self.name} - {self.project.title}'
@@ -84,9 +115,11 @@ class TaskDocument(models.Model):
     )
     file = models.FileField(
         'archivo',
-        upload_to=task_document_path
+        upload_to=task_document_path,
+        storage=task_document_storage
     )
     name = models.CharField('nombre', max_length=255)
+    original_filename = models.CharField('nombre de archivo original', max_length=255, blank=True)
     uploaded_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -104,4 +137,138 @@ class TaskDocument(models.Model):
         return self.name
     
     def filename(self):
-        return os.path.basename(self.file.name)
+        return self.original_filename or os.path.basename(self.file.name)
+
+
+class DocumentBlob(models.Model):
+    """Contenido almacenado una sola vez por ``ContentAddressedStorage``.
+    
+    ``ref_count`` cuenta los documentos que apuntan al archivo; al llegar a
+    cero se borran la fila y el archivo.
+    """
+    
+    sha256 = models.CharField('SHA-256', max_length=64, unique=True)
+    size = models.BigIntegerField('tamaño')
+    ref_count = models.PositiveIntegerField('referencias', default=0)
+    created_at = models.DateTimeField('fecha de creación', auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'contenido de documento'
+        verbose_name_plural = 'contenidos de documentos'
+    
+    def __str__(self):
+        return self.sha256
+    
+    @classmethod
+    def acquire(cls, sha256, size, count=1):
+        """Suma ``count`` referencias; retorna ``True`` si el contenido es nuevo."""
+        blob, created = cls.objects.get_or_create(
+            sha256=sha256, defaults={'size': size, 'ref_count': count}
+        )
+        if not created:
+            cls.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + count)
+        return created
+    
+    @classmethod
+    def release(cls, sha256):
+        """Resta una referencia; retorna ``True`` si era la última."""
+        cls.objects.filter(sha256=sha256, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+        deleted, _ = cls.objects.filter(sha256=sha256, ref_count=0).delete()
+        return bool(deleted)
+
+
+class TaskReminder(models.Model):
+    """Recordatorio de fecha límite ya enviado a un usuario.
+    
+    Evita repetir avisos: se guarda uno por tarea, usuario, tipo y fecha
+    límite, así que si la fecha cambia la tarea vuelve a avisar.
+    """
+    
+    DUE_SOON = 'due_soon'
+    OVERDUE = 'overdue'
+    KIND_CHOICES = [
+        (DUE_SOON, 'Vence pronto'),
+        (OVERDUE, 'Vencida'),
+    ]
+    
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='reminders',
+        verbose_name='tarea'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='task_reminders',
+        verbose_name='usuario'
+    )
+    kind = models.CharField('tipo', max_length=10, choices=KIND_CHOICES)
+    deadline = models.DateField('fecha límite avisada')
+    sent_at = models.DateTimeField('fecha de envío')
+    
+    class Meta:
+        verbose_name = 'recordatorio'
+        verbose_name_plural = 'recordatorios'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['task', 'user', 'kind', 'deadline'],
+                name='task_reminder_unique'
+            ),
+        ]
+    
+    def __str__(self):
+        return f'{self.get_kind_display()}: {self.task_id} → {self.user_id}'
+
+
+class DocumentUpload(models.Model):
+    """Subida de un documento por partes, reanudable.
+    
+    Las partes se escriben en ``partial_name`` dentro del almacenamiento de
+    documentos y ``received`` indica cuántos bytes están confirmados. Al
+    completarse el archivo se convierte en blob y ``document`` apunta al
+    documento creado, así que repetir la finalización no lo duplica.
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='uploads',
+        verbose_name='tarea'
+    )
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='document_uploads',
+        verbose_name='subido por'
+    )
+    name = models.CharField('nombre', max_length=255)
+    filename = models.CharField('nombre de archivo', max_length=255)
+    size = models.PositiveBigIntegerField('tamaño')
+    sha256 = models.CharField('SHA-256 esperado', max_length=64, blank=True)
+    received = models.PositiveBigIntegerField('bytes recibidos', default=0)
+    document = models.OneToOneField(
+        TaskDocument,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='documento'
+    )
+    created_at = models.DateTimeField('fecha de creación', auto_now_add=True)
+    updated_at = models.DateTimeField('última actividad', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'subida de documento'
+        verbose_name_plural = 'subidas de documentos'
+        indexes = [
+            models.Index(fields=['updated_at'], name='task_upload_updated_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.filename} ({self.received}/{self.size})'
+    
+    @property
+    def partial_name(self):
+        return f'tasks/uploads/{self.id}.part'
@@ -0,0 +1,156 @@
+"""Recordatorios de fechas límite enviados desde el servidor.
+
+Una sola consulta recorre el rango de fechas del índice parcial
+``task_open_deadline_idx`` (tareas abiertas): las que vencen en los
+próximos ``TASK_REMINDER_DUE_SOON_DAYS`` días y las vencidas en los últimos
+``TASK_REMINDER_OVERDUE_DAYS``, para todos los usuarios a la vez, sin las
+que ya tienen ``TaskReminder``. Cada aviso se registra antes de enviarse
+(``claim``) y se entrega por el grupo ``notifications_<id>`` de
+``NotificationConsumer``, así que nunca se envía dos veces.
+
+El ciclo corre en el event loop del proceso ASGI (``ensure_scheduler``)
+porque el channel layer en memoria solo llega a las conexiones del mismo
+proceso. Avisa únicamente a quienes tienen abierta una conexión de
+notificaciones; el resto recibe lo pendiente al conectarse. Con un channel
+layer compartido puede usarse ``manage.py send_task_reminders``.
+"""
+import asyncio
+import logging
+from datetime import timedelta
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, CharField, Exists, OuterRef, Value, When
+from django.utils import timezone
+
+from chat.heartbeat import ConnectionRegistry
+from .models import Task, TaskReminder
+
+logger = logging.getLogger(__name__)
+
+INTERVAL = getattr(settings, 'TASK_REMINDER_INTERVAL', 300)
+DUE_SOON_DAYS = getattr(settings, 'TASK_REMINDER_DUE_SOON_DAYS', 3)
+OVERDUE_DAYS = getattr(settings, 'TASK_REMINDER_OVERDUE_DAYS', 7)
+
+# Usuarios con una conexión de notificaciones abierta en este proceso
+listeners = ConnectionRegistry()
+
+# (event loop, tarea) del ciclo en curso
+_scheduler = None
+
+
+def pending_reminders(today=None, user_ids=None):
+    """Avisos por enviar, del vencimiento más próximo al más lejano.
+
+    Cada elemento es un diccionario con la tarea, su asignado y ``kind``
+    (``due_soon`` u ``overdue``). Con ``user_ids`` se limita a esos usuarios.
+    """
+    today = today or timezone.localdate()
+    kind = Case(
+        When(deadline__lt=today, then=Value(TaskReminder.OVERDUE)),
+        default=Value(TaskReminder.DUE_SOON),
+        output_field=CharField()
+    )
+    sent = TaskReminder.objects.filter(
+        task=OuterRef('pk'),
+        user=OuterRef('assigned_to'),
+        kind=OuterRef('kind'),
+        deadline=OuterRef('deadline')
+    )
+    tasks = Task.objects.filter(
+        deadline__gte=today - timedelta(days=OVERDUE_DAYS),
+        deadline__lte=today + timedelta(days=DUE_SOON_DAYS),
+        assigned_to__isnull=False,
+        project__deleted_at__isnull=True
+    ).exclude(status='completed')
+    if user_ids is not None:
+        tasks = tasks.filter(assigned_to__in=user_ids)
+
+    return list(
+        tasks.annotate(kind=kind).filter(~Exists(sent)).order_by('deadline', 'id').values(
+            'id', 'name', 'deadline', 'project_id', 'project__title', 'assigned_to_id', 'kind'
+        )
+    )
+
+
+def claim(reminders, now=None):
+    """Registra los avisos y retorna solo los que registró esta llamada.
+
+    La restricción única descarta los que otro proceso registró antes; los
+    propios se reconocen por su ``sent_at``.
+    """
+    if not reminders:
+        return []
+    now = now or timezone.now()
+    with transaction.atomic():
+        TaskReminder.objects.bulk_create([
+            TaskReminder(
+                task_id=reminder['id'],
+                user_id=reminder['assigned_to_id'],
+                kind=reminder['kind'],
+                deadline=reminder['deadline'],
+                sent_at=now
+            )
+            for reminder in reminders
+        ], ignore_conflicts=True)
+        claimed = set(TaskReminder.objects.filter(
+            sent_at=now, task_id__in={reminder['id'] for reminder in reminders}
+        ).values_list('task_id', 'user_id', 'kind'))
+    return [
+        reminder for reminder in reminders
+        if (reminder['id'], reminder['assigned_to_id'], reminder['kind']) in claimed
+    ]
+
+
+def collect(user_ids=None, today=None):
+    """Calcula y registra los avisos pendientes, agrupados por usuario."""
+    today = today or timezone.localdate()
+    by_user = {}
+    for reminder in claim(pending_reminders(today, user_ids)):
+        by_user.setdefault(reminder['assigned_to_id'], []).append({
+            'task_id': reminder['id'],
+            'task_name': reminder['name'],
+            'project_id': reminder['project_id'],
+            'project_title': reminder['project__title'],
+            'deadline': reminder['deadline'].isoformat(),
+            'days_remaining': (reminder['deadline'] - today).days,
+            'kind': reminder['kind'],
+        })
+    return by_user
+
+
+async def send_due_reminders(channel_layer, user_ids=None):
+    """Envía los avisos pendientes; retorna cuántos se enviaron."""
+    by_user = await database_sync_to_async(collect)(user_ids)
+    for user_id, reminders in by_user.items():
+        await channel_layer.group_send(f'notifications_{user_id}', {
+            'type': 'task_reminder_notification',
+            'reminders': reminders,
+        })
+    return sum(len(reminders) for reminders in by_user.values())
+
+
+def ensure_scheduler():
+    """Inicia el ciclo de recordatorios en el event loop actual, una sola vez."""
+    global _scheduler
+    if not INTERVAL:
+        return
+    loop = asyncio.get_running_loop()
+    if _scheduler is not None and _scheduler[0] is loop and not _scheduler[1].done():
+        return
+    _scheduler = (loop, loop.create_task(_run_scheduler()))
+
+
+async def _run_scheduler():
+    channel_layer = get_channel_layer()
+    while True:
+        await asyncio.sleep(INTERVAL)
+        user_ids = list(listeners.stats()['by_user'])
+        if not user_ids:
+            continue
+        try:
+            await send_due_reminders(channel_layer, user_ids)
+        except Exception:
+            logger.exception('Error al enviar recordatorios de tareas')
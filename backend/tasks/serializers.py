@@ -1,22 +1,43 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.urls import reverse
 from django.utils import timezone
-from .models import Task, TaskDocument
+from .listing import DEFAULT_SORT, sort_choices
+from .models import Task, TaskDocument, DocumentUpload
+from . import uploads
+from projects.downloads import download_url
 from projects.models import Membership
+from projects import stats
 
 User = get_user_model()
 
+# Operaciones por petición en ``BulkTaskView``
+BULK_TASKS_MAX_ITEMS = getattr(settings, 'BULK_TASKS_MAX_ITEMS', 500)
+
+# Tamaño máximo de página de las listas de tareas (``?page_size=``)
+TASK_LIST_MAX_PAGE_SIZE = getattr(settings, 'TASK_LIST_MAX_PAGE_SIZE', 100)
+
 
 class TaskDocumentSerializer(serializers.ModelSerializer):
     """Serializer para documentos de tareas."""
     
     uploaded_by_name = serializers.CharField(source='uploaded_by.get_full_name', read_only=True)
     filename = serializers.CharField(read_only=True)
+    file = serializers.SerializerMethodField()
     
     class Meta:
         model = TaskDocument
         fields = ['id', 'task', 'file', 'name', 'uploaded_by', 'uploaded_by_name', 'filename', 'uploaded_at']
         read_only_fields = ['id', 'uploaded_by', 'uploaded_at']
+    
+    def get_file(self, obj):
+        """URL de descarga firmada; el archivo no se publica en ``MEDIA_URL``."""
+        if not obj.file:
+            return None
+        path = reverse('tasks:document_download', args=[obj.pk])
+        return download_url(self.context.get('request'), path)
 
 
 class TaskListSerializer(serializers.ModelSerializer):
@@ -37,6 +58,9 @@ class TaskListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
     
     def get_documents_count(self, obj):
+        # Valor anotado por ``task_list_queryset``
+        if hasattr(obj, 'documents_count'):
+            return obj.documents_count
         return obj.documents.count()
 
 
@@ -103,6 +127,13 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
                     'El usuario asignado debe ser miembro del proyecto.'
                 )
         return value
+    
+    def update(self, instance, validated_data):
+        previous = stats.task_snapshot(instance)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            stats.task_changed(instance, *previous)
+        return instance
 
 
 class TaskStatusSerializer(serializers.ModelSerializer):
@@ -121,8 +152,11 @@ class TaskStatusSerializer(serializers.ModelSerializer):
         elif new_status != 'completed':
             instance.completed_at = None
         
+        previous = stats.task_snapshot(instance)
         instance.status = new_status
-        instance.save()
+        with transaction.atomic():
+            instance.save()
+            stats.task_changed(instance, *previous)
         return instance
 
 
@@ -138,3 +172,143 @@ class TaskDocumentUploadSerializer(serializers.ModelSerializer):
             # Si no se proporciona nombre, usar el nombre del archivo
             return self.initial_data.get('file', '').name if hasattr(self.initial_data.get('file', ''), 'name') else 'documento'
         return value
+
+
+class DocumentUploadStartSerializer(serializers.Serializer):
+    """Datos para iniciar una subida por partes."""
+    
+    filename = serializers.CharField(max_length=255)
+    name = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    size = serializers.IntegerField(min_value=1)
+    sha256 = serializers.RegexField(r'^[0-9a-f]{64}$', required=False, allow_blank=True)
+    
+    def validate_size(self, value):
+        limit = uploads.max_size()
+        if value > limit:
+            raise serializers.ValidationError(f'El archivo puede tener como máximo {limit} bytes.')
+        return value
+
+
+class DocumentUploadSerializer(serializers.ModelSerializer):
+    """Estado de una subida por partes."""
+    
+    chunk_size = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = DocumentUpload
+        fields = [
+            'id', 'task', 'name', 'filename', 'size', 'received',
+            'chunk_size', 'document', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+    
+    def get_chunk_size(self, obj):
+        return uploads.chunk_size()
+
+
+class BulkTaskCreateItemSerializer(serializers.ModelSerializer):
+    """Tarea a crear en una operación masiva.
+    
+    ``assigned_to`` es un ID: la membresía se valida contra el conjunto
+    precargado en ``tasks.bulk``, no con una consulta por elemento.
+    """
+    
+    assigned_to = serializers.IntegerField(required=False, allow_null=True)
+    
+    class Meta:
+        model = Task
+        fields = ['name', 'description', 'deadline', 'priority', 'assigned_to']
+    
+    def validate_deadline(self, value):
+        """Valida que la fecha límite no sea pasada."""
+        if value < timezone.now().date():
+            raise serializers.ValidationError(
+                'La fecha límite no puede ser una fecha pasada.'
+            )
+        return value
+
+
+class BulkTaskUpdateItemSerializer(serializers.ModelSerializer):
+    """Cambios parciales de una tarea en una operación masiva."""
+    
+    id = serializers.IntegerField()
+    assigned_to = serializers.IntegerField(required=False, allow_null=True)
+    
+    class Meta:
+        model = Task
+        fields = ['id', 'name', 'description', 'deadline', 'priority', 'assigned_to']
+        extra_kwargs = {
+            field: {'required': False}
+            for field in ['name', 'description', 'deadline', 'priority']
+        }
+
+
+class BulkTaskStatusItemSerializer(serializers.Serializer):
+    """Cambio de estado de una tarea en una operación masiva."""
+    
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES)
+
+
+class BulkTaskSerializer(serializers.Serializer):
+    """Listas de tareas a crear, actualizar y cambiar de estado.
+    
+    Los elementos se validan uno por uno en ``tasks.bulk`` para informar el
+    resultado de cada uno sin rechazar toda la operación.
+    """
+    
+    create = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    update = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    status = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    
+    def validate(self, attrs):
+        total = len(attrs['create']) + len(attrs['update']) + len(attrs['status'])
+        if not total:
+            raise serializers.ValidationError('Debes indicar al menos una operación.')
+        if total > BULK_TASKS_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f'Se permiten como máximo {BULK_TASKS_MAX_ITEMS} operaciones por petición.'
+            )
+        return attrs
+
+
+class CommaSeparatedChoiceField(serializers.Field):
+    """Lista de opciones separadas por comas en un parámetro de la URL."""
+    
+    def __init__(self, choices, **kwargs):
+        self.choices = [value for value, _ in choices]
+        super().__init__(**kwargs)
+    
+    def to_internal_value(self, data):
+        values = [value.strip() for value in str(data).split(',') if value.strip()]
+        invalid = [value for value in values if value not in self.choices]
+        if invalid:
+            raise serializers.ValidationError(f'Valores no válidos: {", ".join(invalid)}.')
+        return values
+
+
+class TaskListQuerySerializer(serializers.Serializer):
+    """Parámetros de filtrado, orden y paginación de las listas de tareas."""
+    
+    status = CommaSeparatedChoiceField(Task.STATUS_CHOICES, required=False)
+    priority = CommaSeparatedChoiceField(Task.PRIORITY_CHOICES, required=False)
+    deadline_after = serializers.DateField(required=False)
+    deadline_before = serializers.DateField(required=False)
+    assigned_to = serializers.RegexField(r'^(me|none|\d+)$', required=False)
+    project = serializers.IntegerField(required=False, min_value=1)
+    search = serializers.CharField(required=False, max_length=100)
+    sort = serializers.ChoiceField(choices=sort_choices(), default=DEFAULT_SORT)
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(
+        required=False, min_value=1, max_value=TASK_LIST_MAX_PAGE_SIZE
+    )
+    facets = serializers.BooleanField(required=False, default=False)
+    
+    def validate(self, attrs):
+        after, before = attrs.get('deadline_after'), attrs.get('deadline_before')
+        if after and before and after > before:
+            raise serializers.ValidationError(
+                'deadline_after no puede ser posterior a deadline_before.'
+            )
+        attrs.setdefault('page_size', settings.REST_FRAMEWORK.get('PAGE_SIZE', 10))
+        return attrs
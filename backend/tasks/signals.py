@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+
+# Cambiaron tareas de un proyecto sin pasar por ``save``/``delete`` (operaciones
+# masivas con ``bulk_create``/``bulk_update``). Argumentos: ``project_id`` y
+# ``task_ids``. Se envía una vez por operación al confirmar la transacción.
+tasks_changed = Signal()
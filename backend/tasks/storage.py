@@ -0,0 +1,142 @@
+"""Almacenamiento de documentos direccionado por contenido.
+
+``ContentAddressedStorage`` guarda cada archivo en
+``tasks/blobs/<aa>/<sha256>`` y calcula el hash mientras copia la subida,
+sin leerla dos veces. Si el contenido ya existía se descarta la copia, así
+que un mismo archivo subido a muchas tareas ocupa espacio una sola vez.
+``DocumentBlob`` cuenta las referencias: ``delete`` resta una y el archivo
+se borra al confirmar la transacción que quitó la última.
+
+Los nombres anteriores (``tasks/<proyecto>/<tarea>/<archivo>``) siguen
+funcionando; ``dedupe_task_documents`` los convierte con ``adopt``.
+"""
+import hashlib
+import os
+import re
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+
+BLOB_PREFIX = 'tasks/blobs'
+BLOB_NAME_RE = re.compile(rf'^{BLOB_PREFIX}/[0-9a-f]{{2}}/([0-9a-f]{{64}})$')
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def blob_name(digest):
+    return f'{BLOB_PREFIX}/{digest[:2]}/{digest}'
+
+
+def blob_digest(name):
+    """Hash de un nombre de blob, o ``None`` si es un nombre anterior."""
+    match = BLOB_NAME_RE.match(name or '')
+    return match.group(1) if match else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """``FileSystemStorage`` que deduplica por SHA-256 con conteo de referencias."""
+
+    def get_available_name(self, name, max_length=None):
+        # El nombre definitivo lo decide el contenido en ``_save``
+        return name
+
+    def _save(self, name, content):
+        from .models import DocumentBlob
+
+        temp_path = self.path(f'{BLOB_PREFIX}/tmp/{uuid.uuid4().hex}')
+        self._ensure_directory(temp_path)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(temp_path, 'wb') as temp:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp.write(chunk)
+                    size += len(chunk)
+            name = self._commit_blob(temp_path, digest.hexdigest())
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        DocumentBlob.acquire(blob_digest(name), size)
+        return name
+
+    def file_digest(self, name):
+        """``(sha256, tamaño)`` de un archivo ya guardado."""
+        digest = hashlib.sha256()
+        with self.open(name, 'rb') as source:
+            for chunk in iter(lambda: source.read(READ_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest(), self.size(name)
+
+    def adopt(self, name, save, references=1):
+        """Convierte un archivo con nombre anterior en blob, sin copiarlo.
+
+        ``save(nombre_del_blob)`` actualiza las filas que lo usan; se llama
+        dentro de la transacción que suma ``references`` referencias. Si el
+        contenido es nuevo el archivo se mueve; si ya estaba guardado se
+        borra tras confirmar. Retorna ``(nombre del blob, bytes liberados)``.
+        """
+        from .models import DocumentBlob
+
+        digest, size = self.file_digest(name)
+        new_name = blob_name(digest)
+        path, final_path = self.path(name), self.path(new_name)
+        moved = not os.path.exists(final_path)
+        if moved:
+            self._ensure_directory(final_path)
+            os.replace(path, final_path)
+        try:
+            with transaction.atomic():
+                DocumentBlob.acquire(digest, size, references)
+                save(new_name)
+        except Exception:
+            if moved:
+                os.replace(final_path, path)
+            raise
+
+        if moved:
+            return new_name, 0
+        os.remove(path)
+        return new_name, size
+
+    def delete(self, name):
+        digest = blob_digest(name)
+        if digest is None:
+            return super().delete(name)
+
+        from .models import DocumentBlob
+        if DocumentBlob.release(digest):
+            transaction.on_commit(lambda: self._delete_unreferenced(digest))
+
+    def _delete_unreferenced(self, digest):
+        from .models import DocumentBlob
+
+        # Otra subida pudo volver a referenciar el contenido antes del commit
+        if not DocumentBlob.objects.filter(sha256=digest).exists():
+            super().delete(blob_name(digest))
+
+    def _commit_blob(self, path, digest):
+        """Mueve ``path`` a su nombre definitivo si el contenido es nuevo."""
+        name = blob_name(digest)
+        final_path = self.path(name)
+        if not os.path.exists(final_path):
+            self._ensure_directory(final_path)
+            os.replace(path, final_path)
+            if self.file_permissions_mode is not None:
+                os.chmod(final_path, self.file_permissions_mode)
+        return name
+
+    def _ensure_directory(self, path):
+        directory = os.path.dirname(path)
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
@@ -1,3 +1,936 @@
-from django.test import TestCase
+import base64
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from projects import stats
+from projects.models import Project, Membership, ProjectStats, Activity
+from . import reminders, uploads
+from .models import Task, TaskDocument, TaskReminder, DocumentBlob, DocumentUpload
+
+User = get_user_model()
+
+
+class TaskQueriesTest(TestCase):
+    """Las vistas de tareas usan un número fijo de consultas."""
+
+    def setUp(self):
+        self.leader = User.objects.create_user(
+            'lider@example.com', None, first_name='Ana', last_name='Torres'
+        )
+        self.project = Project.objects.create(
+            title='Proyecto', description='-', general_objectives='-',
+            specific_objectives='-', start_date=date(2025, 1, 1),
+            end_date=date(2030, 1, 1), created_by=self.leader
+        )
+        Membership.objects.create(user=self.leader, project=self.project, role='leader')
+        self.client = APIClient()
+        self.client.force_authenticate(self.leader)
+
+    def add_tasks(self, count, documents=1):
+        """Tareas asignadas a miembros distintos, cada una con documentos."""
+        for i in range(count):
+            member = User.objects.create_user(
+                f'miembro{Task.objects.count()}@example.com', None,
+                first_name='Miembro', last_name=str(i)
+            )
+            Membership.objects.create(user=member, project=self.project)
+            task = Task.objects.create(
+                project=self.project, name=f'Tarea {i}', description='-',
+                deadline=date.today() + timedelta(days=i), created_by=member,
+                assigned_to=member if i % 2 else self.leader
+            )
+            TaskDocument.objects.bulk_create([
+                TaskDocument(
+                    task=task, uploaded_by=member, name=f'doc{j}',
+                    file=f'tasks/{self.project.id}/{task.id}/doc{j}.txt'
+                )
+                for j in range(documents)
+            ])
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data
+
+    def test_project_tasks_query_count_is_constant(self):
+        self.add_tasks(1)
+        url = f'/api/tasks/project/{self.project.pk}/?facets=true'
+        baseline, _ = self.count_queries(url)
+
+        # Una página completa y más tareas de las que caben en ella
+        self.add_tasks(14, documents=3)
+        queries, data = self.count_queries(url)
+        self.assertEqual(queries, baseline)
+        self.assertEqual(data['facets']['total'], 15)
+        self.assertTrue(data['has_more'])
+        self.assertEqual(data['results'][0]['documents_count'], 3)
+        self.assertEqual(data['results'][0]['assigned_to_name'], 'Miembro 13')
+
+    def test_my_tasks_query_count_is_constant(self):
+        self.add_tasks(2)
+        baseline, _ = self.count_queries('/api/tasks/my-tasks/?facets=true')
+
+        self.add_tasks(20, documents=2)
+        queries, data = self.count_queries('/api/tasks/my-tasks/?facets=true')
+        self.assertEqual(queries, baseline)
+        self.assertEqual(data['facets']['total'], 11)
+        self.assertEqual(data['results'][0]['documents_count'], 2)
+
+    def test_detail_query_count_is_constant(self):
+        self.add_tasks(1, documents=1)
+        first = Task.objects.get()
+        baseline, _ = self.count_queries(f'/api/tasks/{first.pk}/')
+
+        self.add_tasks(1, documents=6)
+        task = Task.objects.latest('id')
+        queries, data = self.count_queries(f'/api/tasks/{task.pk}/')
+        self.assertEqual(queries, baseline)
+        self.assertEqual(len(data['documents']), 6)
+        self.assertEqual(data['project_title'], 'Proyecto')
+        self.assertEqual(data['documents'][0]['uploaded_by_name'], 'Miembro 0')
+
+
+class BulkTaskTest(TestCase):
+    """Operaciones masivas sobre tareas con resultados por elemento."""
+
+    def setUp(self):
+        self.leader = User.objects.create_user(
+            'lider@example.com', None, first_name='Ana', last_name='Torres'
+        )
+        self.member = User.objects.create_user(
+            'miembro@example.com', None, first_name='Luis', last_name='Rojas'
+        )
+        self.outsider = User.objects.create_user('otro@example.com', None)
+        self.project = Project.objects.create(
+            title='Proyecto', description='-', general_objectives='-',
+            specific_objectives='-', start_date=date(2025, 1, 1),
+            end_date=date(2030, 1, 1), created_by=self.leader
+        )
+        Membership.objects.create(user=self.leader, project=self.project, role='leader')
+        Membership.objects.create(user=self.member, project=self.project)
+        ProjectStats.objects.create(project=self.project, members_count=2)
+        self.deadline = (date.today() + timedelta(days=7)).isoformat()
+        self.client = APIClient()
+        self.client.force_authenticate(self.leader)
+
+    def bulk(self, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    f'/api/tasks/project/{self.project.pk}/bulk/', data, format='json'
+                )
+        return response, len(queries)
+
+    def create_task(self, name, assigned_to):
+        task = Task.objects.create(
+            project=self.project, name=name, description='-',
+            deadline=date.today(), created_by=self.leader, assigned_to=assigned_to
+        )
+        stats.task_created(task)
+        return task
+
+    def new_tasks(self, count):
+        return [
+            {'name': f'Tarea {i}', 'description': '-', 'deadline': self.deadline,
+             'assigned_to': self.member.id}
+            for i in range(count)
+        ]
+
+    def test_mixed_operations(self):
+        existing = self.create_task('Informe', self.member)
+        response, _ = self.bulk({
+            'create': self.new_tasks(2) + [
+                {'name': 'Sin fecha', 'description': '-'},
+                {'name': 'Ajena', 'description': '-', 'deadline': self.deadline,
+                 'assigned_to': self.outsider.id},
+            ],
+            'update': [
+                {'id': existing.id, 'priority': 'high', 'assigned_to': self.leader.id},
+                {'id': 999999, 'name': 'No existe'},
+            ],
+            'status': [{'id': existing.id, 'status': 'completed'}],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary'], {
+            'created': 2, 'invalid': 1, 'not_member': 1, 'updated': 2, 'not_found': 1,
+        })
+        self.assertEqual([r['status'] for r in response.data['results']][:4], [
+            'created', 'created', 'invalid', 'not_member',
+        ])
+
+        existing.refresh_from_db()
+        self.assertEqual(existing.priority, 'high')
+        self.assertEqual(existing.assigned_to, self.leader)
+        self.assertEqual(existing.status, 'completed')
+        self.assertIsNotNone(existing.completed_at)
+
+        project_stats = ProjectStats.objects.get(project=self.project)
+        self.assertEqual(project_stats.tasks_total, 3)
+        self.assertEqual(project_stats.tasks_status_completed, 1)
+        self.assertEqual(project_stats.tasks_priority_high, 1)
+        self.assertEqual(
+            Membership.objects.get(project=self.project, user=self.member).open_tasks_count, 2
+        )
+        self.assertEqual(Activity.objects.filter(project=self.project).count(), 4)
+
+    def test_query_count_does_not_grow(self):
+        _, baseline = self.bulk({'create': self.new_tasks(2)})
+        ids = list(Task.objects.values_list('id', flat=True))
+        response, queries = self.bulk({
+            'create': self.new_tasks(2),
+            'status': [{'id': task_id, 'status': 'in_progress'} for task_id in ids],
+        })
+        self.assertEqual(response.data['summary'], {'created': 2, 'updated': 2})
+
+        ids = list(Task.objects.values_list('id', flat=True))
+        response, more = self.bulk({
+            'create': self.new_tasks(40),
+            'status': [{'id': task_id, 'status': 'completed'} for task_id in ids],
+        })
+        self.assertEqual(response.data['summary'], {'created': 40, 'updated': 4})
+        self.assertEqual(more, queries)
+
+    def test_member_can_only_change_own_status(self):
+        own = self.create_task('Propia', self.member)
+        other = self.create_task('Ajena', self.leader)
+        self.client.force_authenticate(self.member)
+        response, _ = self.bulk({
+            'create': self.new_tasks(1),
+            'status': [
+                {'id': own.id, 'status': 'in_progress'},
+                {'id': other.id, 'status': 'in_progress'},
+            ],
+        })
+        self.assertEqual(
+            [r['status'] for r in response.data['results']],
+            ['forbidden', 'updated', 'forbidden']
+        )
+
+        self.client.force_authenticate(self.outsider)
+        response, _ = self.bulk({'create': self.new_tasks(1)})
+        self.assertEqual(response.status_code, 403)
+
+
+class TaskListingTest(TestCase):
+    """Filtros, orden por cursor y facetas de las listas de tareas."""
+
+    def setUp(self):
+        self.leader = User.objects.create_user(
+            'lider@example.com', None, first_name='Ana', last_name='Torres'
+        )
+        self.member = User.objects.create_user('miembro@example.com', None)
+        self.project = Project.objects.create(
+            title='Proyecto', description='-', general_objectives='-',
+            specific_objectives='-', start_date=date(2025, 1, 1),
+            end_date=date(2030, 1, 1), created_by=self.leader
+        )
+        Membership.objects.create(user=self.leader, project=self.project, role='leader')
+        Membership.objects.create(user=self.member, project=self.project)
+        self.client = APIClient()
+        self.client.force_authenticate(self.leader)
+        self.url = f'/api/tasks/project/{self.project.pk}/'
+
+        statuses = ['pending', 'in_progress', 'completed']
+        priorities = ['low', 'medium', 'high', 'critical']
+        Task.objects.bulk_create([
+            Task(
+                project=self.project, name=f'Tarea {i:02d}', description='-',
+                # Fechas repetidas para probar el desempate por ID
+                deadline=date(2026, 1, 1) + timedelta(days=i // 3),
+                status=statuses[i % 3], priority=priorities[i % 4],
+                created_by=self.leader,
+                assigned_to=self.member if i % 2 else None
+            )
+            for i in range(30)
+        ])
+
+    def get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def walk(self, **params):
+        """Recorre todas las páginas y retorna los IDs en orden."""
+        ids, cursor = [], None
+        while True:
+            data = self.get(**params, **({'cursor': cursor} if cursor else {}))
+            ids.extend(task['id'] for task in data['results'])
+            if not data['has_more']:
+                return ids
+            cursor = data['cursor']
+
+    def test_keyset_pages_follow_sort_order(self):
+        tasks = Task.objects.all()
+        rank = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+        expected = {
+            'deadline': sorted(tasks, key=lambda t: (t.deadline, t.id)),
+            '-deadline': sorted(tasks, key=lambda t: (t.deadline, t.id), reverse=True),
+            'priority': sorted(tasks, key=lambda t: (rank[t.priority], t.id)),
+            '-created_at': sorted(tasks, key=lambda t: (t.created_at, t.id), reverse=True),
+            'name': sorted(tasks, key=lambda t: (t.name, t.id)),
+        }
+        for sort, ordered in expected.items():
+            with self.subTest(sort=sort):
+                ids = self.walk(sort=sort, page_size=7)
+                self.assertEqual(ids, [task.id for task in ordered])
+
+    def test_filters(self):
+        data = self.get(status='pending,in_progress', priority='high', page_size=100)
+        for task in data['results']:
+            self.assertIn(task['status'], ['pending', 'in_progress'])
+            self.assertEqual(task['priority'], 'high')
+
+        data = self.get(deadline_after='2026-01-03', deadline_before='2026-01-04', page_size=100)
+        self.assertEqual(len(data['results']), 6)
+
+        self.assertEqual(len(self.get(assigned_to='none', page_size=100)['results']), 15)
+        self.assertEqual(len(self.get(assigned_to=self.member.id, page_size=100)['results']), 15)
+        self.assertEqual(self.get(search='tarea 07')['results'][0]['name'], 'Tarea 07')
+
+    def test_facets_ignore_their_own_filter(self):
+        facets = self.get(status='pending', priority='low', facets='true')['facets']
+        pending_low = Task.objects.filter(status='pending', priority='low').count()
+        self.assertEqual(facets['total'], pending_low)
+        self.assertEqual(facets['status'], {
+            value: Task.objects.filter(status=value, priority='low').count()
+            for value in ['pending', 'in_progress', 'completed']
+        })
+        self.assertEqual(facets['priority']['low'], pending_low)
+        self.assertEqual(
+            facets['priority']['high'],
+            Task.objects.filter(status='pending', priority='high').count()
+        )
+
+    def test_my_tasks_filters_by_project(self):
+        self.client.force_authenticate(self.member)
+        response = self.client.get(
+            '/api/tasks/my-tasks/', {'project': self.project.pk, 'sort': 'deadline', 'facets': 'true'}
+        )
+        self.assertEqual(response.data['facets']['total'], 15)
+        response = self.client.get('/api/tasks/my-tasks/', {'project': self.project.pk + 1})
+        self.assertEqual(response.data['results'], [])
+
+    def test_invalid_parameters(self):
+        cursor = self.get(sort='deadline', page_size=5)['cursor']
+        for params in [
+            {'status': 'archived'},
+            {'sort': 'updated_at'},
+            {'page_size': 1000},
+            {'deadline_after': '2026-02-01', 'deadline_before': '2026-01-01'},
+            {'cursor': 'no-es-un-cursor'},
+            {'cursor': cursor, 'sort': 'name'},
+        ]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+    def test_tampered_cursor_values(self):
+        def cursor(*data):
+            encoded = base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+            return encoded.rstrip('=')
+
+        for sort, value in [
+            ('deadline', 'zzz'),
+            ('deadline', {'a': 1}),
+            ('-created_at', '2026-13-01T00:00:00+00:00'),
+            ('-created_at', '2026-01-01T00:00:00'),
+            ('-created_at', 5),
+            ('priority', 'high'),
+            ('priority', True),
+            ('name', ['a']),
+            ('project', None),
+        ]:
+            with self.subTest(sort=sort, value=value):
+                response = self.client.get(self.url, {'sort': sort, 'cursor': cursor(sort, value, 1)})
+                self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            self.url, {'sort': 'deadline', 'cursor': cursor('deadline', '2026-01-01', True)}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ReminderFixture:
+    """Tareas con fechas límite alrededor de hoy."""
+
+    def setUp(self):
+        self.leader = User.objects.create_user('lider@example.com', None)
+        self.member = User.objects.create_user('miembro@example.com', None)
+        self.project = Project.objects.create(
+            title='Proyecto', description='-', general_objectives='-',
+            specific_objectives='-', start_date=date(2025, 1, 1),
+            end_date=date(2030, 1, 1), created_by=self.leader
+        )
+        self.today = date.today()
+        self.soon = self.task('Por vencer', 1)
+        self.overdue = self.task('Vencida', -2, status='in_progress')
+        self.task('Completada', 1, status='completed')
+        self.task('Sin asignar', 1, assigned_to=None)
+        self.task('Lejana', 10)
+        self.task('Vencida hace mucho', -30)
+        self.task('Del líder', 0, assigned_to=self.leader)
+
+    def task(self, name, days, status='pending', assigned_to=False, project=None):
+        return Task.objects.create(
+            project=project or self.project, name=name, description='-',
+            deadline=self.today + timedelta(days=days), status=status,
+            created_by=self.leader,
+            assigned_to=self.member if assigned_to is False else assigned_to
+        )
+
+
+class TaskReminderTest(ReminderFixture, TestCase):
+    """Recordatorios de fechas límite calculados por el servidor."""
+
+    def test_pending_reminders_in_one_query(self):
+        with self.assertNumQueries(1):
+            pending = reminders.pending_reminders(self.today)
+        self.assertEqual(
+            [(item['name'], item['kind']) for item in pending],
+            [('Vencida', 'overdue'), ('Del líder', 'due_soon'), ('Por vencer', 'due_soon')]
+        )
+
+        deleted = Project.objects.create(
+            title='Eliminado', description='-', general_objectives='-',
+            specific_objectives='-', start_date=date(2025, 1, 1),
+            end_date=date(2030, 1, 1), created_by=self.leader,
+            deleted_at=timezone.now()
+        )
+        self.task('De proyecto eliminado', 1, project=deleted)
+        pending = reminders.pending_reminders(self.today, user_ids=[self.member.id])
+        self.assertEqual([item['name'] for item in pending], ['Vencida', 'Por vencer'])
+
+    def test_reminders_are_sent_once(self):
+        by_user = reminders.collect(today=self.today)
+        self.assertEqual(
+            [(item['task_name'], item['days_remaining']) for item in by_user[self.member.id]],
+            [('Vencida', -2), ('Por vencer', 1)]
+        )
+        self.assertEqual(reminders.collect(today=self.today), {})
+
+        # Otro proceso que calculó lo mismo antes del registro no reenvía nada
+        stale = [
+            {'id': self.soon.id, 'assigned_to_id': self.member.id,
+             'kind': 'due_soon', 'deadline': self.soon.deadline}
+        ]
+        self.assertEqual(reminders.claim(stale), [])
+
+        # Una nueva fecha límite vuelve a avisar
+        self.soon.deadline += timedelta(days=1)
+        self.soon.save()
+        by_user = reminders.collect(today=self.today)
+        self.assertEqual([item['task_id'] for item in by_user[self.member.id]], [self.soon.id])
+
+
+class TaskReminderPushTest(ReminderFixture, TransactionTestCase):
+    """Los recordatorios llegan al grupo de ``NotificationConsumer``.
+
+    ``database_sync_to_async`` cierra la conexión al terminar, por eso la
+    prueba no corre dentro de la transacción de ``TestCase``.
+    """
+
+    def test_push_to_notification_group(self):
+        layer = get_channel_layer()
+
+        async def receive():
+            channel = await layer.new_channel()
+            await layer.group_add(f'notifications_{self.member.id}', channel)
+            sent = await reminders.send_due_reminders(layer, [self.member.id])
+            return sent, await layer.receive(channel)
+
+        sent, event = async_to_sync(receive)()
+        self.assertEqual(sent, 2)
+        self.assertEqual(event['type'], 'task_reminder_notification')
+        self.assertEqual(
+            [item['kind'] for item in event['reminders']], ['overdue', 'due_soon']
+        )
+        self.assertEqual(TaskReminder.objects.filter(user=self.member).count(), 2)
+
+
+class DocumentStorageTest(TestCase):
+    """Documentos guardados una sola vez por contenido, con conteo de referencias."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.storage = TaskDocument._meta.get_field('file').storage
+
+        self.leader = User.objects.create_user('lider@example.com', None)
+        self.project = Project.objects.create(
+            title='Proyecto', description='-', general_objectives='-',
+            specific_objectives='-', start_date=date(2025, 1, 1),
+            end_date=date(2030, 1, 1), created_by=self.leader
+        )
+        Membership.objects.create(user=self.leader, project=self.project, role='leader')
+        self.tasks = [
+            Task.objects.create(
+                project=self.project, name=f'Tarea {i}', description='-',
+                deadline=date.today(), created_by=self.leader
+            )
+            for i in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.leader)
+
+    def upload(self, task, filename, content):
+        response = self.client.post(
+            f'/api/tasks/{task.pk}/documents/upload/',
+            {'file': SimpleUploadedFile(filename, content), 'name': filename},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return TaskDocument.objects.get(pk=response.data['id'])
+
+    def blob_files(self):
+        root = os.path.join(self.media_root, 'tasks', 'blobs')
+        return sorted(
+            name for _, _, names in os.walk(root) for name in names
+        ) if os.path.isdir(root) else []
+
+    def test_same_content_is_stored_once(self):
+        content = b'alumno,nota\n' * 1000
+        first = self.upload(self.tasks[0], 'datos.csv', content)
+        second = self.upload(self.tasks[1], 'copia.csv', content)
+        other = self.upload(self.tasks[2], 'datos.csv', b'otro contenido')
+
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertNotEqual(first.file.name, other.file.name)
+        self.assertEqual(self.blob_files(), sorted([
+            hashlib.sha256(content).hexdigest(), hashlib.sha256(b'otro contenido').hexdigest()
+        ]))
+        self.assertEqual(DocumentBlob.objects.get(sha256=first.file.name[-64:]).ref_count, 2)
+
+        response = self.client.get(f'/api/tasks/{self.tasks[1].pk}/documents/')
+        self.assertEqual(response.data['results'][0]['filename'], 'copia.csv')
+        with self.storage.open(first.file.name) as stored:
+            self.assertEqual(stored.read(), content)
+
+        # Guardar con FieldFile.save también conserva el nombre original
+        document = TaskDocument(task=self.tasks[2], uploaded_by=self.leader, name='Informe')
+        document.file.save('informe.csv', ContentFile(content))
+        self.assertEqual(document.file.name, first.file.name)
+        self.assertEqual(document.filename(), 'informe.csv')
+        self.assertEqual(DocumentBlob.objects.get(sha256=first.file.name[-64:]).ref_count, 3)
+
+    def test_file_is_deleted_with_last_reference(self):
+        content = b'plantilla'
+        first = self.upload(self.tasks[0], 'plantilla.docx', content)
+        second = self.upload(self.tasks[1], 'plantilla.docx', content)
+        path = self.storage.path(first.file.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/tasks/documents/{first.pk}/delete/')
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(DocumentBlob.objects.get().ref_count, 1)
+
+        # Borrar la tarea libera también las referencias de sus documentos
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/tasks/{second.task_id}/')
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(DocumentBlob.objects.exists())
+
+    def test_failed_delete_keeps_reference(self):
+        first = self.upload(self.tasks[0], 'plantilla.docx', b'plantilla')
+        self.upload(self.tasks[1], 'plantilla.docx', b'plantilla')
+
+        with mock.patch.object(TaskDocument, 'delete', side_effect=DatabaseError('bloqueada')):
+            with self.assertRaises(DatabaseError):
+                self.client.delete(f'/api/tasks/documents/{first.pk}/delete/')
+        self.assertEqual(DocumentBlob.objects.get().ref_count, 2)
+        self.assertTrue(TaskDocument.objects.filter(pk=first.pk).exists())
+
+    def test_dedupe_command_converts_existing_files(self):
+        legacy = FileSystemStorage()
+        content = b'x' * 5000
+        names = [
+            legacy.save(f'tasks/{self.project.pk}/{task.pk}/dataset.csv', ContentFile(content))
+            for task in self.tasks
+        ]
+        unique = legacy.save(f'tasks/{self.project.pk}/{self.tasks[0].pk}/notas.txt', ContentFile(b'unico'))
+        TaskDocument.objects.bulk_create([
+            TaskDocument(task=task, file=name, name='Dataset', uploaded_by=self.leader)
+            for task, name in zip(self.tasks, names)
+        ] + [TaskDocument(task=self.tasks[0], file=unique, name='Notas', uploaded_by=self.leader)])
+
+        out = StringIO()
+        call_command('dedupe_task_documents', '--dry-run', stdout=out)
+        self.assertIn('Bytes liberados: 10000', out.getvalue())
+        self.assertTrue(all(legacy.exists(name) for name in names))
+
+        out = StringIO()
+        call_command('dedupe_task_documents', stdout=out)
+        self.assertIn('Documentos convertidos: 4', out.getvalue())
+        self.assertIn('Bytes liberados: 10000', out.getvalue())
+        self.assertFalse(any(legacy.exists(name) for name in names + [unique]))
+        self.assertEqual(len(self.blob_files()), 2)
+
+        documents = TaskDocument.objects.filter(name='Dataset')
+        self.assertEqual({document.file.name for document in documents}, {
+            f'tasks/blobs/{hashlib.sha256(content).hexdigest()[:2]}/{hashlib.sha256(content).hexdigest()}'
+        })
+        self.assertEqual({document.filename() for document in documents}, {'dataset.csv'})
+        self.assertEqual(DocumentBlob.objects.get(size=5000).ref_count, 3)
+
+        # Una segunda pasada no encuentra nada que convertir
+        out = StringIO()
+        call_command('dedupe_task_documents', stdout=out)
+        self.assertIn('Documentos convertidos: 0', out.getvalue())
+
+
+class DocumentDownloadTest(TestCase):
+    """Descarga autenticada con rangos, ETag y modos de envío delegados."""
+
+    content = bytes(range(256)) * 40
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.leader = User.objects.create_user('lider@example.com', None)
+        self.outsider = User.objects.create_user('externo@example.com', None)
+        project = Project.objects.create(
+            title='Proyecto', description='-', general_objectives='-',
+            specific_objectives='-', start_date=date(2025, 1, 1),
+            end_date=date(2030, 1, 1), created_by=self.leader
+        )
+        Membership.objects.create(user=self.leader, project=project, role='leader')
+        task = Task.objects.create(
+            project=project, name='Tarea', description='-',
+            deadline=date.today(), created_by=self.leader
+        )
+        self.document = TaskDocument(task=task, uploaded_by=self.leader, name='Informe')
+        self.document.file.save('informe.pdf', ContentFile(self.content))
+        self.url = f'/api/tasks/documents/{self.document.pk}/download/'
+        self.digest = hashlib.sha256(self.content).hexdigest()
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.leader)
+
+    def test_full_download(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(response['ETag'], f'"{self.digest}"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Disposition'], 'inline; filename="informe.pdf"')
+
+        response = self.client.get(self.url, {'download': 1})
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="informe.pdf"')
+        b''.join(response.streaming_content)
+
+    def test_byte_ranges(self):
+        size = len(self.content)
+        cases = {
+            'bytes=100-199': (100, 199),
+            'bytes=10000-': (10000, size - 1),
+            'bytes=-50': (size - 50, size - 1),
+            'bytes=200-999999': (200, size - 1),
+        }
+        for header, (start, end) in cases.items():
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{size}')
+                self.assertEqual(response['Content-Length'], str(end - start + 1))
+                self.assertEqual(b''.join(response.streaming_content), self.content[start:end + 1])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={size}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{size}')
+
+        # Varios rangos o un If-Range distinto: archivo completo
+        for headers in ({'HTTP_RANGE': 'bytes=0-1,5-6'},
+                        {'HTTP_RANGE': 'bytes=0-1', 'HTTP_IF_RANGE': '"otro"'}):
+            response = self.client.get(self.url, **headers)
+            self.assertEqual(response.status_code, 200)
+            b''.join(response.streaming_content)
+
+    def test_if_none_match(self):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'W/"{self.digest}"')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"otro"')
+        self.assertEqual(response.status_code, 200)
+        b''.join(response.streaming_content)
+
+    def test_access_control(self):
+        self.client.force_authenticate(self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        client = APIClient()
+        self.assertEqual(client.get(self.url).status_code, 401)
+        self.assertEqual(client.get(self.url, {'token': 'invalido'}).status_code, 401)
+        # El token de acceso no se acepta en la URL
+        access = str(AccessToken.for_user(self.leader))
+        self.assertEqual(client.get(self.url, {'token': access}).status_code, 401)
+
+    def signed_url(self):
+        self.client.force_authenticate(self.leader)
+        response = self.client.get(f'/api/tasks/{self.document.task_id}/documents/')
+        url = response.data['results'][0]['file']
+        self.assertTrue(url.startswith(f'http://testserver{self.url}?token='))
+        return url
+
+    def test_signed_url_from_serializer(self):
+        url = self.signed_url()
+        client = APIClient()
+        response = client.get(url + '&download=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="informe.pdf"')
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+        # La firma solo vale para su ruta y durante DOWNLOAD_TOKEN_MAX_AGE
+        token = url.split('token=')[1]
+        other = f'/api/tasks/documents/{self.document.pk + 1}/download/'
+        self.assertEqual(client.get(other, {'token': token}).status_code, 401)
+        self.assertEqual(client.get(f'/api/tasks/{self.document.task_id}/', {'token': token}).status_code, 401)
+        with override_settings(DOWNLOAD_TOKEN_MAX_AGE=-1):
+            self.assertEqual(client.get(url).status_code, 401)
+
+        # Quien ya no es miembro no puede usar un enlace generado antes
+        Membership.objects.filter(user=self.leader).delete()
+        self.assertEqual(client.get(url).status_code, 403)
+
+    def test_media_url_is_not_served(self):
+        with override_settings(DEBUG=True):
+            response = self.client.get(f'/media/{self.document.file.name}')
+        self.assertEqual(response.status_code, 404)
+
+    def test_delegated_serve_modes(self):
+        with override_settings(DOWNLOAD_SERVE_MODE='x-accel-redirect'):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.document.file.name}')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+        with override_settings(DOWNLOAD_SERVE_MODE='x-sendfile'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], self.document.file.path)
+
+
+class ChunkedUploadTest(TestCase):
+    """Subidas por partes: posiciones, sumas de verificación y reintentos."""
+
+    content = os.urandom(250 * 1024)
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.leader = User.objects.create_user('lider@example.com', None)
+        self.member = User.objects.create_user('miembro@example.com', None)
+        project = Project.objects.create(
+            title='Proyecto', description='-', general_objectives='-',
+            specific_objectives='-', start_date=date(2025, 1, 1),
+            end_date=date(2030, 1, 1), created_by=self.leader
+        )
+        Membership.objects.create(user=self.leader, project=project, role='leader')
+        Membership.objects.create(user=self.member, project=project, role='member')
+        self.task = Task.objects.create(
+            project=project, name='Tarea', description='-',
+            deadline=date.today(), created_by=self.leader
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.leader)
+
+    def start(self, content=None, **extra):
+        content = self.content if content is None else content
+        data = {'filename': 'video.mp4', 'name': 'Grabación', 'size': len(content), **extra}
+        response = self.client.post(f'/api/tasks/{self.task.pk}/documents/uploads/', data, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+    def put(self, upload_id, offset, chunk, checksum=None):
+        return self.client.generic(
+            'PUT', f'/api/tasks/documents/uploads/{upload_id}/', chunk,
+            content_type='application/octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset),
+            HTTP_UPLOAD_CHECKSUM=checksum or hashlib.sha256(chunk).hexdigest()
+        )
+
+    def complete(self, upload_id):
+        return self.client.post(f'/api/tasks/documents/uploads/{upload_id}/complete/')
+
+    def test_upload_in_chunks_with_retries(self):
+        upload_id = self.start(sha256=hashlib.sha256(self.content).hexdigest())
+        chunks = [self.content[i:i + 100 * 1024] for i in range(0, len(self.content), 100 * 1024)]
+
+        response = self.put(upload_id, 0, chunks[0])
+        self.assertEqual(response.data['offset'], len(chunks[0]))
+
+        # Reintento de una parte ya recibida: no escribe y responde lo mismo
+        response = self.put(upload_id, 0, chunks[0])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['offset'], len(chunks[0]))
+
+        # Saltarse una parte o alterar una recibida responde la posición esperada
+        response = self.put(upload_id, 200 * 1024, chunks[2])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], 100 * 1024)
+        response = self.put(upload_id, 0, b'x' * len(chunks[0]))
+        self.assertEqual(response.status_code, 409)
+
+        # Una parte dañada se descarta sin mover la posición
+        response = self.put(upload_id, 100 * 1024, chunks[1], checksum='0' * 64)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(f'/api/tasks/documents/uploads/{upload_id}/').data['received'], 100 * 1024)
+
+        self.assertEqual(self.complete(upload_id).status_code, 409)
+        self.put(upload_id, 100 * 1024, chunks[1])
+        response = self.put(upload_id, 200 * 1024, chunks[2])
+        self.assertEqual(response.data['offset'], len(self.content))
+
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['filename'], 'video.mp4')
+        document = TaskDocument.objects.get(pk=response.data['id'])
+        with document.file.open('rb') as stored:
+            self.assertEqual(stored.read(), self.content)
+        self.assertEqual(DocumentBlob.objects.get().ref_count, 1)
+        self.assertFalse(os.listdir(os.path.join(self.media_root, 'tasks', 'uploads')))
+        self.assertTrue(Activity.objects.filter(verb=Activity.DOCUMENT_UPLOADED).exists())
+
+        # Completar de nuevo no duplica el documento
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], document.pk)
+        self.assertEqual(TaskDocument.objects.count(), 1)
+        self.assertEqual(self.put(upload_id, 0, self.content[:10]).status_code, 409)
+
+    def test_concurrent_part_keeps_first_write(self):
+        upload_id = self.start(content=b'abcdef')
+        upload = DocumentUpload.objects.get(pk=upload_id)
+        first, second = b'abc', b'xyz'
+
+        class RacingStream:
+            # Otra petición confirma la misma posición mientras esta recibe su parte
+            def __init__(stream, data):
+                stream.data, stream.raced = data, False
+
+            def read(stream, size):
+                if not stream.raced:
+                    stream.raced = True
+                    self.assertEqual(self.put(upload_id, 0, first).data['offset'], 3)
+                data, stream.data = stream.data[:size], stream.data[size:]
+                return data
+
+        with self.assertRaises(uploads.UploadConflict) as conflict:
+            uploads.write_chunk(
+                upload, 0, RacingStream(second), 3, hashlib.sha256(second).hexdigest()
+            )
+        self.assertEqual(conflict.exception.offset, 3)
+
+        # Un reintento idéntico que pierde la carrera se confirma sin escribir
+        DocumentUpload.objects.filter(pk=upload_id).update(received=0)
+        received = uploads.write_chunk(
+            upload, 0, RacingStream(first), 3, hashlib.sha256(first).hexdigest()
+        )
+        self.assertEqual(received, 3)
+
+        partial = os.path.join(self.media_root, 'tasks', 'uploads', f'{upload_id}.part')
+        with open(partial, 'rb') as stored:
+            self.assertEqual(stored.read(), first)
+        self.assertEqual(os.listdir(os.path.dirname(partial)), [f'{upload_id}.part'])
+
+    def test_duplicate_content_reuses_blob(self):
+        first = self.start()
+        self.put(first, 0, self.content[:200 * 1024])
+        self.put(first, 200 * 1024, self.content[200 * 1024:])
+        self.complete(first)
+
+        second = self.start()
+        self.put(second, 0, self.content[:200 * 1024])
+        self.put(second, 200 * 1024, self.content[200 * 1024:])
+        self.assertEqual(self.complete(second).status_code, 201)
+
+        names = set(TaskDocument.objects.values_list('file', flat=True))
+        self.assertEqual(len(names), 1)
+        self.assertEqual(DocumentBlob.objects.get().ref_count, 2)
+
+    def test_final_checksum_mismatch_discards_upload(self):
+        upload_id = self.start(content=b'abc', sha256='0' * 64)
+        self.put(upload_id, 0, b'abc')
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(DocumentUpload.objects.exists())
+        self.assertFalse(DocumentBlob.objects.exists())
+        self.assertFalse(TaskDocument.objects.exists())
+
+    def test_validation_and_access(self):
+        upload_id = self.start(content=b'abc')
+        self.assertEqual(self.put(upload_id, 0, b'abcd').status_code, 400)
+        self.assertEqual(self.put(upload_id, -1, b'a').status_code, 400)
+
+        with override_settings(TASK_UPLOAD_CHUNK_SIZE=2):
+            self.assertEqual(self.put(upload_id, 0, b'abc').status_code, 400)
+        with override_settings(TASK_UPLOAD_MAX_SIZE=2):
+            response = self.client.post(
+                f'/api/tasks/{self.task.pk}/documents/uploads/',
+                {'filename': 'a.txt', 'size': 3}, format='json'
+            )
+            self.assertEqual(response.status_code, 400)
+
+        # Solo quien inició la subida puede continuarla
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.put(upload_id, 0, b'abc').status_code, 404)
+        response = self.client.post(
+            f'/api/tasks/{self.task.pk}/documents/uploads/',
+            {'filename': 'a.txt', 'size': 3}, format='json'
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_deleting_task_removes_partial_files(self):
+        upload_id = self.start(content=b'abc')
+        self.put(upload_id, 0, b'ab')
+        partial = os.path.join(self.media_root, 'tasks', 'uploads', f'{upload_id}.part')
+        self.assertTrue(os.path.exists(partial))
+
+        response = self.client.delete(f'/api/tasks/{self.task.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(DocumentUpload.objects.exists())
+        self.assertFalse(os.path.exists(partial))
+
+    def test_expired_uploads_are_discarded(self):
+        upload_id = self.start(content=b'abc')
+        self.put(upload_id, 0, b'ab')
+        partial = os.path.join(self.media_root, 'tasks', 'uploads', f'{upload_id}.part')
+        self.assertTrue(os.path.exists(partial))
+
+        DocumentUpload.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        self.start(content=b'otro')
+        self.assertFalse(DocumentUpload.objects.filter(pk=upload_id).exists())
+        self.assertFalse(os.path.exists(partial))
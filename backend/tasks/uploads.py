@@ -0,0 +1,260 @@
+"""Subidas de documentos por partes, reanudables.
+
+El cliente inicia una subida (``DocumentUpload``) con el tamaño total y
+envía el archivo en partes con ``PUT``, cada una con su posición
+(``Upload-Offset``) y su SHA-256 (``Upload-Checksum``). Cada parte se copia
+del cuerpo de la petición en bloques de ``BLOCK_SIZE``, calculando el hash
+al mismo tiempo, así que la memoria por subida no depende del tamaño del
+archivo ni de la parte. Las escrituras al archivo parcial se serializan
+con un ``UPDATE`` condicional sobre ``received``, sin bloqueos del sistema
+operativo.
+
+Reintentos: una parte ya confirmada se reconoce por su posición y su hash y
+responde sin escribir nada; una parte con otra posición responde
+``UploadConflict`` con la posición esperada para que el cliente continúe
+desde ahí. Al finalizar, ``ContentAddressedStorage.adopt`` mueve el parcial
+a su blob (sin copiarlo) y el documento se crea en la misma transacción.
+"""
+import hashlib
+import os
+import shutil
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from projects import activity
+from .models import DocumentUpload, TaskDocument
+from .storage import blob_digest
+
+
+BLOCK_SIZE = 64 * 1024
+
+
+def chunk_size():
+    return getattr(settings, 'TASK_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)
+
+
+def max_size():
+    return getattr(settings, 'TASK_UPLOAD_MAX_SIZE', 1024 * 1024 * 1024)
+
+
+def expiry():
+    return getattr(settings, 'TASK_UPLOAD_EXPIRY', 24 * 60 * 60)
+
+
+class UploadConflict(Exception):
+    """La parte no continúa el archivo; ``offset`` es la posición esperada."""
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+class ChecksumMismatch(ValueError):
+    pass
+
+
+def document_storage():
+    return TaskDocument._meta.get_field('file').storage
+
+
+def start(task, user, name, filename, size, sha256=''):
+    """Crea la subida y su archivo parcial vacío."""
+    expire_uploads()
+    upload = DocumentUpload.objects.create(
+        task=task, uploaded_by=user, name=name or filename,
+        filename=filename, size=size, sha256=sha256
+    )
+    path = document_storage().path(upload.partial_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    return upload
+
+
+def write_chunk(upload, offset, stream, length, checksum):
+    """Escribe una parte en ``offset``; retorna los bytes confirmados.
+
+    ``stream`` es el cuerpo de la petición y ``checksum`` el SHA-256 en
+    hexadecimal de sus ``length`` bytes.
+    """
+    if length <= 0:
+        raise ValueError('La parte está vacía.')
+    limit = chunk_size()
+    if length > limit:
+        raise ValueError(f'Cada parte puede tener como máximo {limit} bytes.')
+    if offset + length > upload.size:
+        raise ValueError('La parte excede el tamaño declarado del archivo.')
+
+    path = document_storage().path(upload.partial_name)
+    if not os.path.exists(path):
+        raise UploadConflict('El archivo parcial ya no existe; inicia la subida de nuevo.', 0)
+
+    # Otra petición pudo confirmar partes desde que se cargó la subida
+    upload.refresh_from_db(fields=['received', 'document'])
+    confirmed = _confirmed(upload, path, offset, length, checksum)
+    if confirmed is not None:
+        return confirmed
+
+    # La parte se recibe en un archivo propio y solo se copia al parcial
+    # tras reclamar su posición, así dos peticiones nunca escriben a la vez
+    # el mismo tramo y la transacción no espera al cliente
+    staging = f'{path}.{uuid.uuid4().hex}'
+    try:
+        with open(staging, 'w+b') as chunk:
+            digest = hashlib.sha256()
+            written = 0
+            while written < length:
+                block = stream.read(min(BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                digest.update(block)
+                chunk.write(block)
+                written += len(block)
+            if written != length:
+                raise ValueError('La parte llegó incompleta.')
+            if digest.hexdigest() != checksum:
+                raise ChecksumMismatch('La suma de verificación de la parte no coincide.')
+
+            with transaction.atomic():
+                # El UPDATE condicional bloquea la fila hasta confirmar: una
+                # petición concurrente con la misma posición ya no la encuentra
+                claimed = DocumentUpload.objects.filter(
+                    pk=upload.pk, received=offset, document__isnull=True
+                ).update(received=offset + length, updated_at=timezone.now())
+                if claimed:
+                    try:
+                        partial = open(path, 'r+b')
+                    except FileNotFoundError:
+                        raise UploadConflict(
+                            'El archivo parcial ya no existe; inicia la subida de nuevo.', 0
+                        )
+                    with partial:
+                        chunk.seek(0)
+                        partial.seek(offset)
+                        shutil.copyfileobj(chunk, partial, BLOCK_SIZE)
+                        partial.flush()
+                        os.fsync(partial.fileno())
+    finally:
+        os.remove(staging)
+
+    if not claimed:
+        upload.refresh_from_db(fields=['received', 'document'])
+        confirmed = _confirmed(upload, path, offset, length, checksum)
+        if confirmed is None:
+            raise UploadConflict('La parte no continúa el archivo.', upload.received)
+        return confirmed
+    upload.received = offset + length
+    return upload.received
+
+
+def _confirmed(upload, path, offset, length, checksum):
+    """Bytes confirmados si la parte ya se recibió; ``None`` si continúa el archivo."""
+    received = upload.received
+    if upload.document_id:
+        raise UploadConflict('La subida ya fue completada.', received)
+    if offset < received and offset + length <= received:
+        # Reintento de una parte confirmada: basta con comparar el hash
+        try:
+            with open(path, 'rb') as partial:
+                stored = _stored_digest(partial, offset, length)
+        except FileNotFoundError:
+            raise UploadConflict('El archivo parcial ya no existe; inicia la subida de nuevo.', 0)
+        if stored != checksum:
+            raise UploadConflict('La parte no coincide con la ya recibida.', received)
+        return received
+    if offset != received:
+        raise UploadConflict('La parte no continúa el archivo.', received)
+    return None
+
+
+def _stored_digest(partial, offset, length):
+    digest = hashlib.sha256()
+    partial.seek(offset)
+    remaining = length
+    while remaining:
+        block = partial.read(min(BLOCK_SIZE, remaining))
+        if not block:
+            break
+        digest.update(block)
+        remaining -= len(block)
+    return digest.hexdigest()
+
+
+def finish(upload, user):
+    """Crea el documento con el archivo completo; retorna ``(documento, creado)``.
+
+    Repetir la llamada retorna el mismo documento. Si el hash final no
+    coincide con el declarado al iniciar, la subida se descarta.
+    """
+    if upload.document_id:
+        return upload.document, False
+    if upload.received != upload.size:
+        raise UploadConflict('Faltan partes por subir.', upload.received)
+
+    storage = document_storage()
+    created = []
+    try:
+        with transaction.atomic():
+            # Reclamar la fila serializa las finalizaciones concurrentes: la
+            # segunda espera a que la primera confirme y ya no la encuentra
+            claimed = DocumentUpload.objects.filter(
+                pk=upload.pk, received=upload.size, document__isnull=True
+            ).update(updated_at=timezone.now())
+            if claimed:
+                if not os.path.exists(storage.path(upload.partial_name)):
+                    raise UploadConflict(
+                        'El archivo parcial ya no existe; inicia la subida de nuevo.', 0
+                    )
+
+                def save(name):
+                    if upload.sha256 and blob_digest(name) != upload.sha256:
+                        raise ChecksumMismatch('La suma de verificación del archivo no coincide.')
+                    document = TaskDocument.objects.create(
+                        task=upload.task, file=name, name=upload.name,
+                        original_filename=upload.filename, uploaded_by=user
+                    )
+                    activity.document_uploaded(document, upload.task, user)
+                    DocumentUpload.objects.filter(pk=upload.pk).update(
+                        document=document, updated_at=timezone.now()
+                    )
+                    created.append(document)
+
+                storage.adopt(upload.partial_name, save)
+    except ChecksumMismatch:
+        discard(upload)
+        raise
+
+    if not claimed:
+        # Otra petición acaba de completarla
+        try:
+            upload.refresh_from_db(fields=['document'])
+        except DocumentUpload.DoesNotExist:
+            upload.document_id = None
+        if upload.document_id:
+            return upload.document, False
+        raise UploadConflict('El archivo parcial ya no existe; inicia la subida de nuevo.', 0)
+
+    upload.document = created[0]
+    return upload.document, True
+
+
+def discard(upload):
+    """Elimina la subida y su archivo parcial."""
+    try:
+        os.remove(document_storage().path(upload.partial_name))
+    except FileNotFoundError:
+        pass
+    upload.delete()
+
+
+def expire_uploads(now=None):
+    """Descarta las subidas sin completar inactivas por más de ``TASK_UPLOAD_EXPIRY``."""
+    cutoff = (now or timezone.now()) - timedelta(seconds=expiry())
+    expired = DocumentUpload.objects.filter(updated_at__lt=cutoff, document__isnull=True)
+    for upload in expired.only('id'):
+        discard(upload)
+    # Las completadas ya no tienen archivo parcial
+    DocumentUpload.objects.filter(updated_at__lt=cutoff).delete()
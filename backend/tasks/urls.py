@@ -2,10 +2,15 @@ from django.urls import path
 
 from .views import (
     TaskListCreateView,
+    BulkTaskView,
     TaskDetailView,
     TaskStatusUpdateView,
     TaskDocumentListView,
     TaskDocumentUploadView,
+    TaskDocumentDownloadView,
+    DocumentUploadStartView,
+    DocumentUploadView,
+    DocumentUploadCompleteView,
     TaskDocumentDeleteView,
     MyTasksView
 )
@@ -18,6 +23,7 @@ urlpatterns = [
     
     # Tareas por proyecto
     path('project/<int:project_id>/', TaskListCreateView.as_view(), name='list_create'),
+    path('project/<int:project_id>/bulk/', BulkTaskView.as_view(), name='bulk'),
     
     # Detalle de tarea
     path('<int:pk>/', TaskDetailView.as_view(), name='detail'),
@@ -26,5 +32,9 @@ urlpatterns = [
     # Documentos
     path('<int:task_id>/documents/', TaskDocumentListView.as_view(), name='document_list'),
     path('<int:task_id>/documents/upload/', TaskDocumentUploadView.as_view(), name='document_upload'),
+    path('<int:task_id>/documents/uploads/', DocumentUploadStartView.as_view(), name='document_upload_start'),
+    path('documents/uploads/<uuid:upload_id>/', DocumentUploadView.as_view(), name='document_upload_detail'),
+    path('documents/uploads/<uuid:upload_id>/complete/', DocumentUploadCompleteView.as_view(), name='document_upload_complete'),
+    path('documents/<int:pk>/download/', TaskDocumentDownloadView.as_view(), name='document_download'),
     path('documents/<int:pk>/delete/', TaskDocumentDeleteView.as_view(), name='document_delete'),
 ]
@@ -1,24 +1,101 @@
+import re
+
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.db import transaction
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
 
-from .models import Task, TaskDocument
+from . import uploads
+from .bulk import apply_changes
+from .listing import InvalidCursor, facet_counts, filter_tasks, keyset_page
+from .models import Task, TaskDocument, DocumentUpload
+from .storage import blob_digest
 from .serializers import (
+    BulkTaskSerializer,
     TaskListSerializer,
     TaskDetailSerializer,
     TaskCreateSerializer,
     TaskUpdateSerializer,
     TaskStatusSerializer,
     TaskDocumentSerializer,
-    TaskDocumentUploadSerializer
+    TaskDocumentUploadSerializer,
+    DocumentUploadStartSerializer,
+    DocumentUploadSerializer,
+    TaskListQuerySerializer
 )
-from projects.models import Project, Membership
+from projects.models import Project
+from projects import activity, stats
+from projects.downloads import DownloadTokenAuthentication, serve_file
+from projects.permissions import get_membership_resolver, IsProjectMember
+
+
+def task_list_queryset(queryset):
+    """Tareas preparadas para ``TaskListSerializer``.
+    
+    El número de documentos se cuenta en una subconsulta y el usuario
+    asignado se obtiene con un JOIN, sin consultas por tarea.
+    """
+    documents_count = TaskDocument.objects.filter(task=OuterRef('pk')).values(
+        'task'
+    ).annotate(n=Count('id')).values('n')
+    return queryset.select_related('assigned_to').annotate(
+        documents_count=Coalesce(Subquery(documents_count), 0)
+    )
 
 
-class TaskListCreateView(generics.ListCreateAPIView):
+def task_detail_queryset():
+    """Tareas preparadas para ``TaskDetailSerializer``.
+    
+    Usuarios y proyecto con JOIN; los documentos se precargan junto a
+    quien los subió.
+    """
+    return Task.objects.select_related('assigned_to', 'created_by', 'project').prefetch_related(
+        Prefetch('documents', queryset=TaskDocument.objects.select_related('uploaded_by'))
+    )
+
+
+class TaskListMixin:
+    """Lista de tareas con filtros, orden y paginación por cursor.
+    
+    Parámetros de ``TaskListQuerySerializer``. Responde
+    ``{results, cursor, has_more}``; la siguiente página se pide con
+    ``?cursor=<cursor>`` y los mismos filtros. Con ``?facets=true`` agrega
+    los totales por estado y prioridad (ver ``tasks.listing``).
+    """
+    
+    def list(self, request, *args, **kwargs):
+        query = TaskListQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        
+        queryset = self.get_queryset()
+        try:
+            tasks, cursor = keyset_page(
+                filter_tasks(queryset, params, request.user),
+                params['sort'],
+                cursor=params.get('cursor'),
+                page_size=params['page_size']
+            )
+        except InvalidCursor as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = {
+            'results': self.get_serializer(tasks, many=True).data,
+            'cursor': cursor,
+            'has_more': cursor is not None
+        }
+        if params['facets']:
+            data['facets'] = facet_counts(queryset, params, request.user)
+        return Response(data)
+
+
+class TaskListCreateView(TaskListMixin, generics.ListCreateAPIView):
     """Vista para listar y crear tareas de un proyecto."""
     
     permission_classes = [IsAuthenticated]
@@ -29,24 +106,23 @@ class TaskListCreateView(generics.ListCreateAPIView):
         return TaskListSerializer
     
     def get_project(self):
-        """Obtiene el proyecto y verifica membresía."""
-        project_id = self.kwargs.get('project_id')
-        project = get_object_or_404(Project, pk=project_id)
-        
-        # Verificar membresía
-        if not Membership.objects.filter(
-            user=self.request.user,
-            project=project
-        ).exists():
-            return None
-        
-        return project
+        """Obtiene el proyecto y verifica membresía (una vez por petición)."""
+        if not hasattr(self, '_project'):
+            project = get_object_or_404(Project, pk=self.kwargs.get('project_id'))
+            
+            # Verificar membresía
+            if not get_membership_resolver(self.request).is_member(project.id):
+                project = None
+            
+            self._project = project
+        
+        return self._project
     
     def get_queryset(self):
         project = self.get_project()
         if not project:
             return Task.objects.none()
-        return Task.objects.filter(project=project).order_by('-created_at')
+        return task_list_queryset(Task.objects.filter(project=project))
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -63,12 +139,7 @@ class TaskListCreateView(generics.ListCreateAPIView):
             )
         
         # Verificar que sea líder para crear tareas
-        membership = Membership.objects.filter(
-            user=request.user,
-            project=project
-        ).first()
-        
-        if membership.role != 'leader':
+        if not get_membership_resolver(request).is_leader(project.id):
             return Response(
                 {'error': 'Solo el líder puede crear tareas.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -77,17 +148,49 @@ class TaskListCreateView(generics.ListCreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        task = serializer.save(
-            project=project,
-            created_by=request.user
-        )
+        with transaction.atomic():
+            task = serializer.save(
+                project=project,
+                created_by=request.user
+            )
+            stats.task_created(task)
+            activity.task_created(task, request.user)
         
         return Response(
-            TaskDetailSerializer(task).data,
+            TaskDetailSerializer(task, context={'request': request}).data,
             status=status.HTTP_201_CREATED
         )
 
 
+class BulkTaskView(APIView):
+    """Vista para crear, editar y cambiar el estado de varias tareas a la vez.
+    
+    Recibe las listas ``create``, ``update`` y ``status``; cada elemento se
+    valida por separado y la respuesta trae el resultado de cada uno.
+    """
+    
+    permission_classes = [IsAuthenticated, IsProjectMember]
+    
+    def post(self, request, project_id):
+        project = get_object_or_404(Project, pk=project_id)
+        serializer = BulkTaskSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        data = serializer.validated_data
+        results, summary = apply_changes(
+            project, request.user,
+            creates=data['create'], updates=data['update'], statuses=data['status']
+        )
+        return Response({
+            'message': (
+                f'Se crearon {summary.get("created", 0)} tareas y se actualizaron '
+                f'{summary.get("updated", 0)}.'
+            ),
+            'summary': summary,
+            'results': results
+        }, status=status.HTTP_200_OK)
+
+
 class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Vista para ver, actualizar y eliminar una tarea."""
     
@@ -99,20 +202,18 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
         return TaskDetailSerializer
     
     def get_queryset(self):
-        user = self.request.user
-        return Task.objects.filter(
-            project__memberships__user=user
-        ).distinct()
+        queryset = Task.objects.all()
+        if self.request.method == 'GET':
+            queryset = task_detail_queryset()
+        return queryset.filter(
+            project_id__in=get_membership_resolver(self.request).project_ids()
+        )
     
     def update(self, request, *args, **kwargs):
         """Solo el líder puede actualizar tareas."""
         task = self.get_object()
-        membership = Membership.objects.filter(
-            user=request.user,
-            project=task.project
-        ).first()
         
-        if not membership or membership.role != 'leader':
+        if not get_membership_resolver(request).is_leader(task.project_id):
             return Response(
                 {'error': 'Solo el líder puede editar tareas.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -120,21 +221,40 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
         
         return super().update(request, *args, **kwargs)
     
+    def perform_update(self, serializer):
+        changed = [
+            field for field, value in serializer.validated_data.items()
+            if getattr(serializer.instance, field) != value
+        ]
+        with transaction.atomic():
+            task = serializer.save()
+            activity.task_updated(task, self.request.user, changed)
+    
     def destroy(self, request, *args, **kwargs):
         """Solo el líder puede eliminar tareas."""
         task = self.get_object()
-        membership = Membership.objects.filter(
-            user=request.user,
-            project=task.project
-        ).first()
         
-        if not membership or membership.role != 'leader':
+        if not get_membership_resolver(request).is_leader(task.project_id):
             return Response(
                 {'error': 'Solo el líder puede eliminar tareas.'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
         return super().destroy(request, *args, **kwargs)
+    
+    def perform_destroy(self, instance):
+        storage = TaskDocument._meta.get_field('file').storage
+        files = list(instance.documents.values_list('file', flat=True))
+        with transaction.atomic():
+            stats.task_deleted(instance)
+            activity.task_deleted(instance, self.request.user)
+            # El borrado en cascada no alcanza los archivos parciales
+            for upload in instance.uploads.filter(document__isnull=True).only('id'):
+                uploads.discard(upload)
+            instance.delete()
+            # Liberar las referencias a los archivos de los documentos borrados
+            for name in files:
+                storage.delete(name)
 
 
 class TaskStatusUpdateView(APIView):
@@ -146,20 +266,17 @@ class TaskStatusUpdateView(APIView):
         task = get_object_or_404(Task, pk=pk)
         
         # Verificar membresía
-        membership = Membership.objects.filter(
-            user=request.user,
-            project=task.project
-        ).first()
+        role = get_membership_resolver(request).role(task.project_id)
         
-        if not membership:
+        if not role:
             return Response(
                 {'error': 'No tienes acceso a esta tarea.'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
         # Solo el asignado o el líder pueden cambiar el estado
-        is_leader = membership.role == 'leader'
-        is_assigned = task.assigned_to == request.user
+        is_leader = role == 'leader'
+        is_assigned = task.assigned_to_id == request.user.id
         
         if not is_leader and not is_assigned:
             return Response(
@@ -169,10 +286,13 @@ class TaskStatusUpdateView(APIView):
         
         serializer = TaskStatusSerializer(task, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        old_status = task.status
+        with transaction.atomic():
+            serializer.save()
+            activity.task_status_changed(task, request.user, old_status)
         
         return Response(
-            TaskDetailSerializer(task).data,
+            TaskDetailSerializer(task, context={'request': request}).data,
             status=status.HTTP_200_OK
         )
 
@@ -185,19 +305,38 @@ class TaskDocumentListView(generics.ListAPIView):
     
     def get_queryset(self):
         task_id = self.kwargs.get('task_id')
-        user = self.request.user
         
         # Verificar acceso
         task = get_object_or_404(Task, pk=task_id)
-        if not Membership.objects.filter(
-            user=user,
-            project=task.project
-        ).exists():
+        if not get_membership_resolver(self.request).is_member(task.project_id):
             return TaskDocument.objects.none()
         
         return TaskDocument.objects.filter(task_id=task_id)
 
 
+def document_upload_denied(request, task):
+    """Respuesta 403 si el usuario no puede subir documentos a ``task``."""
+    # Verificar membresía
+    role = get_membership_resolver(request).role(task.project_id)
+    
+    if not role:
+        return Response(
+            {'error': 'No tienes acceso a esta tarea.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    # Solo el asignado o el líder pueden subir documentos
+    is_leader = role == 'leader'
+    is_assigned = task.assigned_to_id == request.user.id
+    
+    if not is_leader and not is_assigned:
+        return Response(
+            {'error': 'Solo el líder o la persona asignada pueden subir documentos.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return None
+
+
 class TaskDocumentUploadView(APIView):
     """Vista para subir documentos a una tarea."""
     
@@ -207,27 +346,9 @@ class TaskDocumentUploadView(APIView):
     def post(self, request, task_id):
         task = get_object_or_404(Task, pk=task_id)
         
-        # Verificar membresía
-        membership = Membership.objects.filter(
-            user=request.user,
-            project=task.project
-        ).first()
-        
-        if not membership:
-            return Response(
-                {'error': 'No tienes acceso a esta tarea.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        # Solo el asignado o el líder pueden subir documentos
-        is_leader = membership.role == 'leader'
-        is_assigned = task.assigned_to == request.user
-        
-        if not is_leader and not is_assigned:
-            return Response(
-                {'error': 'Solo el líder o la persona asignada pueden subir documentos.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
+        denied = document_upload_denied(request, task)
+        if denied:
+            return denied
         
         serializer = TaskDocumentUploadSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -236,19 +357,163 @@ class TaskDocumentUploadView(APIView):
         file_obj = request.data.get('file')
         name = serializer.validated_data.get('name') or file_obj.name
         
-        document = TaskDocument.objects.create(
-            task=task,
-            file=file_obj,
-            name=name,
-            uploaded_by=request.user
+        with transaction.atomic():
+            document = TaskDocument.objects.create(
+                task=task,
+                file=file_obj,
+                name=name,
+                uploaded_by=request.user
+            )
+            activity.document_uploaded(document, task, request.user)
+        
+        return Response(
+            TaskDocumentSerializer(document, context={'request': request}).data,
+            status=status.HTTP_201_CREATED
         )
+
+
+class DocumentUploadStartView(APIView):
+    """Vista para iniciar la subida por partes de un documento."""
+    
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, task_id):
+        task = get_object_or_404(Task, pk=task_id)
+        
+        denied = document_upload_denied(request, task)
+        if denied:
+            return denied
+        
+        serializer = DocumentUploadStartSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = uploads.start(task, request.user, **serializer.validated_data)
         
         return Response(
-            TaskDocumentSerializer(document).data,
+            DocumentUploadSerializer(upload).data,
             status=status.HTTP_201_CREATED
         )
 
 
+class DocumentUploadView(APIView):
+    """Vista para consultar, continuar o cancelar una subida por partes.
+    
+    ``PUT`` recibe una parte como cuerpo crudo con los encabezados
+    ``Upload-Offset`` (posición en bytes) y ``Upload-Checksum`` (SHA-256 en
+    hexadecimal de la parte). Responde la cantidad de bytes confirmados; con
+    ``409`` incluye la posición desde la que debe continuar el cliente.
+    """
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get_upload(self, request, upload_id):
+        return get_object_or_404(DocumentUpload, pk=upload_id, uploaded_by=request.user)
+    
+    def get(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        return Response(DocumentUploadSerializer(upload).data)
+    
+    def put(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or '')
+        except ValueError:
+            return Response(
+                {'error': 'Se requieren los encabezados Upload-Offset y Content-Length.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        checksum = request.headers.get('Upload-Checksum', '').strip().lower()
+        if offset < 0 or not re.fullmatch(r'[0-9a-f]{64}', checksum):
+            return Response(
+                {'error': 'Upload-Offset no puede ser negativo y Upload-Checksum debe ser un SHA-256 en hexadecimal.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            received = uploads.write_chunk(upload, offset, request.stream, length, checksum)
+        except uploads.UploadConflict as exc:
+            return Response(
+                {'error': str(exc), 'offset': exc.offset},
+                status=status.HTTP_409_CONFLICT
+            )
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({'offset': received, 'size': upload.size})
+    
+    def delete(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        if upload.document_id:
+            return Response(
+                {'error': 'La subida ya fue completada.'},
+                status=status.HTTP_409_CONFLICT
+            )
+        uploads.discard(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class DocumentUploadCompleteView(APIView):
+    """Vista para completar una subida por partes y crear el documento.
+    
+    Repetirla retorna el mismo documento con ``200``.
+    """
+    
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, upload_id):
+        upload = get_object_or_404(
+            DocumentUpload.objects.select_related('task', 'document'),
+            pk=upload_id, uploaded_by=request.user
+        )
+        
+        denied = document_upload_denied(request, upload.task)
+        if denied:
+            return denied
+        
+        try:
+            document, created = uploads.finish(upload, request.user)
+        except uploads.UploadConflict as exc:
+            return Response(
+                {'error': str(exc), 'offset': exc.offset},
+                status=status.HTTP_409_CONFLICT
+            )
+        except uploads.ChecksumMismatch as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(
+            TaskDocumentSerializer(document, context={'request': request}).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+
+class TaskDocumentDownloadView(APIView):
+    """Vista para descargar un documento de una tarea.
+    
+    Admite ``Range`` e ``If-None-Match`` (ver ``projects.downloads``). Los
+    enlaces y visores usan la URL firmada que entrega ``TaskDocumentSerializer``.
+    """
+    
+    authentication_classes = [JWTAuthentication, DownloadTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        document = get_object_or_404(TaskDocument.objects.select_related('task'), pk=pk)
+        
+        # Verificar membresía
+        if not get_membership_resolver(request).is_member(document.task.project_id):
+            return Response(
+                {'error': 'No tienes acceso a este documento.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        # En los blobs el nombre ya es el hash del contenido
+        return serve_file(
+            request, document.file, document.filename(),
+            etag=blob_digest(document.file.name)
+        )
+
+
 class TaskDocumentDeleteView(APIView):
     """Vista para eliminar un documento de una tarea."""
     
@@ -259,20 +524,17 @@ class TaskDocumentDeleteView(APIView):
         task = document.task
         
         # Verificar membresía
-        membership = Membership.objects.filter(
-            user=request.user,
-            project=task.project
-        ).first()
+        role = get_membership_resolver(request).role(task.project_id)
         
-        if not membership:
+        if not role:
             return Response(
                 {'error': 'No tienes acceso a este documento.'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
         # Solo el que subió el documento o el líder pueden eliminarlo
-        is_leader = membership.role == 'leader'
-        is_uploader = document.uploaded_by == request.user
+        is_leader = role == 'leader'
+        is_uploader = document.uploaded_by_id == request.user.id
         
         if not is_leader and not is_uploader:
             return Response(
@@ -280,22 +542,25 @@ class TaskDocumentDeleteView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Eliminar archivo físico
-        if document.file:
-            document.file.delete(save=False)
-        
-        document.delete()
+        with transaction.atomic():
+            activity.document_deleted(document, task, request.user)
+            # Liberar la referencia al archivo junto con la fila: si el borrado
+            # falla, el conteo del blob vuelve atrás con la transacción
+            if document.file:
+                document.file.delete(save=False)
+            document.delete()
         
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class MyTasksView(generics.ListAPIView):
+class MyTasksView(TaskListMixin, generics.ListAPIView):
     """Vista para listar todas las tareas asignadas al usuario."""
     
     permission_classes = [IsAuthenticated]
     serializer_class = TaskListSerializer
     
     def get_queryset(self):
-        return Task.objects.filter(
-            assigned_to=self.request.user
-        ).order_by('-created_at')
+        return task_list_queryset(Task.objects.filter(
+            assigned_to=self.request.user,
+            project__deleted_at__isnull=True
+        ))
@@ -14,6 +14,7 @@ import {
     Info,
     Wifi,
     WifiOff,
+    Paperclip,
 } from 'lucide-react';
 import { chatService, ChatRoom, ChatMessage } from '@/services/chat.service';
 import { useChat } from '@/hooks/useChat';
@@ -47,6 +48,7 @@ export default function ChatRoomPage() {
         typingUsers,
         isConnected,
         connectionError,
+        pendingCount,
     } = useChat(roomId);
 
     // Fetch initial messages (poll when WebSocket is disconnected)
@@ -84,6 +86,7 @@ export default function ChatRoomPage() {
             chatService.markAsRead(roomId).catch(console.error);
             // Invalidate chat rooms to update unread count
             queryClient.invalidateQueries({ queryKey: ['chat-rooms'] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard'] });
         }
     }, [roomId, queryClient]);
 
@@ -92,14 +95,8 @@ export default function ChatRoomPage() {
         const content = messageInput.trim();
         if (!content) return;
 
-        if (isConnected) {
-            sendMessage(content);
-        } else {
-            // Fallback to REST API
-            chatService.sendMessage(roomId, content).then(() => {
-                queryClient.invalidateQueries({ queryKey: ['chat-messages', roomId] });
-            });
-        }
+        // Sent over the WebSocket, or the REST API while disconnected
+        sendMessage(content);
 
         setMessageInput('');
         setTyping(false);
@@ -194,6 +191,11 @@ export default function ChatRoomPage() {
                                 <span>{connectionError || 'Desconectado'}</span>
                             </>
                         )}
+                        {pendingCount > 0 && (
+                            <span className="ml-2">
+                                {pendingCount === 1 ? '1 mensaje sin enviar' : `${pendingCount} mensajes sin enviar`}
+                            </span>
+                        )}
                         {typingUsers.length > 0 && (
                             <span className="ml-2 italic">
                                 {typingUsers.map((u) => u.name).join(', ')} escribiendo...
@@ -288,6 +290,18 @@ export default function ChatRoomPage() {
                                         <p className="whitespace-pre-wrap break-words">
                                             {message.content}
                                         </p>
+                                        {message.file && (
+                                            <a
+                                                href={chatService.messageFileUrl(message) ?? undefined}
+                                                target="_blank"
+                                                rel="noopener noreferrer"
+                                                className="flex items-center gap-1 text-sm underline mt-1"
+                                                style={{ color: isOwn ? 'white' : '#8B7355' }}
+                                            >
+                                                <Paperclip className="w-4 h-4" />
+                                                Ver archivo adjunto
+                                            </a>
+                                        )}
                                         <p
                                             className="text-xs mt-1 text-right"
                                             style={{
@@ -19,47 +19,34 @@ import {
     BellRing,
 } from 'lucide-react';
 import { useAuth } from '@/hooks/useAuth';
-import { projectService } from '@/services/project.service';
-import { taskService } from '@/services/task.service';
+import { dashboardService } from '@/services/dashboard.service';
 import { useTaskReminders } from '@/hooks/useNotifications';
 
 export default function DashboardPage() {
     const { user } = useAuth();
     const [calendarMonth, setCalendarMonth] = useState(new Date());
 
-    const { data: projects = [] } = useQuery({
-        queryKey: ['projects'],
-        queryFn: projectService.getProjects,
+    // Projects, task counts and upcoming deadlines in a single request
+    const { data: dashboard } = useQuery({
+        queryKey: ['dashboard'],
+        queryFn: dashboardService.getDashboard,
     });
 
-    const { data: myTasks = [] } = useQuery({
-        queryKey: ['my-tasks'],
-        queryFn: taskService.getMyTasks,
-    });
-
-    const pendingTasks = myTasks.filter((t) => t.status === 'pending');
-    const inProgressTasks = myTasks.filter((t) => t.status === 'in_progress');
-    const completedTasks = myTasks.filter((t) => t.status === 'completed');
-
-    const getDaysRemaining = (deadline: string) => {
-        const now = new Date();
-        const end = new Date(deadline);
-        const diff = Math.ceil((end.getTime() - now.getTime()) / (1000 * 60 * 60 * 24));
-        return diff;
-    };
+    const projects = dashboard?.projects ?? [];
+    const upcomingTasks = useMemo(() => dashboard?.tasks.upcoming ?? [], [dashboard]);
+    const totalTasks = dashboard?.tasks.total ?? 0;
+    const pendingCount = dashboard?.tasks.by_status.pending ?? 0;
+    const inProgressCount = dashboard?.tasks.by_status.in_progress ?? 0;
+    const completedCount = dashboard?.tasks.by_status.completed ?? 0;
 
-    const urgentTasks = myTasks
-        .filter((t) => t.status !== 'completed' && getDaysRemaining(t.deadline) <= 3)
-        .sort((a, b) => getDaysRemaining(a.deadline) - getDaysRemaining(b.deadline));
+    // Upcoming tasks arrive sorted by deadline
+    const urgentTasks = upcomingTasks.filter((t) => t.days_remaining <= 3);
 
-    // Task reminders hook for browser notifications
-    const { requestPermission, permission, isSupported } = useTaskReminders(myTasks);
+    // Deadline reminders pushed by the server as browser notifications
+    const { requestPermission, permission, isSupported } = useTaskReminders();
 
     // Calculate overall progress
-    const overallProgress = useMemo(() => {
-        if (myTasks.length === 0) return 0;
-        return Math.round((completedTasks.length / myTasks.length) * 100);
-    }, [myTasks, completedTasks]);
+    const overallProgress = totalTasks > 0 ? Math.round((completedCount / totalTasks) * 100) : 0;
 
     // Calendar data
     const calendarDays = useMemo(() => {
@@ -76,12 +63,12 @@ export default function DashboardPage() {
 
         for (let d = 1; d <= lastDay.getDate(); d++) {
             const dateStr = `${year}-${String(month + 1).padStart(2, '0')}-${String(d).padStart(2, '0')}`;
-            const tasksOnDay = myTasks.filter(t => t.deadline === dateStr && t.status !== 'completed');
+            const tasksOnDay = upcomingTasks.filter(t => t.deadline === dateStr);
             days.push({ date: d, tasks: tasksOnDay, dateStr });
         }
 
         return days;
-    }, [calendarMonth, myTasks]);
+    }, [calendarMonth, upcomingTasks]);
 
     const monthNames = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
         'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'];
@@ -96,21 +83,21 @@ export default function DashboardPage() {
         },
         {
             label: 'Tareas Pendientes',
-            value: pendingTasks.length,
+            value: pendingCount,
             icon: Clock,
             bgColor: 'bg-[#FFF8E7]',
             iconColor: 'text-[#C4A055]',
         },
         {
             label: 'En Progreso',
-            value: inProgressTasks.length,
+            value: inProgressCount,
             icon: TrendingUp,
             bgColor: 'bg-[#F0F4F8]',
             iconColor: 'text-[#6B7280]',
         },
         {
             label: 'Completadas',
-            value: completedTasks.length,
+            value: completedCount,
             icon: CheckSquare,
             bgColor: 'bg-[#EBF5EE]',
             iconColor: 'text-[#6B9080]',
@@ -199,7 +186,7 @@ export default function DashboardPage() {
                     </div>
                     <div className="mt-4 text-center">
                         <p className="text-sm text-[#7D6B5D]">
-                            {completedTasks.length} de {myTasks.length} tareas completadas
+                            {completedCount} de {totalTasks} tareas completadas
                         </p>
                     </div>
                 </div>
@@ -209,9 +196,9 @@ export default function DashboardPage() {
                     <h2 className="text-lg font-semibold text-[#4A3728] mb-4">Distribución de Tareas</h2>
                     <div className="space-y-4">
                         {[
-                            { label: 'Pendientes', count: pendingTasks.length, color: '#C4A055' },
-                            { label: 'En Progreso', count: inProgressTasks.length, color: '#8B7355' },
-                            { label: 'Completadas', count: completedTasks.length, color: '#6B9080' },
+                            { label: 'Pendientes', count: pendingCount, color: '#C4A055' },
+                            { label: 'En Progreso', count: inProgressCount, color: '#8B7355' },
+                            { label: 'Completadas', count: completedCount, color: '#6B9080' },
                         ].map(item => (
                             <div key={item.label}>
                                 <div className="flex justify-between text-sm mb-1">
@@ -222,7 +209,7 @@ export default function DashboardPage() {
                                     <div
                                         className="h-full rounded-full transition-all"
                                         style={{
-                                            width: myTasks.length > 0 ? `${(item.count / myTasks.length) * 100}%` : '0%',
+                                            width: totalTasks > 0 ? `${(item.count / totalTasks) * 100}%` : '0%',
                                             backgroundColor: item.color
                                         }}
                                     />
@@ -302,7 +289,7 @@ export default function DashboardPage() {
                             </div>
                         ) : (
                             urgentTasks.slice(0, 5).map((task) => {
-                                const daysLeft = getDaysRemaining(task.deadline);
+                                const daysLeft = task.days_remaining;
                                 return (
                                     <Link
                                         key={task.id}
@@ -4,25 +4,21 @@ import { useQuery } from '@tanstack/react-query';
 import Link from 'next/link';
 import { Mail, Edit, Key, FolderKanban, CheckSquare } from 'lucide-react';
 import { useAuth } from '@/hooks/useAuth';
-import { projectService } from '@/services/project.service';
-import { taskService } from '@/services/task.service';
+import { dashboardService } from '@/services/dashboard.service';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
 
 export default function ProfilePage() {
     const { user } = useAuth();
 
-    const { data: projects = [] } = useQuery({
-        queryKey: ['projects'],
-        queryFn: projectService.getProjects,
+    const { data: dashboard } = useQuery({
+        queryKey: ['dashboard'],
+        queryFn: dashboardService.getDashboard,
     });
 
-    const { data: tasks = [] } = useQuery({
-        queryKey: ['my-tasks'],
-        queryFn: taskService.getMyTasks,
-    });
-
-    const completedTasks = tasks.filter((t) => t.status === 'completed');
+    const projects = dashboard?.projects ?? [];
+    const totalTasks = dashboard?.tasks.total ?? 0;
+    const completedCount = dashboard?.tasks.by_status.completed ?? 0;
 
     return (
         <div className="max-w-3xl mx-auto space-y-6 pt-8 lg:pt-0">
@@ -79,7 +75,7 @@ export default function ProfilePage() {
                 <Card className="border-[#E8DFD5] shadow-sm bg-white">
                     <CardContent className="p-6 text-center">
                         <CheckSquare className="w-8 h-8 mx-auto text-[#6B9080] mb-3" />
-                        <p className="text-3xl font-bold text-[#4A3728]">{completedTasks.length}</p>
+                        <p className="text-3xl font-bold text-[#4A3728]">{completedCount}</p>
                         <p className="text-sm text-[#7D6B5D]">Tareas Completadas</p>
                     </CardContent>
                 </Card>
@@ -87,7 +83,7 @@ export default function ProfilePage() {
                 <Card className="border-[#E8DFD5] shadow-sm bg-white">
                     <CardContent className="p-6 text-center">
                         <CheckSquare className="w-8 h-8 mx-auto text-[#C4A055] mb-3" />
-                        <p className="text-3xl font-bold text-[#4A3728]">{tasks.length}</p>
+                        <p className="text-3xl font-bold text-[#4A3728]">{totalTasks}</p>
                         <p className="text-sm text-[#7D6B5D]">Total Tareas Asignadas</p>
                     </CardContent>
                 </Card>
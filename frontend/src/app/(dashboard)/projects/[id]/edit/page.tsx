@@ -52,6 +52,7 @@ export default function EditProjectPage() {
             toast.success('Proyecto actualizado');
             queryClient.invalidateQueries({ queryKey: ['project', projectId] });
             queryClient.invalidateQueries({ queryKey: ['projects'] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard'] });
             router.push(`/projects/${projectId}`);
         },
         onError: (error: unknown) => {
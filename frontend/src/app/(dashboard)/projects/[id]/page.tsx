@@ -72,6 +72,7 @@ export default function ProjectDetailPage() {
         onSuccess: () => {
             toast.success('Has salido del proyecto');
             queryClient.invalidateQueries({ queryKey: ['projects'] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard'] });
             router.push('/projects');
         },
         onError: () => {
@@ -84,6 +85,7 @@ export default function ProjectDetailPage() {
         onSuccess: () => {
             toast.success('Proyecto eliminado');
             queryClient.invalidateQueries({ queryKey: ['projects'] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard'] });
             router.push('/projects');
         },
         onError: () => {
@@ -125,115 +127,21 @@ export default function ProjectDetailPage() {
         toast.success('Código copiado al portapapeles');
     };
 
-    // Export project to PDF
-    const exportToPDF = () => {
+    // Export project to PDF (generated on the server)
+    const exportToPDF = async () => {
         if (!project) return;
 
-        const progress = tasks.length > 0 ? Math.round((completedTasks.length / tasks.length) * 100) : 0;
-
-        const printWindow = window.open('', '_blank');
-        if (!printWindow) {
-            toast.error('No se pudo abrir la ventana de impresión');
-            return;
+        try {
+            const blob = await projectService.exportProjectPDF(projectId);
+            const url = URL.createObjectURL(blob);
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = `${project.code} - ${project.title}.pdf`;
+            link.click();
+            URL.revokeObjectURL(url);
+        } catch {
+            toast.error('Error al exportar el proyecto');
         }
-
-        const html = `
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>${project.title} - Reporte</title>
-                <style>
-                    body { font-family: 'Inter', Arial, sans-serif; padding: 40px; color: #4A3728; line-height: 1.6; }
-                    h1 { color: #4A3728; margin-bottom: 8px; }
-                    h2 { color: #8B7355; border-bottom: 2px solid #E8DFD5; padding-bottom: 8px; margin-top: 32px; }
-                    .header-info { color: #7D6B5D; margin-bottom: 24px; }
-                    .stats { display: flex; gap: 24px; margin: 24px 0; flex-wrap: wrap; }
-                    .stat { background: #F5EDE4; padding: 16px 24px; border-radius: 8px; text-align: center; }
-                    .stat-value { font-size: 24px; font-weight: bold; color: #4A3728; }
-                    .stat-label { font-size: 12px; color: #7D6B5D; }
-                    .progress-bar { height: 8px; background: #E8DFD5; border-radius: 4px; margin: 16px 0; }
-                    .progress-fill { height: 100%; background: linear-gradient(90deg, #8B7355, #6B9080); border-radius: 4px; }
-                    table { width: 100%; border-collapse: collapse; margin-top: 16px; }
-                    th, td { padding: 12px; text-align: left; border-bottom: 1px solid #E8DFD5; }
-                    th { background: #F5EDE4; color: #4A3728; font-weight: 600; }
-                    .badge { padding: 4px 10px; border-radius: 12px; font-size: 12px; font-weight: 500; }
-                    .badge-pending { background: #FFF8E7; color: #C4A055; }
-                    .badge-in_progress { background: #F5EDE4; color: #8B7355; }
-                    .badge-completed { background: #EBF5EE; color: #6B9080; }
-                    .member { display: flex; align-items: center; gap: 8px; padding: 8px 0; }
-                    .avatar { width: 32px; height: 32px; background: linear-gradient(135deg, #8B7355, #A0926D); color: white; border-radius: 8px; display: flex; align-items: center; justify-content: center; font-weight: 600; font-size: 12px; }
-                    .footer { margin-top: 40px; padding-top: 16px; border-top: 1px solid #E8DFD5; color: #B8A99A; font-size: 12px; }
-                    @media print { body { padding: 20px; } }
-                </style>
-            </head>
-            <body>
-                <h1>${project.title}</h1>
-                <div class="header-info">
-                    <p><strong>Código:</strong> ${project.code} | <strong>Prioridad:</strong> ${project.priority_display}</p>
-                    <p><strong>Fecha de entrega:</strong> ${new Date(project.end_date).toLocaleDateString('es-ES', { weekday: 'long', year: 'numeric', month: 'long', day: 'numeric' })}</p>
-                    <p>${project.description || 'Sin descripción'}</p>
-                </div>
-                
-                <div class="stats">
-                    <div class="stat"><div class="stat-value">${members.length}</div><div class="stat-label">Miembros</div></div>
-                    <div class="stat"><div class="stat-value">${tasks.length}</div><div class="stat-label">Tareas Totales</div></div>
-                    <div class="stat"><div class="stat-value">${completedTasks.length}</div><div class="stat-label">Completadas</div></div>
-                    <div class="stat"><div class="stat-value">${progress}%</div><div class="stat-label">Progreso</div></div>
-                </div>
-                
-                <div class="progress-bar"><div class="progress-fill" style="width: ${progress}%"></div></div>
-                
-                <h2>📋 Tareas (${tasks.length})</h2>
-                ${tasks.length > 0 ? `
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Tarea</th>
-                            <th>Estado</th>
-                            <th>Prioridad</th>
-                            <th>Fecha Límite</th>
-                            <th>Asignado a</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        ${tasks.map(task => `
-                            <tr>
-                                <td>${task.name}</td>
-                                <td><span class="badge badge-${task.status}">${getStatusLabel(task.status)}</span></td>
-                                <td>${getPriorityLabel(task.priority)}</td>
-                                <td>${new Date(task.deadline).toLocaleDateString('es-ES')}</td>
-                                <td>${task.assigned_to_name || 'Sin asignar'}</td>
-                            </tr>
-                        `).join('')}
-                    </tbody>
-                </table>
-                ` : '<p>No hay tareas en este proyecto.</p>'}
-                
-                <h2>👥 Equipo (${members.length})</h2>
-                ${members.map(member => `
-                    <div class="member">
-                        <div class="avatar">${(member.user_name || '').split(' ').map(n => n[0] || '').join('')}</div>
-                        <div>
-                            <strong>${member.user_name || 'Usuario'}</strong>
-                            ${member.role === 'leader' ? ' 👑 Líder' : ''}
-                            <br><span style="color: #7D6B5D; font-size: 12px;">${member.user_email || ''}</span>
-                        </div>
-                    </div>
-                `).join('')}
-                
-                <div class="footer">
-                    Generado el ${new Date().toLocaleString('es-ES')} • Academic Project Manager
-                </div>
-            </body>
-            </html>
-
-        `;
-
-        printWindow.document.write(html);
-        printWindow.document.close();
-        printWindow.onload = () => {
-            printWindow.print();
-        };
     };
 
     // Handler to show transfer leadership modal
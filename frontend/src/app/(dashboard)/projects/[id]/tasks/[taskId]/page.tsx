@@ -17,7 +17,7 @@ import {
     X,
     Save,
 } from 'lucide-react';
-import { taskService } from '@/services/task.service';
+import { RESUMABLE_UPLOAD_THRESHOLD, taskService } from '@/services/task.service';
 import { projectService } from '@/services/project.service';
 import { useAuth } from '@/hooks/useAuth';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
@@ -85,6 +85,7 @@ export default function TaskDetailPage() {
             queryClient.invalidateQueries({ queryKey: ['task', taskId] });
             queryClient.invalidateQueries({ queryKey: ['project-tasks', projectId] });
             queryClient.invalidateQueries({ queryKey: ['my-tasks'] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard'] });
         },
         onError: () => {
             toast.error('Error al actualizar el estado');
@@ -98,6 +99,7 @@ export default function TaskDetailPage() {
             queryClient.invalidateQueries({ queryKey: ['task', taskId] });
             queryClient.invalidateQueries({ queryKey: ['project-tasks', projectId] });
             queryClient.invalidateQueries({ queryKey: ['my-tasks'] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard'] });
             setIsEditing(false);
         },
         onError: (error: unknown) => {
@@ -115,6 +117,7 @@ export default function TaskDetailPage() {
         onSuccess: () => {
             toast.success('Tarea eliminada');
             queryClient.invalidateQueries({ queryKey: ['project-tasks', projectId] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard'] });
             router.push(`/projects/${projectId}`);
         },
         onError: () => {
@@ -123,7 +126,9 @@ export default function TaskDetailPage() {
     });
 
     const uploadDocument = useMutation({
-        mutationFn: (file: File) => taskService.uploadDocument(taskId, file),
+        mutationFn: (file: File) => file.size > RESUMABLE_UPLOAD_THRESHOLD
+            ? taskService.uploadDocumentResumable(taskId, file)
+            : taskService.uploadDocument(taskId, file),
         onSuccess: () => {
             toast.success('Documento subido');
             queryClient.invalidateQueries({ queryKey: ['task-documents', taskId] });
@@ -381,7 +386,7 @@ export default function TaskDetailPage() {
                                             </div>
                                             <div className="flex gap-2">
                                                 <a
-                                                    href={doc.file}
+                                                    href={taskService.documentDownloadUrl(doc)}
                                                     target="_blank"
                                                     rel="noopener noreferrer"
                                                     className="p-2 hover:bg-white rounded-lg"
@@ -42,6 +42,7 @@ export default function NewTaskPage() {
             toast.success('Tarea creada exitosamente');
             queryClient.invalidateQueries({ queryKey: ['project-tasks', projectId] });
             queryClient.invalidateQueries({ queryKey: ['my-tasks'] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard'] });
             router.push(`/projects/${projectId}/tasks/${data.id}`);
         },
         onError: (error: unknown) => {
@@ -21,6 +21,7 @@ export default function JoinProjectPage() {
         onSuccess: (data) => {
             toast.success('Te has unido al proyecto exitosamente');
             queryClient.invalidateQueries({ queryKey: ['projects'] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard'] });
             router.push(`/projects/${data.id}`);
         },
         onError: (error: unknown) => {
@@ -30,6 +30,7 @@ export default function NewProjectPage() {
         onSuccess: (data) => {
             toast.success('Proyecto creado exitosamente');
             queryClient.invalidateQueries({ queryKey: ['projects'] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard'] });
             router.push(`/projects/${data.id}`);
         },
         onError: (error: unknown) => {
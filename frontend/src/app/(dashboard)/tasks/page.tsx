@@ -1,7 +1,7 @@
 'use client';
 
-import { useState, useMemo } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import { useState, useMemo, useEffect } from 'react';
+import { useInfiniteQuery, keepPreviousData } from '@tanstack/react-query';
 import Link from 'next/link';
 import {
     CheckSquare,
@@ -20,13 +20,18 @@ import { Card, CardContent } from '@/components/ui/card';
 import { Input } from '@/components/ui/input';
 import { Button } from '@/components/ui/button';
 import { cn, formatShortDate, getDaysRemaining } from '@/lib/utils';
+import type { TaskListParams } from '@/types';
 
 type ViewMode = 'kanban' | 'calendar';
 type SortOption = 'deadline' | 'priority' | 'name' | 'project';
 type FilterStatus = 'all' | 'pending' | 'in_progress' | 'completed';
 type FilterPriority = 'all' | 'critical' | 'high' | 'medium' | 'low';
 
-const priorityOrder = { critical: 0, high: 1, medium: 2, low: 3 };
+const PAGE_SIZE = 50;
+const CALENDAR_PAGE_SIZE = 100;
+
+const toISODate = (date: Date) =>
+    `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}-${String(date.getDate()).padStart(2, '0')}`;
 
 export default function MyTasksPage() {
     const [viewMode, setViewMode] = useState<ViewMode>('kanban');
@@ -37,56 +42,56 @@ export default function MyTasksPage() {
     const [showFilters, setShowFilters] = useState(false);
     const [calendarMonth, setCalendarMonth] = useState(new Date());
 
-    const { data: tasks = [], isLoading } = useQuery({
-        queryKey: ['my-tasks'],
-        queryFn: taskService.getMyTasks,
-    });
-
-    // Filter and sort tasks
-    const filteredTasks = useMemo(() => {
-        let result = [...tasks];
-
-        // Search
-        if (searchQuery) {
-            const query = searchQuery.toLowerCase();
-            result = result.filter(t =>
-                t.name.toLowerCase().includes(query) ||
-                t.project_title?.toLowerCase().includes(query)
-            );
-        }
-
-        // Filter by status
-        if (filterStatus !== 'all') {
-            result = result.filter(t => t.status === filterStatus);
-        }
-
-        // Filter by priority
-        if (filterPriority !== 'all') {
-            result = result.filter(t => t.priority === filterPriority);
+    const [debouncedSearch, setDebouncedSearch] = useState('');
+
+    useEffect(() => {
+        const timeout = setTimeout(() => setDebouncedSearch(searchQuery.trim()), 300);
+        return () => clearTimeout(timeout);
+    }, [searchQuery]);
+
+    // Filtering, sorting and pagination happen on the server
+    const params = useMemo<TaskListParams>(() => {
+        const result: TaskListParams = {
+            sort: sortBy,
+            // The calendar loads the whole month in a single page
+            page_size: viewMode === 'calendar' ? CALENDAR_PAGE_SIZE : PAGE_SIZE,
+            facets: true,
+        };
+        if (filterStatus !== 'all') result.status = filterStatus;
+        if (filterPriority !== 'all') result.priority = filterPriority;
+        if (debouncedSearch) result.search = debouncedSearch;
+        if (viewMode === 'calendar') {
+            const year = calendarMonth.getFullYear();
+            const month = calendarMonth.getMonth();
+            result.deadline_after = toISODate(new Date(year, month, 1));
+            result.deadline_before = toISODate(new Date(year, month + 1, 0));
         }
-
-        // Sort
-        switch (sortBy) {
-            case 'deadline':
-                result.sort((a, b) => new Date(a.deadline).getTime() - new Date(b.deadline).getTime());
-                break;
-            case 'priority':
-                result.sort((a, b) => priorityOrder[a.priority] - priorityOrder[b.priority]);
-                break;
-            case 'name':
-                result.sort((a, b) => a.name.localeCompare(b.name));
-                break;
-            case 'project':
-                result.sort((a, b) => (a.project_title || '').localeCompare(b.project_title || ''));
-                break;
-        }
-
         return result;
-    }, [tasks, searchQuery, filterStatus, filterPriority, sortBy]);
+    }, [sortBy, filterStatus, filterPriority, debouncedSearch, viewMode, calendarMonth]);
+
+    const {
+        data,
+        isLoading,
+        hasNextPage,
+        fetchNextPage,
+        isFetchingNextPage,
+    } = useInfiniteQuery({
+        queryKey: ['my-tasks', params],
+        queryFn: ({ pageParam }) => taskService.listMyTasks(
+            pageParam ? { ...params, cursor: pageParam } : params
+        ),
+        initialPageParam: '',
+        getNextPageParam: (lastPage) => (lastPage.has_more ? lastPage.cursor : undefined),
+        placeholderData: keepPreviousData,
+    });
 
-    const pendingTasks = filteredTasks.filter((t) => t.status === 'pending');
-    const inProgressTasks = filteredTasks.filter((t) => t.status === 'in_progress');
-    const completedTasks = filteredTasks.filter((t) => t.status === 'completed');
+    const tasks = useMemo(() => data?.pages.flatMap((page) => page.results) ?? [], [data]);
+    const facets = data?.pages[0]?.facets;
+    const hasFilters = filterStatus !== 'all' || filterPriority !== 'all' || !!debouncedSearch;
+
+    const pendingTasks = tasks.filter((t) => t.status === 'pending');
+    const inProgressTasks = tasks.filter((t) => t.status === 'in_progress');
+    const completedTasks = tasks.filter((t) => t.status === 'completed');
 
     // Calendar data
     const calendarDays = useMemo(() => {
@@ -103,12 +108,12 @@ export default function MyTasksPage() {
 
         for (let d = 1; d <= lastDay.getDate(); d++) {
             const dateStr = `${year}-${String(month + 1).padStart(2, '0')}-${String(d).padStart(2, '0')}`;
-            const tasksOnDay = filteredTasks.filter(t => t.deadline === dateStr);
+            const tasksOnDay = tasks.filter(t => t.deadline === dateStr);
             days.push({ date: d, tasks: tasksOnDay, dateStr });
         }
 
         return days;
-    }, [calendarMonth, filteredTasks]);
+    }, [calendarMonth, tasks]);
 
     const monthNames = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
         'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'];
@@ -207,8 +212,8 @@ export default function MyTasksPage() {
                 <div>
                     <h1 className="text-2xl font-bold text-[#4A3728]">Mis Tareas</h1>
                     <p className="text-[#7D6B5D] mt-1">
-                        {filteredTasks.length} tarea{filteredTasks.length !== 1 ? 's' : ''}
-                        {filterStatus !== 'all' || filterPriority !== 'all' ? ' (filtrado)' : ''}
+                        {facets?.total ?? tasks.length} tarea{(facets?.total ?? tasks.length) !== 1 ? 's' : ''}
+                        {hasFilters ? ' (filtrado)' : ''}
                     </p>
                 </div>
                 <div className="flex gap-2">
@@ -310,7 +315,7 @@ export default function MyTasksPage() {
                 </Card>
             )}
 
-            {tasks.length === 0 ? (
+            {tasks.length === 0 && !hasFilters && viewMode === 'kanban' ? (
                 <Card className="border-[#E8DFD5] shadow-sm bg-white">
                     <CardContent className="py-16 text-center">
                         <CheckSquare className="w-16 h-16 mx-auto text-[#D4C4B5] mb-4" />
@@ -332,7 +337,7 @@ export default function MyTasksPage() {
                                 <span className="w-3 h-3 rounded-full bg-[#C4A055]" />
                                 Pendientes
                             </h2>
-                            <span className="text-sm text-[#7D6B5D]">{pendingTasks.length}</span>
+                            <span className="text-sm text-[#7D6B5D]">{facets?.status.pending ?? pendingTasks.length}</span>
                         </div>
                         <div className="space-y-3">
                             {pendingTasks.map((task) => (
@@ -353,7 +358,7 @@ export default function MyTasksPage() {
                                 <span className="w-3 h-3 rounded-full bg-[#8B7355]" />
                                 En Progreso
                             </h2>
-                            <span className="text-sm text-[#7D6B5D]">{inProgressTasks.length}</span>
+                            <span className="text-sm text-[#7D6B5D]">{facets?.status.in_progress ?? inProgressTasks.length}</span>
                         </div>
                         <div className="space-y-3">
                             {inProgressTasks.map((task) => (
@@ -374,7 +379,7 @@ export default function MyTasksPage() {
                                 <span className="w-3 h-3 rounded-full bg-[#6B9080]" />
                                 Completadas
                             </h2>
-                            <span className="text-sm text-[#7D6B5D]">{completedTasks.length}</span>
+                            <span className="text-sm text-[#7D6B5D]">{facets?.status.completed ?? completedTasks.length}</span>
                         </div>
                         <div className="space-y-3">
                             {completedTasks.map((task) => (
@@ -387,6 +392,17 @@ export default function MyTasksPage() {
                             )}
                         </div>
                     </div>
+                    {hasNextPage && (
+                        <div className="lg:col-span-3 text-center">
+                            <Button
+                                variant="outline"
+                                onClick={() => fetchNextPage()}
+                                disabled={isFetchingNextPage}
+                            >
+                                {isFetchingNextPage ? 'Cargando...' : 'Cargar más tareas'}
+                            </Button>
+                        </div>
+                    )}
                 </div>
             ) : (
                 /* Calendar View */
@@ -21,9 +21,7 @@ import {
     Bell,
 } from 'lucide-react';
 import { useAuth, useLogout } from '@/hooks/useAuth';
-import { projectService } from '@/services/project.service';
-import { taskService } from '@/services/task.service';
-import { chatService } from '@/services/chat.service';
+import { dashboardService } from '@/services/dashboard.service';
 import { useTheme } from '@/hooks/useTheme';
 
 const mainNavigation = [
@@ -41,39 +39,19 @@ export function Sidebar() {
     const [projectsExpanded, setProjectsExpanded] = useState(true);
     const [mobileOpen, setMobileOpen] = useState(false);
 
-    const { data: projects = [] } = useQuery({
-        queryKey: ['projects'],
-        queryFn: projectService.getProjects,
-    });
-
-    const { data: myTasks = [] } = useQuery({
-        queryKey: ['my-tasks'],
-        queryFn: taskService.getMyTasks,
-    });
-
-    // Fetch chat rooms for unread count
-    const { data: chatRooms = [] } = useQuery({
-        queryKey: ['chat-rooms'],
-        queryFn: chatService.getChatRooms,
+    // Projects, task counts and unread messages in a single request
+    const { data: dashboard } = useQuery({
+        queryKey: ['dashboard'],
+        queryFn: dashboardService.getDashboard,
         refetchInterval: 30000, // Refresh every 30 seconds
     });
 
-    // Calculate total unread messages
-    const totalUnreadMessages = Array.isArray(chatRooms)
-        ? chatRooms.reduce((sum, room) => sum + (room.unread_count || 0), 0)
-        : 0;
+    const projects = dashboard?.projects ?? [];
+    const totalUnreadMessages = dashboard?.unread.total ?? 0;
 
     // Count urgent and pending tasks
-    const getDaysRemaining = (deadline: string) => {
-        const now = new Date();
-        const end = new Date(deadline);
-        return Math.ceil((end.getTime() - now.getTime()) / (1000 * 60 * 60 * 24));
-    };
-
-    const pendingTasks = myTasks.filter((t) => t.status === 'pending');
-    const urgentTasks = myTasks.filter((t) =>
-        t.status !== 'completed' && getDaysRemaining(t.deadline) <= 3
-    );
+    const pendingCount = dashboard?.tasks.by_status.pending ?? 0;
+    const urgentTasks = (dashboard?.tasks.upcoming ?? []).filter((t) => t.days_remaining <= 3);
 
     const SidebarContent = () => (
         <div className="flex flex-col h-full" style={{ backgroundColor: '#FFFDF9' }}>
@@ -108,7 +86,7 @@ export function Sidebar() {
                         (item.href !== '/dashboard' && pathname.startsWith(item.href));
 
                     // Show badge for tasks
-                    const showTaskBadge = item.href === '/tasks' && pendingTasks.length > 0;
+                    const showTaskBadge = item.href === '/tasks' && pendingCount > 0;
                     const showUrgentBadge = item.href === '/tasks' && urgentTasks.length > 0;
 
                     // Show badge for chat
@@ -136,7 +114,7 @@ export function Sidebar() {
                                         color: urgentTasks.length > 0 ? '#A65D57' : '#C4A055'
                                     }}
                                 >
-                                    {pendingTasks.length}
+                                    {pendingCount}
                                 </span>
                             )}
                             {showChatBadge && (
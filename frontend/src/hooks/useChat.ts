@@ -2,7 +2,7 @@
 
 import { useState, useEffect, useCallback, useRef } from 'react';
 import { useAuthStore } from '@/store/authStore';
-import { ChatMessage } from '@/services/chat.service';
+import { chatService, ChatMessage } from '@/services/chat.service';
 
 interface WebSocketMessage {
     type: string;
@@ -16,21 +16,28 @@ interface WebSocketMessage {
     };
     created_at?: string;
     is_own_message?: boolean;
+    client_key?: string | null;
     user_id?: number;
     user_name?: string;
     is_typing?: boolean;
-    message_ids?: number[];
+    last_read_id?: number;
+}
+
+interface PendingMessage {
+    content: string;
+    messageType: string;
 }
 
 interface UseChatReturn {
     messages: ChatMessage[];
     sendMessage: (content: string) => void;
     setTyping: (isTyping: boolean) => void;
-    markMessagesRead: (messageIds: number[]) => void;
+    markMessagesRead: (upToId: number) => void;
     typingUsers: { id: number; name: string }[];
     onlineUsers: { id: number; name: string }[];
     isConnected: boolean;
     connectionError: string | null;
+    pendingCount: number;
 }
 
 export function useChat(roomId: number | null): UseChatReturn {
@@ -39,8 +46,11 @@ export function useChat(roomId: number | null): UseChatReturn {
     const [onlineUsers, setOnlineUsers] = useState<{ id: number; name: string }[]>([]);
     const [isConnected, setIsConnected] = useState(false);
     const [connectionError, setConnectionError] = useState<string | null>(null);
+    const [pendingCount, setPendingCount] = useState(0);
 
     const wsRef = useRef<WebSocket | null>(null);
+    // Messages not yet acknowledged by the server, keyed by client_key (in send order)
+    const pendingRef = useRef<Map<string, PendingMessage>>(new Map());
     const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
     const typingTimeoutRef = useRef<NodeJS.Timeout | null>(null);
 
@@ -64,6 +74,16 @@ export function useChat(roomId: number | null): UseChatReturn {
                     console.log('WebSocket connected to room:', roomId);
                     setIsConnected(true);
                     setConnectionError(null);
+
+                    // Resend unacknowledged messages with their original keys
+                    pendingRef.current.forEach((pending, clientKey) => {
+                        ws.send(JSON.stringify({
+                            type: 'chat_message',
+                            content: pending.content,
+                            message_type: pending.messageType,
+                            client_key: clientKey,
+                        }));
+                    });
                 };
 
                 ws.onmessage = (event) => {
@@ -110,16 +130,34 @@ export function useChat(roomId: number | null): UseChatReturn {
                 wsRef.current = null;
             }
             setMessages([]);
+            pendingRef.current.clear();
+            setPendingCount(0);
             setTypingUsers([]);
             setOnlineUsers([]);
             setIsConnected(false);
         };
     }, [roomId, accessToken]);
 
+    const acknowledge = useCallback((clientKey: string | null | undefined) => {
+        if (clientKey && pendingRef.current.delete(clientKey)) {
+            setPendingCount(pendingRef.current.size);
+        }
+    }, []);
+
+    const addMessage = useCallback((message: ChatMessage) => {
+        // A resent message is acknowledged with the original id
+        setMessages((prev) =>
+            prev.some((msg) => msg.id === message.id) ? prev : [...prev, message]
+        );
+    }, []);
+
     // Handle incoming WebSocket messages
     const handleWebSocketMessage = useCallback((data: WebSocketMessage) => {
         switch (data.type) {
             case 'chat_message':
+                if (data.is_own_message) {
+                    acknowledge(data.client_key);
+                }
                 if (data.sender && data.message_id && data.content && data.created_at) {
                     const newMessage: ChatMessage = {
                         id: data.message_id,
@@ -134,10 +172,11 @@ export function useChat(roomId: number | null): UseChatReturn {
                         message_type: (data.message_type as 'text' | 'file' | 'image' | 'system') || 'text',
                         file: null,
                         is_read: false,
+                        client_key: data.client_key,
                         created_at: data.created_at,
                         is_own_message: data.is_own_message || false,
                     };
-                    setMessages((prev) => [...prev, newMessage]);
+                    addMessage(newMessage);
                 }
                 break;
 
@@ -175,34 +214,57 @@ export function useChat(roomId: number | null): UseChatReturn {
                 break;
 
             case 'messages_read':
-                if (data.message_ids) {
+                if (data.last_read_id) {
                     setMessages((prev) =>
                         prev.map((msg) =>
-                            data.message_ids!.includes(msg.id) ? { ...msg, is_read: true } : msg
+                            msg.id <= data.last_read_id! && msg.sender?.id !== data.user_id
+                                ? { ...msg, is_read: true }
+                                : msg
                         )
                     );
                 }
                 break;
 
+            case 'ping':
+                // Heartbeat: the server closes sockets that stop answering
+                if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+                    wsRef.current.send(JSON.stringify({ type: 'pong' }));
+                }
+                break;
+
             case 'error':
                 console.error('WebSocket error message:', data);
                 break;
         }
-    }, [roomId]);
+    }, [roomId, acknowledge, addMessage]);
 
-    // Send a chat message
+    // Send a chat message; it stays pending until the server echoes its client_key
     const sendMessage = useCallback((content: string) => {
-        if (!wsRef.current || wsRef.current.readyState !== WebSocket.OPEN) {
-            console.error('WebSocket is not connected');
+        if (!roomId) return;
+
+        const clientKey = crypto.randomUUID();
+        const pending: PendingMessage = { content: content.trim(), messageType: 'text' };
+        pendingRef.current.set(clientKey, pending);
+        setPendingCount(pendingRef.current.size);
+
+        if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+            wsRef.current.send(JSON.stringify({
+                type: 'chat_message',
+                content: pending.content,
+                message_type: pending.messageType,
+                client_key: clientKey,
+            }));
             return;
         }
 
-        wsRef.current.send(JSON.stringify({
-            type: 'chat_message',
-            content: content.trim(),
-            message_type: 'text',
-        }));
-    }, []);
+        // Fallback to the REST API; on failure the message is resent on reconnect
+        chatService.sendMessage(roomId, pending.content, pending.messageType, clientKey)
+            .then((message) => {
+                acknowledge(clientKey);
+                addMessage(message);
+            })
+            .catch((error) => console.error('Error sending message:', error));
+    }, [roomId, acknowledge, addMessage]);
 
     // Send typing indicator
     const setTyping = useCallback((isTyping: boolean) => {
@@ -233,15 +295,15 @@ export function useChat(roomId: number | null): UseChatReturn {
         }
     }, []);
 
-    // Mark messages as read
-    const markMessagesRead = useCallback((messageIds: number[]) => {
+    // Mark messages as read up to (and including) the given message id
+    const markMessagesRead = useCallback((upToId: number) => {
         if (!wsRef.current || wsRef.current.readyState !== WebSocket.OPEN) {
             return;
         }
 
         wsRef.current.send(JSON.stringify({
             type: 'mark_read',
-            message_ids: messageIds,
+            up_to_id: upToId,
         }));
     }, []);
 
@@ -254,6 +316,7 @@ export function useChat(roomId: number | null): UseChatReturn {
         onlineUsers,
         isConnected,
         connectionError,
+        pendingCount,
     };
 }
 
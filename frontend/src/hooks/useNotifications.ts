@@ -1,6 +1,8 @@
 'use client';
 
 import { useEffect, useState, useCallback } from 'react';
+import { useAuthStore } from '@/store/authStore';
+import type { TaskReminder } from '@/types';
 
 export function useNotifications() {
     const [permission, setPermission] = useState<NotificationPermission>('default');
@@ -49,33 +51,25 @@ export function useNotifications() {
         }
     }, [isSupported, permission]);
 
-    const notifyUrgentTasks = useCallback((tasks: Array<{ name: string; deadline: string; project_title?: string }>) => {
+    const notifyTaskReminders = useCallback((reminders: TaskReminder[]) => {
         if (!isSupported || permission !== 'granted') return;
 
-        const getDaysRemaining = (deadline: string) => {
-            const now = new Date();
-            const end = new Date(deadline);
-            return Math.ceil((end.getTime() - now.getTime()) / (1000 * 60 * 60 * 24));
-        };
-
-        tasks.forEach(task => {
-            const daysLeft = getDaysRemaining(task.deadline);
-            let body = '';
-
-            if (daysLeft <= 0) {
-                body = `¡La tarea "${task.name}" está vencida!`;
-            } else if (daysLeft === 1) {
-                body = `La tarea "${task.name}" vence mañana`;
-            } else if (daysLeft <= 3) {
-                body = `La tarea "${task.name}" vence en ${daysLeft} días`;
+        reminders.forEach(reminder => {
+            let body: string;
+            if (reminder.kind === 'overdue' || reminder.days_remaining < 0) {
+                body = `¡La tarea "${reminder.task_name}" está vencida!`;
+            } else if (reminder.days_remaining === 0) {
+                body = `La tarea "${reminder.task_name}" vence hoy`;
+            } else if (reminder.days_remaining === 1) {
+                body = `La tarea "${reminder.task_name}" vence mañana`;
+            } else {
+                body = `La tarea "${reminder.task_name}" vence en ${reminder.days_remaining} días`;
             }
 
-            if (body) {
-                sendNotification('⚠️ Recordatorio de Tarea', {
-                    body,
-                    tag: `task-${task.name}`, // Prevents duplicate notifications
-                });
-            }
+            sendNotification('⚠️ Recordatorio de Tarea', {
+                body,
+                tag: `task-${reminder.task_id}-${reminder.kind}`, // Prevents duplicate notifications
+            });
         });
     }, [isSupported, permission, sendNotification]);
 
@@ -84,38 +78,57 @@ export function useNotifications() {
         permission,
         requestPermission,
         sendNotification,
-        notifyUrgentTasks,
+        notifyTaskReminders,
     };
 }
 
-// Hook to check and notify about urgent tasks periodically
-export function useTaskReminders(tasks: Array<{ name: string; deadline: string; status: string; project_title?: string }>) {
-    const { permission, notifyUrgentTasks, requestPermission, isSupported } = useNotifications();
-    const [lastNotified, setLastNotified] = useState<string | null>(null);
+// Hook that listens for deadline reminders pushed by the server.
+// The backend computes due-soon and overdue tasks and sends each reminder once.
+export function useTaskReminders() {
+    const { permission, notifyTaskReminders, requestPermission, isSupported } = useNotifications();
+    const { accessToken } = useAuthStore();
 
     useEffect(() => {
-        // Only run if permission is granted
-        if (permission !== 'granted') return;
-
-        // Get urgent tasks (not completed, deadline within 3 days)
-        const getDaysRemaining = (deadline: string) => {
-            const now = new Date();
-            const end = new Date(deadline);
-            return Math.ceil((end.getTime() - now.getTime()) / (1000 * 60 * 60 * 24));
+        if (permission !== 'granted' || !accessToken) return;
+
+        let ws: WebSocket | null = null;
+        let reconnectTimeout: NodeJS.Timeout | null = null;
+        let closed = false;
+
+        const connect = () => {
+            const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+            const wsHost = process.env.NEXT_PUBLIC_WS_URL || `${window.location.hostname}:8000`;
+            ws = new WebSocket(`${wsProtocol}//${wsHost}/ws/notifications/?token=${accessToken}`);
+
+            ws.onmessage = (event) => {
+                try {
+                    const data = JSON.parse(event.data);
+                    if (data.type === 'ping') {
+                        ws?.send(JSON.stringify({ type: 'pong' }));
+                    } else if (data.type === 'task_reminder') {
+                        notifyTaskReminders(data.reminders as TaskReminder[]);
+                    }
+                } catch (e) {
+                    console.error('Error parsing notification:', e);
+                }
+            };
+
+            ws.onclose = (event) => {
+                // Reconnect after 5 seconds if not a normal close
+                if (!closed && event.code !== 1000) {
+                    reconnectTimeout = setTimeout(connect, 5000);
+                }
+            };
         };
 
-        const urgentTasks = tasks.filter(t =>
-            t.status !== 'completed' &&
-            getDaysRemaining(t.deadline) <= 3
-        );
+        connect();
 
-        // Check once per session (or once per hour if tab stays open)
-        const now = new Date().toISOString().slice(0, 13); // YYYY-MM-DDTHH
-        if (lastNotified !== now && urgentTasks.length > 0) {
-            notifyUrgentTasks(urgentTasks);
-            setLastNotified(now);
-        }
-    }, [tasks, permission, notifyUrgentTasks, lastNotified]);
+        return () => {
+            closed = true;
+            if (reconnectTimeout) clearTimeout(reconnectTimeout);
+            ws?.close(1000, 'Component unmounted');
+        };
+    }, [permission, accessToken, notifyTaskReminders]);
 
     return {
         requestPermission,
@@ -37,6 +37,16 @@ export const fileApi = axios.create({
     baseURL: BACKEND_URL,
 });
 
+// File URLs from the API (document and message `file`) are already signed for
+// the current user, so links and media players can use them without the
+// Authorization header. The signature expires; refetch the data for a fresh one.
+export function downloadUrl(signedUrl: string, asAttachment: boolean = false): string {
+    if (!asAttachment) {
+        return signedUrl;
+    }
+    return `${signedUrl}${signedUrl.includes('?') ? '&' : '?'}download=1`;
+}
+
 // Add auth token to fileApi
 fileApi.interceptors.request.use(
     (config) => {
@@ -1,4 +1,4 @@
-import { api } from '@/lib/api';
+import { api, downloadUrl } from '@/lib/api';
 
 // Types for chat
 export interface ChatRoom {
@@ -36,6 +36,7 @@ export interface ChatMessage {
     message_type: 'text' | 'file' | 'image' | 'system';
     file: string | null;
     is_read: boolean;
+    client_key?: string | null;
     created_at: string;
     is_own_message: boolean;
 }
@@ -111,10 +112,17 @@ export const chatService = {
     /**
      * Send a message via REST API (alternative to WebSocket)
      */
-    sendMessage: async (roomId: number, content: string, messageType: string = 'text'): Promise<ChatMessage> => {
+    sendMessage: async (
+        roomId: number,
+        content: string,
+        messageType: string = 'text',
+        clientKey?: string
+    ): Promise<ChatMessage> => {
+        // The same client_key as the WebSocket attempt lets the server drop duplicates
         const response = await api.post<ChatMessage>(`/chat/rooms/${roomId}/send_message/`, {
             content,
-            message_type: messageType
+            message_type: messageType,
+            ...(clientKey ? { client_key: clientKey } : {})
         });
         return response.data;
     },
@@ -126,6 +134,13 @@ export const chatService = {
         await api.post(`/chat/rooms/${roomId}/mark_read/`);
     },
 
+    /**
+     * Signed link to a message attachment (supports Range requests)
+     */
+    messageFileUrl: (message: ChatMessage, asAttachment: boolean = false): string | null => {
+        return message.file ? downloadUrl(message.file, asAttachment) : null;
+    },
+
     /**
      * Get project members available for private chat
      */
@@ -0,0 +1,9 @@
+import api from '@/lib/api';
+import type { DashboardSummary } from '@/types';
+
+export const dashboardService = {
+    async getDashboard(): Promise<DashboardSummary> {
+        const response = await api.get<DashboardSummary>('/dashboard/');
+        return response.data;
+    },
+};
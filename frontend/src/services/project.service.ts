@@ -1,9 +1,11 @@
 import api from '@/lib/api';
-import type { Project, ProjectCreate, Membership, PaginatedResponse } from '@/types';
+import type { Project, ProjectCreate, ProjectClone, ActivityPage, ActivitySync, Membership, PaginatedResponse, BulkMembershipResponse, ProjectDeletion } from '@/types';
 
 export const projectService = {
-    async getProjects(): Promise<Project[]> {
-        const response = await api.get<PaginatedResponse<Project> | Project[]>('/projects/');
+    async getProjects(search?: string): Promise<Project[]> {
+        const response = await api.get<PaginatedResponse<Project> | Project[]>('/projects/', {
+            params: search ? { search } : undefined,
+        });
         if (Array.isArray(response.data)) {
             return response.data;
         }
@@ -25,8 +27,38 @@ export const projectService = {
         return response.data;
     },
 
-    async deleteProject(id: number): Promise<void> {
-        await api.delete(`/projects/${id}/`);
+    async deleteProject(id: number): Promise<ProjectDeletion> {
+        const response = await api.delete<ProjectDeletion>(`/projects/${id}/`);
+        return response.data;
+    },
+
+    async getProjectDeletion(deletionId: number): Promise<ProjectDeletion> {
+        const response = await api.get<ProjectDeletion>(`/projects/deletions/${deletionId}/`);
+        return response.data;
+    },
+
+    async exportProjectPDF(id: number): Promise<Blob> {
+        const response = await api.get<Blob>(`/projects/${id}/export/pdf/`, {
+            responseType: 'blob',
+        });
+        return response.data;
+    },
+
+    async cloneProject(id: number, data: ProjectClone): Promise<Project> {
+        const response = await api.post<Project>(`/projects/${id}/clone/`, data);
+        return response.data;
+    },
+
+    async getActivity(id: number, cursorUrl?: string): Promise<ActivityPage> {
+        const response = await api.get<ActivityPage>(cursorUrl || `/projects/${id}/activity/`);
+        return response.data;
+    },
+
+    async syncActivity(id: number, since: number): Promise<ActivitySync> {
+        const response = await api.get<ActivitySync>(`/projects/${id}/activity/`, {
+            params: { since },
+        });
+        return response.data;
     },
 
     async joinProject(code: string): Promise<Project> {
@@ -55,4 +87,27 @@ export const projectService = {
     async removeMember(projectId: number, userId: number): Promise<void> {
         await api.post(`/projects/${projectId}/remove-member/`, { user_id: userId });
     },
+
+    async bulkAddMembers(projectId: number, source: string[] | File): Promise<BulkMembershipResponse> {
+        let data: FormData | { emails: string[] };
+        if (Array.isArray(source)) {
+            data = { emails: source };
+        } else {
+            data = new FormData();
+            data.append('file', source);
+        }
+        const response = await api.post<BulkMembershipResponse>(
+            `/projects/${projectId}/members/bulk-add/`,
+            data
+        );
+        return response.data;
+    },
+
+    async bulkRemoveMembers(projectId: number, userIds: number[]): Promise<BulkMembershipResponse> {
+        const response = await api.post<BulkMembershipResponse>(
+            `/projects/${projectId}/members/bulk-remove/`,
+            { user_ids: userIds }
+        );
+        return response.data;
+    },
 };
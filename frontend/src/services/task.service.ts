@@ -1,5 +1,17 @@
-import api, { fileApi } from '@/lib/api';
-import type { Task, TaskCreate, TaskUpdate, TaskStatusUpdate, TaskDocument, PaginatedResponse } from '@/types';
+import api, { downloadUrl, fileApi } from '@/lib/api';
+import type {
+    Task, TaskCreate, TaskUpdate, TaskStatusUpdate, TaskDocument, DocumentUpload, PaginatedResponse,
+    BulkTaskRequest, BulkTaskResponse, TaskListParams, TaskPage
+} from '@/types';
+
+// Files above this size are sent in resumable chunks
+export const RESUMABLE_UPLOAD_THRESHOLD = 5 * 1024 * 1024;
+const MAX_CHUNK_RETRIES = 5;
+
+async function sha256Hex(data: ArrayBuffer): Promise<string> {
+    const digest = await crypto.subtle.digest('SHA-256', data);
+    return Array.from(new Uint8Array(digest), (byte) => byte.toString(16).padStart(2, '0')).join('');
+}
 
 export const taskService = {
     async getTasks(projectId: number): Promise<Task[]> {
@@ -20,6 +32,16 @@ export const taskService = {
         return response.data.results || [];
     },
 
+    async listTasks(projectId: number, params: TaskListParams = {}): Promise<TaskPage> {
+        const response = await api.get<TaskPage>(`/tasks/project/${projectId}/`, { params });
+        return response.data;
+    },
+
+    async listMyTasks(params: TaskListParams = {}): Promise<TaskPage> {
+        const response = await api.get<TaskPage>('/tasks/my-tasks/', { params });
+        return response.data;
+    },
+
     async getTask(taskId: number): Promise<Task> {
         const response = await api.get<Task>(`/tasks/${taskId}/`);
         return response.data;
@@ -44,6 +66,11 @@ export const taskService = {
         return response.data;
     },
 
+    async bulkUpdateTasks(projectId: number, data: BulkTaskRequest): Promise<BulkTaskResponse> {
+        const response = await api.post<BulkTaskResponse>(`/tasks/project/${projectId}/bulk/`, data);
+        return response.data;
+    },
+
     // Document management
     async getDocuments(taskId: number): Promise<TaskDocument[]> {
         const response = await api.get<PaginatedResponse<TaskDocument> | TaskDocument[]>(
@@ -69,6 +96,66 @@ export const taskService = {
         return response.data;
     },
 
+    // Chunked upload: each chunk carries its offset and SHA-256, and after a
+    // failure the upload continues from the offset the server reports.
+    async uploadDocumentResumable(
+        taskId: number,
+        file: File,
+        name?: string,
+        onProgress?: (sent: number, total: number) => void
+    ): Promise<TaskDocument> {
+        const { data: upload } = await fileApi.post<DocumentUpload>(
+            `/tasks/${taskId}/documents/uploads/`,
+            { filename: file.name, name: name || file.name, size: file.size }
+        );
+
+        let offset = upload.received;
+        let failures = 0;
+        while (offset < file.size) {
+            const chunk = await file.slice(offset, offset + upload.chunk_size).arrayBuffer();
+            try {
+                const response = await fileApi.put<{ offset: number }>(
+                    `/tasks/documents/uploads/${upload.id}/`,
+                    chunk,
+                    {
+                        headers: {
+                            'Content-Type': 'application/octet-stream',
+                            'Upload-Offset': String(offset),
+                            'Upload-Checksum': await sha256Hex(chunk),
+                        },
+                    }
+                );
+                offset = response.data.offset;
+                failures = 0;
+            } catch (error) {
+                const err = error as { response?: { status: number; data?: { offset?: number } } };
+                failures += 1;
+                if (failures > MAX_CHUNK_RETRIES) {
+                    throw error;
+                }
+                if (err.response?.status === 409 && typeof err.response.data?.offset === 'number') {
+                    offset = err.response.data.offset;
+                } else if (err.response && err.response.status < 500 && err.response.status !== 400) {
+                    throw error;
+                } else {
+                    // Network error, server error or damaged chunk: back off and resend
+                    await new Promise((resolve) => setTimeout(resolve, 1000 * failures));
+                }
+            }
+            onProgress?.(offset, file.size);
+        }
+
+        const response = await fileApi.post<TaskDocument>(
+            `/tasks/documents/uploads/${upload.id}/complete/`
+        );
+        return response.data;
+    },
+
+    // Signed download link; supports resuming and in-browser preview
+    documentDownloadUrl(document: TaskDocument, asAttachment = false): string {
+        return downloadUrl(document.file, asAttachment);
+    },
+
     async deleteDocument(documentId: number): Promise<void> {
         await api.delete(`/tasks/documents/${documentId}/delete/`);
     },
@@ -40,6 +40,7 @@ export interface Project {
     priority: 'low' | 'medium' | 'high' | 'critical';
     priority_display: string;
     code: string;
+    is_template?: boolean;
     created_by: number;
     created_by_name: string;
     members_count?: number;
@@ -68,6 +69,50 @@ export interface ProjectCreate {
     start_date: string;
     end_date: string;
     priority: 'low' | 'medium' | 'high' | 'critical';
+    is_template?: boolean;
+}
+
+// Códigos de verbo del registro de actividad (projects.models.Activity)
+export const ActivityVerb = {
+    TaskCreated: 1,
+    TaskUpdated: 2,
+    TaskStatusChanged: 3,
+    TaskDeleted: 4,
+    MembersAdded: 10,
+    MembersRemoved: 11,
+    LeaderChanged: 12,
+    DocumentUploaded: 20,
+    DocumentDeleted: 21,
+    ChatRoomCreated: 30,
+} as const;
+
+export interface Activity {
+    id: number;
+    verb: number;
+    actor: number | null;
+    actor_name: string | null;
+    payload: Record<string, unknown>;
+    created_at: string;
+}
+
+export interface ActivityPage {
+    next: string | null;
+    previous: string | null;
+    results: Activity[];
+}
+
+export interface ActivitySync {
+    results: Activity[];
+    cursor: number;
+    has_more: boolean;
+}
+
+export interface ProjectClone {
+    start_date: string;
+    title?: string;
+    end_date?: string;
+    include_members?: boolean;
+    is_template?: boolean;
 }
 
 // Task types
@@ -113,6 +158,71 @@ export interface TaskStatusUpdate {
     status: 'pending' | 'in_progress' | 'completed';
 }
 
+export type TaskSort =
+    | 'created_at' | '-created_at'
+    | 'deadline' | '-deadline'
+    | 'priority' | '-priority'
+    | 'name' | '-name'
+    | 'project' | '-project';
+
+export interface TaskListParams {
+    status?: string;
+    priority?: string;
+    deadline_after?: string;
+    deadline_before?: string;
+    assigned_to?: number | 'me' | 'none';
+    project?: number;
+    search?: string;
+    sort?: TaskSort;
+    cursor?: string;
+    page_size?: number;
+    facets?: boolean;
+}
+
+export interface TaskFacets {
+    total: number;
+    status: Record<'pending' | 'in_progress' | 'completed', number>;
+    priority: Record<'low' | 'medium' | 'high' | 'critical', number>;
+}
+
+export interface TaskPage {
+    results: Task[];
+    cursor: string | null;
+    has_more: boolean;
+    facets?: TaskFacets;
+}
+
+export interface BulkTaskRequest {
+    create?: TaskCreate[];
+    update?: (TaskUpdate & { id: number })[];
+    status?: (TaskStatusUpdate & { id: number })[];
+}
+
+export interface BulkTaskResult {
+    op: 'create' | 'update' | 'status';
+    row: number;
+    id?: number;
+    status: string;
+    message: string;
+    errors?: Record<string, string[]>;
+}
+
+export interface BulkTaskResponse {
+    message: string;
+    summary: Record<string, number>;
+    results: BulkTaskResult[];
+}
+
+export interface TaskReminder {
+    task_id: number;
+    task_name: string;
+    project_id: number;
+    project_title: string;
+    deadline: string;
+    days_remaining: number;
+    kind: 'due_soon' | 'overdue';
+}
+
 export interface TaskDocument {
     id: number;
     task: number;
@@ -124,6 +234,73 @@ export interface TaskDocument {
     uploaded_at: string;
 }
 
+export interface DocumentUpload {
+    id: string;
+    task: number;
+    name: string;
+    filename: string;
+    size: number;
+    received: number;
+    chunk_size: number;
+    document: number | null;
+    created_at: string;
+    updated_at: string;
+}
+
+export interface BulkMembershipResult {
+    row: number;
+    email?: string;
+    user?: number;
+    status: string;
+    message: string;
+}
+
+export interface BulkMembershipResponse {
+    message: string;
+    summary: Record<string, number>;
+    results: BulkMembershipResult[];
+}
+
+export interface ProjectDeletion {
+    id: number;
+    project_id: number;
+    title: string;
+    status: 'pending' | 'running' | 'completed' | 'failed';
+    progress: number;
+    total_rows: number;
+    deleted_rows: number;
+    deleted_files: number;
+    error: string;
+    created_at: string;
+    updated_at: string;
+    finished_at: string | null;
+}
+
+// Dashboard types
+export interface DashboardTask {
+    id: number;
+    name: string;
+    deadline: string;
+    priority: Task['priority'];
+    status: Task['status'];
+    project: number;
+    project_title: string;
+    days_remaining: number;
+}
+
+export interface DashboardSummary {
+    projects: Project[];
+    tasks: {
+        total: number;
+        by_status: Record<Task['status'], number>;
+        upcoming: DashboardTask[];
+    };
+    unread: {
+        total: number;
+        by_room: Record<string, number>;
+    };
+}
+
 // API Response types
 export interface PaginatedResponse<T> {
     count: number;